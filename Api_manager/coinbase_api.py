@@ -9,9 +9,13 @@ import pandas as pd
 import hmac, hashlib, base64, time
 
 from typing import Optional, List
+from contextlib import asynccontextmanager
 from coinbase import jwt_generator
 from Shared_Utils.enum import ValidationCode
 from Shared_Utils.alert_system import AlertSystem
+from Api_manager.http_client import HttpClient
+from Api_manager.jwt_cache import JwtCache
+from Api_manager.rate_limiter import RateLimiter
 from datetime import datetime, timedelta, timezone
 from Shared_Utils.logging_manager import LoggerManager
 from Config.config_manager import CentralConfig as Config
@@ -20,14 +24,12 @@ from Config.config_manager import CentralConfig as Config
 class CoinbaseAPI:
     """This class is for REST API code and should not be confused with the websocket code used in WebsocketHelper."""
 
-    # ✅ Global OHLCV semaphore & counters (shared across all instances)
-    _ohlcv_semaphore = asyncio.Semaphore(5)  # limit concurrent OHLCV calls
-    _active_ohlcv_tasks = 0  # tracking active tasks
-
     def __init__(self, session, shared_utils_utility, logger_manager, shared_utils_precision):
         self.session: aiohttp.ClientSession | None = None
         self.session = session
         self.config = Config()
+        self.jwt_cache = JwtCache.get_instance()
+        self.rate_limiter = RateLimiter.get_instance()
         self._reload_credentials_from_config()
         self._valid_products_cache: set[str] = set()
         self._valid_cache_expiry: datetime | None = None
@@ -56,6 +58,20 @@ class CoinbaseAPI:
         self.jwt_token = None
         self.jwt_expiry = None
 
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        """The session to use: the one passed in while open, else the pooled process-wide one."""
+        if self.session is None or self.session.closed:
+            self.session = HttpClient.get_instance().session
+        return self.session
+
+    @asynccontextmanager
+    async def _request(self, method: str, url: str, *, endpoint: str, **kwargs):
+        """One REST call under the shared RateLimiter; the status and Retry-After feed back into it."""
+        async with self.rate_limiter.acquire(endpoint):
+            async with self._ensure_session().request(method, url, **kwargs) as response:
+                self.rate_limiter.observe(endpoint, response.status, response.headers.get('Retry-After'))
+                yield response
+
     def _load_blocklist_bases_from_env(self) -> set[str]:
         """
         Read SHILL_COINS from .env and return a set of BASE tickers (uppercased).
@@ -76,6 +92,8 @@ class CoinbaseAPI:
         self.market_url = w.get('market_api_url') or None
         self.base_url = w.get('base_url') or None
         self.rest_url = w.get('rest_api_url') or None
+        if hasattr(self, 'jwt_cache'):
+            self.jwt_cache.clear()  # Tokens signed with the previous creds
         try:
             klen = len(self.api_key or "")
             self.logger.debug(f"🔐 Coinbase creds refreshed (key_len={klen}, rest_url={self.rest_url})")
@@ -154,14 +172,14 @@ class CoinbaseAPI:
             # NEW guard to avoid early-empty creds
             self._ensure_creds()
             jwt_uri = jwt_generator.format_jwt_uri(method, request_path)
-            jwt_token = jwt_generator.build_rest_jwt(jwt_uri, self.api_key, self.api_secret)
+            issued = self.jwt_cache.issue(self.api_key, self.api_secret, jwt_uri)  # Reused until near expiry
 
-            if not jwt_token:
+            if not issued.token:
                 raise ValueError("JWT token is empty!")
 
-            self.jwt_token = jwt_token
-            self.jwt_expiry = datetime.now(timezone.utc) + timedelta(minutes=5)
-            return jwt_token
+            self.jwt_token = issued.token
+            self.jwt_expiry = datetime.fromtimestamp(issued.expires, timezone.utc)
+            return issued.token
         except Exception as e:
             self.logger.error(f"JWT Generation Failed: {e}", exc_info=True)
             return None
@@ -178,10 +196,7 @@ class CoinbaseAPI:
             jwt_token = self.generate_rest_jwt('POST', request_path)
             headers = {'Content-Type': 'application/json', 'Authorization': f'Bearer {jwt_token}'}
 
-            if self.session.closed:
-                self.session = aiohttp.ClientSession()
-
-            async with self.session.post(f'{self.rest_url}{request_path}', headers=headers, json=payload) as response:
+            async with self._request('POST', f'{self.rest_url}{request_path}', headers=headers, json=payload, endpoint='orders') as response:
                 error_message = await response.text()
                 status = response.status
 
@@ -272,10 +287,7 @@ class CoinbaseAPI:
             headers = {'Content-Type': 'application/json', 'Authorization': f'Bearer {jwt_token}'}
             url = f'{self.rest_url}{request_path}'
 
-            if self.session.closed:
-                self.session = aiohttp.ClientSession()
-
-            async with self.session.get(url, headers=headers) as response:
+            async with self._request('GET', url, headers=headers, endpoint='reports') as response:
                 text = await response.text()
                 if response.status == 200:
                     js = await response.json()
@@ -295,7 +307,7 @@ class CoinbaseAPI:
                     self._reload_credentials_from_config()
                     jwt_token = self.generate_rest_jwt('GET', request_path)
                     headers = {'Content-Type': 'application/json', 'Authorization': f'Bearer {jwt_token}'}
-                    async with self.session.get(url, headers=headers) as r2:
+                    async with self._request('GET', url, headers=headers, endpoint='reports') as r2:
                         text2 = await r2.text()
                         if r2.status == 200:
                             js = await r2.json()
@@ -325,7 +337,7 @@ class CoinbaseAPI:
         headers = {'Content-Type': 'application/json', 'Authorization': f'Bearer {jwt_token}'}
 
         for attempt in range(max_retries):
-            async with self.session.post(f'{self.rest_url}{request_path}', headers=headers, json=payload) as response:
+            async with self._request('POST', f'{self.rest_url}{request_path}', headers=headers, json=payload, endpoint='orders') as response:
                 if response.status == 200:
                     return await response.json()
                 elif response.status == 401:
@@ -361,10 +373,7 @@ class CoinbaseAPI:
 
             payload = {"order_ids": order_ids}
 
-            if self.session.closed:
-                self.session = aiohttp.ClientSession()
-
-            async with self.session.post(f"{self.rest_url}{request_path}", headers=headers, json=payload) as response:
+            async with self._request('POST', f"{self.rest_url}{request_path}", headers=headers, json=payload, endpoint='orders') as response:
                 text = await response.text()
 
                 if response.status != 200:
@@ -421,17 +430,13 @@ class CoinbaseAPI:
             'Authorization': f'Bearer {jwt_token}',
         }
         timeout_seconds = 15  # ⏱ To catch long stalls
-        async with aiohttp.ClientSession() as session:
-            resp = await asyncio.wait_for(
-            session.get(f"{self.rest_url}{request_path}", params=params, headers=headers),
-                timeout=timeout_seconds
-            )
-            async with resp:
-                if resp.status == 200:
-                    return await resp.json()
-                else:
-                    text = await resp.text()
-                    raise Exception(f"Error {resp.status}: {text}")
+        async with self._request('GET', f"{self.rest_url}{request_path}", params=params, headers=headers,
+                                 timeout=aiohttp.ClientTimeout(total=timeout_seconds), endpoint='reports') as resp:
+            if resp.status == 200:
+                return await resp.json()
+            else:
+                text = await resp.text()
+                raise Exception(f"Error {resp.status}: {text}")
 
     async def list_historical_orders(self, *,
             limit: int | None = None,
@@ -485,10 +490,7 @@ class CoinbaseAPI:
             url = f'{self.rest_url}{request_path}{query}'
 
             # --- do request ---------------------------------------------
-            if self.session.closed:
-                self.session = aiohttp.ClientSession()
-
-            async with self.session.get(url, headers=headers) as resp:
+            async with self._request('GET', url, headers=headers, endpoint='reports') as resp:
                 text = await resp.text()
 
                 if resp.status == 200:
@@ -532,10 +534,7 @@ class CoinbaseAPI:
             if aggregation_price_increment:
                 params["aggregation_price_increment"] = aggregation_price_increment
 
-            if self.session is None or self.session.closed:
-                self.session = aiohttp.ClientSession()
-
-            async with self.session.get(f"{self.rest_url}{path}", params=params, headers=headers) as resp:
+            async with self._request('GET', f"{self.rest_url}{path}", params=params, headers=headers, endpoint='market') as resp:
                 text = await resp.text()
                 if resp.status != 200:
                     self.logger.warning(f"[product_book {product_id}] {resp.status} {text}")
@@ -616,9 +615,7 @@ class CoinbaseAPI:
 
             async def _one_call(batch: list[str]) -> tuple[int, str, dict]:
                 params = {"product_ids": batch}
-                if self.session.closed:
-                    self.session = aiohttp.ClientSession()
-                async with self.session.get(f"{self.rest_url}{request_path}", params=params, headers=headers) as resp:
+                async with self._request('GET', f"{self.rest_url}{request_path}", params=params, headers=headers, endpoint='market') as resp:
                     text = await resp.text()
                     if resp.status == 200:
                         return 200, text, await resp.json()
@@ -692,10 +689,7 @@ class CoinbaseAPI:
                 'Authorization': f'Bearer {jwt_token}'
             }
 
-            if self.session.closed:
-                self.session = aiohttp.ClientSession()
-
-            async with self.session.get(f"{self.rest_url}{request_path}", headers=headers) as response:
+            async with self._request('GET', f"{self.rest_url}{request_path}", headers=headers, endpoint='market') as response:
                 text = await response.text()
                 status = response.status
 
@@ -718,10 +712,7 @@ class CoinbaseAPI:
             headers = {'Content-Type': 'application/json', 'Authorization': f'Bearer {jwt_token}'}
             url = f"{self.rest_url}{request_path}"
 
-            if self.session.closed:
-                self.session = aiohttp.ClientSession()
-
-            async with self.session.get(url, headers=headers) as response:
+            async with self._request('GET', url, headers=headers, endpoint='market') as response:
                 text = await response.text()
                 if response.status == 200:
                     data = await response.json()
@@ -734,7 +725,7 @@ class CoinbaseAPI:
                     self._reload_credentials_from_config()
                     jwt_token = self.generate_rest_jwt('GET', request_path)
                     headers = {'Content-Type': 'application/json', 'Authorization': f'Bearer {jwt_token}'}
-                    async with self.session.get(url, headers=headers) as r2:
+                    async with self._request('GET', url, headers=headers, endpoint='market') as r2:
                         text2 = await r2.text()
                         if r2.status == 200:
                             data = await r2.json()
@@ -754,7 +745,7 @@ class CoinbaseAPI:
     async def fetch_ohlcv(self, symbol: str, params: dict, max_retries: int = 5):
         """
         Fetch OHLCV candles from Coinbase Advanced Trade API (JWT-authenticated).
-        Includes global throttling and exponential backoff retries.
+        Throttled by the shared RateLimiter ('ohlcv' endpoint), with exponential backoff retries.
 
         Args:
             symbol (str): Market symbol like "BTC-USD"
@@ -764,97 +755,88 @@ class CoinbaseAPI:
         Returns:
             dict: { 'symbol': str, 'data': pd.DataFrame }
         """
-        async with self._ohlcv_semaphore:
-            type(self)._active_ohlcv_tasks += 1
-            try:
-                self.logger.debug(
-                    f"📊 OHLCV active={self._active_ohlcv_tasks} "
-                    f"(max={self._ohlcv_semaphore._value + self._active_ohlcv_tasks}) | Fetching: {symbol}"
-                )
-
-                product_id = symbol.replace("/", "-")
-                request_path = f"/api/v3/brokerage/products/{product_id}/candles"
-
-                query_params = {
-                    "start": str(params.get("start")),
-                    "end": str(params.get("end")),
-                    "granularity": params.get("granularity", "ONE_MINUTE"),
-                    "limit": str(params.get("limit", 300))
-                }
+        try:
+            self.logger.debug(f"📊 OHLCV fetching: {symbol}")
 
-                jwt_token = self.generate_rest_jwt("GET", request_path)
-                headers = {
-                    "Authorization": f"Bearer {jwt_token}",
-                    "Content-Type": "application/json"
-                }
-                url = f'{self.rest_url}{request_path}'
+            product_id = symbol.replace("/", "-")
+            request_path = f"/api/v3/brokerage/products/{product_id}/candles"
 
-                retries = 0
-                delay = 1
+            query_params = {
+                "start": str(params.get("start")),
+                "end": str(params.get("end")),
+                "granularity": params.get("granularity", "ONE_MINUTE"),
+                "limit": str(params.get("limit", 300))
+            }
 
-                while retries <= max_retries:
-                    try:
-                        async with aiohttp.ClientSession() as session:
-                            async with session.get(url, headers=headers, params=query_params) as response:
-                                if response.status == 200:
-                                    result = await response.json()
-                                    candles = result.get("candles", [])
-
-                                    if not candles:
-                                        self.logger.debug(f"🟡 No OHLCV data for {symbol}")
-                                        return {"symbol": symbol, "data": pd.DataFrame()}
-
-                                    df = pd.DataFrame(candles).rename(columns={
-                                        "start": "time",
-                                        "low": "low",
-                                        "high": "high",
-                                        "open": "open",
-                                        "close": "close",
-                                        "volume": "volume"
-                                    })
-                                    df["time"] = pd.to_datetime(df["time"].astype(int), unit="s", utc=True)
-                                    df[["open", "high", "low", "close", "volume"]] = df[
-                                        ["open", "high", "low", "close", "volume"]
-                                    ].astype(float)
-                                    df = df.sort_values("time")
-                                    return {"symbol": symbol, "data": df}
-
-                                elif response.status in (429, 500, 503):
-                                    # Retry on rate limits or server errors
-                                    self.logger.warning(
-                                        f"⚠️ OHLCV fetch {symbol} → HTTP {response.status}. "
-                                        f"Retrying in {delay}s (Attempt {retries + 1}/{max_retries})"
-                                    )
-                                else:
-                                    text = await response.text()
-                                    self.logger.error(
-                                        f"❌ OHLCV fetch {symbol} failed → HTTP {response.status}: {text}"
-                                    )
-                                    return {"symbol": symbol, "data": pd.DataFrame()}
-
-                        # Exponential backoff before retry
-                        retries += 1
-                        await asyncio.sleep(delay + random.uniform(0, 0.5))
-                        delay = min(delay * 2, 30)
-
-                    except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
-                        retries += 1
-                        self.logger.warning(
-                            f"🌐 Network error on OHLCV fetch for {symbol}: {e}. "
-                            f"Retrying in {delay}s (Attempt {retries}/{max_retries})"
-                        )
-                        await asyncio.sleep(delay + random.uniform(0, 0.5))
-                        delay = min(delay * 2, 30)
-
-                self.logger.error(f"❌ Max retries exceeded for OHLCV {symbol}")
-                return {"symbol": symbol, "data": pd.DataFrame()}
-
-            except Exception as e:
-                self.logger.error(f"❌ Error fetching OHLCV for {symbol}: {e}", exc_info=True)
-                return {"symbol": symbol, "data": pd.DataFrame()}
-
-            finally:
-                type(self)._active_ohlcv_tasks -= 1
+            jwt_token = self.generate_rest_jwt("GET", request_path)
+            headers = {
+                "Authorization": f"Bearer {jwt_token}",
+                "Content-Type": "application/json"
+            }
+            url = f'{self.rest_url}{request_path}'
+
+            retries = 0
+            delay = 1
+
+            while retries <= max_retries:
+                try:
+                    async with self._request('GET', url, headers=headers, params=query_params, endpoint='ohlcv') as response:
+                        if response.status == 200:
+                            result = await response.json()
+                            candles = result.get("candles", [])
+
+                            if not candles:
+                                self.logger.debug(f"🟡 No OHLCV data for {symbol}")
+                                return {"symbol": symbol, "data": pd.DataFrame()}
+
+                            df = pd.DataFrame(candles).rename(columns={
+                                "start": "time",
+                                "low": "low",
+                                "high": "high",
+                                "open": "open",
+                                "close": "close",
+                                "volume": "volume"
+                            })
+                            df["time"] = pd.to_datetime(df["time"].astype(int), unit="s", utc=True)
+                            df[["open", "high", "low", "close", "volume"]] = df[
+                                ["open", "high", "low", "close", "volume"]
+                            ].astype(float)
+                            df = df.sort_values("time")
+                            return {"symbol": symbol, "data": df}
+
+                        elif response.status in (429, 500, 503):
+                            # Retry on rate limits or server errors
+                            self.logger.warning(
+                                f"⚠️ OHLCV fetch {symbol} → HTTP {response.status}. "
+                                f"Retrying in {delay}s (Attempt {retries + 1}/{max_retries})"
+                            )
+                        else:
+                            text = await response.text()
+                            self.logger.error(
+                                f"❌ OHLCV fetch {symbol} failed → HTTP {response.status}: {text}"
+                            )
+                            return {"symbol": symbol, "data": pd.DataFrame()}
+
+                    # Exponential backoff before retry
+                    retries += 1
+                    await asyncio.sleep(delay + random.uniform(0, 0.5))
+                    delay = min(delay * 2, 30)
+
+                except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                    retries += 1
+                    self.logger.warning(
+                        f"🌐 Network error on OHLCV fetch for {symbol}: {e}. "
+                        f"Retrying in {delay}s (Attempt {retries}/{max_retries})"
+                    )
+                    await asyncio.sleep(delay + random.uniform(0, 0.5))
+                    delay = min(delay * 2, 30)
+
+            self.logger.error(f"❌ Max retries exceeded for OHLCV {symbol}")
+            return {"symbol": symbol, "data": pd.DataFrame()}
+
+        except Exception as e:
+            self.logger.error(f"❌ Error fetching OHLCV for {symbol}: {e}", exc_info=True)
+            return {"symbol": symbol, "data": pd.DataFrame()}
 
     async def fetch_open_orders(self, product_id: Optional[str] = None, limit: int = 100) -> List[dict]:
         """
@@ -886,58 +868,55 @@ class CoinbaseAPI:
         timeout_seconds = 15  # ⏱ To catch long stalls
 
         try:
-            async with aiohttp.ClientSession() as session:
-                while True:
-                    if cursor:
-                        params["cursor"] = cursor
+            while True:
+                if cursor:
+                    params["cursor"] = cursor
 
-                    try:
-                        resp = await asyncio.wait_for(
-                            session.get(f"{self.rest_url}{request_path}", params=params, headers=headers),
-                            timeout=timeout_seconds
-                        )
-                        async with resp:
-                            if resp.status == 429:
-                                retries += 1
-                                if retries > 3:
-                                    self.logger.error("❌ Max retries exceeded due to rate limits.")
-                                    return []
-                                wait_time = 2 ** retries
-                                self.logger.warning(f"⚠️ Rate limited (429). Retrying in {wait_time}s...")
-                                await asyncio.sleep(wait_time)
-                                continue
-
-                            if resp.status != 200:
-                                text = await resp.text()
-                                self.logger.error(f"❌ Failed to fetch orders: HTTP {resp.status}")
-                                self.logger.debug(f"↩️ Response: {text}")
+                try:
+                    async with self._request('GET', f"{self.rest_url}{request_path}", params=params, headers=headers,
+                                             timeout=aiohttp.ClientTimeout(total=timeout_seconds),
+                                             endpoint='account') as resp:
+                        if resp.status == 429:
+                            retries += 1
+                            if retries > 3:
+                                self.logger.error("❌ Max retries exceeded due to rate limits.")
                                 return []
+                            wait_time = 2 ** retries
+                            self.logger.warning(f"⚠️ Rate limited (429). Retrying in {wait_time}s...")
+                            await asyncio.sleep(wait_time)
+                            continue
 
-                            try:
-                                data = await resp.json()
-                            except aiohttp.ContentTypeError:
-                                self.logger.error("❌ Invalid content-type. Could not parse JSON.")
-                                return []
+                        if resp.status != 200:
+                            text = await resp.text()
+                            self.logger.error(f"❌ Failed to fetch orders: HTTP {resp.status}")
+                            self.logger.debug(f"↩️ Response: {text}")
+                            return []
 
-                            orders = data.get("orders", [])
-                            all_orders.extend(orders)
+                        try:
+                            data = await resp.json()
+                        except aiohttp.ContentTypeError:
+                            self.logger.error("❌ Invalid content-type. Could not parse JSON.")
+                            return []
 
-                            if not data.get("has_next"):
-                                break
+                        orders = data.get("orders", [])
+                        all_orders.extend(orders)
 
-                            cursor = data.get("cursor")
+                        if not data.get("has_next"):
+                            break
 
-                    except asyncio.TimeoutError:
-                        self.logger.error(f"⏰ Timeout: fetch_open_orders() exceeded {timeout_seconds}s.")
-                        return []
+                        cursor = data.get("cursor")
 
-                    except asyncio.CancelledError:
-                        self.logger.error("❌ fetch_open_orders() was cancelled during aiohttp request.", exc_info=True)
-                        raise  # Required to allow shutdowns and task cancellation
+                except asyncio.TimeoutError:
+                    self.logger.error(f"⏰ Timeout: fetch_open_orders() exceeded {timeout_seconds}s.")
+                    return []
 
-                    except Exception as e:
-                        self.logger.error(f"❌ Exception during open orders fetch: {e}", exc_info=True)
-                        return []
+                except asyncio.CancelledError:
+                    self.logger.error("❌ fetch_open_orders() was cancelled during aiohttp request.", exc_info=True)
+                    raise  # Required to allow shutdowns and task cancellation
+
+                except Exception as e:
+                    self.logger.error(f"❌ Exception during open orders fetch: {e}", exc_info=True)
+                    return []
 
             # Final filtering and formatting
             formatted_orders = []
@@ -1012,20 +991,14 @@ class CoinbaseAPI:
         pages_fetched = 0
 
         try:
-            if self.session.closed:
-                self.session = aiohttp.ClientSession()
-
             while pages_fetched < max_pages:
                 params = {"limit": "250"}
                 if cursor:
                     params["cursor"] = cursor
 
                 try:
-                    resp = await asyncio.wait_for(
-                        self.session.get(f"{self.rest_url}{request_path}", params=params, headers=headers),
-                        timeout=15
-                    )
-                    async with resp:
+                    async with self._request('GET', f"{self.rest_url}{request_path}", params=params, headers=headers,
+                                             timeout=aiohttp.ClientTimeout(total=15), endpoint='account') as resp:
                         if resp.status != 200:
                             error_text = await resp.text()
                             self.logger.error(f"❌ Get accounts failed [{resp.status}]: {error_text}")
@@ -1107,10 +1080,7 @@ class CoinbaseAPI:
         }
 
         try:
-            if self.session.closed:
-                self.session = aiohttp.ClientSession()
-
-            async with self.session.post(f'{self.rest_url}{request_path}', headers=headers, json=payload) as response:
+            async with self._request('POST', f'{self.rest_url}{request_path}', headers=headers, json=payload, endpoint='orders') as response:
                 status = response.status
                 response_text = await response.text()
 
@@ -1171,10 +1141,7 @@ class CoinbaseAPI:
         }
 
         try:
-            if self.session.closed:
-                self.session = aiohttp.ClientSession()
-
-            async with self.session.post(f'{self.rest_url}{request_path}', headers=headers) as response:
+            async with self._request('POST', f'{self.rest_url}{request_path}', headers=headers, endpoint='orders') as response:
                 status = response.status
                 response_text = await response.text()
 
@@ -1220,10 +1187,7 @@ class CoinbaseAPI:
         }
 
         try:
-            if self.session.closed:
-                self.session = aiohttp.ClientSession()
-
-            async with self.session.get(f'{self.rest_url}{request_path}', headers=headers) as response:
+            async with self._request('GET', f'{self.rest_url}{request_path}', headers=headers, endpoint='account') as response:
                 status = response.status
                 response_text = await response.text()
 
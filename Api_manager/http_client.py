@@ -0,0 +1,139 @@
+"""
+Pooled HTTP Client
+
+One aiohttp.ClientSession per process for the REST helpers (CoinbaseAPI),
+instead of a new session, and so a new TCP + TLS handshake and DNS lookup,
+per request. The session's connector keeps idle keep-alive connections per
+host and bounds how many are open:
+
+- HTTP_POOL_LIMIT (100): open connections in total
+- HTTP_POOL_LIMIT_PER_HOST (30): open connections per host
+- HTTP_KEEPALIVE_TIMEOUT (30): seconds an idle connection is kept for reuse
+- HTTP_DNS_TTL (300): seconds a DNS answer is cached
+- HTTP_CONNECT_TIMEOUT (10) / HTTP_TOTAL_TIMEOUT (30): default request
+  timeouts in seconds (a request can still pass its own)
+
+A trace config counts requests and whether each one got a new or a pooled
+connection (stats()). The process owns the client: main enters it with
+`async with HttpClient.get_instance()`, which closes the session and its
+connections on shutdown.
+"""
+
+import asyncio
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+import aiohttp
+
+from Shared_Utils.logger import get_logger
+
+_logger = get_logger('http_client', context={'component': 'http_client'})
+
+
+@dataclass(frozen=True)
+class HttpClientConfig:
+    limit: int = 100
+    limit_per_host: int = 30
+    keepalive_timeout: float = 30.0
+    dns_ttl: int = 300
+    connect_timeout: float = 10.0
+    total_timeout: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> 'HttpClientConfig':
+        return cls(
+            limit=int(os.getenv('HTTP_POOL_LIMIT', '100')),
+            limit_per_host=int(os.getenv('HTTP_POOL_LIMIT_PER_HOST', '30')),
+            keepalive_timeout=float(os.getenv('HTTP_KEEPALIVE_TIMEOUT', '30')),
+            dns_ttl=int(os.getenv('HTTP_DNS_TTL', '300')),
+            connect_timeout=float(os.getenv('HTTP_CONNECT_TIMEOUT', '10')),
+            total_timeout=float(os.getenv('HTTP_TOTAL_TIMEOUT', '30')),
+        )
+
+
+class HttpClient:
+    """Process-wide pooled aiohttp session with connection reuse counters"""
+    _instance = None
+
+    @classmethod
+    def get_instance(cls, config: Optional[HttpClientConfig] = None) -> 'HttpClient':
+        if cls._instance is None:
+            cls._instance = cls(config)
+        return cls._instance
+
+    def __init__(self, config: Optional[HttpClientConfig] = None):
+        self.config = config or HttpClientConfig.from_env()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.sessions_created = 0
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.request_errors = 0
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The pooled session (created on first use and again if it was closed)"""
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+        return self._session
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        config = self.config
+        connector = aiohttp.TCPConnector(
+            limit=config.limit,
+            limit_per_host=config.limit_per_host,
+            keepalive_timeout=config.keepalive_timeout,
+            ttl_dns_cache=config.dns_ttl,
+        )
+        timeout = aiohttp.ClientTimeout(total=config.total_timeout, connect=config.connect_timeout)
+        self.sessions_created += 1
+        _logger.debug("HTTP session created", extra={'pool_limit': config.limit,
+                                                     'pool_limit_per_host': config.limit_per_host})
+        return aiohttp.ClientSession(connector=connector, timeout=timeout, trace_configs=[self._trace_config()])
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            self.requests += 1
+
+        async def on_connection_create_end(session, context, params):
+            self.connections_created += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            self.connections_reused += 1
+
+        async def on_request_exception(session, context, params):
+            self.request_errors += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace.on_request_exception.append(on_request_exception)
+        return trace
+
+    async def close(self):
+        """Close the session and its pooled connections"""
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            _logger.info("HTTP session closed", extra=self.stats())
+            await session.close()
+            await asyncio.sleep(0)  # Let the connector finish closing transports
+
+    async def __aenter__(self) -> 'HttpClient':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def stats(self) -> dict:
+        connections = self.connections_created + self.connections_reused
+        return {
+            'requests': self.requests,
+            'connections_created': self.connections_created,
+            'connections_reused': self.connections_reused,
+            'reuse_ratio': round(self.connections_reused / connections, 3) if connections else 0.0,
+            'request_errors': self.request_errors,
+            'sessions_created': self.sessions_created,
+        }
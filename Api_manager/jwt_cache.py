@@ -0,0 +1,123 @@
+"""
+Coinbase JWT Cache
+
+Coinbase REST and websocket auth uses short-lived ES256 JWTs (valid for
+JWT_LIFETIME seconds) whose 'uri' claim scopes them to one method, host and
+path ("GET api.coinbase.com/api/v3/brokerage/orders"). Signing a new one
+per request parsed the PEM key and ran an ECDSA signature every time, a
+visible share of CPU during order bursts and OHLCV backfills.
+
+JwtCache keeps one token per (API key, uri) and hands it out until
+COINBASE_JWT_REFRESH_MARGIN seconds before it expires; the parsed private
+key is cached as well. Claims and headers match coinbase.jwt_generator
+(sub, iss='cdp', nbf, exp, uri; kid and a random nonce).
+
+Env:
+- COINBASE_JWT_CACHE (true): false signs a new token per request again
+- COINBASE_JWT_REFRESH_MARGIN (30): seconds before expiry a token is replaced
+
+Lookups and signing happen under a threading lock, so the cache is safe for
+coroutines and for signing from worker threads.
+"""
+
+import os
+import secrets
+import threading
+import time
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+
+JWT_LIFETIME = 120  # Seconds, as coinbase.jwt_generator issues them
+
+
+class CachedJwt(NamedTuple):
+    token: str
+    expires: float  # Epoch seconds
+
+
+class JwtCache:
+    """(API key, uri) -> signed JWT, reused until shortly before it expires"""
+    _instance = None
+
+    @classmethod
+    def get_instance(cls) -> 'JwtCache':
+        if cls._instance is None:
+            cls._instance = cls(
+                enabled=os.getenv('COINBASE_JWT_CACHE', 'true').lower() in ('true', '1', 'yes'),
+                refresh_margin=float(os.getenv('COINBASE_JWT_REFRESH_MARGIN', '30')),
+            )
+        return cls._instance
+
+    def __init__(self, enabled: bool = True, lifetime: int = JWT_LIFETIME, refresh_margin: float = 30.0,
+                 clock: Callable[[], float] = time.time):
+        self.enabled = enabled
+        self.lifetime = lifetime
+        self.refresh_margin = min(refresh_margin, lifetime / 2)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens: Dict[Tuple[str, str], CachedJwt] = {}
+        self._keys: Dict[str, object] = {}  # PEM secret -> parsed private key
+        self.hits = 0
+        self.signed = 0
+        self.expired = 0
+
+    def _private_key(self, secret: str):
+        key = self._keys.get(secret)
+        if key is None:
+            try:
+                key = serialization.load_pem_private_key(secret.encode('utf-8'), password=None)
+            except ValueError as e:
+                raise ValueError(f"Invalid Coinbase API secret (expected an EC private key in PEM format): {e}")
+            self._keys[secret] = key
+        return key
+
+    def _sign(self, key_name: str, secret: str, uri: Optional[str], now: float) -> CachedJwt:
+        issued = int(now)
+        claims = {'sub': key_name, 'iss': 'cdp', 'nbf': issued, 'exp': issued + self.lifetime}
+        if uri:
+            claims['uri'] = uri
+        token = jwt.encode(claims, self._private_key(secret), algorithm='ES256',
+                           headers={'kid': key_name, 'nonce': secrets.token_hex()})
+        self.signed += 1
+        return CachedJwt(token, float(issued + self.lifetime))
+
+    def issue(self, key_name: str, secret: str, uri: Optional[str] = None) -> CachedJwt:
+        """A token for uri ("METHOD host/path", or the websocket URL), signed only when needed"""
+        if not key_name or not secret:
+            raise ValueError("Coinbase API key name and secret are required to sign a JWT")
+        with self._lock:
+            now = self._clock()
+            if not self.enabled:
+                return self._sign(key_name, secret, uri, now)
+            cache_key = (key_name, uri or '')
+            cached = self._tokens.get(cache_key)
+            if cached is not None and now < cached.expires - self.refresh_margin:
+                self.hits += 1
+                return cached
+            if cached is not None:
+                self.expired += 1
+            fresh = self._sign(key_name, secret, uri, now)
+            self._tokens[cache_key] = fresh
+            return fresh
+
+    def token(self, key_name: str, secret: str, uri: Optional[str] = None) -> str:
+        return self.issue(key_name, secret, uri).token
+
+    def clear(self):
+        """Drop every token and parsed key (credentials reloaded / rejected)"""
+        with self._lock:
+            self._tokens.clear()
+            self._keys.clear()
+
+    def stats(self) -> dict:
+        requests = self.hits + self.signed
+        return {
+            'enabled': self.enabled,
+            'tokens': len(self._tokens),
+            'hits': self.hits,
+            'signed': self.signed,
+            'expired': self.expired,
+            'hit_rate': round(self.hits / requests, 3) if requests else 0.0,
+        }
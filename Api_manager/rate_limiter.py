@@ -0,0 +1,283 @@
+"""
+Unified Exchange Rate Limiter
+
+Every REST call to the exchange (CoinbaseAPI, and ccxt calls through
+ApiManager.ccxt_api_call) takes a permit here first. This replaces the
+per-layer limits that did not know about each other (ApiManager's token
+bucket and semaphores, CoinbaseAPI's OHLCV semaphore, MarketManager's fixed
+sleeps between OHLCV chunks and batches).
+
+Pools: one token bucket per exchange budget. Coinbase Advanced Trade allows
+RATE_LIMIT_PRIVATE (30) req/s on authenticated endpoints and
+RATE_LIMIT_PUBLIC (10) req/s on public ones.
+
+Endpoints: each call site names an endpoint (ENDPOINTS), which picks its
+pool, a priority class and a cap on requests in flight. When a pool is out
+of tokens, waiters are served by priority (orders, then reads, then candles,
+then reports) and FIFO within a class.
+
+AIMD: a 429 halves the pool's rate (at most once per second, never below
+RATE_LIMIT_MIN_FRACTION of the budget) and pauses the pool for Retry-After
+(default 1 s); every success adds back 1% of the budget. The pool then
+hovers just under what the exchange actually accepts.
+
+stats() reports per-pool rate, utilization (grants over the last
+UTILIZATION_WINDOW seconds / what the current rate allows) and queue depth,
+and per-endpoint grants, throttles and wait times.
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Callable, Dict, List, Optional
+
+from Shared_Utils.logger import get_logger
+
+_logger = get_logger('rate_limiter', context={'component': 'rate_limiter'})
+
+UTILIZATION_WINDOW = 10.0
+DECREASE_FACTOR = 0.5
+DECREASE_COOLDOWN = 1.0
+INCREASE_FRACTION = 0.01
+DEFAULT_RETRY_AFTER = 1.0
+
+
+class Priority(IntEnum):
+    ORDERS = 0
+    READS = 1
+    CANDLES = 2
+    REPORTS = 3
+
+
+@dataclass(frozen=True)
+class EndpointBudget:
+    pool: str
+    priority: Priority
+    max_concurrent: int
+
+
+ENDPOINTS: Dict[str, EndpointBudget] = {
+    'orders': EndpointBudget('private', Priority.ORDERS, 10),    # create / cancel / edit / convert
+    'private': EndpointBudget('private', Priority.READS, 14),    # ccxt private calls
+    'account': EndpointBudget('private', Priority.READS, 5),     # accounts, open orders
+    'market': EndpointBudget('private', Priority.READS, 8),      # best bid/ask, books, products
+    'ohlcv': EndpointBudget('private', Priority.CANDLES, 5),
+    'fills': EndpointBudget('private', Priority.REPORTS, 9),
+    'reports': EndpointBudget('private', Priority.REPORTS, 4),   # historical orders, fee summary
+    'public': EndpointBudget('public', Priority.READS, 9),       # ccxt public calls
+    'default': EndpointBudget('private', Priority.REPORTS, 2),
+}
+
+
+class _Pool:
+    """Token bucket with an adaptive (AIMD) rate and a priority queue of waiters"""
+
+    def __init__(self, name: str, rate: float, burst: float, min_fraction: float, clock: Callable[[], float]):
+        self.name = name
+        self.max_rate = rate
+        self.min_rate = rate * min_fraction
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self._clock = clock
+        self.updated = clock()
+        self.paused_until = 0.0
+        self.last_decrease = float('-inf')
+        self.waiters: List[list] = []  # heap of [priority, seq, event]
+        self.grants = deque()  # grant times within UTILIZATION_WINDOW
+        self.throttled = 0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Seconds until a token is available (0: take one now)"""
+        now = self._clock()
+        self._refill(now)
+        if now < self.paused_until:
+            return self.paused_until - now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        now = self._clock()
+        self.tokens -= 1
+        self.grants.append(now)
+        while self.grants and self.grants[0] < now - UTILIZATION_WINDOW:
+            self.grants.popleft()
+
+    def wake_head(self):
+        if self.waiters:
+            self.waiters[0][2].set()
+
+    def on_success(self):
+        self.rate = min(self.max_rate, self.rate + self.max_rate * INCREASE_FRACTION)
+
+    def on_throttled(self, retry_after: Optional[float]):
+        now = self._clock()
+        self.throttled += 1
+        self._refill(now)
+        self.paused_until = max(self.paused_until, now + (retry_after if retry_after is not None else DEFAULT_RETRY_AFTER))
+        self.tokens = min(self.tokens, 0.0)
+        if now - self.last_decrease >= DECREASE_COOLDOWN:
+            self.rate = max(self.min_rate, self.rate * DECREASE_FACTOR)
+            self.last_decrease = now
+
+    def utilization(self) -> float:
+        now = self._clock()
+        recent = sum(1 for t in self.grants if t >= now - UTILIZATION_WINDOW)
+        return recent / (self.rate * UTILIZATION_WINDOW)
+
+
+class _EndpointStats:
+    __slots__ = ('granted', 'throttled', 'errors', 'in_flight', 'queued', 'wait_total', 'wait_max')
+
+    def __init__(self):
+        self.granted = self.throttled = self.errors = self.in_flight = self.queued = 0
+        self.wait_total = self.wait_max = 0.0
+
+
+class RateLimiter:
+    """Process-wide permits for exchange REST calls (see module docstring)"""
+    _instance = None
+
+    @classmethod
+    def get_instance(cls) -> 'RateLimiter':
+        if cls._instance is None:
+            cls._instance = cls.from_env()
+        return cls._instance
+
+    @classmethod
+    def from_env(cls) -> 'RateLimiter':
+        return cls(
+            pools={
+                'private': float(os.getenv('RATE_LIMIT_PRIVATE', '30')),
+                'public': float(os.getenv('RATE_LIMIT_PUBLIC', '10')),
+            },
+            min_fraction=float(os.getenv('RATE_LIMIT_MIN_FRACTION', '0.1')),
+        )
+
+    def __init__(self, pools: Dict[str, float], endpoints: Optional[Dict[str, EndpointBudget]] = None,
+                 min_fraction: float = 0.1, clock: Callable[[], float] = time.monotonic):
+        """pools: name -> requests per second (also the burst size)"""
+        self._clock = clock
+        self.pools = {name: _Pool(name, rate, max(1.0, rate), min_fraction, clock) for name, rate in pools.items()}
+        self.endpoints = dict(endpoints or ENDPOINTS)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._stats: Dict[str, _EndpointStats] = {}
+        self._seq = itertools.count()
+
+    def _budget(self, endpoint: str) -> EndpointBudget:
+        return self.endpoints.get(endpoint) or self.endpoints['default']
+
+    def _semaphore(self, endpoint: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(endpoint)
+        if semaphore is None:
+            semaphore = self._semaphores[endpoint] = asyncio.Semaphore(self._budget(endpoint).max_concurrent)
+        return semaphore
+
+    def _endpoint_stats(self, endpoint: str) -> _EndpointStats:
+        stats = self._stats.get(endpoint)
+        if stats is None:
+            stats = self._stats[endpoint] = _EndpointStats()
+        return stats
+
+    async def _take_token(self, pool: _Pool, priority: int):
+        entry = [priority, next(self._seq), asyncio.Event()]
+        heapq.heappush(pool.waiters, entry)
+        try:
+            while True:
+                if pool.waiters[0] is not entry:
+                    entry[2].clear()
+                    await entry[2].wait()  # Set when this entry reaches the head
+                    continue
+                delay = pool.delay()
+                if delay <= 0:
+                    pool.take()
+                    return
+                try:
+                    await asyncio.wait_for(entry[2].wait(), timeout=delay)  # Woken early by a 429 / new head
+                except asyncio.TimeoutError:
+                    pass
+                entry[2].clear()
+        finally:
+            pool.waiters.remove(entry)
+            heapq.heapify(pool.waiters)
+            pool.wake_head()
+
+    @asynccontextmanager
+    async def acquire(self, endpoint: str):
+        """Permit for one request to `endpoint`; report its outcome with observe() / throttled()"""
+        budget = self._budget(endpoint)
+        pool = self.pools[budget.pool]
+        stats = self._endpoint_stats(endpoint)
+        async with self._semaphore(endpoint):
+            start = self._clock()
+            stats.queued += 1
+            try:
+                await self._take_token(pool, budget.priority)
+            finally:
+                stats.queued -= 1
+            waited = self._clock() - start
+            stats.granted += 1
+            stats.wait_total += waited
+            stats.wait_max = max(stats.wait_max, waited)
+            stats.in_flight += 1
+            try:
+                yield
+            finally:
+                stats.in_flight -= 1
+
+    def observe(self, endpoint: str, status: int, retry_after=None):
+        """Feed back an HTTP status (429 slows the pool down, 2xx speeds it back up)"""
+        if status == 429:
+            self.throttled(endpoint, retry_after)
+        elif 200 <= status < 300:
+            self.pools[self._budget(endpoint).pool].on_success()
+        elif status >= 500:
+            self._endpoint_stats(endpoint).errors += 1
+
+    def throttled(self, endpoint: str, retry_after=None):
+        """A rate-limit rejection (HTTP 429 or ccxt RateLimitExceeded) on `endpoint`"""
+        pool = self.pools[self._budget(endpoint).pool]
+        try:
+            retry_after = float(retry_after) if retry_after not in (None, '') else None
+        except (TypeError, ValueError):
+            retry_after = None
+        pool.on_throttled(retry_after)
+        self._endpoint_stats(endpoint).throttled += 1
+        pool.wake_head()  # Re-evaluate the wait against the pause
+        _logger.warning("Exchange rate limit hit", extra={'endpoint': endpoint, 'pool': pool.name,
+                                                          'rate': round(pool.rate, 2), 'retry_after': retry_after})
+
+    def stats(self) -> dict:
+        return {
+            'pools': {
+                name: {
+                    'rate': round(pool.rate, 2),
+                    'max_rate': pool.max_rate,
+                    'utilization': round(pool.utilization(), 3),
+                    'queued': len(pool.waiters),
+                    'throttled': pool.throttled,
+                }
+                for name, pool in self.pools.items()
+            },
+            'endpoints': {
+                name: {
+                    'granted': s.granted,
+                    'throttled': s.throttled,
+                    'errors': s.errors,
+                    'in_flight': s.in_flight,
+                    'queued': s.queued,
+                    'avg_wait_ms': round(s.wait_total / s.granted * 1000, 2) if s.granted else 0.0,
+                    'max_wait_ms': round(s.wait_max * 1000, 2),
+                }
+                for name, s in self._stats.items()
+            },
+        }
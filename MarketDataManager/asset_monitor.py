@@ -1,4 +1,5 @@
 import asyncio
+import copy
 import re
 import datetime as dt
 import collections
@@ -8,6 +9,7 @@ from datetime import datetime, timedelta, timezone
 from webhook.webhook_validate_orders import OrderData
 from Shared_Utils.logger import get_logger
 from MarketDataManager.position_monitor import PositionMonitor
+from MarketDataManager.ohlcv_store import OHLCVStore
 
 # === Config knobs (put near other module-level constants or __init__) ===
 POSITIONS_EXIT_SWEEP_INTERVAL_SEC = 3       # how often you'll call this (see B)
@@ -458,6 +460,7 @@ class AssetMonitor:
                         # Remove from order_tracker
                         if oid in self.shared_data_manager.order_management.get('order_tracker', {}):
                             del self.shared_data_manager.order_management['order_tracker'][oid]
+                            self.shared_data_manager.mark_changed('order_management', ['order_tracker'])
                             self.logger.info(f"[UNTRACKED] Removed order {oid} from order_tracker")
                     else:
                         failure_reason = entry.get("failure_reason") if entry else "No response entry"
@@ -825,31 +828,32 @@ class AssetMonitor:
 
     def _normalize_order_tracker_snapshot(self, order_mgmt: dict) -> dict:
         tracker = order_mgmt.get("order_tracker", {})
-        normalized_tracker = {}
+        return {order_id: self._normalize_tracked_order(raw) for order_id, raw in tracker.items()}
 
-        for order_id, raw in tracker.items():
-            order_type = raw.get("type")
+    @staticmethod
+    def _normalize_tracked_order(raw: dict) -> dict:
+        if raw.get("type") != "TAKE_PROFIT_STOP_LOSS":
+            return raw
 
-            if order_type == "TAKE_PROFIT_STOP_LOSS":
-                trigger_cfg = (
-                    raw.get("info", {})
-                    .get("order_configuration", {})
-                    .get("trigger_bracket_gtc", {})
-                )
-
-                normalized_tracker[order_id] = {
-                    **raw,
-                    "type": "limit",  # Treat as limit for consistency
-                    "tp_sl_flag": True,
-                    "amount": Decimal(trigger_cfg.get("base_size", "0")),
-                    "price": Decimal(trigger_cfg.get("limit_price", "0")),
-                    "stop_price": Decimal(trigger_cfg.get("stop_trigger_price", "0")),
-                    "parent_order_id": raw.get("info", {}).get("originating_order_id"),
-                }
-            else:
-                normalized_tracker[order_id] = raw
+        trigger_cfg = (
+            raw.get("info", {})
+            .get("order_configuration", {})
+            .get("trigger_bracket_gtc", {})
+        )
+        return {
+            **raw,
+            "type": "limit",  # Treat as limit for consistency
+            "tp_sl_flag": True,
+            "amount": Decimal(trigger_cfg.get("base_size", "0")),
+            "price": Decimal(trigger_cfg.get("limit_price", "0")),
+            "stop_price": Decimal(trigger_cfg.get("stop_trigger_price", "0")),
+            "parent_order_id": raw.get("info", {}).get("originating_order_id"),
+        }
 
-        return normalized_tracker
+    def _typed_tracked_order(self, raw: dict) -> tuple:
+        """(normalized order, OrderData), cached per order by the IndexedOrderTracker"""
+        normalized = self._normalize_tracked_order(raw)
+        return normalized, OrderData.from_dict(normalized)
 
     def _get_usd_available(self):
         usd_data = self.usd_pairs.set_index('asset').to_dict(orient='index')
@@ -1075,7 +1079,8 @@ class AssetMonitor:
     async def _get_adx_di(self, symbol: str, lookback: int = ADX_LOOKBACK):
         """
         Returns (adx, plus_di, minus_di) as Decimals, or None if not available.
-        Prefers DB OHLCV via existing fetch function; falls back to live OHLCV via ohlcv_manager.
+        Prefers the shared OHLCV store (websocket candles, synced with ohlcv_data);
+        falls back to a DB fetch function or live OHLCV via ohlcv_manager.
         Reuses precomputed indicators if present on the DataFrame; else computes Wilder ADX.
         """
         now_ts = dt.datetime.now(dt.timezone.utc).timestamp()
@@ -1084,8 +1089,22 @@ class AssetMonitor:
             return cached[1]
 
         ohlcv_df = None
+        window = max(lookback * 3, 100)
 
-        # 1) Try your existing DB fetch (preferred)
+        # 0) Shared OHLCV store; (re)load from ohlcv_data when short or stale
+        store = OHLCVStore.get_instance()
+        last_time = store.last_time(symbol)
+        view = store.view(symbol, n=window)
+        if view is None or len(view) < lookback + 2 or last_time < now_ts - 180:
+            try:
+                await store.refresh_from_db(self.shared_data_manager.database_session_manager, [symbol], window)
+                view = store.view(symbol, n=window)
+            except Exception as e:
+                self.logger.debug(f"[ADX] OHLCV store refresh failed for {symbol}: {e}")
+        if view is not None and len(view) >= lookback + 2:
+            ohlcv_df = store.frame(symbol, n=window)
+
+        # 1) Try your existing DB fetch
         fetch_db = None
         # Locate an existing fetch_ohlcv_data_from_db implementation (listener / manager)
         if hasattr(self.listener, "fetch_ohlcv_data_from_db"):
@@ -1095,7 +1114,7 @@ class AssetMonitor:
         elif hasattr(self, "fetch_ohlcv_data_from_db"):
             fetch_db = self.fetch_ohlcv_data_from_db  # if AssetMonitor exposes it
 
-        if fetch_db:
+        if fetch_db and ohlcv_df is None:
             try:
                 ohlcv_df = await fetch_db(symbol)
             except Exception as e:
@@ -1380,11 +1399,14 @@ class AssetMonitor:
 
         async with self.order_tracker_lock:
 
-            order_tracker = self._normalize_order_tracker_snapshot(order_mgmt)
+            order_tracker = self.shared_data_manager.order_tracker_index()
 
-            for order_id, raw_order in order_tracker.items():
+            for order_id in list(order_tracker):
+                if order_id not in order_tracker:  # Removed while an earlier order was handled
+                    continue
                 try:
-                    order_data = OrderData.from_dict(raw_order)
+                    raw_order, order_data = order_tracker.cached(order_id, self._typed_tracked_order)
+                    order_data = copy.copy(order_data)  # Per-tick fields are set below; keep the cached one intact
                     symbol = order_data.trading_pair
                     asset = re.split(r'[-/]', symbol)[0]
 
@@ -0,0 +1,383 @@
+"""
+Websocket Candle Builder
+
+Builds 1-minute OHLCV bars locally from market websocket messages, so the
+candles in ohlcv_data no longer have to be re-downloaded over REST every cycle:
+
+- market_trades: every trade updates its bar (price and size), giving exact OHLCV
+- ticker / ticker_batch (opt-in, CandleBuilder(ticker_prices=True)): the last
+  trade price at message time updates the bar (close-price sampling, no volume,
+  sampled high/low). For replays and analysis only: CandleService refuses it,
+  so ticker-sampled bars never replace REST candles in ohlcv_data
+
+A bar closes when an update for a later interval arrives, or once its interval
+has ended plus a grace period for late messages. Intervals without updates are
+filled with flat bars at the previous close (volume 0), like the REST path's
+resample().ffill(). The first bar of a symbol after start-up or a reconnect
+only saw part of its interval and is dropped; the hole it leaves is backfilled
+over REST by MarketManager.fetch_and_store_ohlcv_data().
+
+CandleService upserts closed bars into ohlcv_data in batches (and into the
+process's shared OHLCV store, when given one). The webhook subscribes to
+market_trades when WS_CANDLES_ENABLED is set.
+
+Replay a recorded message file (one raw websocket message per line):
+    python -m MarketDataManager.candle_builder messages.jsonl
+    python -m MarketDataManager.candle_builder messages.jsonl --ticker-prices
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from Shared_Utils.logger import get_logger
+from TableModels.ohlcv_data import OHLCVData
+
+TRADE_CHANNELS = ('market_trades',)
+TICKER_CHANNELS = ('ticker', 'ticker_batch')
+CANDLE_CHANNELS = TRADE_CHANNELS + TICKER_CHANNELS
+
+_UPSERT_INSERTS = {
+    'postgresql': postgresql_insert,
+    'sqlite': sqlite_insert,
+}
+
+
+def _epoch_seconds(value) -> Optional[float]:
+    """ISO-8601 timestamp (Coinbase sends up to nanoseconds) → epoch seconds"""
+    if not value:
+        return None
+    value = value.replace('Z', '+00:00')
+    if '.' in value:
+        # fromisoformat() accepts at most microseconds
+        head, _, tail = value.partition('.')
+        digits = len(tail) - len(tail.lstrip('0123456789'))
+        value = f"{head}.{tail[:min(digits, 6)]}{tail[digits:]}"
+    return datetime.fromisoformat(value).timestamp()
+
+
+@dataclass
+class Candle:
+    """One OHLCV bar; `start` is the interval start in epoch seconds"""
+
+    symbol: str
+    start: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float = 0.0
+    partial: bool = False  # Built from part of its interval only (first bar after a (re)start)
+
+    @property
+    def time(self) -> datetime:
+        return datetime.fromtimestamp(self.start, tz=timezone.utc)
+
+    def update(self, price: float, size: float):
+        if price > self.high:
+            self.high = price
+        if price < self.low:
+            self.low = price
+        self.close = price
+        self.volume += size
+
+    def as_record(self) -> Dict:
+        """Row for ohlcv_data"""
+        return {
+            'symbol': self.symbol, 'time': self.time,
+            'open': self.open, 'high': self.high, 'low': self.low,
+            'close': self.close, 'volume': self.volume,
+        }
+
+
+class CandleBuilder:
+    """
+    Aggregates websocket trade and ticker updates into closed OHLCV bars.
+
+    Args:
+        interval_seconds: Bar size (60 = the ONE_MINUTE candles in ohlcv_data)
+        grace_seconds: How long a bar stays open after its interval for late messages
+        max_fill_bars: Flat bars emitted after a symbol's last update before it
+            is treated as stale (longer gaps are left for the REST backfill)
+        ticker_prices: Also build bars from ticker / ticker_batch prices
+            (no volume, sampled high/low; not for ohlcv_data)
+    """
+
+    def __init__(self, interval_seconds: int = 60, grace_seconds: int = 5, max_fill_bars: int = 60,
+                 ticker_prices: bool = False):
+        self.interval = int(interval_seconds)
+        self.grace = grace_seconds
+        self.max_fill_bars = max_fill_bars
+        self.ticker_prices = ticker_prices
+        self.channels = CANDLE_CHANNELS if ticker_prices else TRADE_CHANNELS
+        self._open: Dict[str, Candle] = {}
+        self._last: Dict[str, Candle] = {}        # Last closed bar per symbol
+        self._last_update: Dict[str, int] = {}    # Interval start of the last real update
+        self.stats = {'messages': 0, 'updates': 0, 'late_updates': 0,
+                      'closed': 0, 'filled': 0, 'dropped_partial': 0}
+
+    # =========================================================================
+    # INPUT
+    # =========================================================================
+
+    def on_message(self, data: Dict) -> List[Candle]:
+        """Feed one decoded market websocket message; returns bars it closed"""
+        channel = data.get('channel')
+        if channel not in self.channels:
+            return []
+        self.stats['messages'] += 1
+
+        closed = []
+        if channel == 'market_trades':
+            for event in data.get('events') or []:
+                if event.get('type') == 'snapshot':
+                    continue  # Last trades before subscribing: incomplete history
+                for trade in event.get('trades') or []:
+                    closed += self.add_trade(
+                        trade.get('product_id'), float(trade['price']),
+                        float(trade.get('size') or 0), _epoch_seconds(trade.get('time'))
+                    )
+        else:
+            timestamp = _epoch_seconds(data.get('timestamp'))
+            for event in data.get('events') or []:
+                for ticker in event.get('tickers') or []:
+                    if ticker.get('price'):
+                        closed += self.add_trade(ticker.get('product_id'), float(ticker['price']), 0.0, timestamp)
+        return closed
+
+    def add_trade(self, product_id: str, price: float, size: float, timestamp: Optional[float]) -> List[Candle]:
+        """Apply one price update (size 0 for ticker prices); returns bars it closed"""
+        if not product_id or timestamp is None:
+            return []
+        symbol = product_id.replace('-', '/')
+        start = int(timestamp // self.interval) * self.interval
+        closed = []
+
+        bar = self._open.get(symbol)
+        if bar is not None and start > bar.start:
+            closed += self._close(symbol, until=start)
+            bar = None
+        if bar is None:
+            last = self._last.get(symbol)
+            if last is not None and start <= last.start:
+                self.stats['late_updates'] += 1
+                return closed
+            if last is not None:
+                closed += self._fill(symbol, until=start)
+            bar = Candle(symbol, start, price, price, price, price, partial=symbol not in self._last_update)
+            self._open[symbol] = bar
+            bar.volume += size
+        elif start < bar.start:
+            self.stats['late_updates'] += 1
+            return closed
+        else:
+            bar.update(price, size)
+
+        self._last_update[symbol] = start
+        self.stats['updates'] += 1
+        return closed
+
+    def close_due(self, now: Optional[float] = None) -> List[Candle]:
+        """Close bars whose interval (plus grace) has ended and emit flat bars for quiet symbols"""
+        now = time.time() if now is None else now
+        current = int((now - self.grace) // self.interval) * self.interval
+        closed = []
+        for symbol in [s for s, bar in self._open.items() if bar.start < current]:
+            closed += self._close(symbol, until=current)
+        for symbol in [s for s in self._last if s not in self._open]:
+            closed += self._fill(symbol, until=current)
+        return closed
+
+    def reset(self):
+        """Forget open bars (e.g. after a reconnect: updates may have been missed)"""
+        self._open.clear()
+        self._last.clear()
+        self._last_update.clear()
+
+    # =========================================================================
+    # BAR LIFECYCLE
+    # =========================================================================
+
+    def _close(self, symbol: str, until: int) -> List[Candle]:
+        bar = self._open.pop(symbol)
+        self._last[symbol] = bar
+        if bar.partial:
+            # Flat bars after a dropped partial bar would hide the hole from the backfill
+            self.stats['dropped_partial'] += 1
+            return []
+        self.stats['closed'] += 1
+        return [bar] + self._fill(symbol, until)
+
+    def _fill(self, symbol: str, until: int) -> List[Candle]:
+        """Flat bars after the last closed bar, up to (not including) `until`"""
+        last = self._last[symbol]
+        if last.partial:
+            return []
+        limit = self._last_update.get(symbol, last.start) + self.max_fill_bars * self.interval
+        filled = []
+        start = last.start + self.interval
+        while start < until and start <= limit:
+            flat = Candle(symbol, start, last.close, last.close, last.close, last.close)
+            filled.append(flat)
+            start += self.interval
+        if filled:
+            self._last[symbol] = filled[-1]
+            self.stats['filled'] += len(filled)
+        return filled
+
+
+class CandleService:
+    """
+    Feeds market websocket messages to a CandleBuilder and upserts closed bars
+    into ohlcv_data in batches.
+
+    Usage:
+        service = CandleService(database_session_manager)
+        service.on_message(data)             # from the market message handler (no I/O)
+        asyncio.create_task(service.run(shutdown_event))
+    """
+
+    def __init__(self, database_session_manager, builder: Optional[CandleBuilder] = None,
+                 flush_seconds: float = 10.0, batch_rows: int = 1000, record_path: Optional[str] = None,
+                 store=None):
+        """
+        Args:
+            database_session_manager: Provides async_session()
+            builder: CandleBuilder (default: 1-minute bars)
+            flush_seconds: Interval between closing due bars and writing them
+            batch_rows: Rows per INSERT ... ON CONFLICT batch
+            record_path: Append every candle-channel message to this JSONL file (for replays)
+            store: OHLCVStore that also receives the written bars (ONE_MINUTE)
+        """
+        self.db_session_manager = database_session_manager
+        self.builder = builder or CandleBuilder()
+        if self.builder.ticker_prices:
+            raise ValueError("Ticker-sampled bars (no volume, sampled high/low) must not be written to ohlcv_data")
+        self.flush_seconds = flush_seconds
+        self.batch_rows = max(1, int(batch_rows))
+        self.record_path = record_path
+        self.store = store
+        self.logger = get_logger('candle_builder', context={'component': 'candle_builder'})
+        self._pending: List[Candle] = []
+        self.rows_written = 0
+
+    def on_message(self, data: Dict):
+        """Apply one decoded market message; closed bars wait for the next flush"""
+        if data.get('channel') not in self.builder.channels:
+            return
+        if self.record_path:
+            with open(self.record_path, 'a') as f:
+                f.write(json.dumps(data) + '\n')
+        self._pending += self.builder.on_message(data)
+
+    def reset(self):
+        self.builder.reset()
+
+    async def flush(self, now: Optional[float] = None) -> int:
+        """Close due bars and upsert everything pending; returns rows written"""
+        self._pending += self.builder.close_due(now)
+        if not self._pending:
+            return 0
+        # ON CONFLICT cannot touch the same row twice in one statement: last bar wins
+        rows = list({(c.symbol, c.start): c.as_record() for c in self._pending}.values())
+        async with self.db_session_manager.async_session() as session:
+            async with session.begin():
+                await self.write(session, rows)
+        if self.store is not None:
+            for c in sorted(self._pending, key=lambda c: c.start):
+                self.store.update_bar(c.symbol, 'ONE_MINUTE', c.start, c.open, c.high, c.low, c.close, c.volume)
+        self._pending = []
+        self.rows_written += len(rows)
+        return len(rows)
+
+    async def write(self, session, rows: List[Dict]):
+        """Upsert ohlcv_data rows in batches of batch_rows"""
+        connection = await session.connection()
+        dialect = connection.dialect.name
+        if dialect not in _UPSERT_INSERTS:
+            raise NotImplementedError(f"ohlcv_data upsert not supported on {dialect}")
+        stmt = _UPSERT_INSERTS[dialect](OHLCVData.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['symbol', 'time'],
+            set_={
+                'open': stmt.excluded.open, 'high': stmt.excluded.high, 'low': stmt.excluded.low,
+                'close': stmt.excluded.close, 'volume': stmt.excluded.volume,
+                'last_updated': func.now(),
+            }
+        )
+        for start in range(0, len(rows), self.batch_rows):
+            await session.execute(stmt, rows[start:start + self.batch_rows])
+
+    async def run(self, shutdown_event: Optional[asyncio.Event] = None):
+        """Flush every flush_seconds until shutdown_event is set"""
+        self.logger.info("Websocket candle builder started",
+                         extra={'interval_s': self.builder.interval, 'flush_s': self.flush_seconds})
+        while shutdown_event is None or not shutdown_event.is_set():
+            await asyncio.sleep(self.flush_seconds)
+            try:
+                written = await self.flush()
+                if written:
+                    self.logger.debug("Websocket candles flushed",
+                                      extra={'rows': written, **self.builder.stats})
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Keep the bars: the next flush retries them
+                self.logger.error(f"❌ Error flushing websocket candles: {e}", exc_info=True)
+
+
+def replay(messages: Iterable[Dict], builder: Optional[CandleBuilder] = None,
+           until: Optional[float] = None) -> List[Candle]:
+    """
+    Run recorded messages through a CandleBuilder; returns the closed bars.
+
+    Bars still open at the end are closed as of `until` (default: one
+    interval after the last bar, i.e. everything is closed).
+    """
+    builder = builder or CandleBuilder()
+    closed = []
+    for data in messages:
+        closed += builder.on_message(data)
+    if until is None:
+        starts = [bar.start for bar in builder._open.values()]
+        until = max(starts) + builder.interval + builder.grace if starts else 0
+    return closed + builder.close_due(until)
+
+
+def read_messages(path: str) -> Iterable[Dict]:
+    """Decoded messages from a JSONL recording (blank lines skipped)"""
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Replay recorded market websocket messages into candles')
+    parser.add_argument('path', help='JSONL file with one raw market message per line')
+    parser.add_argument('--interval', type=int, default=60, help='Bar size in seconds')
+    parser.add_argument('--symbol', help='Only print bars for this symbol (e.g. BTC/USD)')
+    parser.add_argument('--ticker-prices', action='store_true',
+                        help='Also sample ticker / ticker_batch prices (no volume)')
+    args = parser.parse_args(argv)
+
+    builder = CandleBuilder(interval_seconds=args.interval, ticker_prices=args.ticker_prices)
+    candles = replay(read_messages(args.path), builder)
+    for c in candles:
+        if args.symbol is None or c.symbol == args.symbol:
+            print(f"{c.time.isoformat()}  {c.symbol:<12} O={c.open} H={c.high} L={c.low} C={c.close} V={c.volume}")
+    print(f"{len(candles)} bars · {builder.stats}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,271 @@
+"""
+Level 2 Order Book
+
+In-memory L2 books per product, built from the market websocket's level2
+channel (its messages arrive as channel 'l2_data'): one snapshot event per
+product, then update events that set a price level's new quantity (0 removes
+the level).
+
+Each side is a SortedDict keyed by Decimal price, so applying an update is
+O(log n) in the number of levels and the best bid / ask are O(1). Queries:
+best bid / ask, spread, mid, top-N depth and VWAP to a size.
+
+Gaps and resyncs: Coinbase numbers every message of a connection
+(sequence_num, across all channels), so L2BookManager.observe() is fed every
+market message in arrival order. A skipped number invalidates every book, a
+crossed book or an update without a snapshot invalidates its product; invalid
+books are cleared, a resync is requested (WebSocketHelper resubscribes level2,
+which sends fresh snapshots) and book() answers None until the snapshot
+arrives, so callers fall back to REST meanwhile.
+
+Replay a recorded capture (one raw websocket message per line):
+    python -m scripts.benchmarks.bench_l2_book --capture level2.jsonl
+"""
+
+import asyncio
+import operator
+import time
+from decimal import Decimal
+from itertools import islice
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sortedcontainers import SortedDict
+
+from Shared_Utils.logger import get_logger
+from webhook.ws_decoder import to_decimal
+
+L2_CHANNEL = 'l2_data'
+
+Level = Tuple[Decimal, Decimal]  # (price, size)
+
+_BID_SIDES = ('bid', 'buy')
+
+
+class L2Book:
+    """Price levels of one product"""
+
+    __slots__ = ('product_id', 'bids', 'asks', 'valid', 'updated_at', 'updates')
+
+    def __init__(self, product_id: str):
+        self.product_id = product_id
+        self.bids = SortedDict(operator.neg)  # Highest price first
+        self.asks = SortedDict()  # Lowest price first
+        self.valid = False  # Snapshot applied and no gap since
+        self.updated_at = 0.0  # time.time() of the last applied event
+        self.updates = 0
+
+    def clear(self):
+        self.bids.clear()
+        self.asks.clear()
+        self.valid = False
+
+    def apply(self, side: str, price: Decimal, quantity: Decimal):
+        """Set one level (quantity 0 removes it)"""
+        levels = self.bids if side in _BID_SIDES else self.asks
+        if quantity:
+            levels[price] = quantity
+        else:
+            levels.pop(price, None)
+
+    def apply_updates(self, updates: Iterable[Dict]) -> int:
+        """Apply raw level2 updates ({side, price_level, new_quantity}); returns levels applied"""
+        applied = 0
+        for update in updates:
+            price = to_decimal(update.get('price_level'))
+            if price is None:
+                continue
+            self.apply(update.get('side'), price, to_decimal(update.get('new_quantity'), Decimal(0)))
+            applied += 1
+        self.updates += applied
+        self.updated_at = time.time()
+        return applied
+
+    # =========================================================================
+    # QUERIES
+    # =========================================================================
+
+    def best_bid(self) -> Optional[Level]:
+        return self.bids.peekitem(0) if self.bids else None
+
+    def best_ask(self) -> Optional[Level]:
+        return self.asks.peekitem(0) if self.asks else None
+
+    def crossed(self) -> bool:
+        return bool(self.bids and self.asks) and self.bids.peekitem(0)[0] >= self.asks.peekitem(0)[0]
+
+    def spread(self) -> Optional[Decimal]:
+        if not (self.bids and self.asks):
+            return None
+        return self.asks.peekitem(0)[0] - self.bids.peekitem(0)[0]
+
+    def mid(self) -> Optional[Decimal]:
+        if not (self.bids and self.asks):
+            return None
+        return (self.asks.peekitem(0)[0] + self.bids.peekitem(0)[0]) / 2
+
+    def depth(self, n: int = 10) -> Dict[str, List[Level]]:
+        """Top `n` levels per side, best first"""
+        return {'bids': list(islice(self.bids.items(), n)), 'asks': list(islice(self.asks.items(), n))}
+
+    def vwap(self, side: str, size: Decimal) -> Optional[Decimal]:
+        """
+        Average fill price of a market order for `size` base units: 'buy' walks
+        the asks, 'sell' the bids. None if the book holds less than `size`.
+        """
+        size = Decimal(size)
+        if size <= 0:
+            return None
+        levels = self.asks if side.lower() == 'buy' else self.bids
+        remaining, notional = size, Decimal(0)
+        for price, quantity in levels.items():
+            take = min(quantity, remaining)
+            notional += take * price
+            remaining -= take
+            if not remaining:
+                return notional / size
+        return None
+
+
+class L2BookManager:
+    """
+    Usage:
+        books = L2BookManager.get_instance()
+        books.resync = helper.resync_level2
+        books.observe(data)            # every market message, arrival order
+        books.on_message(data)         # 'l2_data' messages
+        book = books.book('BTC/USD')   # None until a snapshot is in
+    """
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls) -> 'L2BookManager':
+        """Shared books of this process"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, resync: Optional[Callable[[List[str]], Awaitable[None]]] = None,
+                 resync_interval: float = 5.0, resync_timeout: float = 30.0, logger=None):
+        """
+        Args:
+            resync: Coroutine function called with product ids whose books need
+                a fresh snapshot
+            resync_interval: Seconds between resync requests (invalidations in
+                between are batched into the next one)
+            resync_timeout: Seconds to wait for a requested snapshot before
+                requesting it again
+        """
+        self.resync = resync
+        self.resync_interval = resync_interval
+        self.resync_timeout = resync_timeout
+        self.logger = logger or get_logger('webhook', context={'component': 'l2_order_book'})
+        self.books: Dict[str, L2Book] = {}
+        self.counters = {'messages': 0, 'snapshots': 0, 'updates': 0, 'dropped': 0,
+                         'gaps': 0, 'crossed': 0, 'resyncs': 0}
+        self._last_sequence: Optional[int] = None
+        self._awaiting: Dict[str, float] = {}  # Product → monotonic time its snapshot was requested
+        self._resync_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _product_id(symbol: str) -> str:
+        return symbol.replace('/', '-')
+
+    def book(self, symbol: str) -> Optional[L2Book]:
+        """Book of a product ('BTC-USD' or 'BTC/USD'), None unless it is in sync"""
+        book = self.books.get(self._product_id(symbol))
+        return book if book is not None and book.valid else None
+
+    # =========================================================================
+    # MESSAGES
+    # =========================================================================
+
+    def observe(self, data: Dict) -> bool:
+        """Check a market message's sequence_num; returns False on a gap"""
+        sequence = data.get('sequence_num')
+        if sequence is None:
+            return True
+        last, self._last_sequence = self._last_sequence, sequence
+        if last is None or sequence <= last + 1:
+            return True
+        self.counters['gaps'] += 1
+        in_sync = [product for product, book in self.books.items() if book.valid]
+        if in_sync:
+            self.logger.warning(f"⚠️ Market sequence gap {last} → {sequence}: resyncing {len(in_sync)} L2 books")
+            self.invalidate(in_sync)
+        return False
+
+    def on_message(self, data: Dict):
+        """Apply the snapshot / update events of one l2_data message"""
+        self.counters['messages'] += 1
+        for event in data.get('events') or ():
+            product = event.get('product_id')
+            if not product:
+                continue
+            updates = event.get('updates') or ()
+            book = self.books.get(product)
+            if book is None:
+                book = self.books[product] = L2Book(product)
+
+            if event.get('type') == 'snapshot':
+                book.clear()
+                book.apply_updates(updates)
+                book.valid = True
+                self._awaiting.pop(product, None)
+                self.counters['snapshots'] += 1
+            elif not book.valid:
+                self.counters['dropped'] += len(updates)
+                if product not in self._awaiting:
+                    self.invalidate([product])  # Updates without a snapshot
+                continue
+            else:
+                self.counters['updates'] += book.apply_updates(updates)
+
+            if book.crossed():
+                self.counters['crossed'] += 1
+                self.logger.warning(f"⚠️ Crossed L2 book for {product}: resyncing")
+                self.invalidate([product])
+
+    def invalidate(self, products: Iterable[str]):
+        """Clear books and request fresh snapshots for them"""
+        products = [self._product_id(p) for p in products]
+        for product in products:
+            book = self.books.get(product)
+            if book is not None:
+                book.clear()
+            self._awaiting.setdefault(product, float('-inf'))
+        if self.resync is not None and (self._resync_task is None or self._resync_task.done()):
+            try:
+                self._resync_task = asyncio.get_running_loop().create_task(self._run_resync())
+            except RuntimeError:
+                pass  # No loop (replay): the books stay invalid
+
+    def reset(self):
+        """New connection: sequence numbers restart and its subscription sends new snapshots"""
+        for book in self.books.values():
+            book.clear()
+        self._last_sequence = None
+        self._awaiting.clear()
+
+    async def _run_resync(self):
+        while self._awaiting:
+            now = time.monotonic()
+            due = sorted(p for p, requested in self._awaiting.items() if now - requested >= self.resync_timeout)
+            if due:
+                for product in due:
+                    self._awaiting[product] = now
+                self.counters['resyncs'] += 1
+                try:
+                    await self.resync(due)
+                except Exception as e:
+                    # Still awaited: requested again after resync_timeout
+                    self.logger.error(f"❌ L2 resync failed for {len(due)} products: {e}", exc_info=True)
+            await asyncio.sleep(self.resync_interval)
+
+    def stats(self) -> Dict:
+        return {
+            **self.counters,
+            'books': len(self.books),
+            'in_sync': sum(book.valid for book in self.books.values()),
+            'awaiting_snapshot': len(self._awaiting),
+        }
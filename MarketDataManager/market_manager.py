@@ -6,7 +6,7 @@ import TableModels.ohlcv_data
 from typing import Any, List
 from sqlalchemy.sql import Select
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import select, func, delete
+from sqlalchemy import select, func, delete, text, bindparam
 from Config.config_manager import CentralConfig
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta, timezone
@@ -54,7 +54,6 @@ class MarketManager:
         self.logger = get_logger('market_manager', context={'component': 'market_manager'})
 
         self.start_time = None
-        self.request_semaphore = asyncio.Semaphore(2)
         self.semaphore = asyncio.Semaphore(max_concurrent_tasks)
 
         if self.coinbase_api is None:
@@ -84,12 +83,6 @@ class MarketManager:
     def max_ohlcv_rows(self):
         return self._max_ohlcv_rows
 
-    async def rate_limited_request(self, func, *args, **kwargs):
-        """PART III"""
-        async with self.request_semaphore:
-            await asyncio.sleep(self.exchange.rateLimit / 1000)  # Enforce rate limit
-            return await func(*args, **kwargs)
-
     async def fetch_scalar_column(self, session: AsyncSession, query: Select) -> List[Any]:
         """
         Executes a SQLAlchemy select query and returns a flat list of scalar values.
@@ -104,67 +97,50 @@ class MarketManager:
     async def fetch_and_store_ohlcv_data(self, symbols, mode='update', timeframe='ONE_MINUTE', limit=300):
         """PART III:
         Called from sender.py
-        Fetch and store OHLCV data in parallel for all symbols, handling initialization or updates.
+        Fetch and store OHLCV data over REST for all symbols.
+
+        'initialize' downloads the last 24 hours per symbol. In 'update' mode the
+        candles normally come from the websocket candle builder
+        (MarketDataManager/candle_builder.py), so REST only backfills gaps:
+        symbols with no candles, holes between stored candles, and stale tails.
         """
 
-        async def fetch_store(symbol):
+        async def fetch_store(symbol, ranges):
             """PART III:
-            Fetch and store OHLCV data for a single symbol.
+            Fetch and store OHLCV data for a single symbol over the given time ranges.
 
         """
             try:
-                # Start and end time for 24 hours
-                end_dt = datetime.now(timezone.utc)
-                start_dt = end_dt - timedelta(minutes=1440)
-
-                # Initialize empty DataFrame to accumulate
                 all_dfs = []
-
-                # Break 1440 min into 350-candle chunks (≈ 6 batches max)
-                chunk_minutes = 350  # Coinbase max per call
-                for i in range(0, 1440, chunk_minutes):
-                    chunk_start = start_dt + timedelta(minutes=i)
-                    chunk_duration_seconds = limit * 60
-                    chunk_end = chunk_start + timedelta(seconds=chunk_duration_seconds)
-
-                    # If chunk_end goes beyond the end_dt, skip it
-                    if chunk_end > end_dt:
-                        break
-                    params = {
-                        "start": int(chunk_start.timestamp()),
-                        "end": int(chunk_end.timestamp()),
-                        "granularity": timeframe,
-                        "limit": limit
-                    }
-                    ohlcv_result = await OHLCVDebugCounter.track(
-                        self.coinbase_api.fetch_ohlcv(symbol, params),
-                        symbol
-                    )#debugging counter to track active requests
-
-                    # ohlcv_result = await self.coinbase_api.fetch_ohlcv(symbol=symbol,params=params)
-                    if ohlcv_result and not ohlcv_result['data'].empty:
-                        all_dfs.append(ohlcv_result['data'])
-                    else:
-                        self.logger.warning("No OHLCV data returned for chunk",
-                                          extra={'symbol': symbol, 'chunk_start': str(chunk_start), 'chunk_end': str(chunk_end)})
-
-                    await asyncio.sleep(0.2)  # Gentle pacing
-
-                # Merge all chunks
-                if all_dfs:
-                    df = pd.concat(all_dfs)
+                for start_dt, end_dt in ranges:
+                    df = await self.fetch_ohlcv_range(symbol, start_dt, end_dt, timeframe, limit)
+                    if df.empty:
+                        continue
+                    # Forward-fill within each range only: candles between ranges are already stored
+                    df = df.drop_duplicates('time', keep='last')
                     df['time'] = pd.to_datetime(df['time'], unit='ms')
                     df = df.set_index('time').resample('1min', origin='start').ffill().reset_index()
                     df['time'] = pd.to_datetime(df['time'], utc=True)  # safe & direct UTC assignment
+                    all_dfs.append(df)
 
-                    await self.store_ohlcv_data({'symbol': symbol, 'data': df})
+                if all_dfs:
+                    await self.store_ohlcv_data({'symbol': symbol, 'data': pd.concat(all_dfs, ignore_index=True)})
                 else:
-                    self.logger.error("No OHLCV data fetched for 24h window", extra={'symbol': symbol})
+                    self.logger.warning("No OHLCV data fetched for requested ranges",
+                                        extra={'symbol': symbol, 'ranges': [(str(a), str(b)) for a, b in ranges]})
 
             except Exception as e_process:
                 self.logger.error(f"❌ Error processing OHLCV data for {symbol}: {e_process}", exc_info=True)
 
         try:
+            end_dt = datetime.now(timezone.utc)
+            if mode == 'update':
+                gaps = await self.find_ohlcv_gaps(symbols, end_dt)
+            else:
+                gaps = {symbol: [(end_dt - timedelta(minutes=1440), end_dt)] for symbol in symbols}
+            symbols = [symbol for symbol in symbols if gaps.get(symbol)]
+            self.logger.info("OHLCV REST backfill", extra={'mode': mode, 'symbols': len(symbols)})
+
             # Dynamically adjust batch size based on the number of symbols
             total_symbols = len(symbols)
             if total_symbols <= 20:
@@ -174,25 +150,99 @@ class MarketManager:
             else:
                 batch_size = 10  # Larger batch sizes for many symbols
 
-            # Concurrency semaphore to control rate limits
+            # Symbols in flight; request pacing is CoinbaseAPI's shared RateLimiter ('ohlcv' endpoint),
+            # so there is no barrier or sleep between batches
             semaphore = asyncio.Semaphore(batch_size)
+            processed = 0
 
             async def throttled_fetch_store(symbol):
+                nonlocal processed
                 async with semaphore:
-                    await fetch_store(symbol)
+                    await fetch_store(symbol, gaps[symbol])
+                processed += 1
+                if processed % batch_size == 0 or processed == total_symbols:
+                    self.logger.info("OHLCV batch processing progress",
+                                     extra={'processed': processed, 'total': total_symbols})
 
-            # Process symbols in batches
-            for i in range(0, total_symbols, batch_size):
-                batch = symbols[i:i + batch_size]
-                tasks = [throttled_fetch_store(symbol) for symbol in batch]
-                await asyncio.gather(*tasks)
-                self.logger.info("OHLCV batch processing progress",
-                               extra={'processed': i + len(batch), 'total': total_symbols})
-                await asyncio.sleep(0.5)  # Slight delay between batches to respect rate limits
+            await asyncio.gather(*(throttled_fetch_store(symbol) for symbol in symbols))
 
         except Exception as e:
             self.logger.error(f"❌ Error in fetch_and_store_ohlcv_data(): {e}", exc_info=True)
 
+    async def fetch_ohlcv_range(self, symbol, start_dt, end_dt, timeframe='ONE_MINUTE', limit=300) -> pd.DataFrame:
+        """
+        Fetch 1-minute candles for [start_dt, end_dt] over REST in contiguous
+        chunks of `limit` candles; returns them concatenated (may be empty).
+        """
+        all_dfs = []
+        chunk = timedelta(minutes=limit)
+        chunk_start = start_dt
+        while chunk_start < end_dt:
+            chunk_end = min(chunk_start + chunk, end_dt)
+            params = {
+                "start": int(chunk_start.timestamp()),
+                "end": int(chunk_end.timestamp()),
+                "granularity": timeframe,
+                "limit": limit
+            }
+            ohlcv_result = await OHLCVDebugCounter.track(
+                self.coinbase_api.fetch_ohlcv(symbol, params),
+                symbol
+            )  # debugging counter to track active requests
+
+            if ohlcv_result and not ohlcv_result['data'].empty:
+                all_dfs.append(ohlcv_result['data'])
+            else:
+                self.logger.warning("No OHLCV data returned for chunk",
+                                    extra={'symbol': symbol, 'chunk_start': str(chunk_start), 'chunk_end': str(chunk_end)})
+
+            chunk_start = chunk_end
+
+        return pd.concat(all_dfs) if all_dfs else pd.DataFrame()
+
+    async def find_ohlcv_gaps(self, symbols, now: datetime, stale_after: timedelta = timedelta(seconds=150)):
+        """
+        Time ranges per symbol that ohlcv_data is missing within the last
+        max_ohlcv_rows minutes: the whole window for symbols without candles,
+        holes between consecutive candles, and the tail when the newest candle
+        is older than `stale_after` (a websocket bar is written at most ~135s after it starts).
+        """
+        step = timedelta(minutes=1)
+        since = now - timedelta(minutes=self._max_ohlcv_rows)
+        symbol_param = bindparam('symbols', expanding=True)
+
+        latest_query = text("""
+            SELECT symbol, MAX(time) AS last_time
+            FROM ohlcv_data
+            WHERE symbol IN :symbols AND time >= :since
+            GROUP BY symbol
+        """).bindparams(symbol_param)
+        holes_query = text("""
+            SELECT symbol, prev_time, time
+            FROM (
+                SELECT symbol, time, LAG(time) OVER (PARTITION BY symbol ORDER BY time) AS prev_time
+                FROM ohlcv_data
+                WHERE symbol IN :symbols AND time >= :since
+            ) candles
+            WHERE prev_time IS NOT NULL AND time > prev_time + :step
+        """).bindparams(symbol_param)
+
+        params = {'symbols': list(symbols), 'since': since, 'step': step}
+        async with self.db_session_manager.async_session() as session:
+            latest = {row.symbol: row.last_time for row in await session.execute(latest_query, params)}
+            holes = (await session.execute(holes_query, params)).fetchall()
+
+        gaps = {symbol: [] for symbol in symbols}
+        for row in holes:
+            gaps[row.symbol].append((row.prev_time, row.time))
+        for symbol in symbols:
+            last_time = latest.get(symbol)
+            if last_time is None:
+                gaps[symbol] = [(since, now)]
+            elif now - last_time > stale_after:
+                gaps[symbol].append((last_time, now))
+        return gaps
+
     async def store_ohlcv_data(self, ohlcv_data):
         """
         Store OHLCV data in the database using SQLAlchemy async engine.
@@ -7,6 +7,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta, timezone
 from Shared_Utils.logger import get_logger
+from MarketDataManager.ohlcv_store import OHLCVStore
 
 # Module-level logger for debug counter
 _ohlcv_logger = get_logger('ohlcv_manager', context={'component': 'ohlcv_manager'})
@@ -72,12 +73,12 @@ class OHLCVManager:
 
         self.market_manager = market_manager
         self.shared_utiles_data_time = shared_utiles_data_time
-        self.ohlcv_cache = {}  # In-memory cache
+        self.ohlcv_store = OHLCVStore.get_instance()  # Shared with the websocket candle builder
 
     async def fetch_last_5min_ohlcv(self, symbol, timeframe='ONE_MINUTE', limit=5):
         """
         Fetches the last 5 minutes of OHLCV data dynamically from the REST API.
-        Uses a cache to prevent excessive API requests.
+        Uses the shared OHLCV store to prevent excessive API requests.
         Args:
             symbol (str): Trading pair (e.g., 'BTC-USD').
             timeframe (str): OHLCV timeframe ('ONE_MINUTE' for 1-minute candles).
@@ -91,12 +92,11 @@ class OHLCVManager:
             now = datetime.now(timezone.utc).replace(microsecond=0)
             five_min_ago = now - timedelta(minutes=5)
 
-            # ✅ Step 1: Check Cache
-            if symbol in self.ohlcv_cache:
-                cached_data = self.ohlcv_cache[symbol]
-                if cached_data["timestamp"] >= five_min_ago:
+            # ✅ Step 1: Check the store (written in the last 5 minutes and covering them)
+            if self.ohlcv_store.updated_at(symbol, timeframe) >= five_min_ago.timestamp():
+                df = self.ohlcv_store.frame(symbol, timeframe, since=five_min_ago)
+                if len(df) >= limit:
                     self.logger.debug(f"✅ Using cached OHLCV data for {symbol}")
-                    df = cached_data['data']
                     return df, df.iloc[0]['close'], df.iloc[-1]['close'], df['close'].mean()
 
             # ✅ Step 2: Prepare timestamp range
@@ -124,7 +124,7 @@ class OHLCVManager:
                 df = df.set_index('time')
                 df = df.resample('1min').asfreq().ffill().reset_index()
 
-                self.ohlcv_cache[symbol] = {"timestamp": now, "data": df}
+                self.ohlcv_store.update_frame(symbol, timeframe, df)
 
                 oldest_close = df.iloc[0]['close']
                 newest_close = df.iloc[-1]['close']
@@ -140,10 +140,9 @@ class OHLCVManager:
 
     async def fetch_volatility_5min(self, symbol, threshold_multiplier=1.1):
         try:
-            # Always ensure cache is fresh; function will reuse cache if valid
-            await self.fetch_last_5min_ohlcv(symbol)
+            # Function will reuse the store if it is fresh
+            df, *_ = await self.fetch_last_5min_ohlcv(symbol)
 
-            df = self.ohlcv_cache.get(symbol, {}).get('data')
             if df is None or df.empty or len(df) < 5:
                 return None, None
 
@@ -0,0 +1,392 @@
+"""
+Shared OHLCV Store
+
+One process-wide in-memory store of candles, keyed by (symbol, timeframe),
+replacing the per-consumer candle copies (OHLCVManager's 5-minute cache,
+TradingStrategy's per-cycle DB reads, AssetMonitor's ADX input, TickerManager's
+hourly ATR candles).
+
+Each series is a fixed-capacity NumPy ring buffer: appends are O(1), the
+oldest bars fall off once capacity is reached, and readers get zero-copy,
+read-only views of the newest bars. Rings are preallocated, so memory use is
+known up front; once the configured cap is exceeded the least recently used
+series are evicted (cold symbols are simply reloaded on their next use).
+
+Symbols are normalized to the ohlcv_data form ('BTC-USD' → 'BTC/USD') and times
+are stored as epoch seconds of the bar start.
+
+Views are only valid until the next write to the same series (the ring is
+compacted in place), so read them synchronously or use frame() for a copy.
+"""
+
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import and_, func, or_, select
+
+from Shared_Utils.logger import get_logger
+from TableModels.ohlcv_data import OHLCVData
+
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+# Bars kept per series (ONE_MINUTE: 24h, the longest OHLCV window in use)
+TIMEFRAME_CAPACITY = {
+    'ONE_MINUTE': 1440,
+    'FIVE_MINUTE': 864,
+    'FIFTEEN_MINUTE': 672,
+    'ONE_HOUR': 500,
+    'SIX_HOUR': 400,
+    'ONE_DAY': 365,
+}
+
+_EPOCH = pd.Timestamp(0, tz='UTC')
+_SECOND = pd.Timedelta(seconds=1)
+
+
+def to_epoch_seconds(values) -> np.ndarray:
+    """Datetimes (aware, naive UTC, or pandas) → int64 epoch seconds"""
+    index = pd.DatetimeIndex(pd.to_datetime(values, utc=True))
+    return np.asarray((index - _EPOCH) // _SECOND, dtype=np.int64)
+
+
+class OHLCVView(NamedTuple):
+    """Read-only arrays of the newest bars of one series (oldest first)"""
+
+    time: np.ndarray  # int64 epoch seconds
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self):
+        return len(self.time)
+
+
+class OHLCVRing:
+    """
+    Fixed-capacity ring of bars in ascending time order.
+
+    Bars live in a buffer of capacity + slack slots and are always contiguous,
+    so views never wrap: when the write position reaches the end of the buffer
+    the newest bars are moved back to the front (one copy every `slack` appends).
+    """
+
+    __slots__ = ('capacity', '_time', '_values', '_start', '_end', 'updated_at')
+
+    def __init__(self, capacity: int):
+        self.capacity = int(capacity)
+        size = self.capacity + max(16, self.capacity // 4)
+        self._time = np.zeros(size, dtype=np.int64)
+        self._values = np.zeros((len(FIELDS), size), dtype=np.float64)
+        self._start = 0
+        self._end = 0
+        self.updated_at = 0.0  # Wall time of the last write
+
+    def __len__(self):
+        return self._end - self._start
+
+    @property
+    def nbytes(self) -> int:
+        return self._time.nbytes + self._values.nbytes
+
+    @property
+    def last_time(self) -> Optional[int]:
+        return int(self._time[self._end - 1]) if self._end > self._start else None
+
+    def append(self, t: int, values: Tuple[float, ...]):
+        """Add one bar; a bar for the newest time replaces it (in-progress candle revised)"""
+        last = self.last_time
+        if last is not None and t <= last:
+            if t == last:
+                self._values[:, self._end - 1] = values
+                self.updated_at = time.time()
+            else:
+                self.extend(np.array([t], dtype=np.int64), np.array(values, dtype=np.float64).reshape(-1, 1))
+            return
+        self._reserve(1)
+        self._time[self._end] = t
+        self._values[:, self._end] = values
+        self._end += 1
+        if self._end - self._start > self.capacity:
+            self._start += 1
+        self.updated_at = time.time()
+
+    def extend(self, times: np.ndarray, values: np.ndarray):
+        """
+        Add bars (times ascending; values shaped (5, n)). Bars overlapping the
+        stored range replace the stored bars with the same time.
+        """
+        n = len(times)
+        if n == 0:
+            return
+        last = self.last_time
+        if last is not None and times[0] <= last:
+            self._merge(times, values)
+            return
+        if n >= self.capacity:
+            self._start, self._end = 0, self.capacity
+            self._time[:self.capacity] = times[-self.capacity:]
+            self._values[:, :self.capacity] = values[:, -self.capacity:]
+        else:
+            self._reserve(n)
+            self._time[self._end:self._end + n] = times
+            self._values[:, self._end:self._end + n] = values
+            self._end += n
+            self._start = max(self._start, self._end - self.capacity)
+        self.updated_at = time.time()
+
+    def view(self, n: Optional[int] = None) -> OHLCVView:
+        start = self._start if n is None else max(self._start, self._end - n)
+        arrays = [self._time[start:self._end]] + [row[start:self._end] for row in self._values]
+        for array in arrays:
+            array.flags.writeable = False
+        return OHLCVView(*arrays)
+
+    def _reserve(self, n: int):
+        """Make room for n more bars at the end of the buffer"""
+        if self._end + n <= len(self._time):
+            return
+        keep = min(self._end - self._start, self.capacity - n)
+        src = self._end - keep
+        self._time[:keep] = self._time[src:self._end]
+        self._values[:, :keep] = self._values[:, src:self._end]
+        self._start, self._end = 0, keep
+
+    def _merge(self, times: np.ndarray, values: np.ndarray):
+        """Out-of-order or overlapping bars: rebuild the series (new bars win)"""
+        all_times = np.concatenate([self._time[self._start:self._end], times])
+        all_values = np.concatenate([self._values[:, self._start:self._end], values], axis=1)
+        # Last occurrence of each time wins: unique() on the reversed arrays keeps the first
+        unique_times, first = np.unique(all_times[::-1], return_index=True)
+        picked = len(all_times) - 1 - first
+        self._start = self._end = 0
+        self.extend(unique_times, all_values[:, picked])
+
+
+class OHLCVStore:
+    """
+    Process-wide candle store: one OHLCVRing per (symbol, timeframe) with LRU
+    eviction under a memory cap.
+
+    Usage:
+        store = OHLCVStore.get_instance()
+        store.update_frame('BTC/USD', 'ONE_MINUTE', df)
+        view = store.view('BTC/USD', n=100)     # zero-copy arrays
+        df = store.frame('BTC/USD', n=720)      # DataFrame copy (time, open, ..., volume)
+    """
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls) -> 'OHLCVStore':
+        """Shared store of this process (memory cap from OHLCV_STORE_MAX_MB, default 256)"""
+        if cls._instance is None:
+            max_mb = float(os.getenv('OHLCV_STORE_MAX_MB', '256'))
+            cls._instance = cls(max_bytes=int(max_mb * 1024 * 1024))
+        return cls._instance
+
+    def __init__(self, max_bytes: Optional[int] = None, capacities: Optional[Dict[str, int]] = None,
+                 default_capacity: int = 1440, db_overlap: timedelta = timedelta(minutes=5)):
+        """
+        Args:
+            max_bytes: Memory cap for all rings (None = unbounded)
+            capacities: Bars per series by timeframe (default: TIMEFRAME_CAPACITY)
+            default_capacity: Bars per series for timeframes not in `capacities`
+            db_overlap: How far before the last seen ohlcv_data.last_updated
+                refresh_from_db() re-reads (covers in-flight transactions and clock skew)
+        """
+        self.max_bytes = max_bytes
+        self.capacities = dict(TIMEFRAME_CAPACITY if capacities is None else capacities)
+        self.default_capacity = default_capacity
+        self.db_overlap = db_overlap
+        self.logger = get_logger('ohlcv_store', context={'component': 'ohlcv_store'})
+        self._rings: 'OrderedDict[Tuple[str, str], OHLCVRing]' = OrderedDict()
+        self._bytes = 0
+        self._db_watermarks: Dict[str, datetime] = {}  # symbol → last ohlcv_data.last_updated seen for it
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'bars_written': 0}
+
+    # =========================================================================
+    # LOOKUP
+    # =========================================================================
+
+    @staticmethod
+    def _key(symbol: str, timeframe: str) -> Tuple[str, str]:
+        return symbol.replace('-', '/'), timeframe
+
+    def _get(self, symbol: str, timeframe: str) -> Optional[OHLCVRing]:
+        key = self._key(symbol, timeframe)
+        ring = self._rings.get(key)
+        if ring is None or not len(ring):
+            self.stats['misses'] += 1
+            return None
+        self._rings.move_to_end(key)
+        self.stats['hits'] += 1
+        return ring
+
+    def __contains__(self, key) -> bool:
+        return self._key(*key) in self._rings
+
+    def __len__(self):
+        return len(self._rings)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def view(self, symbol: str, timeframe: str = 'ONE_MINUTE', n: Optional[int] = None) -> Optional[OHLCVView]:
+        """Zero-copy read-only arrays of the newest n bars (all when None); None if unknown"""
+        ring = self._get(symbol, timeframe)
+        return ring.view(n) if ring is not None else None
+
+    def frame(self, symbol: str, timeframe: str = 'ONE_MINUTE', n: Optional[int] = None,
+              since: Optional[datetime] = None) -> pd.DataFrame:
+        """
+        Newest n bars (or bars starting at/after `since`) as a new DataFrame with
+        the ohlcv_data columns; empty if the series is unknown.
+        """
+        view = self.view(symbol, timeframe, n)
+        if view is None:
+            return pd.DataFrame(columns=['time', *FIELDS])
+        start = 0
+        if since is not None:
+            start = int(np.searchsorted(view.time, to_epoch_seconds([since])[0], side='left'))
+        times = pd.DatetimeIndex(view.time[start:].astype('datetime64[s]').astype('datetime64[ns]'))
+        df = pd.DataFrame(np.vstack(view[1:])[:, start:].T, columns=list(FIELDS))
+        df.insert(0, 'time', times.tz_localize('UTC'))
+        return df
+
+    def last_time(self, symbol: str, timeframe: str = 'ONE_MINUTE') -> Optional[int]:
+        """Start (epoch seconds) of the newest stored bar"""
+        ring = self._rings.get(self._key(symbol, timeframe))
+        return ring.last_time if ring is not None else None
+
+    def updated_at(self, symbol: str, timeframe: str = 'ONE_MINUTE') -> float:
+        """Wall time of the last write to the series (0 if unknown)"""
+        ring = self._rings.get(self._key(symbol, timeframe))
+        return ring.updated_at if ring is not None else 0.0
+
+    # =========================================================================
+    # WRITES
+    # =========================================================================
+
+    def _ring(self, symbol: str, timeframe: str) -> OHLCVRing:
+        key = self._key(symbol, timeframe)
+        ring = self._rings.get(key)
+        if ring is None:
+            ring = OHLCVRing(self.capacities.get(timeframe, self.default_capacity))
+            self._rings[key] = ring
+            self._bytes += ring.nbytes
+            self._evict(keep=key)
+        else:
+            self._rings.move_to_end(key)
+        return ring
+
+    def _evict(self, keep: Tuple[str, str]):
+        while self.max_bytes is not None and self._bytes > self.max_bytes and len(self._rings) > 1:
+            key, ring = next(iter(self._rings.items()))
+            if key == keep:
+                break
+            del self._rings[key]
+            self._bytes -= ring.nbytes
+            self.stats['evictions'] += 1
+
+    def update_bar(self, symbol: str, timeframe: str, start: int,
+                   open_: float, high: float, low: float, close: float, volume: float):
+        """Add or revise one bar (`start` in epoch seconds)"""
+        self._ring(symbol, timeframe).append(int(start), (open_, high, low, close, volume))
+        self.stats['bars_written'] += 1
+
+    def update(self, symbol: str, timeframe: str, times: np.ndarray, values: np.ndarray):
+        """Add or revise bars: epoch-second times (ascending) and values shaped (5, n)"""
+        if len(times):
+            self._ring(symbol, timeframe).extend(np.asarray(times, dtype=np.int64),
+                                                 np.asarray(values, dtype=np.float64))
+            self.stats['bars_written'] += len(times)
+
+    def update_frame(self, symbol: str, timeframe: str, df: pd.DataFrame):
+        """Add or revise bars from a DataFrame with a `time` column and the OHLCV columns"""
+        if df is None or df.empty:
+            return
+        df = df.sort_values('time')
+        values = df[list(FIELDS)].to_numpy(dtype=np.float64).T
+        self.update(symbol, timeframe, to_epoch_seconds(df['time']), values)
+
+    def discard(self, symbol: str, timeframe: Optional[str] = None):
+        """Drop one series, or every timeframe of a symbol"""
+        name = symbol.replace('-', '/')
+        for key in [k for k in self._rings if k[0] == name and (timeframe is None or k[1] == timeframe)]:
+            self._bytes -= self._rings.pop(key).nbytes
+
+    def clear(self):
+        self._rings.clear()
+        self._bytes = 0
+        self._db_watermarks.clear()
+
+    # =========================================================================
+    # OHLCV_DATA SYNC
+    # =========================================================================
+
+    async def refresh_from_db(self, database_session_manager, symbols: Iterable[str], limit: int) -> int:
+        """
+        Bring the ONE_MINUTE series of `symbols` up to date with ohlcv_data.
+
+        Symbols not in the store load their newest `limit` rows; the others
+        only read rows written since their own previous refresh
+        (ohlcv_data.last_updated), which picks up new candles, revised candles
+        and backfilled holes. Watermarks are kept per symbol, so callers
+        refreshing different symbol subsets never skip each other's rows.
+        Both are single queries for all symbols. Returns the rows read.
+        """
+        names = sorted({s.replace('-', '/') for s in symbols})
+        if not names:
+            return 0
+        cold = [s for s in names if s not in self._db_watermarks or (s, 'ONE_MINUTE') not in self._rings]
+        warm = [s for s in names if s not in set(cold)]
+        columns = (OHLCVData.symbol, OHLCVData.time, *(getattr(OHLCVData, f) for f in FIELDS),
+                   OHLCVData.last_updated)
+
+        rows = []
+        async with database_session_manager.async_session() as session:
+            if cold:
+                ranked = select(
+                    *columns,
+                    func.row_number().over(partition_by=OHLCVData.symbol, order_by=OHLCVData.time.desc()).label('rn')
+                ).where(OHLCVData.symbol.in_(cold)).subquery()
+                result = await session.execute(
+                    select(*(ranked.c[c.key] for c in columns)).where(ranked.c.rn <= limit)
+                )
+                rows += result.all()
+            if warm:
+                # Symbols refreshed together share a watermark: one condition per group
+                groups: Dict[datetime, list] = {}
+                for s in warm:
+                    groups.setdefault(self._db_watermarks[s], []).append(s)
+                result = await session.execute(
+                    select(*columns).where(or_(*(
+                        and_(OHLCVData.symbol.in_(group), OHLCVData.last_updated >= watermark - self.db_overlap)
+                        for watermark, group in groups.items()
+                    )))
+                )
+                rows += result.all()
+
+        if not rows:
+            return 0
+        df = pd.DataFrame(rows, columns=['symbol', 'time', *FIELDS, 'last_updated'])
+        for symbol, bars in df.groupby('symbol', sort=False):
+            self.update_frame(symbol, 'ONE_MINUTE', bars)
+
+        seen = df['last_updated'].dropna()
+        if not seen.empty:
+            latest = seen.max().to_pydatetime()
+            loaded = set(df['symbol'])
+            for s in names:
+                # Cold symbols without rows stay cold; the rest advance to what this query saw
+                if s in loaded or s in self._db_watermarks:
+                    self._db_watermarks[s] = max(latest, self._db_watermarks.get(s, latest))
+        return len(rows)
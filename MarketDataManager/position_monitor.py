@@ -17,6 +17,7 @@ import os
 from decimal import Decimal, ROUND_HALF_UP
 from typing import Optional, Dict, Tuple
 from datetime import datetime, timedelta
+from SharedDataManager.order_tracker import OPEN_STATUSES
 
 class PositionMonitor:
     """
@@ -668,15 +669,8 @@ class PositionMonitor:
             True if open sell order exists, False otherwise
         """
         try:
-            order_tracker = self.shared_data_manager.order_management.get('order_tracker', {})
-
-            for order_id, order_info in order_tracker.items():
-                if order_info.get('symbol') == product_id or order_info.get('product_id') == product_id:
-                    if order_info.get('side', '').lower() == 'sell':
-                        if order_info.get('status') in {'open', 'OPEN', 'new', 'NEW'}:
-                            return True
-
-            return False
+            order_tracker = self.shared_data_manager.order_tracker_index()
+            return order_tracker.has(product=product_id, side='sell', status=OPEN_STATUSES)
 
         except Exception as e:
             self.logger.debug(f"[POS_MONITOR] Error checking open sell orders for {product_id}: {e}")
@@ -774,13 +768,10 @@ class PositionMonitor:
             product_id: Trading pair (e.g., 'BTC-USD')
         """
         try:
-            order_tracker = self.shared_data_manager.order_management.get('order_tracker', {})
+            order_tracker = self.shared_data_manager.order_tracker_index()
 
             # Find all orders for this product
-            orders_to_cancel = []
-            for oid, order_info in list(order_tracker.items()):
-                if order_info.get('symbol') == product_id or order_info.get('product_id') == product_id:
-                    orders_to_cancel.append((oid, order_info))
+            orders_to_cancel = list(order_tracker.orders(product=product_id))
 
             if not orders_to_cancel:
                 self.logger.debug(f"[POS_MONITOR] No existing orders to cancel for {product_id}")
@@ -805,6 +796,7 @@ class PositionMonitor:
                         # Remove from order tracker
                         if oid in order_tracker:
                             del order_tracker[oid]
+                            self.shared_data_manager.mark_changed('order_management', ['order_tracker'])
                         self.logger.info(f"[POS_MONITOR] ✅ Successfully cancelled order {oid}")
                     else:
                         failure_reason = entry.get("failure_reason") if entry else "Unknown"
@@ -968,6 +960,7 @@ class PositionMonitor:
 
                 # Store for daily report analysis
                 self.shared_data_manager.order_management['exit_tracking'].append(exit_metadata)
+                self.shared_data_manager.mark_changed('order_management', ['exit_tracking'])
 
                 self.logger.debug(f"[EXIT_TRACK] Stored exit metadata for {product_id}: {exit_metadata}")
 
@@ -979,6 +972,7 @@ class PositionMonitor:
                     position_triggers = self.shared_data_manager.order_management.get('position_triggers', {})
                     if product_id in position_triggers:
                         del position_triggers[product_id]
+                        self.shared_data_manager.mark_changed('order_management', ['position_triggers'])
                         self.logger.debug(f"[PEAK_TRACK] Cleaned up trigger metadata for {product_id}")
                 except Exception as e:
                     self.logger.debug(f"[PEAK_TRACK] Error cleaning trigger metadata for {product_id}: {e}")
@@ -11,7 +11,9 @@ from http.client import RemoteDisconnected
 from pandas.core.methods.describe import select_describe_func
 from requests.exceptions import HTTPError
 from ccxt.base.errors import BadSymbol
+from MarketDataManager.ohlcv_store import OHLCVStore
 
+ATR_MAX_CANDLE_AGE = 2 * 3600  # Seconds; older stored 1h candles are not used for ATR
 
 
 class MyPortfolioPosition:
@@ -63,6 +65,7 @@ class TickerManager:
         self.test_debug_maint = test_debug_maint
         self.shared_utils_precision = shared_utils_precision
         self.mid_history = defaultdict(lambda: deque(maxlen=120))
+        self.ohlcv_store = OHLCVStore.get_instance()
         self.enrich_limit = self.bot_config.enrich_limit
         self.start_time = None
 
@@ -454,7 +457,9 @@ class TickerManager:
                         'precision': {
                             'base_increment': item.get('base_increment'),
                             'quote_increment': item.get('quote_increment'),
-                            'price_increment': item.get('price_increment')
+                            'price_increment': item.get('price_increment'),
+                            'base_min_size': item.get('base_min_size'),
+                            'quote_min_size': item.get('quote_min_size')
                         },
                         'info': {
                             'product_id': item.get('product_id'),
@@ -567,6 +572,11 @@ class TickerManager:
         """
         Calculate ATR (Average True Range) for products with active positions.
 
+        Hourly candles are kept in the shared OHLCV store; after the first
+        200-candle fetch only the candles since the newest stored one are fetched.
+        Products whose newest stored candle is older than ATR_MAX_CANDLE_AGE
+        (e.g. after a failed fetch) are skipped.
+
         Args:
             product_ids: List of all product IDs
             spot_positions: Dictionary of active positions {symbol: position_data}
@@ -600,6 +610,9 @@ class TickerManager:
                 # Calculate timestamps: 200 hours ~= 8.3 days ago
                 end_time = int(datetime.now(timezone.utc).timestamp())
                 start_time = end_time - (200 * 3600)  # 200 hours in seconds
+                stored = self.ohlcv_store.view(product_id, 'ONE_HOUR')
+                if stored is not None and len(stored) > period and int(stored.time[-1]) > start_time:
+                    start_time = int(stored.time[-1])  # Refresh the in-progress candle onwards
 
                 ohlcv_response = await self.coinbase_api.fetch_ohlcv(
                     product_id,
@@ -611,24 +624,27 @@ class TickerManager:
                     }
                 )
 
-                if not ohlcv_response or 'data' not in ohlcv_response:
+                if ohlcv_response and 'data' in ohlcv_response:
+                    self.ohlcv_store.update_frame(product_id, 'ONE_HOUR', ohlcv_response['data'])
+
+                candles = self.ohlcv_store.view(product_id, 'ONE_HOUR', n=period + 1)
+                # A failed fetch leaves the store as it was: skip rather than publish a stale ATR
+                if candles is None or int(candles.time[-1]) < end_time - ATR_MAX_CANDLE_AGE:
                     self.logger.info(f"[ATR] No OHLCV data for {product_id}")
                     continue
 
-                df = ohlcv_response['data']
-                if len(df) < period + 1:
-                    self.logger.info(f"[ATR] Insufficient OHLCV data for {product_id}: {len(df)} candles")
+                if len(candles) < period + 1:
+                    self.logger.info(f"[ATR] Insufficient OHLCV data for {product_id}: {len(candles)} candles")
                     continue
 
                 # Calculate ATR using True Range
                 trs = []
-                prev_close = Decimal(str(df.iloc[0]['close']))
+                prev_close = Decimal(str(candles.close[0]))
 
-                for idx in range(1, len(df)):
-                    row = df.iloc[idx]
-                    high = Decimal(str(row['high']))
-                    low = Decimal(str(row['low']))
-                    close = Decimal(str(row['close']))
+                for idx in range(1, len(candles)):
+                    high = Decimal(str(candles.high[idx]))
+                    low = Decimal(str(candles.low[idx]))
+                    close = Decimal(str(candles.close[idx]))
 
                     # True Range = max(high - low, |high - prev_close|, |prev_close - low|)
                     tr = max(high - low, abs(high - prev_close), abs(prev_close - low))
@@ -1,5 +1,6 @@
 from decimal import Decimal, ROUND_DOWN
 from webhook.webhook_validate_orders import OrderData
+from MarketDataManager.l2_order_book import L2BookManager
 
 
 class OrderBookManager:
@@ -26,11 +27,21 @@ class OrderBookManager:
 
     async def get_order_book(self, order_data: OrderData, symbol=None, order_book=None):
         """
-        Returns the order book summary (bid/ask/spread) for a given trading pair.
+        Returns the order book summary (bid/ask/spread) for a given trading pair,
+        with the top levels when the websocket L2 book is in sync.
         Falls back to local cache from SharedDataManager.
         """
         try:
             trading_pair = symbol or order_data.trading_pair
+            l2 = L2BookManager.get_instance().book(trading_pair)
+            if l2 is not None and l2.bids and l2.asks:
+                return {
+                    "order_book": l2.depth(10),
+                    "highest_bid": l2.best_bid()[0],
+                    "lowest_ask": l2.best_ask()[0],
+                    "spread": l2.spread()
+                }
+
             spread_data = self.shared_data_manager.market_data.get("bid_ask_spread", {}).get(trading_pair)
 
             if spread_data:
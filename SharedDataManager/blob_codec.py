@@ -0,0 +1,200 @@
+"""
+Columnar shared_data Blob Encoding
+
+Alternate encoding for the shared_data market_data / order_management blobs.
+The JSON encoding round-trips every DataFrame through to_dict('records') and
+turns nested Decimals into floats; this one keeps DataFrames columnar and
+Decimals exact.
+
+A columnar blob is text (shared_data.data is a text column):
+
+    'SDC<version>:' + base64(zlib(payload))
+    payload = uint32 manifest length | manifest (UTF-8 JSON) | buffers
+
+The manifest lists one section per top-level key: the value as JSON, stored
+in a buffer, plus whether it contains markers:
+
+- {"__type__": "Decimal", "value": "<str>"} for every Decimal
+- {"__type__": "Frame", "rows": n, "columns": [...]} for every DataFrame;
+  numeric / bool columns point at a raw little-endian buffer, datetime64
+  columns at int64 nanoseconds (+ tz), all-Decimal columns are string lists,
+  anything else a JSON value list
+- {"__type__": "Records", "rows": n, "columns": [...], ("keys": [...])} for a
+  section that is a list of dicts with the same keys (filtered_vol), or a
+  dict of such dicts (bid_ask_spread); all-float / int / bool columns are
+  buffers, the rest as for frames
+
+Sections without markers (bid_ask_spread, ATR caches, ...) are decoded by the
+plain C JSON parser; only the others pay for the Python object_hook.
+
+The 'SDC<version>:' header makes the encoding self-describing: JSON rows
+(starting with '{') stay readable, and a reader rejects a version it does not
+know instead of misreading it. Like the JSON blob, frames come back with a
+RangeIndex and string column names, and datetimes outside DataFrames as ISO
+strings.
+"""
+
+import base64
+import json
+import struct
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+COLUMNAR_PREFIX = 'SDC'
+FORMAT_VERSION = 1
+
+_LENGTH = struct.Struct('<I')
+
+_LIST_DTYPES = {float: '<f8', int: '<i8', bool: '|b1'}  # Exact types only (not numpy / Decimal)
+
+
+def is_columnar(raw) -> bool:
+    """True for a columnar blob (any version)"""
+    return isinstance(raw, str) and raw.startswith(COLUMNAR_PREFIX)
+
+
+class _Writer:
+    def __init__(self, default: Optional[Callable]):
+        self.fallback = default
+        self.buffers: List[bytes] = []
+        self.size = 0
+        self.markers = 0
+
+    def append(self, data: bytes) -> dict:
+        self.buffers.append(data)
+        ref = {"offset": self.size, "nbytes": len(data)}
+        self.size += len(data)
+        return ref
+
+    def buffer(self, array: np.ndarray) -> dict:
+        return self.append(np.ascontiguousarray(array).tobytes())
+
+    def column(self, name: str, series: pd.Series) -> dict:
+        dtype = series.dtype
+        if isinstance(dtype, np.dtype) and dtype.kind in 'biuf':
+            array = series.to_numpy()
+            return {"name": name, "kind": "array", "dtype": array.dtype.newbyteorder('<').str,
+                    **self.buffer(array.astype(array.dtype.newbyteorder('<'), copy=False))}
+        if dtype.kind == 'M':
+            tz = getattr(dtype, 'tz', None)
+            nanos = series.dt.as_unit('ns').array.asi8  # UTC for tz-aware columns
+            return {"name": name, "kind": "datetime", "tz": str(tz) if tz else None,
+                    **self.buffer(nanos.astype('<i8', copy=False))}
+        return self.values(name, series.tolist())
+
+    def values(self, name: str, values: list) -> dict:
+        kinds = {type(v) for v in values}
+        if len(kinds) == 1:
+            kind = kinds.pop()
+            if kind in _LIST_DTYPES:
+                try:
+                    array = np.array(values, dtype=_LIST_DTYPES[kind])
+                except OverflowError:  # ints beyond int64
+                    return {"name": name, "kind": "values", "values": values}
+                return {"name": name, "kind": "list", "dtype": array.dtype.str, **self.buffer(array)}
+            if kind is Decimal:
+                return {"name": name, "kind": "decimal", "values": [str(v) for v in values]}
+        return {"name": name, "kind": "values", "values": values}
+
+    def records(self, rows: list, keys: Optional[list] = None) -> Optional[dict]:
+        """Uniform dicts as columns; None when they are not uniform"""
+        names = tuple(rows[0]) if isinstance(rows[0], dict) else ()
+        if not names or not all(isinstance(n, str) for n in names):
+            return None
+        if not all(isinstance(row, dict) and tuple(row) == names for row in rows):
+            return None
+        self.markers += 1
+        spec = {"__type__": "Records", "rows": len(rows),
+                "columns": [self.values(name, [row[name] for row in rows]) for name in names]}
+        if keys is not None:
+            spec["keys"] = keys
+        return spec
+
+    def section(self, value):
+        spec = None
+        if isinstance(value, list) and len(value) > 1:
+            spec = self.records(value)
+        elif isinstance(value, dict) and len(value) > 1 and all(isinstance(k, str) for k in value):
+            spec = self.records(list(value.values()), keys=list(value))
+        return value if spec is None else spec
+
+    def default(self, obj):
+        if isinstance(obj, (pd.DataFrame, Decimal)):
+            self.markers += 1
+        if isinstance(obj, pd.DataFrame):
+            return {"__type__": "Frame", "rows": len(obj),
+                    "columns": [self.column(str(name), obj.iloc[:, i]) for i, name in enumerate(obj.columns)]}
+        if isinstance(obj, Decimal):
+            return {"__type__": "Decimal", "value": str(obj)}
+        if isinstance(obj, np.generic):
+            return obj.item()
+        if obj is pd.NA:
+            return None
+        if isinstance(obj, (datetime, date)):
+            return obj.isoformat()
+        if self.fallback is not None:
+            return self.fallback(obj)
+        raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def encode_columnar(data: dict, default: Optional[Callable] = None, level: int = 1) -> str:
+    """Encode a blob (a dict); `default` handles objects the codec does not know (like json.dumps)"""
+    writer = _Writer(default)
+    sections = []
+    for key, value in data.items():
+        markers = writer.markers
+        text = json.dumps(writer.section(value), default=writer.default, separators=(',', ':')).encode()
+        ref = writer.append(text)
+        sections.append([str(key), ref["offset"], ref["nbytes"], writer.markers != markers])
+    manifest = json.dumps({"sections": sections}, separators=(',', ':')).encode()
+    payload = b''.join([_LENGTH.pack(len(manifest)), manifest, *writer.buffers])
+    return f"{COLUMNAR_PREFIX}{FORMAT_VERSION}:" + base64.b64encode(zlib.compress(payload, level)).decode('ascii')
+
+
+def decode_columnar(raw: str) -> dict:
+    header, _, body = raw.partition(':')
+    if header != f"{COLUMNAR_PREFIX}{FORMAT_VERSION}":
+        raise ValueError(f"Unsupported shared_data encoding: {header!r}")
+    payload = memoryview(zlib.decompress(base64.b64decode(body)))
+    (length,) = _LENGTH.unpack_from(payload)
+    buffers = payload[_LENGTH.size + length:]
+
+    def column(spec: dict, rows: int):
+        kind = spec["kind"]
+        if kind == "array":
+            return np.frombuffer(buffers, dtype=np.dtype(spec["dtype"]), count=rows, offset=spec["offset"]).copy()
+        if kind == "datetime":
+            nanos = np.frombuffer(buffers, dtype='<i8', count=rows, offset=spec["offset"])
+            values = pd.DatetimeIndex(nanos.view('datetime64[ns]'))
+            return values.tz_localize('UTC').tz_convert(spec["tz"]) if spec["tz"] else values
+        if kind == "list":
+            return np.frombuffer(buffers, dtype=np.dtype(spec["dtype"]), count=rows, offset=spec["offset"]).tolist()
+        if kind == "decimal":
+            return [Decimal(v) for v in spec["values"]]
+        return spec["values"]
+
+    def object_hook(obj):
+        marker = obj.get("__type__")
+        if marker == "Decimal":
+            return Decimal(obj["value"])
+        if marker == "Frame":
+            columns = obj["columns"]
+            return pd.DataFrame({spec["name"]: column(spec, obj["rows"]) for spec in columns},
+                                columns=list(dict.fromkeys(spec["name"] for spec in columns)))
+        if marker == "Records":
+            names = [spec["name"] for spec in obj["columns"]]
+            rows = [dict(zip(names, row)) for row in zip(*(column(spec, obj["rows"]) for spec in obj["columns"]))]
+            return dict(zip(obj["keys"], rows)) if "keys" in obj else rows
+        return obj
+
+    manifest = json.loads(bytes(payload[_LENGTH.size:_LENGTH.size + length]))
+    data = {}
+    for key, offset, nbytes, marked in manifest["sections"]:
+        text = bytes(buffers[offset:offset + nbytes])
+        data[key] = json.loads(text, object_hook=object_hook) if marked else json.loads(text)
+    return data
@@ -0,0 +1,246 @@
+"""
+Indexed Order Tracker
+
+order_management['order_tracker'] is a dict of order_id -> order dict, and
+monitors used to scan all of it for every position / tick ("is there an open
+sell for BTC-USD?") and rebuild OrderData.from_dict for every order.
+
+IndexedOrderTracker is still that dict (a dict subclass, so JSON encoding,
+snapshots, replication and every existing caller keep working) and keeps
+secondary indexes up to date in each mutating dict method:
+
+- product: the order's 'symbol' and 'product_id' values, as stored
+- side: lower-cased 'side' / 'order_side'
+- status: 'status', as stored
+- type: 'type' / 'order_type', as stored
+- age bucket: created time ('info.created_time' or 'datetime') in
+  AGE_BUCKET_SECONDS buckets, for older_than()
+
+It also caches typed views of each order (cached(order_id, build), e.g.
+OrderData.from_dict), dropped when that order is replaced or removed.
+
+Index maintenance happens inside each dict method, with no await, so it is
+consistent for every coroutine on the event loop. Writers that edit an order
+dict in place (rather than assigning a new one) must call touch(order_id).
+"""
+
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+AGE_BUCKET_SECONDS = 300
+
+OPEN_STATUSES = frozenset({'open', 'OPEN', 'new', 'NEW'})
+
+_INDEXES = ('product', 'side', 'status', 'type')
+
+
+def _created_ts(order: dict) -> Optional[float]:
+    info = order.get('info')
+    value = (info.get('created_time') if isinstance(info, dict) else None) or order.get('datetime')
+    if isinstance(value, datetime):
+        created = value
+    elif isinstance(value, str) and value:
+        try:
+            created = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    else:
+        return None
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=timezone.utc)
+    return created.timestamp()
+
+
+def _index_keys(order) -> Tuple[Dict[str, Tuple], Optional[float]]:
+    """Index values of one order: ({index: (keys, ...)}, created timestamp)"""
+    if not isinstance(order, dict):
+        return {name: () for name in _INDEXES}, None
+    products = tuple({p for p in (order.get('symbol'), order.get('product_id')) if p})
+    side = order.get('side') or order.get('order_side')
+    status = order.get('status')
+    order_type = order.get('type') or order.get('order_type')
+    return {
+        'product': products,
+        'side': (side.lower(),) if isinstance(side, str) and side else (),
+        'status': (status,) if status else (),
+        'type': (order_type,) if order_type else (),
+    }, _created_ts(order)
+
+
+class IndexedOrderTracker(dict):
+    """order_id -> order dict with product / side / status / type / age indexes"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._indexes: Dict[str, Dict[Any, Set[str]]] = {name: defaultdict(set) for name in _INDEXES}
+        self._keys: Dict[str, Tuple[Dict[str, Tuple], Optional[float]]] = {}
+        self._age_buckets: Dict[int, Set[str]] = defaultdict(set)
+        self._typed: Dict[str, Dict[Callable, Any]] = {}
+        self.typed_hits = 0
+        self.typed_builds = 0
+        self.update(*args, **kwargs)
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+
+    def _index(self, order_id, order):
+        keys = _index_keys(order)
+        self._keys[order_id] = keys
+        by_index, created = keys
+        for name, values in by_index.items():
+            for value in values:
+                self._indexes[name][value].add(order_id)
+        if created is not None:
+            self._age_buckets[int(created // AGE_BUCKET_SECONDS)].add(order_id)
+
+    def _unindex(self, order_id):
+        self._typed.pop(order_id, None)
+        keys = self._keys.pop(order_id, None)
+        if keys is None:
+            return
+        by_index, created = keys
+        for name, values in by_index.items():
+            index = self._indexes[name]
+            for value in values:
+                ids = index.get(value)
+                if ids is not None:
+                    ids.discard(order_id)
+                    if not ids:
+                        del index[value]
+        if created is not None:
+            bucket = int(created // AGE_BUCKET_SECONDS)
+            ids = self._age_buckets.get(bucket)
+            if ids is not None:
+                ids.discard(order_id)
+                if not ids:
+                    del self._age_buckets[bucket]
+
+    def touch(self, order_id):
+        """Re-index an order whose dict was edited in place"""
+        if order_id in self:
+            self._unindex(order_id)
+            self._index(order_id, dict.__getitem__(self, order_id))
+
+    def reindex(self):
+        """Rebuild every index (after in-place edits to many orders)"""
+        for name in _INDEXES:
+            self._indexes[name].clear()
+        self._keys.clear()
+        self._age_buckets.clear()
+        self._typed.clear()
+        for order_id, order in self.items():
+            self._index(order_id, order)
+
+    # ------------------------------------------------------------------
+    # dict mutations
+    # ------------------------------------------------------------------
+
+    def __setitem__(self, order_id, order):
+        self._unindex(order_id)
+        super().__setitem__(order_id, order)
+        self._index(order_id, order)
+
+    def __delitem__(self, order_id):
+        super().__delitem__(order_id)
+        self._unindex(order_id)
+
+    def pop(self, order_id, *default):
+        if order_id in self:
+            self._unindex(order_id)
+        return super().pop(order_id, *default)
+
+    def popitem(self):
+        order_id, order = super().popitem()
+        self._unindex(order_id)
+        return order_id, order
+
+    def setdefault(self, order_id, default=None):
+        if order_id not in self:
+            self[order_id] = default
+        return dict.__getitem__(self, order_id)
+
+    def update(self, *args, **kwargs):
+        for order_id, order in dict(*args, **kwargs).items():
+            self[order_id] = order
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def clear(self):
+        super().clear()
+        self.reindex()
+
+    def copy(self):
+        return IndexedOrderTracker(self)
+
+    def __reduce__(self):
+        return IndexedOrderTracker, (dict(self),)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def select(self, product: Optional[str] = None, side: Optional[str] = None,
+               status: Union[str, Iterable[str], None] = None, order_type: Optional[str] = None) -> Set[str]:
+        """Order ids matching every given criterion (status: one value or a collection)"""
+        result: Optional[Set[str]] = None
+        criteria = (('product', product), ('side', side.lower() if side else None), ('type', order_type))
+        for name, value in criteria:
+            if value is None:
+                continue
+            ids = self._indexes[name].get(value, set())
+            result = set(ids) if result is None else result & ids
+            if not result:
+                return set()
+        if status is not None:
+            statuses = (status,) if isinstance(status, str) else status
+            index = self._indexes['status']
+            ids = set().union(*(index.get(s, ()) for s in statuses))
+            result = ids if result is None else result & ids
+        return set(self) if result is None else result
+
+    def orders(self, **criteria) -> Iterator[Tuple[str, dict]]:
+        """(order_id, order) pairs for select(**criteria)"""
+        for order_id in self.select(**criteria):
+            yield order_id, dict.__getitem__(self, order_id)
+
+    def has(self, **criteria) -> bool:
+        return bool(self.select(**criteria))
+
+    def older_than(self, seconds: float, now: Optional[float] = None) -> List[str]:
+        """Ids of orders created more than `seconds` ago (orders without a created time are skipped)"""
+        cutoff = (now if now is not None else datetime.now(timezone.utc).timestamp()) - seconds
+        last_bucket = int(cutoff // AGE_BUCKET_SECONDS)
+        result = []
+        for bucket, ids in self._age_buckets.items():
+            if bucket < last_bucket:
+                result.extend(ids)
+            elif bucket == last_bucket:
+                result.extend(i for i in ids if self._keys[i][1] <= cutoff)
+        return result
+
+    def cached(self, order_id, build: Callable[[dict], Any]):
+        """build(order), cached until this order changes (callers must not mutate the result)"""
+        order = dict.__getitem__(self, order_id)
+        per_order = self._typed.setdefault(order_id, {})
+        if build in per_order:
+            self.typed_hits += 1
+            return per_order[build]
+        value = build(order)
+        per_order[build] = value
+        self.typed_builds += 1
+        return value
+
+    def stats(self) -> dict:
+        return {
+            'orders': len(self),
+            'products': len(self._indexes['product']),
+            'statuses': {status: len(ids) for status, ids in self._indexes['status'].items()},
+            'age_buckets': len(self._age_buckets),
+            'typed_cached': sum(len(v) for v in self._typed.values()),
+            'typed_hits': self.typed_hits,
+            'typed_builds': self.typed_builds,
+        }
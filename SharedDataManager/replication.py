@@ -0,0 +1,474 @@
+"""
+Shared State Replication
+
+Delta replication of market_data / order_management between the webhook and
+sighook containers, replacing the full-blob save / refresh round trip.
+
+State is split into versioned entries in shared_data_entries, one per
+(data_type, path, key):
+
+- path is a top-level key ('ticker_cache', 'order_tracker', ...); its header
+  entry (key '') records how to rebuild it: {'kind': 'frame', 'columns',
+  'rows'}, {'kind': 'dict'} or {'kind': 'value', 'value'}
+- DataFrames get one entry per row (keyed by the symbol column when it is
+  unique, else by position), dicts one per item
+
+publish() encodes the state, compares every entry with what this process
+last wrote or read, and upserts only the changed ones (deleted rows / items
+become tombstones) under one new version. sync() reads the entries with a
+version above the last one it applied and rebuilds only the paths they touch.
+Publishers are serialized (Postgres advisory lock), so versions are committed
+in order and `version > last` never skips an entry.
+
+Readers are woken by a notifier: Postgres LISTEN/NOTIFY in production, a
+polled version file as the stand-in for SQLite and tests; without one they
+only sync when asked. Tombstones are purged after `tombstone_retention`
+seconds, so a reader that has not synced for that long reloads everything.
+
+Values are encoded like the shared_data blob: DataFrames as records, Decimals
+as floats except top-level ones (restored as Decimal), datetimes as ISO-8601.
+"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from Shared_Utils.logger import get_logger
+from TableModels.shared_data_entry import SharedDataEntry
+
+HEADER = ''
+
+# Frame columns whose unique values key the rows (else: row position)
+FRAME_KEY_COLUMNS = ('symbol', 'asset', 'product_id')
+
+NOTIFY_CHANNEL = 'shared_data'
+
+_LOCK_KEY = 0x5348_4152_4544  # pg_advisory_xact_lock key serializing publishers ('SHARED')
+
+_UPSERT_INSERTS = {
+    'postgresql': postgresql_insert,
+    'sqlite': sqlite_insert,
+}
+
+_UPSERT_CHUNK = 2000  # Rows per INSERT (Postgres allows 32767 bind parameters)
+
+EntryKey = Tuple[str, str, str]  # (data_type, path, key)
+
+
+# =============================================================================
+# ENCODING
+# =============================================================================
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, pd.DataFrame):
+        return {"__type__": "DataFrame", "data": obj.to_dict(orient="records")}
+    if hasattr(obj, "to_dict") and callable(obj.to_dict):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+_ENCODER = json.JSONEncoder(default=_default, separators=(',', ':'))  # Reused: json.dumps builds one per call
+
+
+def _dumps(value) -> str:
+    return _ENCODER.encode(value)
+
+
+def _object_hook(obj):
+    marker = obj.get("__type__")
+    if marker == "Decimal":
+        return Decimal(obj["value"])
+    if marker == "DataFrame":
+        return pd.DataFrame(obj["data"])
+    return obj
+
+
+def _loads(value: str):
+    return json.loads(value, object_hook=_object_hook)
+
+
+def _frame_keys(frame: pd.DataFrame) -> List[str]:
+    for column in FRAME_KEY_COLUMNS:
+        if column in frame.columns and frame[column].is_unique:
+            return [str(k) for k in frame[column].tolist()]
+    return [str(i) for i in range(len(frame))]
+
+
+def encode_path(value) -> Dict[str, str]:
+    """One top-level value → {key: JSON}, header under key ''"""
+    if isinstance(value, pd.DataFrame):
+        keys = _frame_keys(value)
+        entries = {key: _dumps(row) for key, row in zip(keys, value.to_dict(orient="records"))}
+        entries[HEADER] = _dumps({"kind": "frame", "columns": [str(c) for c in value.columns], "rows": keys})
+        return entries
+    if isinstance(value, dict):
+        entries = {str(key): _dumps(item) for key, item in value.items()}
+        entries[HEADER] = _dumps({"kind": "dict"})
+        return entries
+    if isinstance(value, Decimal):
+        value = {"__type__": "Decimal", "value": str(value)}
+    return {HEADER: _dumps({"kind": "value", "value": value})}
+
+
+def decode_path(entries: Dict[str, Any]):
+    """Decoded entries of one path → the value (None without a header)"""
+    header = entries.get(HEADER)
+    if not isinstance(header, dict):
+        return None
+    kind = header.get("kind")
+    if kind == "frame":
+        rows = [entries[key] for key in header.get("rows", ()) if key in entries]
+        return pd.DataFrame(rows, columns=header.get("columns"))
+    if kind == "dict":
+        return {key: item for key, item in entries.items() if key != HEADER}
+    return header.get("value")
+
+
+# =============================================================================
+# NOTIFIERS
+# =============================================================================
+
+class PgNotifier:
+    """Postgres LISTEN/NOTIFY; the NOTIFY is sent in the publish transaction (delivered on commit)"""
+
+    transactional = True
+
+    def __init__(self, dsn: str, channel: str = NOTIFY_CHANNEL):
+        self.dsn = dsn
+        self.channel = channel
+        self._conn = None
+
+    async def notify(self, version: int, session=None):
+        await session.execute(text("SELECT pg_notify(:channel, :payload)"),
+                              {"channel": self.channel, "payload": str(version)})
+
+    async def listen(self, callback: Callable[[int], None]):
+        import asyncpg
+
+        self._conn = await asyncpg.connect(self.dsn)
+        await self._conn.add_listener(self.channel, lambda conn, pid, channel, payload: callback(int(payload)))
+
+    async def close(self):
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+
+class FileNotifier:
+    """Stand-in for LISTEN/NOTIFY (SQLite, tests): the last version in a file, polled by readers"""
+
+    transactional = False
+
+    def __init__(self, path: str, poll_interval: float = 0.05):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def notify(self, version: int, session=None):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            f.write(str(version))
+        os.replace(tmp, self.path)
+
+    def _mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    async def listen(self, callback: Callable[[int], None]):
+        async def poll():
+            last = self._mtime()
+            while True:
+                await asyncio.sleep(self.poll_interval)
+                mtime = self._mtime()
+                if mtime is None or mtime == last:
+                    continue
+                last = mtime
+                try:
+                    with open(self.path) as f:
+                        callback(int(f.read()))
+                except (FileNotFoundError, ValueError):
+                    pass  # Replaced mid-read: picked up by the next poll
+
+        self._task = asyncio.create_task(poll())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+# =============================================================================
+# REPLICATOR
+# =============================================================================
+
+class SharedStateReplicator:
+    """
+    Usage:
+        replicator = SharedStateReplicator.for_session_manager(database_session_manager)
+        await replicator.start()                                  # listen for notifications
+        await replicator.publish({'market_data': market_data, 'order_management': om})
+        await replicator.sync()
+        replicator.state['market_data']['ticker_cache']
+    """
+
+    def __init__(self, database_session_manager, notifier=None, tombstone_retention: float = 3600.0,
+                 purge_interval: float = 600.0, logger=None):
+        """
+        Args:
+            database_session_manager: Provides async_session()
+            notifier: PgNotifier / FileNotifier (None = sync only when asked)
+            tombstone_retention: Seconds deleted entries are kept for readers
+            purge_interval: Seconds between tombstone purges (by publishers)
+        """
+        self.db = database_session_manager
+        self.notifier = notifier
+        self.tombstone_retention = tombstone_retention
+        self.purge_interval = purge_interval
+        self.logger = logger or get_logger('shared_data_manager', context={'component': 'replication'})
+
+        self.state: Dict[str, Dict[str, Any]] = {}
+        self._entries: Dict[Tuple[str, str], Dict[str, Any]] = {}  # Decoded entries per path
+        self._known: Dict[EntryKey, Tuple[int, ...]] = {}  # Hashes of the entry as stored / as rebuilt
+        self._version: Optional[int] = None  # Highest version applied
+        self._synced_at = 0.0
+        self._last_purge = time.monotonic()
+        self._dirty: Set[Tuple[str, str]] = set()  # Paths published by this process since the last sync
+        self._lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._notified_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self.counters = {
+            'publishes': 0, 'entries_published': 0, 'bytes_published': 0,
+            'syncs': 0, 'full_syncs': 0, 'entries_received': 0, 'bytes_received': 0,
+            'notifications': 0, 'last_sync_ms': 0.0, 'last_notify_to_apply_ms': 0.0,
+        }
+
+    @classmethod
+    def for_session_manager(cls, database_session_manager, **kwargs) -> 'SharedStateReplicator':
+        """LISTEN/NOTIFY on Postgres; SHARED_DATA_NOTIFY_PATH selects the file stand-in elsewhere"""
+        notifier = None
+        engine = getattr(database_session_manager, 'engine', None)
+        url = engine.url if engine is not None else None
+        if url is not None and url.get_backend_name() == 'postgresql':
+            notifier = PgNotifier(url.set(drivername='postgresql').render_as_string(hide_password=False))
+        elif os.getenv('SHARED_DATA_NOTIFY_PATH'):
+            notifier = FileNotifier(os.getenv('SHARED_DATA_NOTIFY_PATH'))
+        return cls(database_session_manager, notifier=notifier, **kwargs)
+
+    @property
+    def version(self) -> Optional[int]:
+        return self._version
+
+    # =========================================================================
+    # LIFECYCLE
+    # =========================================================================
+
+    async def start(self):
+        """Listen for publishes and sync in the background as they arrive"""
+        if self.notifier is None or (self._task is not None and not self._task.done()):
+            return
+        await self.notifier.listen(self._on_notify)
+        self._task = asyncio.create_task(self._sync_on_notify())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.notifier is not None:
+            await self.notifier.close()
+
+    def _on_notify(self, version: int):
+        if self._version is not None and version <= self._version:
+            return  # Own publish, or already applied
+        self.counters['notifications'] += 1
+        if self._notified_at is None:
+            self._notified_at = time.monotonic()
+        self._wake.set()
+
+    async def _sync_on_notify(self):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            try:
+                await self.sync()
+            except Exception as e:
+                self.logger.error(f"❌ Shared data sync after notification failed: {e}", exc_info=True)
+
+    # =========================================================================
+    # PUBLISH
+    # =========================================================================
+
+    def _diff(self, states: Dict[str, Dict[str, Any]]) -> List[Tuple[EntryKey, Optional[str]]]:
+        changes = []
+        for data_type, state in states.items():
+            for path, value in state.items():
+                entries = encode_path(value)
+                for key, encoded in entries.items():
+                    if hash(encoded) not in self._known.get((data_type, path, key), ()):
+                        changes.append(((data_type, path, key), encoded))
+                for key in self._entries.get((data_type, path), {}).keys() - entries.keys():
+                    changes.append(((data_type, path, key), None))
+        return changes
+
+    async def publish(self, states: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Write the entries of `states` ({data_type: {path: value}}) that differ
+        from the stored ones. Paths missing from `states` are left untouched,
+        like the blob merge. Returns the number of entries written.
+        """
+        async with self._lock:
+            if self._version is None:
+                await self._sync()  # Learn what is stored, so only real changes are written
+            changes = self._diff(states)
+            if changes:
+                await self._write(changes)
+            return len(changes)
+
+    async def _write(self, changes: List[Tuple[EntryKey, Optional[str]]]):
+
+        now = datetime.now(timezone.utc)
+        rows = [{'data_type': dt, 'path': path, 'key': key, 'value': value, 'last_updated': now}
+                for (dt, path, key), value in changes]
+        async with self.db.async_session() as session:
+            async with session.begin():
+                dialect = session.bind.dialect.name
+                if dialect == 'postgresql':
+                    await session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {'key': _LOCK_KEY})
+                latest = (await session.execute(
+                    select(func.coalesce(func.max(SharedDataEntry.version), 0)))).scalar_one()
+                version = latest + 1
+                for row in rows:
+                    row['version'] = version
+                insert = _UPSERT_INSERTS[dialect]
+                for start in range(0, len(rows), _UPSERT_CHUNK):
+                    stmt = insert(SharedDataEntry).values(rows[start:start + _UPSERT_CHUNK])
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=['data_type', 'path', 'key'],
+                        set_={'value': stmt.excluded.value, 'version': stmt.excluded.version,
+                              'last_updated': stmt.excluded.last_updated})
+                    await session.execute(stmt)
+                if time.monotonic() - self._last_purge >= self.purge_interval:
+                    await self._purge_tombstones(session, now)
+                if self.notifier is not None and self.notifier.transactional:
+                    await self.notifier.notify(version, session)
+
+        if self.notifier is not None and not self.notifier.transactional:
+            await self.notifier.notify(version)
+        for (dt, path, key), value in changes:
+            self._remember(dt, path, key, value)
+        if latest == self._version:
+            self._version = version  # Nothing was published in between: nothing to read back
+
+        self.counters['publishes'] += 1
+        self.counters['entries_published'] += len(changes)
+        self.counters['bytes_published'] += sum(len(value or '') for _, value in changes)
+
+    def _remember(self, data_type: str, path: str, key: str, value: Optional[str]):
+        """Record an entry as stored; its path is rebuilt by the next sync"""
+        entries = self._entries.setdefault((data_type, path), {})
+        if value is None:
+            entries.pop(key, None)
+            self._known.pop((data_type, path, key), None)
+        else:
+            entries[key] = _loads(value)
+            self._known[(data_type, path, key)] = (hash(value),)
+        self._dirty.add((data_type, path))
+
+    async def _purge_tombstones(self, session, now: datetime):
+        self._last_purge = time.monotonic()
+        cutoff = now - timedelta(seconds=self.tombstone_retention)
+        await session.execute(delete(SharedDataEntry).where(SharedDataEntry.value.is_(None),
+                                                            SharedDataEntry.last_updated < cutoff))
+
+    # =========================================================================
+    # SYNC
+    # =========================================================================
+
+    async def sync(self, full: bool = False) -> Set[Tuple[str, str]]:
+        """Apply the entries published since the last sync; returns the changed (data_type, path)s"""
+        async with self._lock:
+            return await self._sync(full)
+
+    async def _sync(self, full: bool = False) -> Set[Tuple[str, str]]:
+        started = time.monotonic()
+        full = (full or self._version is None
+                or time.time() - self._synced_at > self.tombstone_retention)
+        query = select(SharedDataEntry.data_type, SharedDataEntry.path, SharedDataEntry.key,
+                       SharedDataEntry.value, SharedDataEntry.version)
+        if full:
+            query = query.where(SharedDataEntry.value.is_not(None))
+        else:
+            query = query.where(SharedDataEntry.version > self._version)
+        async with self.db.async_session() as session:
+            rows = (await session.execute(query.order_by(SharedDataEntry.version))).all()
+
+        if full:
+            self.state, self._entries, self._known, self._dirty = {}, {}, {}, set()
+            self.counters['full_syncs'] += 1
+        changed, self._dirty = self._dirty, set()
+        version = self._version or 0
+        for data_type, path, key, value, row_version in rows:
+            entries = self._entries.setdefault((data_type, path), {})
+            if value is None:
+                entries.pop(key, None)
+                self._known.pop((data_type, path, key), None)
+            else:
+                entries[key] = _loads(value)
+                self._known[(data_type, path, key)] = (hash(value),)
+                self.counters['bytes_received'] += len(value)
+            changed.add((data_type, path))
+            version = max(version, row_version)
+
+        for data_type, path in changed:
+            self._rebuild(data_type, path)
+
+        self._version = version
+        self._synced_at = time.time()
+        self.counters['syncs'] += 1
+        self.counters['entries_received'] += len(rows)
+        self.counters['last_sync_ms'] = (time.monotonic() - started) * 1000
+        if self._notified_at is not None:
+            self.counters['last_notify_to_apply_ms'] = (time.monotonic() - self._notified_at) * 1000
+            self._notified_at = None
+        return changed
+
+    def _rebuild(self, data_type: str, path: str):
+        value = decode_path(self._entries[(data_type, path)])
+        state = self.state.setdefault(data_type, {})
+        if value is None:
+            state.pop(path, None)
+            return
+        state[path] = value
+        # Also accept the re-encoding of what was rebuilt (dtype round trips, e.g. int → float),
+        # so publishing unchanged state read from here writes nothing
+        for key, encoded in encode_path(value).items():
+            known = self._known.get((data_type, path, key))
+            if known is not None and hash(encoded) not in known:
+                self._known[(data_type, path, key)] = known[:1] + (hash(encoded),)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            'version': self._version,
+            'entries': sum(len(e) for e in self._entries.values()),
+        }
@@ -1,6 +1,6 @@
 
+import os
 import time
-import copy
 import json
 import asyncio
 import datetime
@@ -21,6 +21,10 @@ from TableModels.passive_orders import PassiveOrder
 from TableModels.active_symbols import ActiveSymbol
 from datetime import datetime, date, timezone, timedelta
 from SharedDataManager.trade_recorder import TradeRecorder
+from SharedDataManager.blob_codec import decode_columnar, encode_columnar, is_columnar
+from SharedDataManager.replication import SharedStateReplicator
+from SharedDataManager.snapshot_store import SnapshotStore
+from SharedDataManager.order_tracker import IndexedOrderTracker
 from SharedDataManager.leader_board import recompute_and_upsert_active_symbols, LeaderboardConfig
 from Shared_Utils.logger import get_logger
 
@@ -101,6 +105,24 @@ def preprocess_market_data(data):
     return processed_data
 
 
+def encode_shared_data(data: dict, encoding: str = "json") -> str:
+    """
+    Encode a shared_data blob.
+    'json': DataFrames as records, nested Decimals as floats (readable by ad-hoc SQL / scripts);
+    'columnar': SharedDataManager.blob_codec (columnar DataFrames, exact Decimals).
+    """
+    if encoding == "columnar":
+        return encode_columnar(data, default=DecimalEncoderIn().default)
+    return json.dumps(preprocess_market_data(data), cls=DecimalEncoderIn)
+
+
+def decode_shared_data(raw: str, decoder_cls=None) -> dict:
+    """Decode a shared_data blob in either encoding (detected from its header)."""
+    if is_columnar(raw):
+        return decode_columnar(raw)
+    return json.loads(raw, cls=decoder_cls or CustomJSONDecoder)
+
+
 class ThePortfolioPosition:
     def __init__(self, asset, account_uuid, total_balance_fiat, total_balance_crypto):
         self.asset = asset
@@ -140,6 +162,21 @@ class SharedDataManager:
         self._last_save_ts = 0
         self._save_throttle_seconds = 2  # configurable
 
+        # Delta replication of market_data / order_management between containers; the full
+        # shared_data blob is then only rewritten every SHARED_DATA_BLOB_INTERVAL seconds
+        self.replicator = (
+            SharedStateReplicator.for_session_manager(database_session_manager)
+            if os.getenv('SHARED_DATA_REPLICATION', 'true').lower() in ('true', '1', 'yes')
+            else None
+        )
+        self._blob_interval = float(os.getenv('SHARED_DATA_BLOB_INTERVAL', '300'))
+        self._last_blob_ts = 0
+        self._blob_encoding = os.getenv('SHARED_DATA_ENCODING', 'json').lower()
+
+        # Readers get a reference to an immutable, versioned snapshot; writers that mutate
+        # market_data / order_management in place call mark_changed() so it is rebuilt
+        self.snapshots = SnapshotStore(lambda: (self.market_data, self.order_management),
+                                       max_age=float(os.getenv('SHARED_SNAPSHOT_MAX_AGE', '2')))
 
         self.lock = asyncio.Lock()
         self._initialized_event = Event()
@@ -215,10 +252,10 @@ class SharedDataManager:
 
             # Check for invalid strings like 'null' or empty
             if raw_md and raw_md.strip().lower() != "null":
-                market_data = json.loads(raw_md, cls=CustomJSONDecoder)
+                market_data = decode_shared_data(raw_md, CustomJSONDecoder)
 
             if raw_om and raw_om.strip().lower() != "null":
-                order_mgmt = json.loads(raw_om, cls=CustomJSONDecoder)
+                order_mgmt = decode_shared_data(raw_om, CustomJSONDecoder)
                 order_mgmt["passive_orders"] = await self.fetch_passive_orders()
 
         except Exception as e:
@@ -276,6 +313,8 @@ class SharedDataManager:
         try:
             # Ensure DatabaseSessionManager is connected
             await self.database_session_manager.initialize()
+            if self.replicator is not None:
+                await self.replicator.start()  # Apply the other container's deltas as they are published
 
         except Exception as e:
             self.logger.error(f"Failed to initialize SharedDataManager: {e}", exc_info=True)
@@ -291,9 +330,11 @@ class SharedDataManager:
                     self.logger.debug(f"🧠 Updating market_data: Keys = {list(new_market_data.keys())}")
                     # Merge instead of replace to preserve keys like buy_sell_matrix from database
                     self.market_data.update(new_market_data)
+                    self.snapshots.mark_changed('market_data', new_market_data.keys())
                 if new_order_management:
                     self.logger.debug(f"📦 Updating order_management: Keys = {list(new_order_management.keys())}")
                     self.order_management = new_order_management
+                    self.snapshots.mark_changed('order_management')
 
                 if not self._initialized_event.is_set():
                     self._initialized_event.set()
@@ -337,23 +378,41 @@ class SharedDataManager:
                 return {}, {}
 
     async def get_order_tracker(self) -> dict:
-        """Safely retrieve the current order_tracker dict from shared order_management."""
+        """
+        Safely retrieve the current order_tracker dict from shared order_management.
+
+        Callers that edit it in place call mark_changed('order_management', ['order_tracker'])
+        after each edit, so the next snapshot rebuild picks the edit up.
+        """
         async with self.lock:
             if not isinstance(self.order_management, dict):
                 self.order_management = {}
-            if "order_tracker" not in self.order_management:
-                self.order_management["order_tracker"] = {}
-            return self.order_management["order_tracker"]
+            return self.order_tracker_index()
+
+    def order_tracker_index(self) -> IndexedOrderTracker:
+        """The live order_tracker as an IndexedOrderTracker (wraps a plain dict loaded or assigned since)."""
+        if not isinstance(self.order_management, dict):
+            self.order_management = {}
+        tracker = self.order_management.get("order_tracker")
+        if not isinstance(tracker, IndexedOrderTracker):
+            tracker = IndexedOrderTracker(tracker if isinstance(tracker, dict) else {})
+            self.order_management["order_tracker"] = tracker
+        return tracker
 
 
     async def refresh_shared_data(self):
         """Refresh shared data periodically."""
         async with (self.lock):
             try:
-                market_result = await self.fetch_market_data()
+                market_result, order_management_result = (
+                    await self._sync_deltas() if self.replicator is not None else ({}, {})
+                )
+                if not market_result:
+                    market_result = await self.fetch_market_data()
                 self.market_data = market_result if market_result else {}
                 self.market_data = self.validate_market_data(self.market_data)
-                order_management_result = await self.fetch_order_management()
+                if not order_management_result:
+                    order_management_result = await self.fetch_order_management()
                 self.order_management = order_management_result if order_management_result else {}
                 self.order_management = self.validate_order_management_data(self.order_management)
                 self.order_management["passive_orders"] = await self.fetch_passive_orders()
@@ -397,7 +456,10 @@ class SharedDataManager:
             if not isinstance(self.order_management, dict):
                 self.order_management = {}
             for key, value in updated_order_management.items():
+                if key == "order_tracker" and isinstance(value, dict) and not isinstance(value, IndexedOrderTracker):
+                    value = IndexedOrderTracker(value)
                 self.order_management[key] = value
+            self.snapshots.mark_changed('order_management', updated_order_management.keys())
             self._order_management = self.order_management
             missing_keys = {"order_tracker", "non_zero_balances"} - set(self.order_management.keys())
             if missing_keys:
@@ -421,7 +483,7 @@ class SharedDataManager:
 
                 decoder_cls = getattr(self, "custom_json_decoder", json.JSONDecoder)
                 try:
-                    return json.loads(row.data, cls=decoder_cls)
+                    return decode_shared_data(row.data, decoder_cls)
                 except Exception as parse_err:
                     self.logger.error(
                         f"❌ Failed to decode market_data JSON: {parse_err}", exc_info=True
@@ -454,7 +516,7 @@ class SharedDataManager:
 
                 decoder_cls = getattr(self, "custom_json_decoder", json.JSONDecoder)
                 try:
-                    return json.loads(row.data, cls=decoder_cls)
+                    return decode_shared_data(row.data, decoder_cls)
                 except Exception as parse_err:
                     self.logger.error(
                         f"❌ Failed to decode order_management JSON: {parse_err}",
@@ -526,15 +588,22 @@ class SharedDataManager:
             self.logger.error(f"❌ Unexpected error checking OHLCV initialization: {e}", exc_info=True)
             return False
 
+    def mark_changed(self, section: str = None, keys=None):
+        """Call after mutating market_data / order_management in place (see SnapshotStore.mark_changed)."""
+        self.snapshots.mark_changed(section, keys)
+
     async def get_snapshots(self):
-        async with self.lock:
-            try:
-                market_data = copy.deepcopy(self.market_data)
-                order_management = copy.deepcopy(self.order_management)
-                return market_data, order_management
-            except Exception as e:
-                self.logger.error(f"❌ Error fetching snapshots: {e}", exc_info=True)
-                return {}, {}
+        """Read-only (market_data, order_management) of the current snapshot version; copy before modifying."""
+        try:
+            if self.snapshots.is_current():
+                snapshot = self.snapshots.current()
+            else:
+                async with self.lock:  # Rebuild from a state no writer is halfway through
+                    snapshot = self.snapshots.current()
+            return snapshot.market_data, snapshot.order_management
+        except Exception as e:
+            self.logger.error(f"❌ Error fetching snapshots: {e}", exc_info=True)
+            return {}, {}
 
     async def _fetch_data_in_transaction(self, data_type: str, session: AsyncSession) -> dict:
         """Fetch data from database within an existing transaction."""
@@ -547,7 +616,7 @@ class SharedDataManager:
                 return {}
 
             decoder_cls = getattr(self, "custom_json_decoder", json.JSONDecoder)
-            return json.loads(row.data, cls=decoder_cls)
+            return decode_shared_data(row.data, decoder_cls)
         except Exception as e:
             self.logger.error(f"❌ Error fetching {data_type} in transaction: {e}", exc_info=True)
             return {}
@@ -555,7 +624,7 @@ class SharedDataManager:
     async def update_data(self, data_type: str, data: dict, session: AsyncSession):
         """Update shared data in the database using a pooled session."""
         try:
-            encoded_data = json.dumps(data, cls=DecimalEncoderIn)
+            encoded_data = encode_shared_data(data, self._blob_encoding)
             await session.execute(
                 text("""
                     INSERT INTO shared_data (data_type, data, last_updated)
@@ -582,6 +651,14 @@ class SharedDataManager:
             self.logger.debug("💾 Starting save_data...")
             start_time = time.time()
 
+            if self.replicator is not None:
+                published = await self._publish_deltas()
+                if published is not None and now - self._last_blob_ts < self._blob_interval:
+                    duration = round(time.time() - start_time, 2)
+                    self.logger.debug(f"✅ save_data published {published} changed entries in {duration}s")
+                    return
+            self._last_blob_ts = now
+
             async with self.database_session_manager.async_session() as session:
                 async with session.begin():  # start transaction
                     # Clear old snapshots
@@ -589,7 +666,7 @@ class SharedDataManager:
                     await self.clear_old_data(session, "order_management_snapshots")
 
                     # Save new snapshots
-                    saved_market_data = await self.save_market_data_snapshot(session, self.market_data)
+                    await self.save_market_data_snapshot(session, self.market_data)
                     saved_order_management = await self.save_order_management_snapshot(session, self.order_management)
 
                     # Remove runtime-only keys
@@ -600,14 +677,9 @@ class SharedDataManager:
                     # Merge with existing database data to preserve keys from other containers
                     if self.market_data:
                         db_market_data = await self._fetch_data_in_transaction("market_data", session)
-                        if db_market_data:
-                            # Preprocess DB data to handle DataFrames before merging
-                            db_market_data_preprocessed = preprocess_market_data(db_market_data)
-                            # Merge: DB data first, then overlay with our changes
-                            merged_market_data = {**db_market_data_preprocessed, **saved_market_data}
-                            await self.update_data("market_data", merged_market_data, session)
-                        else:
-                            await self.update_data("market_data", saved_market_data, session)
+                        # Merge: DB data first, then overlay with our changes (update_data encodes DataFrames)
+                        merged_market_data = {**db_market_data, **self.market_data} if db_market_data else self.market_data
+                        await self.update_data("market_data", merged_market_data, session)
 
                     if self.order_management:
                         await self.update_data("order_management", saved_order_management_clean, session)
@@ -627,6 +699,40 @@ class SharedDataManager:
         except Exception as e:
             self.logger.error(f"❌ Error saving shared data: {e}", exc_info=True)
 
+    async def _publish_deltas(self):
+        """Publish the changed market_data / order_management entries; None if publishing failed."""
+        try:
+            dismantled = self.dismantle_order_management(self.order_management)
+            states = {}
+            if self.market_data:
+                states["market_data"] = self.market_data
+            if self.order_management:
+                states["order_management"] = dismantled
+            published = await self.replicator.publish(states)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.logger.error(f"❌ Error publishing shared data deltas: {e}", exc_info=True)
+            return None
+
+        # Same in-memory form as after a blob save (passive_orders is runtime only)
+        if "passive_orders" in self.order_management:
+            dismantled["passive_orders"] = self.order_management["passive_orders"]
+        self.order_management = dismantled
+        return published
+
+    async def _sync_deltas(self):
+        """market_data / order_management from the replicated entries ({} until first published)."""
+        try:
+            await self.replicator.sync()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.logger.error(f"❌ Error syncing shared data deltas: {e}", exc_info=True)
+            return {}, {}
+        state = self.replicator.state
+        return dict(state.get("market_data", {})), dict(state.get("order_management", {}))
+
     async def save_market_data_snapshot(self, session: AsyncSession, market_data: dict) -> dict:
         """Save a snapshot of market data using pooled session."""
         try:
@@ -25,9 +25,8 @@ class DBSharedDataView:
                 md_row = await self._db.fetch_market_data()
                 md = {}
                 if md_row and md_row.get("data"):
-                    import json
-                    from Utils.json_utils import CustomJSONDecoder  # adjust path if needed
-                    md = json.loads(md_row["data"], cls=CustomJSONDecoder)
+                    from SharedDataManager.shared_data_manager import decode_shared_data  # JSON or columnar
+                    md = decode_shared_data(md_row["data"])
                 self._cached_market_data = md or {}
                 self._md_ts = now
             except Exception as e:
@@ -39,9 +38,8 @@ class DBSharedDataView:
                 om_row = await self._db.fetch_order_management()
                 om = {}
                 if om_row and om_row.get("data"):
-                    import json
-                    from Utils.json_utils import CustomJSONDecoder  # adjust path if needed
-                    om = json.loads(om_row["data"], cls=CustomJSONDecoder)
+                    from SharedDataManager.shared_data_manager import decode_shared_data  # JSON or columnar
+                    om = decode_shared_data(om_row["data"])
                 # merge passive orders
                 om["passive_orders"] = await self._db.fetch_passive_orders()
                 self._cached_order_mgmt = om or {}
@@ -0,0 +1,202 @@
+"""
+Copy-on-Write Shared State Snapshots
+
+Readers of market_data / order_management (every incoming webhook) used to
+get a copy.deepcopy of both structures, DataFrames included. SnapshotStore
+keeps one immutable, versioned snapshot instead and hands out a reference
+to it; it is only rebuilt when the live state changed, and the rebuild
+shares every frozen sub-tree whose source did not change.
+
+A top-level value counts as changed when:
+
+- it was replaced (the live key no longer points at the object it was
+  frozen from; checked on every read, O(top-level keys)), or
+- a writer that mutated it in place called mark_changed(section, key), or
+- the snapshot is older than `max_age` seconds, which re-freezes everything
+  as a backstop for in-place writers that do not mark their changes.
+
+Frozen values: dicts become FrozenDict and lists FrozenList (read-only dict /
+list subclasses; copy.copy / copy.deepcopy of them return plain, mutable
+containers), DataFrames / Series / arrays are copied, immutable scalars are
+shared, anything else is deep-copied. Readers must not mutate the copied
+DataFrames in place: the same copy is shared by every reader of a version
+and by later versions until the source changes.
+"""
+
+import copy
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+SECTIONS = ('market_data', 'order_management')
+
+_IMMUTABLE = (str, bytes, int, float, bool, Decimal, datetime, date, type(None), np.generic)
+
+
+class FrozenDict(dict):
+    """Read-only dict; copies are plain dicts"""
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("snapshot is read-only; copy it to modify")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return {copy.deepcopy(k, memo): copy.deepcopy(v, memo) for k, v in self.items()}
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+class FrozenList(list):
+    """Read-only list; copies are plain lists"""
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("snapshot is read-only; copy it to modify")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = remove = pop = clear = sort = reverse = _readonly
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return [copy.deepcopy(v, memo) for v in self]
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+
+def freeze(value):
+    """Immutable copy of a shared-state value (see module docstring)"""
+    if isinstance(value, _IMMUTABLE) or isinstance(value, (FrozenDict, FrozenList)):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return FrozenList(freeze(v) for v in value)
+    if isinstance(value, tuple):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=True)
+    if isinstance(value, np.ndarray):
+        frozen = value.copy()
+        frozen.flags.writeable = False
+        return frozen
+    return copy.deepcopy(value)
+
+
+class Snapshot(NamedTuple):
+    version: int
+    market_data: FrozenDict
+    order_management: FrozenDict
+    created: float  # time.monotonic()
+
+
+class SnapshotStore:
+    """Versioned copy-on-write snapshots of the live (market_data, order_management)"""
+
+    def __init__(self, source: Callable[[], Tuple[dict, dict]], max_age: float = 2.0):
+        self._source = source  # Returns the live (market_data, order_management)
+        self.max_age = max_age
+        self._snapshot: Optional[Snapshot] = None
+        self._sources: Dict[str, dict] = {}  # section -> the live dict / values the snapshot was frozen from
+        self._dirty: Dict[str, Set[str]] = {}
+        self._all_dirty = False
+
+        self.reads = 0
+        self.builds = 0
+        self.values_frozen = 0
+        self.values_shared = 0
+        self.last_build_ms = 0.0
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version if self._snapshot else 0
+
+    def mark_changed(self, section: Optional[str] = None, keys: Optional[Iterable[str]] = None):
+        """Record an in-place change (no section: everything, no keys: the whole section)"""
+        if section is None:
+            self._all_dirty = True
+        elif keys is None:
+            self._sources.pop(section, None)
+        else:
+            self._dirty.setdefault(section, set()).update(keys)
+
+    def is_current(self) -> bool:
+        """True when the snapshot still matches the live state (no rebuild needed)"""
+        snapshot = self._snapshot
+        if snapshot is None or self._all_dirty or self._dirty:
+            return False
+        if time.monotonic() - snapshot.created > self.max_age:
+            return False
+        for section, live in zip(SECTIONS, self._source()):
+            sources = self._sources.get(section)
+            if sources is None or not isinstance(live, dict) or len(live) != len(sources):
+                return False
+            for key, value in live.items():
+                if sources.get(key, sources) is not value:
+                    return False
+        return True
+
+    def current(self) -> Snapshot:
+        """The current snapshot, rebuilt first if the live state changed (O(1) when it did not)"""
+        self.reads += 1
+        if not self.is_current():
+            self._build()
+        return self._snapshot
+
+    def _build(self):
+        start = time.perf_counter()
+        previous = self._snapshot
+        full = (self._all_dirty or previous is None
+                or time.monotonic() - previous.created > self.max_age)
+        sections, changed = {}, previous is None
+        for section, live in zip(SECTIONS, self._source()):
+            live = live if isinstance(live, dict) else {}
+            prior_sources = {} if full else self._sources.get(section, {})
+            prior = getattr(previous, section) if previous is not None else FrozenDict()
+            dirty = self._dirty.get(section, ())
+            frozen, sources, section_changed = {}, {}, len(live) != len(prior)
+            for key, value in live.items():
+                if key in prior and key not in dirty and prior_sources.get(key, prior_sources) is value:
+                    frozen[key] = prior[key]
+                    self.values_shared += 1
+                else:
+                    frozen[key] = freeze(value)
+                    self.values_frozen += 1
+                    section_changed = True
+                sources[key] = value
+            self._sources[section] = sources
+            sections[section] = FrozenDict(frozen) if section_changed else prior
+            changed = changed or section_changed
+
+        version = self.version + 1 if changed else self.version
+        self._snapshot = Snapshot(version, sections['market_data'], sections['order_management'],
+                                  time.monotonic())
+        self._dirty.clear()
+        self._all_dirty = False
+        self.builds += 1
+        self.last_build_ms = (time.perf_counter() - start) * 1000
+
+    def stats(self) -> dict:
+        return {
+            'version': self.version,
+            'reads': self.reads,
+            'builds': self.builds,
+            'values_frozen': self.values_frozen,
+            'values_shared': self.values_shared,
+            'last_build_ms': round(self.last_build_ms, 3),
+        }
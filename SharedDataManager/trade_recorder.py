@@ -4,6 +4,8 @@ import decimal
 from decimal import Decimal, ROUND_DOWN, InvalidOperation
 
 import asyncio
+import os
+import time
 from TableModels.trade_record import TradeRecord
 from TestDebugMaintenance.trade_record_maintenance import recompute_fifo_for_symbol
 from Shared_Utils.logger import get_logger
@@ -30,9 +32,17 @@ class TradeRecorder:
         self.run_maintenance_if_needed = maintenance_callback
         self.shared_data_manager = shared_data_manager
 
-        self.trade_queue: Queue = Queue()
+        self.trade_queue: Queue = Queue()  # (enqueued monotonic time, trade_data)
         self.worker_task: Optional[asyncio.Task] = None
 
+        # Queued trades written per transaction by the worker (1: one trade at a time)
+        self.batch_size = max(1, int(os.getenv('TRADE_RECORDER_BATCH_SIZE', '50')))
+        self.metrics = {
+            'trades': 0, 'batches': 0, 'failed': 0,
+            'last_batch': 0, 'max_batch': 0, 'last_batch_ms': 0.0,
+            'last_lag_s': 0.0, 'max_lag_s': 0.0,
+        }
+
     # =====================================================
     # ✅ Worker Management
     # =====================================================
@@ -58,21 +68,32 @@ class TradeRecorder:
         """Enqueues a trade for async processing."""
         if isinstance(trade_data.get("parent_id"), TradeRecord):
             self.logger.warning(f"🚨 enqueue_trade received TradeRecord for parent_id: {trade_data['parent_id']}")
-        await self.trade_queue.put(trade_data)
+        await self.trade_queue.put((time.monotonic(), trade_data))
         self.logger.debug("Trade queued",
                          extra={'symbol': trade_data.get('symbol'), 'side': trade_data.get('side')})
 
     async def _trade_worker_loop(self):
-        """Continuously processes queued trades in FIFO order."""
+        """
+        Continuously processes queued trades in FIFO order.
+
+        Whatever is already queued (up to batch_size) is coalesced into one
+        record_trades() call, so a fill storm costs one transaction per batch
+        instead of one per trade; an idle queue still records each trade as it
+        arrives.
+        """
         has_run_maintenance = False
 
         while True:
-            trade_data = await self.trade_queue.get()
+            batch = [await self.trade_queue.get()]
+            while len(batch) < self.batch_size and not self.trade_queue.empty():
+                batch.append(self.trade_queue.get_nowait())
             try:
-                await self.record_trade(trade_data)
+                started = time.monotonic()
+                await self.record_trades([trade_data for _, trade_data in batch])
+                self._update_batch_metrics(len(batch), started - batch[0][0], time.monotonic() - started)
 
                 # ✅ After draining queue, run maintenance once if DB is no longer empty
-                if not has_run_maintenance and self.trade_queue.empty():
+                if not has_run_maintenance and self.trade_queue.empty() and self.run_maintenance_if_needed:
                     count = await self.get_trade_record_count()
                     if count > 0:
                         self.logger.info("🔧 Running maintenance after initial trade load...")
@@ -80,9 +101,31 @@ class TradeRecorder:
                         has_run_maintenance = True
 
             except Exception as e:
-                self.logger.error(f"❌ Failed to record trade {trade_data.get('order_id')}: {e}", exc_info=True)
+                order_ids = [trade_data.get('order_id') for _, trade_data in batch]
+                self.logger.error(f"❌ Failed to record trades {order_ids}: {e}", exc_info=True)
             finally:
-                self.trade_queue.task_done()
+                for _ in batch:
+                    self.trade_queue.task_done()
+
+    def _update_batch_metrics(self, size: int, lag: float, elapsed: float):
+        m = self.metrics
+        m['trades'] += size
+        m['batches'] += 1
+        m['last_batch'] = size
+        m['max_batch'] = max(m['max_batch'], size)
+        m['last_batch_ms'] = round(elapsed * 1000, 2)
+        m['last_lag_s'] = round(lag, 3)  # Oldest trade in the batch: enqueue -> start of its write
+        m['max_lag_s'] = max(m['max_lag_s'], m['last_lag_s'])
+        if size > 1:
+            self.logger.info("Trade batch recorded",
+                             extra={'batch': size, 'lag_s': m['last_lag_s'], 'ms': m['last_batch_ms'],
+                                    'queued': self.trade_queue.qsize()})
+
+    def stats(self) -> dict:
+        """Queue depth, batch sizes and queue lag of the recording worker"""
+        m = self.metrics
+        return dict(m, queued=self.trade_queue.qsize(), batch_size=self.batch_size,
+                    avg_batch=round(m['trades'] / m['batches'], 2) if m['batches'] else 0.0)
 
     async def _fetch_order_fills(self, order_id: str) -> list[dict]:
         """
@@ -176,269 +219,283 @@ class TradeRecorder:
 
         Flow:
           - Normalize inputs and precision.
-          - For SELL: compute FIFO cost basis & PnL (if enough parent liquidity).
+          - For SELL: PnL is deferred to the FIFO engine (scripts/compute_allocations.py).
           - Build row and UPSERT with `source` excluded from UPDATE set.
-          - For SELL: update parent BUYs' remaining_size (and optionally realized_profit).
         """
-        try:
-            fills_in = trade_data.get("fills")
-            gross_override_raw = trade_data.get("gross_override")
-            fees_override_raw = trade_data.get("fees_override")
-            gross_override = Decimal(gross_override_raw) if gross_override_raw not in (None, "") else None
-            fees_override = Decimal(fees_override_raw) if fees_override_raw not in (None, "") else None
-
-            symbol = trade_data["symbol"]
-            side = (trade_data["side"] or "").lower()
-            order_id = trade_data["order_id"]
-            preferred_parent_id = trade_data.get("preferred_parent_id")
-            status = trade_data.get("status")
-            trigger = trade_data.get("trigger")
-            # incoming source (may be unknown)
-            source_in = (trade_data.get("source") or "").lower()
-            ingest_via = trade_data.get("ingest_via")  # 'websocket' | 'rest' | 'manual' | 'import' (optional)
-            # sensible default if caller didn’t supply a source
-            source_final = source_in
-            if not source_final:
-                if ingest_via in ("websocket",):
-                    source_final = "websocket"
-                elif ingest_via in ("rest", "import"):
-                    source_final = "reconciled"  # marked as “unknownish” so we can upgrade later
-                elif ingest_via in ("manual",):
-                    source_final = "manual"
-
-            last_recon_raw = trade_data.get("last_reconciled_at")
-            last_reconciled_at = None
-            if last_recon_raw:
-                if isinstance(last_recon_raw, str):
-                    last_reconciled_at = datetime.fromisoformat(last_recon_raw.replace("Z", "+00:00"))
-                else:
-                    last_reconciled_at = last_recon_raw
-
-            last_reconciled_via = trade_data.get("last_reconciled_via")  # e.g., 'rest_api'
+        await self.record_trades([trade_data])
 
-            # -----------------------------
-            # Normalize order_time -> UTC aware
-            # -----------------------------
-            order_time_raw = trade_data.get("order_time", datetime.now(timezone.utc))
-            if isinstance(order_time_raw, str):
-                parsed_time = datetime.fromisoformat(order_time_raw.replace("Z", "+00:00"))
-            else:
-                parsed_time = order_time_raw
-            order_time_utc = (
-                parsed_time.astimezone(timezone.utc)
-                if parsed_time.tzinfo else parsed_time.replace(tzinfo=timezone.utc)
-            )
-
-            # -----------------------------
-            # Precision & safe conversions
-            # -----------------------------
-            base_deci, quote_deci, *_ = self.shared_utils_precision.fetch_precision(symbol)
-            base_q = Decimal("1").scaleb(-base_deci)
-            quote_q = Decimal("1").scaleb(-quote_deci)
-
-            amount = self.shared_utils_precision.safe_convert(trade_data["amount"], base_deci)
-            price = self.shared_utils_precision.safe_convert(trade_data["price"], quote_deci)
+    async def record_trades(self, batch: list[dict]) -> int:
+        """
+        Records trades in one transaction (same invariants as record_trade); returns how many were written.
 
-            total_fees_raw = trade_data.get("total_fees") or trade_data.get("total_fees_usd")
-            total_fees = Decimal(total_fees_raw) if total_fees_raw not in (None, "") else Decimal("0")
+        Trades are grouped per symbol in arrival order, the existing/parent `source` lookups are one query
+        for the whole batch, and consecutive rows with the same upsert shape share one multi-row
+        INSERT ... ON CONFLICT. If the transaction fails, each trade is retried in its own so one bad row
+        does not drop the rest.
+        """
+        prepared = []
+        for trade_data in batch:
+            try:
+                prepared.append(self._prepare_trade(trade_data))
+            except Exception as e:
+                self.metrics['failed'] += 1
+                self.logger.error(f"❌ Error recording trade {trade_data.get('order_id')}: {e}", exc_info=True)
+        if not prepared:
+            return 0
 
-            parent_id = trade_data.get("parent_id")
-            parent_ids: list[str] | None = None
-            pnl_usd = cost_basis_usd = sale_proceeds_usd = net_sale_proceeds_usd = None
-            update_instructions = []
+        by_symbol: dict[str, list[dict]] = {}
+        for trade in prepared:
+            by_symbol.setdefault(trade["symbol"], []).append(trade)
+        trades = [trade for symbol_trades in by_symbol.values() for trade in symbol_trades]
 
+        try:
             async with self.db_session_manager.async_session() as session:
                 async with session.begin():
                     self.active_session = session
-
-                    # -----------------------------
-                    # SELL: defer FIFO to external engine
-                    # -----------------------------
-                    if side == "sell":
-                        if fees_override is not None:
-                            total_fees = fees_override
-
-                        # ✅ NEW APPROACH: Don't compute PnL inline
-                        # The FIFO engine (scripts/compute_allocations.py) will compute PnL
-                        # and populate the fifo_allocations table.
-                        parent_ids = None
-                        parent_id = None
-                        pnl_usd = None
-                        cost_basis_usd = None
-                        sale_proceeds_usd = None
-                        net_sale_proceeds_usd = None
-                        update_instructions = []
-
-                        self.logger.info(
-                            f"📝 SELL recorded: {symbol} {amount}@{price} | "
-                            f"PnL will be computed by FIFO engine (external process). "
-                            f"Order ID: {order_id}"
-                        )
-
-                    else:
-                        # -----------------------------
-                        # BUY: baseline fields
-                        # -----------------------------
-                        # For buys, anchor chain to this buy
-                        parent_id = trade_data.get("parent_id")  # keep if provided
-                        parent_ids = [order_id]
-
-                        # If no fees provided but we have fills, sum USD fees
-                        if (total_fees is None or total_fees == 0) and fills_in:
-                            try:
-                                total_fees = sum((Decimal(f["fee_usd"]) for f in fills_in), Decimal("0"))
-                            except Exception as e:
-                                self.logger.warning(f"Failed to compute buy fees from fills: {e}")
-
-                    # -----------------------------
-                    # Normalize parent_id
-                    # -----------------------------
-                    if isinstance(parent_id, list):
-                        parent_id = parent_id[0] if parent_id else None
-                    elif parent_id is not None and not isinstance(parent_id, str):
-                        parent_id = str(parent_id)
-
-                    # -----------------------------
-                    # Decide final `source` for this row
-                    # -----------------------------
-                    source_final = source_in
-                    unknownish = {"", "unknown", "reconciled"}
-
-                    if side == "sell" and (source_final in unknownish):
-                        # Try explicit parent in input first
-                        parent_candidate = trade_data.get("parent_id")
-                        # Else try FIFO-derived parent_ids
-                        if not parent_candidate and parent_ids:
-                            parent_candidate = parent_ids[0]
-                        if parent_candidate:
-                            parent_row = await session.get(TradeRecord, parent_candidate)
-                            if parent_row and (parent_row.source or "") not in unknownish:
-                                source_final = parent_row.source
-
-                    # -----------------------------
-                    # Build row
-                    # -----------------------------
-                    trade_dict = {
-                        "order_id": order_id,
-                        "parent_id": parent_id,
-                        "parent_ids": parent_ids or None,
-                        "symbol": symbol,
-                        "side": side,
-                        "order_time": order_time_utc,
-                        "price": float(price),
-                        "size": float(amount),
-                        "pnl_usd": float(pnl_usd) if pnl_usd is not None else None,
-                        "total_fees_usd": float(total_fees),
-                        "trigger": trigger,
-                        "order_type": trade_data.get("order_type"),
-                        "status": status,
-                        # 🔒 origin-of-intent (immutable after insert)
-                        "source": source_final,
-                        # Derived SELL fields
-                        "cost_basis_usd": float(cost_basis_usd) if cost_basis_usd is not None else None,
-                        "sale_proceeds_usd": float(sale_proceeds_usd) if sale_proceeds_usd is not None else None,
-                        "net_sale_proceeds_usd": float(net_sale_proceeds_usd) if net_sale_proceeds_usd is not None else None,
-                        # BUY remaining_size initialized to full amount; SELL None
-                        "remaining_size": float(amount) if side == "buy" else None,
-                        # SELL realized_profit deprecated - use fifo_allocations table
-                        # Set to None; will be backfilled from FIFO for historical accuracy
-                        "realized_profit": None,
-                    }
-
-                    if ingest_via:
-                        trade_dict["ingest_via"] = ingest_via
-                    if last_reconciled_at:
-                        trade_dict["last_reconciled_at"] = last_reconciled_at
-                    if last_reconciled_via:
-                        trade_dict["last_reconciled_via"] = last_reconciled_via
-
-
-                    # -----------------------------
-                    # UPSERT (preserving `source`)
-                    # -----------------------------
-
-                    # 1) Limit to real table columns
-                    table_cols = set(TradeRecord.__table__.columns.keys())
-
-                    existing_source = await session.scalar(
-                        select(TradeRecord.source).where(TradeRecord.order_id == order_id)
-                    )
-
-                    exclude_from_update = set()
-
-                    def is_unknownish(s):
-                        return (s or "").lower() in {"", "unknown", "reconciled", "none", "null"}
-
-                    if existing_source is None:
-                        # brand new insert; exclude list only affects updates
-                        exclude_from_update.add("source")
-                    else:
-                        if is_unknownish(existing_source) and not is_unknownish(source_final):
-                            # allow upgrade: do NOT add 'source' to exclude_from_update
-                            pass
-                        else:
-                            # keep existing non-unknown source immutable
-                            exclude_from_update.add("source")
-
-                    # For BUY updates, never touch derived/linkage fields
-                    if side == "buy":
-                        # never touch linkage/derived fields on update for buys
-                        exclude_from_update.update({"remaining_size", "realized_profit", "pnl_usd", "parent_id", "parent_ids"})
-
-                    # 2) Filter insert dict to known columns only
-                    insert_values = {k: v for k, v in trade_dict.items() if k in table_cols}
-
-                    # 3) Build insert
-                    insert_stmt = pg_insert(TradeRecord).values(**insert_values)
-
-                    # 4) Build update set from known columns only, excluding immutable ones
-                    update_cols = {
-                        k: getattr(insert_stmt.excluded, k)
-                        for k in insert_values.keys()
-                        if k not in exclude_from_update
-                    }
-
-                    # 5) Final upsert
-                    update_stmt = insert_stmt.on_conflict_do_update(
-                        index_elements=["order_id"],
-                        set_=update_cols,
-                    )
-                    await session.execute(update_stmt)
+                    await self._upsert_trades(session, trades)
 
                     # ============================================================
                     # ✅ STRATEGY LINKAGE: Link trade to strategy snapshot
                     # ============================================================
-                    await self._create_or_update_strategy_link(
-                        session=session,
-                        order_id=order_id,
-                        symbol=symbol,
-                        side=side
-                    )
-
-                    # -----------------------------
-                    # Update Parent BUYs (remaining_size + realized_profit)
-                    # -----------------------------
-                    # ✅ DISABLED: FIFO engine will manage remaining_size updates
-                    # No inline updates needed since we're not computing FIFO here anymore
-                    if update_instructions:
-                        self.logger.debug(
-                            f"[FIFO] Skipping inline parent updates - FIFO engine will handle. "
-                            f"Would have updated {len(update_instructions)} parent records."
+                    for trade in trades:
+                        await self._create_or_update_strategy_link(
+                            session=session,
+                            order_id=trade["order_id"],
+                            symbol=trade["symbol"],
+                            side=trade["side"]
                         )
 
+            for trade in trades:
                 self.logger.info(
-                    f"✅ Trade recorded: {symbol} {side.upper()} {amount}@{price} | "
-                    f"PnL: {pnl_usd} | Parents: {parent_ids}"
+                    f"✅ Trade recorded: {trade['symbol']} {trade['side'].upper()} {trade['amount']}@{trade['price']} | "
+                    f"PnL: None | Parents: {trade['values'].get('parent_ids')}"
                 )
-            self.active_session = None
+            return len(trades)
 
         except asyncio.CancelledError:
-            self.active_session = None
             self.logger.info("🛑 record_trade cancelled cleanly.")
             raise
         except Exception as e:
-            self.active_session = None
+            if len(trades) > 1:
+                self.logger.warning(f"⚠️ Batch of {len(trades)} trades failed ({e}); recording them one at a time")
+                recorded = 0
+                for trade in trades:
+                    recorded += await self.record_trades([trade["trade_data"]])
+                return recorded
+            self.metrics['failed'] += 1
             self.logger.error(f"❌ Error recording trade: {e}", exc_info=True)
+            return 0
+        finally:
+            self.active_session = None
+
+    def _prepare_trade(self, trade_data: dict) -> dict:
+        """Normalizes a queued trade into its trade_records row (no DB access; `source` is decided at write time)."""
+        fills_in = trade_data.get("fills")
+        fees_override_raw = trade_data.get("fees_override")
+        fees_override = Decimal(fees_override_raw) if fees_override_raw not in (None, "") else None
+
+        symbol = trade_data["symbol"]
+        side = (trade_data["side"] or "").lower()
+        order_id = trade_data["order_id"]
+        status = trade_data.get("status")
+        trigger = trade_data.get("trigger")
+        # incoming source (may be unknown)
+        source_in = (trade_data.get("source") or "").lower()
+        ingest_via = trade_data.get("ingest_via")  # 'websocket' | 'rest' | 'manual' | 'import' (optional)
+
+        last_recon_raw = trade_data.get("last_reconciled_at")
+        last_reconciled_at = None
+        if last_recon_raw:
+            if isinstance(last_recon_raw, str):
+                last_reconciled_at = datetime.fromisoformat(last_recon_raw.replace("Z", "+00:00"))
+            else:
+                last_reconciled_at = last_recon_raw
+
+        last_reconciled_via = trade_data.get("last_reconciled_via")  # e.g., 'rest_api'
+
+        # -----------------------------
+        # Normalize order_time -> UTC aware
+        # -----------------------------
+        order_time_raw = trade_data.get("order_time", datetime.now(timezone.utc))
+        if isinstance(order_time_raw, str):
+            parsed_time = datetime.fromisoformat(order_time_raw.replace("Z", "+00:00"))
+        else:
+            parsed_time = order_time_raw
+        order_time_utc = (
+            parsed_time.astimezone(timezone.utc)
+            if parsed_time.tzinfo else parsed_time.replace(tzinfo=timezone.utc)
+        )
+
+        # -----------------------------
+        # Precision & safe conversions
+        # -----------------------------
+        base_deci, quote_deci, *_ = self.shared_utils_precision.fetch_precision(symbol)
+
+        amount = self.shared_utils_precision.safe_convert(trade_data["amount"], base_deci)
+        price = self.shared_utils_precision.safe_convert(trade_data["price"], quote_deci)
+
+        total_fees_raw = trade_data.get("total_fees") or trade_data.get("total_fees_usd")
+        total_fees = Decimal(total_fees_raw) if total_fees_raw not in (None, "") else Decimal("0")
+
+        parent_candidate = None
+        if side == "sell":
+            # -----------------------------
+            # SELL: defer FIFO to external engine
+            # -----------------------------
+            # The FIFO engine (scripts/compute_allocations.py) will compute PnL
+            # and populate the fifo_allocations table.
+            if fees_override is not None:
+                total_fees = fees_override
+            parent_ids = None
+            parent_id = None
+            parent_candidate = self._normalize_parent_id(trade_data.get("parent_id"))
+
+            self.logger.info(
+                f"📝 SELL recorded: {symbol} {amount}@{price} | "
+                f"PnL will be computed by FIFO engine (external process). "
+                f"Order ID: {order_id}"
+            )
+        else:
+            # -----------------------------
+            # BUY: baseline fields
+            # -----------------------------
+            # For buys, anchor chain to this buy
+            parent_id = self._normalize_parent_id(trade_data.get("parent_id"))  # keep if provided
+            parent_ids = [order_id]
+
+            # If no fees provided but we have fills, sum USD fees
+            if (total_fees is None or total_fees == 0) and fills_in:
+                try:
+                    total_fees = sum((Decimal(f["fee_usd"]) for f in fills_in), Decimal("0"))
+                except Exception as e:
+                    self.logger.warning(f"Failed to compute buy fees from fills: {e}")
+
+        # -----------------------------
+        # Build row (`source` is added by _upsert_trades)
+        # -----------------------------
+        trade_dict = {
+            "order_id": order_id,
+            "parent_id": parent_id,
+            "parent_ids": parent_ids or None,
+            "symbol": symbol,
+            "side": side,
+            "order_time": order_time_utc,
+            "price": float(price),
+            "size": float(amount),
+            "pnl_usd": None,
+            "total_fees_usd": float(total_fees),
+            "trigger": trigger,
+            "order_type": trade_data.get("order_type"),
+            "status": status,
+            # Derived SELL fields (computed by the FIFO engine)
+            "cost_basis_usd": None,
+            "sale_proceeds_usd": None,
+            "net_sale_proceeds_usd": None,
+            # BUY remaining_size initialized to full amount; SELL None
+            "remaining_size": float(amount) if side == "buy" else None,
+            # SELL realized_profit deprecated - use fifo_allocations table
+            # Set to None; will be backfilled from FIFO for historical accuracy
+            "realized_profit": None,
+        }
+
+        if ingest_via:
+            trade_dict["ingest_via"] = ingest_via
+        if last_reconciled_at:
+            trade_dict["last_reconciled_at"] = last_reconciled_at
+        if last_reconciled_via:
+            trade_dict["last_reconciled_via"] = last_reconciled_via
+
+        # Limit to real table columns
+        table_cols = set(TradeRecord.__table__.columns.keys())
+        return {
+            "trade_data": trade_data,
+            "order_id": order_id,
+            "symbol": symbol,
+            "side": side,
+            "amount": amount,
+            "price": price,
+            "source_in": source_in,
+            "parent_candidate": parent_candidate,
+            "values": {k: v for k, v in trade_dict.items() if k in table_cols},
+        }
+
+    @staticmethod
+    def _normalize_parent_id(parent_id):
+        if isinstance(parent_id, list):
+            return parent_id[0] if parent_id else None
+        if parent_id is not None and not isinstance(parent_id, str):
+            return str(parent_id)
+        return parent_id
+
+    @staticmethod
+    def _upsert_exclusions(side: str, existing_source: Optional[str], source_final: str) -> set:
+        """Columns an UPSERT must not overwrite on conflict."""
+        def is_unknownish(s):
+            return (s or "").lower() in {"", "unknown", "reconciled", "none", "null"}
+
+        exclude_from_update = set()
+        if existing_source is None:
+            # brand new insert; exclude list only affects updates
+            exclude_from_update.add("source")
+        elif not (is_unknownish(existing_source) and not is_unknownish(source_final)):
+            # keep existing non-unknown source immutable (an unknown one may be upgraded)
+            exclude_from_update.add("source")
+
+        if side == "buy":
+            # never touch linkage/derived fields on update for buys
+            exclude_from_update.update({"remaining_size", "realized_profit", "pnl_usd", "parent_id", "parent_ids"})
+        return exclude_from_update
+
+    async def _upsert_trades(self, session, trades: list[dict]):
+        """
+        UPSERTs prepared trades in order, preserving `source`.
+
+        One query fetches the current `source` of every order_id and SELL parent in the batch; it is then
+        tracked in memory as rows are planned, so later trades see earlier ones (a SELL whose parent BUY is
+        in the same batch inherits its source). Rows with the same columns and update set share a multi-row
+        statement; a repeated order_id goes into a statement after the one holding its previous row, so
+        updates to the same trade still apply in arrival order and each statement touches a row once.
+        """
+        unknownish = {"", "unknown", "reconciled"}
+        lookup_ids = {t["order_id"] for t in trades} | {t["parent_candidate"] for t in trades if t["parent_candidate"]}
+        result = await session.execute(
+            select(TradeRecord.order_id, TradeRecord.source).where(TradeRecord.order_id.in_(lookup_ids))
+        )
+        sources = {order_id: source for order_id, source in result}
+
+        statements = []  # [(columns, exclude), [values]] in execution order
+        latest_by_shape = {}  # shape -> index of its newest statement
+        last_statement = {}  # order_id -> index of the statement holding its latest row
+        for trade in trades:
+            order_id = trade["order_id"]
+
+            # -----------------------------
+            # Decide final `source` for this row
+            # -----------------------------
+            source_final = trade["source_in"]
+            if trade["side"] == "sell" and source_final in unknownish and trade["parent_candidate"]:
+                parent_source = sources.get(trade["parent_candidate"])
+                if (parent_source or "") not in unknownish:
+                    source_final = parent_source
+
+            # 🔒 origin-of-intent (immutable after insert)
+            values = dict(trade["values"], source=source_final)
+            exclude = self._upsert_exclusions(trade["side"], sources.get(order_id), source_final)
+            if order_id not in sources or "source" not in exclude:
+                sources[order_id] = source_final
+
+            shape = (tuple(values), frozenset(exclude))
+            index = latest_by_shape.get(shape, -1)
+            if index <= last_statement.get(order_id, -1):
+                index = latest_by_shape[shape] = len(statements)
+                statements.append((shape, []))
+            statements[index][1].append(values)
+            last_statement[order_id] = index
+
+        for (columns, exclude), rows in statements:
+            insert_stmt = pg_insert(TradeRecord).values(rows)
+            update_cols = {k: getattr(insert_stmt.excluded, k) for k in columns if k not in exclude}
+            await session.execute(insert_stmt.on_conflict_do_update(index_elements=["order_id"], set_=update_cols))
 
     async def compute_cost_basis_and_sale_proceeds(
             self,
@@ -1,9 +1,9 @@
 
-import math
 from inspect import stack  # debugging
 
 import pandas as pd
 from typing import Optional
+from Shared_Utils.product_registry import ProductMeta, ProductRegistry
 from decimal import Decimal, ROUND_DOWN, ROUND_HALF_EVEN, InvalidOperation, localcontext, getcontext
 
 
@@ -28,6 +28,12 @@ class PrecisionUtils:
         # Initialize _usd_pairs to None (set later via set_trade_parameters)
         self._usd_pairs = None
 
+        # Product metadata indexed once per usd_pairs DataFrame; the previous version is kept
+        # so callers still passing the old frame during a refresh do not force rebuilds
+        self._registry = ProductRegistry(None)
+        self._previous_registry = self._registry
+        self._registry_builds = 0
+
         # Initialize dust threshold configuration for FIFO allocations
         self._init_dust_thresholds()
 
@@ -44,22 +50,46 @@ class PrecisionUtils:
             return
 
         self._usd_pairs = usd_pairs
-        self.logger.info(f"✅ PrecisionUtils set_trade_parameters() — {len(usd_pairs)} pairs loaded")
+        registry = self.product_registry(usd_pairs)
+        self.logger.info(f"✅ PrecisionUtils set_trade_parameters() — {len(usd_pairs)} pairs loaded, "
+                         f"{len(registry.products)} products indexed")
 
     @property
     def usd_pairs(self):
+        # Follow the live usd_pairs_cache so refreshed products are picked up
+        if self.shared_data_manager:
+            usd_pairs = self.shared_data_manager.market_data.get('usd_pairs_cache')
+            if isinstance(usd_pairs, pd.DataFrame) and not usd_pairs.empty:
+                self._usd_pairs = usd_pairs
         if self._usd_pairs is None:
-            # Try to load from shared_data_manager if available
-            if self.shared_data_manager:
-                usd_pairs = self.shared_data_manager.market_data.get('usd_pairs_cache')
-                if usd_pairs is not None and not usd_pairs.empty:
-                    self._usd_pairs = usd_pairs
-                    return self._usd_pairs
-            # Return empty DataFrame if not available
-            import pandas as pd
             return pd.DataFrame()
         return self._usd_pairs
 
+    def product_registry(self, usd_pairs: Optional[pd.DataFrame] = None) -> ProductRegistry:
+        """Registry for usd_pairs (default: the live usd_pairs), built once per DataFrame."""
+        usd_pairs = usd_pairs if usd_pairs is not None else self.usd_pairs
+        registry = self._registry
+        if registry.source is usd_pairs:
+            return registry
+        if self._previous_registry.source is usd_pairs:
+            return self._previous_registry
+        new = ProductRegistry(usd_pairs)
+        self._previous_registry, self._registry = registry, new  # Swap in the complete new version
+        self._registry_builds += 1
+        self.logger.debug(f"🔄 Product registry rebuilt: {new.stats()}")
+        return new
+
+    def get_product(self, symbol: str, *, usd_pairs_override: Optional[pd.DataFrame] = None) -> Optional[ProductMeta]:
+        """ProductMeta for 'BTC-USD', 'BTC/USD' or 'BTC'; None if unknown or its metadata is malformed."""
+        asset = symbol.replace('-', '/').split('/')[0]
+        try:
+            return self.product_registry(usd_pairs_override).get(asset)
+        except Exception:
+            return None
+
+    def product_registry_stats(self) -> dict:
+        return {**self._registry.stats(), 'builds': self._registry_builds}
+
     # def bind_shared_data(self, shared_data_manager):
     #     self.shared_data_manager = shared_data_manager
 
@@ -136,9 +166,9 @@ class PrecisionUtils:
         """
 
         try:
-            usd_pairs_df = usd_pairs_override if usd_pairs_override is not None else self.usd_pairs
+            registry = self.product_registry(usd_pairs_override)
 
-            if usd_pairs_df is None or usd_pairs_df.empty:
+            if registry.empty:
                 self.logger.warning("⚠️ fetch_precision: usd_pairs is empty. Using default values.")
                 return 4, 2, 1e-08, 1e-08
 
@@ -161,25 +191,9 @@ class PrecisionUtils:
             if ticker_value == 'USD/USD' or ticker_value == 'USD':
                 return 2, 2, 1e-08, 1e-08
 
-            market = usd_pairs_df.set_index('asset').to_dict(orient='index')  # dataframe to dictionary
-            if market.get(asset):
-                base_precision = Decimal(market.get(asset,{}).get('precision',{}).get('base_increment', 1e-08) ) # Expected to be a float
-                quote_precision = Decimal(market.get(asset,{}).get('precision',{}).get('quote_increment', 1e-08) ) # Expected to be a float
-                base_increment = base_precision  # string
-                quote_increment = quote_precision  # string
-
-                if base_precision <= 0 or quote_precision <= 0:
-                    raise ValueError("Precision value is zero or negative, which may cause a division error.")
-
-                # Calculate decimal places using logarithm
-                base_decimal_places = -int(math.log10(base_precision))
-                quote_decimal_places = -int(math.log10(quote_precision))
-
-                # Check for negative decimal places (should not happen if the log10 is correct)
-                if base_decimal_places < 0 or quote_decimal_places < 0:
-                    raise ValueError("Decimal places cannot be negative.")
-
-                return base_decimal_places, quote_decimal_places, base_increment, quote_increment
+            product = registry.get(asset)  # Re-raises the row's precision error, if any
+            if product is not None:
+                return product.precision
             else:
                 return 0, 2, 1e-08, 1e-08
 
@@ -490,7 +504,12 @@ class PrecisionUtils:
             Decimal minimum trade size
         """
         normalized = symbol.replace('/', '-')
-        return self.MIN_TRADE_SIZES.get(normalized, self.DEFAULT_MIN_TRADE_SIZE)
+        if normalized in self.MIN_TRADE_SIZES:
+            return self.MIN_TRADE_SIZES[normalized]
+        product = self.get_product(normalized)
+        if product is not None and product.base_min_size:
+            return product.base_min_size
+        return self.DEFAULT_MIN_TRADE_SIZE
 
     def is_dust(self, value: Decimal, symbol: str) -> bool:
         """
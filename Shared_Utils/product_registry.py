@@ -0,0 +1,125 @@
+"""
+Product Metadata Registry
+
+Per-asset precision and size metadata built once from a usd_pairs DataFrame
+(one row per USD product, with a 'precision' dict of base / quote / price
+increments and exchange min sizes), so lookups are a dict get instead of a
+set_index().to_dict() of the whole frame per call.
+
+A registry is immutable; PrecisionUtils builds a new one when usd_pairs is
+replaced (every ticker refresh) and swaps the reference, so readers always
+see one complete version.
+"""
+
+import math
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, Optional
+
+import pandas as pd
+
+DEFAULT_INCREMENT = 1e-08
+
+
+@dataclass(frozen=True)
+class ProductMeta:
+    asset: str
+    symbol: Optional[str]
+    base_decimals: int
+    quote_decimals: int
+    base_increment: Decimal
+    quote_increment: Decimal
+    price_increment: Optional[Decimal] = None
+    base_min_size: Optional[Decimal] = None
+    quote_min_size: Optional[Decimal] = None
+
+    @property
+    def precision(self) -> tuple:
+        """(base_decimals, quote_decimals, base_increment, quote_increment), as fetch_precision returns it"""
+        return self.base_decimals, self.quote_decimals, self.base_increment, self.quote_increment
+
+
+def _optional_decimal(value) -> Optional[Decimal]:
+    if value is None or value == '':
+        return None
+    try:
+        return Decimal(str(value))
+    except Exception:
+        return None
+
+
+def product_from_row(asset: str, row: dict) -> ProductMeta:
+    """One usd_pairs row → ProductMeta (raises ValueError like fetch_precision for bad increments)"""
+    precision = row.get('precision', {})
+    base_increment = Decimal(precision.get('base_increment', DEFAULT_INCREMENT))
+    quote_increment = Decimal(precision.get('quote_increment', DEFAULT_INCREMENT))
+    if base_increment <= 0 or quote_increment <= 0:
+        raise ValueError("Precision value is zero or negative, which may cause a division error.")
+
+    base_decimals = -int(math.log10(base_increment))
+    quote_decimals = -int(math.log10(quote_increment))
+    if base_decimals < 0 or quote_decimals < 0:
+        raise ValueError("Decimal places cannot be negative.")
+
+    return ProductMeta(
+        asset=asset,
+        symbol=row.get('symbol'),
+        base_decimals=base_decimals,
+        quote_decimals=quote_decimals,
+        base_increment=base_increment,
+        quote_increment=quote_increment,
+        price_increment=_optional_decimal(precision.get('price_increment')),
+        base_min_size=_optional_decimal(precision.get('base_min_size')),
+        quote_min_size=_optional_decimal(precision.get('quote_min_size')),
+    )
+
+
+class ProductRegistry:
+    """Immutable asset → ProductMeta index of one usd_pairs DataFrame"""
+
+    def __init__(self, usd_pairs: Optional[pd.DataFrame]):
+        start = time.perf_counter()
+        self.source = usd_pairs  # The DataFrame this version was built from
+        self.products: Dict[str, ProductMeta] = {}
+        self.errors: Dict[str, Exception] = {}  # Rows whose precision could not be parsed
+        self.hits = 0
+        self.misses = 0
+
+        if usd_pairs is not None and not usd_pairs.empty and 'asset' in usd_pairs.columns:
+            for row in usd_pairs.to_dict(orient='records'):
+                asset = row.get('asset')
+                if asset is None:
+                    continue
+                try:
+                    self.products[asset] = product_from_row(asset, row)
+                    self.errors.pop(asset, None)
+                except Exception as e:
+                    self.products.pop(asset, None)
+                    self.errors[asset] = e
+        self.build_ms = (time.perf_counter() - start) * 1000
+
+    @property
+    def empty(self) -> bool:
+        return self.source is None or self.source.empty
+
+    def get(self, asset: str) -> Optional[ProductMeta]:
+        """ProductMeta for an asset (raises the row's parse error if it had one)"""
+        product = self.products.get(asset)
+        if product is not None:
+            self.hits += 1
+            return product
+        error = self.errors.get(asset)
+        if error is not None:
+            raise error
+        self.misses += 1
+        return None
+
+    def stats(self) -> dict:
+        return {
+            'products': len(self.products),
+            'errors': len(self.errors),
+            'hits': self.hits,
+            'misses': self.misses,
+            'build_ms': round(self.build_ms, 3),
+        }
@@ -1,4 +1,5 @@
 from .shared_data import SharedData
+from .shared_data_entry import SharedDataEntry
 from .passive_orders import PassiveOrder
 from .market_snapshot import MarketDataSnapshot
 from .order_management import OrderManagementSnapshot
@@ -0,0 +1,19 @@
+from sqlalchemy import (BigInteger, Column, DateTime, Index, String, Text)
+from sqlalchemy.sql import func
+from TableModels.base import Base
+
+
+class SharedDataEntry(Base):
+    """Versioned per-key shared state (delta replication of market_data / order_management)."""
+    __tablename__ = 'shared_data_entries'
+
+    data_type = Column(String, primary_key=True)  # 'market_data' or 'order_management'
+    path = Column(String, primary_key=True)  # Top-level key, e.g. 'ticker_cache'
+    key = Column(String, primary_key=True)  # Row / item key ('' = the path's header)
+    value = Column(Text, nullable=True)  # JSON-encoded; NULL = deleted (tombstone)
+    version = Column(BigInteger, nullable=False)  # Publish version that last wrote the entry
+    last_updated = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index('idx_shared_data_entries_version', 'version'),
+    )
@@ -78,6 +78,9 @@ class BacktestConfig:
     # Symbols to Test
     symbols: list[str] = None  # None = all available symbols
 
+    # Data Source
+    ohlcv_cache_dir: Optional[str] = None  # Read OHLCV from a local OHLCVCache instead of the database
+
     # Output Settings
     verbose: bool = True
     save_trades: bool = True
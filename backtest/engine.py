@@ -25,15 +25,28 @@ class BacktestEngine:
     Backtesting engine that replays historical data and simulates trading decisions.
     """
 
+    # OHLCV columns the simulation reads (the cache loads only these)
+    ohlcv_columns = ('open', 'high', 'low', 'close', 'volume')
+
     def __init__(
         self,
         strategy_config: StrategyConfig,
         backtest_config: BacktestConfig,
-        db_url: str
+        db_url: Optional[str],
+        ohlcv: Optional[pd.DataFrame] = None
     ):
+        """
+        Args:
+            strategy_config: Strategy parameters
+            backtest_config: Backtest window and execution settings
+            db_url: Database holding ohlcv_data (unused when ohlcv is given)
+            ohlcv: Preloaded OHLCV rows (time, symbol, open, high, low, close, volume)
+                   covering the window plus lookback; skips the database query
+        """
         self.strategy = strategy_config
         self.config = backtest_config
         self.db_url = db_url
+        self.ohlcv = ohlcv
 
         # State
         self.positions: Dict[str, Position] = {}  # symbol -> Position
@@ -60,9 +73,7 @@ class BacktestEngine:
         data = self._load_data()
 
         # Make config dates timezone-aware to match database timestamps
-        import pytz
-        start_tz = self.config.start_date.replace(tzinfo=pytz.UTC) if self.config.start_date.tzinfo is None else self.config.start_date
-        end_tz = self.config.end_date.replace(tzinfo=pytz.UTC) if self.config.end_date.tzinfo is None else self.config.end_date
+        start_tz, end_tz = self._window_bounds()
 
         # Filter to actual backtest window (after loading extra data for ROC)
         data_filtered = data[
@@ -104,9 +115,30 @@ class BacktestEngine:
 
         return self.results
 
+    def _window_bounds(self):
+        """Backtest start/end as timezone-aware (UTC) datetimes, matching database timestamps"""
+        import pytz
+        start_tz = self.config.start_date.replace(tzinfo=pytz.UTC) if self.config.start_date.tzinfo is None else self.config.start_date
+        end_tz = self.config.end_date.replace(tzinfo=pytz.UTC) if self.config.end_date.tzinfo is None else self.config.end_date
+        return start_tz, end_tz
+
     def _load_data(self) -> pd.DataFrame:
         """Load historical OHLCV data from database"""
-        engine = create_engine(self.db_url)
+        df = self._query_ohlcv()
+
+        # Convert to Decimal for precise calculations
+        for col in self.ohlcv_columns:
+            df[col] = df[col].apply(Decimal)
+
+        # Calculate ROC for each symbol
+        df = self._calculate_roc_indicators(df)
+
+        return df
+
+    def _query_ohlcv(self) -> pd.DataFrame:
+        """Query raw OHLCV rows (backtest window plus indicator lookback)"""
+        if self.ohlcv is not None:
+            return self.ohlcv.copy()
 
         # Load extra data for ROC calculation (need historical lookback)
         # 5-min ROC: needs 5 periods back
@@ -114,6 +146,13 @@ class BacktestEngine:
         lookback_hours = 48  # Load 48 hours before start to ensure enough data
         adjusted_start = self.config.start_date - timedelta(hours=lookback_hours)
 
+        if self.config.ohlcv_cache_dir:
+            from backtest.ohlcv_cache import OHLCVCache
+            cache = OHLCVCache(self.config.ohlcv_cache_dir)
+            return cache.load(adjusted_start, self.config.end_date, columns=self.ohlcv_columns)
+
+        engine = create_engine(self.db_url)
+
         query = text("""
             SELECT
                 time,
@@ -139,13 +178,6 @@ class BacktestEngine:
                 }
             )
 
-        # Convert to Decimal for precise calculations
-        for col in ['open', 'high', 'low', 'close', 'volume']:
-            df[col] = df[col].apply(Decimal)
-
-        # Calculate ROC for each symbol
-        df = self._calculate_roc_indicators(df)
-
         return df
 
     def _calculate_roc_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -446,9 +478,8 @@ class BacktestEngine:
 
     def _close_remaining_positions(self):
         """Close all open positions at end of backtest"""
-        import pytz
         # Make end_date timezone-aware to match position entry_time
-        end_tz = self.config.end_date.replace(tzinfo=pytz.UTC) if self.config.end_date.tzinfo is None else self.config.end_date
+        _, end_tz = self._window_bounds()
 
         for symbol, position in list(self.positions.items()):
             # Use last known price (simplified - would query actual last price)
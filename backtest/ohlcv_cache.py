@@ -0,0 +1,283 @@
+"""
+Columnar OHLCV Cache
+
+Local, database-free copy of the ohlcv_data table (TableModels.OHLCVData)
+for backtests and research.
+
+Layout (one directory per symbol and UTC day, one .npy file per column):
+
+    <root>/manifest.json
+    <root>/<symbol>/<YYYY-MM-DD>/time.npy     int64 ns since epoch (UTC), sorted
+    <root>/<symbol>/<YYYY-MM-DD>/close.npy    float64 (ohlcv_data columns are Float)
+    ...
+
+Reads prune by symbol and day (directory names) and by column (only the
+requested .npy files are opened), and memory-map the files so only the rows
+in the requested time range are materialised.
+
+update() fills the cache incrementally: it queries ohlcv_data from the last
+cached timestamp onwards, one day at a time, and merges the rows into the
+day partitions they belong to.
+
+Usage:
+    # Fill / refresh from the database (needs the database)
+    python -m backtest.ohlcv_cache update --db-url $DB_URL --since 2025-09-01
+
+    # Load offline
+    cache = OHLCVCache('data/ohlcv_cache')
+    df = cache.load(start, end, symbols=['BTC-USD'], columns=['close'])
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+MANIFEST = 'manifest.json'
+_DAY_FORMAT = '%Y-%m-%d'
+
+
+def _utc(value) -> pd.Timestamp:
+    ts = pd.Timestamp(value)
+    return ts.tz_localize('UTC') if ts.tzinfo is None else ts.tz_convert('UTC')
+
+
+def _symbol_dir(symbol: str) -> str:
+    """Filesystem-safe directory name for a symbol (e.g. BTC/USD → BTC_USD)"""
+    return symbol.replace('/', '_')
+
+
+class OHLCVCache:
+    """
+    Columnar OHLCV cache partitioned by symbol and day.
+
+    Args:
+        root: Cache directory (created on first update)
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    # =========================================================================
+    # READ
+    # =========================================================================
+
+    def load(
+        self,
+        start,
+        end,
+        symbols: Optional[Iterable[str]] = None,
+        columns: Sequence[str] = OHLCV_COLUMNS
+    ) -> pd.DataFrame:
+        """
+        Rows with start <= time <= end, ordered by (time, symbol).
+
+        Args:
+            start, end: Time range (naive datetimes are taken as UTC)
+            symbols: Symbols to load (default: all cached symbols)
+            columns: Subset of OHLCV_COLUMNS to load
+
+        Returns:
+            DataFrame with time (UTC), symbol and the requested columns
+        """
+        unknown = set(columns) - set(OHLCV_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown OHLCV columns: {', '.join(sorted(unknown))}")
+
+        start, end = _utc(start), _utc(end)
+        start_ns, end_ns = start.value, end.value
+        days = {d.strftime(_DAY_FORMAT) for d in pd.date_range(start.normalize(), end.normalize(), freq='D')}
+        manifest = self._read_manifest()
+        wanted = manifest['symbols'] if symbols is None else list(symbols)
+
+        parts = {'time': [], 'symbol': [], **{c: [] for c in columns}}
+        for symbol in wanted:
+            directory = self.root / _symbol_dir(symbol)
+            if not directory.is_dir():
+                continue
+            for day in sorted(days):
+                partition = directory / day
+                if not partition.is_dir():
+                    continue
+                times = np.load(partition / 'time.npy', mmap_mode='r')
+                lo = int(np.searchsorted(times, start_ns, side='left'))
+                hi = int(np.searchsorted(times, end_ns, side='right'))
+                if lo == hi:
+                    continue
+                parts['time'].append(np.array(times[lo:hi]))
+                parts['symbol'].append(np.full(hi - lo, symbol, dtype=object))
+                for column in columns:
+                    parts[column].append(np.array(np.load(partition / f'{column}.npy', mmap_mode='r')[lo:hi]))
+
+        if not parts['time']:
+            return pd.DataFrame({
+                'time': pd.Series([], dtype='datetime64[ns, UTC]'),
+                'symbol': pd.Series([], dtype=object),
+                **{c: pd.Series([], dtype='float64') for c in columns}
+            })
+
+        df = pd.DataFrame({
+            'time': pd.to_datetime(np.concatenate(parts['time']), utc=True),
+            'symbol': np.concatenate(parts['symbol']),
+            **{c: np.concatenate(parts[c]) for c in columns}
+        })
+        return df.sort_values(['time', 'symbol'], kind='mergesort', ignore_index=True)
+
+    def last_time(self) -> Optional[pd.Timestamp]:
+        """Latest cached timestamp (None for an empty cache)"""
+        last = self._read_manifest().get('last_time')
+        return pd.Timestamp(last) if last else None
+
+    # =========================================================================
+    # WRITE
+    # =========================================================================
+
+    def update(self, db_url: str, since=None, until=None) -> int:
+        """
+        Pull new ohlcv_data rows into the cache; returns rows written.
+
+        Starts at `since` if given, otherwise at the last cached timestamp
+        (that day is re-read, so rows arriving late for it are picked up).
+        Queries and writes one UTC day at a time to bound memory.
+        """
+        if since is None:
+            last = self.last_time()
+            if last is None:
+                raise ValueError("Empty cache: pass `since` for the first update")
+            since = last.normalize()
+        since = _utc(since)
+        until = _utc(until) if until is not None else pd.Timestamp.now(tz='UTC')
+
+        engine = create_engine(db_url)
+        query = text(f"""
+            SELECT time, symbol, {', '.join(OHLCV_COLUMNS)}
+            FROM ohlcv_data
+            WHERE time >= :start AND time < :end
+            ORDER BY symbol ASC, time ASC
+        """)
+
+        written = 0
+        day = since.normalize()
+        try:
+            with engine.connect() as conn:
+                while day <= until:
+                    next_day = day + pd.Timedelta(days=1)
+                    df = pd.read_sql(query, conn, params={
+                        'start': max(day, since).to_pydatetime(),
+                        'end': min(next_day, until + pd.Timedelta(microseconds=1)).to_pydatetime()
+                    })
+                    written += self.write(df)
+                    day = next_day
+        finally:
+            engine.dispose()
+        return written
+
+    def write(self, df: pd.DataFrame) -> int:
+        """
+        Merge OHLCV rows (time, symbol, OHLCV_COLUMNS) into the cache.
+
+        Rows replace cached rows with the same (symbol, time). Each partition
+        is rewritten in a temp directory and swapped in, so readers never see
+        a half-written day.
+        """
+        if df.empty:
+            return 0
+
+        df = df.loc[:, ['time', 'symbol', *OHLCV_COLUMNS]].copy()
+        df['time'] = pd.to_datetime(df['time'], utc=True)
+        df['day'] = df['time'].dt.strftime(_DAY_FORMAT)
+        for column in OHLCV_COLUMNS:
+            df[column] = df[column].astype('float64')
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        for (symbol, day), rows in df.groupby(['symbol', 'day'], sort=False):
+            self._merge_partition(symbol, day, rows)
+
+        manifest = self._read_manifest()
+        manifest['symbols'] = sorted(set(manifest['symbols']) | set(df['symbol']))
+        newest = df['time'].max()
+        if manifest.get('last_time') is None or newest > pd.Timestamp(manifest['last_time']):
+            manifest['last_time'] = newest.isoformat()
+        self._write_manifest(manifest)
+        return len(df)
+
+    def _merge_partition(self, symbol: str, day: str, rows: pd.DataFrame):
+        partition = self.root / _symbol_dir(symbol) / day
+        new = pd.DataFrame({'time': rows['time'].dt.tz_localize(None).to_numpy('datetime64[ns]').astype('int64')})
+        for column in OHLCV_COLUMNS:
+            new[column] = rows[column].to_numpy()
+
+        if partition.is_dir():
+            old = pd.DataFrame({c: np.load(partition / f'{c}.npy') for c in ('time', *OHLCV_COLUMNS)})
+            new = pd.concat([old, new], ignore_index=True)
+        new = new.drop_duplicates('time', keep='last').sort_values('time', kind='mergesort')
+
+        partition.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f'.{day}-', dir=partition.parent))
+        for column in ('time', *OHLCV_COLUMNS):
+            np.save(staging / f'{column}.npy', new[column].to_numpy())
+        if partition.is_dir():
+            retired = partition.with_name(f'.{day}-retired')
+            shutil.rmtree(retired, ignore_errors=True)
+            os.replace(partition, retired)
+            os.replace(staging, partition)
+            shutil.rmtree(retired, ignore_errors=True)
+        else:
+            os.replace(staging, partition)
+
+    # =========================================================================
+    # MANIFEST
+    # =========================================================================
+
+    def _read_manifest(self) -> dict:
+        path = self.root / MANIFEST
+        if not path.exists():
+            return {'symbols': [], 'last_time': None}
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest: dict):
+        path = self.root / MANIFEST
+        tmp = path.with_suffix('.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Columnar OHLCV cache')
+    parser.add_argument('--cache', default=os.getenv('OHLCV_CACHE_DIR', 'data/ohlcv_cache'),
+                        help='Cache directory (default: $OHLCV_CACHE_DIR or data/ohlcv_cache)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    update = sub.add_parser('update', help='Fill the cache from ohlcv_data')
+    update.add_argument('--db-url', default=os.getenv('BACKTEST_DB_URL'), required=not os.getenv('BACKTEST_DB_URL'))
+    update.add_argument('--since', help='Start date (YYYY-MM-DD); default: last cached day')
+    update.add_argument('--until', help='End date (YYYY-MM-DD); default: now')
+
+    sub.add_parser('info', help='Show cached symbols and last timestamp')
+    args = parser.parse_args(argv)
+
+    cache = OHLCVCache(args.cache)
+    if args.command == 'update':
+        rows = cache.update(args.db_url, since=args.since, until=args.until)
+        print(f"✅ Cached {rows:,} rows (last: {cache.last_time()})")
+    else:
+        manifest = cache._read_manifest()
+        print(f"Cache: {cache.root}")
+        print(f"  Symbols: {len(manifest['symbols'])}")
+        print(f"  Last timestamp: {manifest['last_time']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,6 +6,22 @@ Formats and displays backtest results.
 
 from backtest.models import BacktestResults, ExitReason
 from decimal import Decimal
+from typing import Optional
+
+# Keys results can be ranked by (all from BacktestResults.get_summary())
+RANK_KEYS = ('total_pnl', 'total_return_pct', 'profit_factor', 'win_rate_pct', 'max_drawdown_pct')
+
+
+def rank_results(results_list: list[BacktestResults], rank_by: str = 'total_pnl') -> list[BacktestResults]:
+    """Sort results best-first by a summary key (max_drawdown_pct ranks lowest first)"""
+    if rank_by not in RANK_KEYS:
+        raise ValueError(f"rank_by must be one of: {', '.join(RANK_KEYS)}")
+    summaries = {id(r): r.get_summary() for r in results_list}
+    return sorted(
+        results_list,
+        key=lambda r: summaries[id(r)][rank_by] or 0,
+        reverse=rank_by != 'max_drawdown_pct'
+    )
 
 
 class BacktestReporter:
@@ -143,25 +159,40 @@ class BacktestReporter:
         print(f"✅ Trades exported to: {filename}")
 
     @staticmethod
-    def compare_strategies(results_list: list[BacktestResults]):
-        """Compare multiple strategy configurations"""
-        print("\n" + "=" * 100)
-        print("  STRATEGY COMPARISON")
-        print("=" * 100)
+    def compare_strategies(results_list: list[BacktestResults], rank_by: Optional[str] = None):
+        """
+        Compare multiple strategy configurations.
+
+        Args:
+            results_list: Results to compare (shown in the given order)
+            rank_by: Optional RANK_KEYS entry; ranks the table best-first by it
+        """
+        if rank_by:
+            results_list = rank_results(results_list, rank_by)
+
+        summaries = [results.get_summary() for results in results_list]
+        name_width = max([30] + [len(s['strategy']) + 2 for s in summaries])
+        width = name_width + 78
+
+        print("\n" + "=" * width)
+        print("  STRATEGY COMPARISON" + (f" (ranked by {rank_by})" if rank_by else ""))
+        print("=" * width)
         print()
 
-        print(f"{'Strategy':<30} {'Trades':>8} {'Win%':>8} {'P&L':>12} {'Return%':>10} {'Profit Factor':>15}")
-        print("-" * 100)
+        print(f"{'#':>3} {'Strategy':<{name_width}} {'Trades':>8} {'Win%':>8} {'P&L':>12} {'Return%':>10} "
+              f"{'Profit Factor':>15} {'Max DD%':>9}")
+        print("-" * width)
 
-        for results in results_list:
-            summary = results.get_summary()
-            name = summary['strategy'][:28]
+        for rank, summary in enumerate(summaries, 1):
+            name = summary['strategy']
             trades = summary['total_trades']
-            win_rate = summary['win_rate_pct']
+            win_rate = summary['win_rate_pct'] or 0
             pnl = summary['total_pnl']
             ret = summary['total_return_pct']
             pf = summary['profit_factor']
+            dd = summary['max_drawdown_pct']
 
-            print(f"{name:<30} {trades:>8} {win_rate:>7.1f}% ${pnl:>10,.2f} {ret:>9.2f}% {pf:>15.2f}")
+            print(f"{rank:>3} {name:<{name_width}} {trades:>8} {win_rate:>7.1f}% ${pnl:>10,.2f} {ret:>9.2f}% "
+                  f"{pf:>15.2f} {dd:>8.2f}%")
 
         print()
@@ -0,0 +1,398 @@
+"""
+Backtest Parameter Sweep
+
+Runs many StrategyConfig variations over the same OHLCV history:
+
+- grid_configs / random_configs / latin_hypercube_configs build the
+  configurations from a base StrategyConfig
+- the OHLCV history is loaded once (database or local file) and placed in
+  shared memory; pool workers attach to it instead of reloading or
+  unpickling it per run
+- every configuration runs on VectorizedBacktestEngine and the results are
+  returned ranked (see backtest.reporter.rank_results) for
+  BacktestReporter.compare_strategies()
+
+Usage:
+    python -m backtest.sweep --data ohlcv.csv --start 2025-12-01 --end 2026-01-12 \\
+        --grid take_profit_pct=0.025,0.035,0.045 --grid stop_loss_pct=0.015,0.02
+
+    # Save the database history once, then sweep offline
+    python -m backtest.sweep --dump ohlcv.pkl --db-url postgresql://... --start 2025-12-01 --end 2026-01-12
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import multiprocessing
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields, replace
+from datetime import datetime
+from decimal import Decimal
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backtest.config import BacktestConfig, StrategyConfig, CURRENT_PRODUCTION
+from backtest.engine import BacktestEngine
+from backtest.models import BacktestResults
+from backtest.reporter import BacktestReporter, RANK_KEYS, rank_results
+from backtest.vectorized import VectorizedBacktestEngine
+
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+# =============================================================================
+# CONFIGURATION GENERATION
+# =============================================================================
+
+_FIELD_TYPES = {f.name: f.type for f in fields(StrategyConfig)}
+
+
+def _coerce(name: str, value):
+    """Convert a sweep value to the StrategyConfig field's type"""
+    if name not in _FIELD_TYPES:
+        raise ValueError(f"Unknown StrategyConfig parameter: {name}")
+    field_type = _FIELD_TYPES[name]
+    if field_type is Decimal:
+        return Decimal(str(value))
+    if field_type is int:
+        return int(round(float(value)))
+    if field_type is bool:
+        return value if isinstance(value, bool) else str(value).lower() in ('1', 'true', 'yes')
+    if field_type is float:
+        return float(value)
+    return value
+
+
+def _label(params: Dict) -> str:
+    return ' '.join(f"{name}={value}" for name, value in params.items())
+
+
+def grid_configs(base: StrategyConfig, grid: Dict[str, Sequence]) -> List[Tuple[str, StrategyConfig]]:
+    """Every combination of the grid values applied to base → [(label, config)]"""
+    names = list(grid)
+    configs = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        params = {name: _coerce(name, value) for name, value in zip(names, values)}
+        configs.append((_label(params), replace(base, **params)))
+    return configs
+
+
+def random_configs(
+    base: StrategyConfig,
+    ranges: Dict[str, Tuple[float, float]],
+    n: int,
+    seed: Optional[int] = None
+) -> List[Tuple[str, StrategyConfig]]:
+    """n configs with each parameter drawn uniformly from its (low, high) range"""
+    rng = random.Random(seed)
+    samples = [[rng.uniform(*ranges[name]) for name in ranges] for _ in range(n)]
+    return _sampled_configs(base, list(ranges), samples)
+
+
+def latin_hypercube_configs(
+    base: StrategyConfig,
+    ranges: Dict[str, Tuple[float, float]],
+    n: int,
+    seed: Optional[int] = None
+) -> List[Tuple[str, StrategyConfig]]:
+    """
+    n configs from a Latin hypercube: each parameter's range is split into n
+    strata and every stratum is used exactly once.
+    """
+    rng = random.Random(seed)
+    columns = []
+    for low, high in ranges.values():
+        strata = list(range(n))
+        rng.shuffle(strata)
+        columns.append([low + (high - low) * (s + rng.random()) / n for s in strata])
+    return _sampled_configs(base, list(ranges), list(zip(*columns)))
+
+
+def _sampled_configs(base, names: List[str], samples) -> List[Tuple[str, StrategyConfig]]:
+    configs = []
+    for values in samples:
+        params = {
+            # Keep sampled Decimals readable (6 significant digits)
+            name: _coerce(name, f"{value:.6g}" if _FIELD_TYPES.get(name) is Decimal else value)
+            for name, value in zip(names, values)
+        }
+        configs.append((_label(params), replace(base, **params)))
+    return configs
+
+
+# =============================================================================
+# OHLCV DATA
+# =============================================================================
+
+def load_ohlcv_file(path: str) -> pd.DataFrame:
+    """Load OHLCV rows from a local .csv, .parquet or .pkl file (times as UTC)"""
+    suffix = Path(path).suffix.lower()
+    if suffix == '.csv':
+        df = pd.read_csv(path)
+    elif suffix == '.parquet':
+        df = pd.read_parquet(path)
+    elif suffix in ('.pkl', '.pickle'):
+        df = pd.read_pickle(path)
+    else:
+        raise ValueError(f"Unsupported OHLCV file type: {path} (use .csv, .parquet or .pkl)")
+
+    missing = {'time', 'symbol', *OHLCV_COLUMNS} - set(df.columns)
+    if missing:
+        raise ValueError(f"OHLCV file {path} is missing columns: {', '.join(sorted(missing))}")
+    df['time'] = pd.to_datetime(df['time'], utc=True)
+    return df.sort_values(['time', 'symbol'], ignore_index=True)
+
+
+class SharedOHLCV:
+    """
+    OHLCV columns in one shared-memory block.
+
+    The creating process owns the block (close() + unlink()); workers attach
+    by name with attach() and rebuild a DataFrame over it with to_frame().
+    Only the OHLCV columns present in the source frame are copied (a
+    VectorizedBacktestEngine cache load has just close). Prices are stored
+    as float64 and become Decimal at fills.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, rows: int, symbols: List[str], columns: Sequence[str]):
+        self.shm = shm
+        self.rows = rows
+        self.symbols = symbols
+        self.columns = tuple(columns)
+
+    @classmethod
+    def create(cls, df: pd.DataFrame) -> 'SharedOHLCV':
+        codes, symbols = pd.factorize(df['symbol'])
+        rows = len(df)
+        columns = tuple(col for col in OHLCV_COLUMNS if col in df.columns)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, rows * 8 * (len(columns) + 2)))
+        arrays = None
+        try:
+            shared = cls(shm, rows, list(symbols), columns)
+            arrays = shared._arrays()
+            arrays['time'][:] = pd.to_datetime(df['time'], utc=True).dt.tz_localize(None).to_numpy('datetime64[ns]').astype('int64')
+            arrays['symbol'][:] = codes
+            for col in columns:
+                arrays[col][:] = df[col].astype(float).to_numpy()
+        except BaseException:
+            arrays = None  # release the views before closing the block
+            shm.close()
+            shm.unlink()
+            raise
+        return shared
+
+    @classmethod
+    def attach(cls, spec: Tuple[str, int, List[str], Tuple[str, ...]]) -> 'SharedOHLCV':
+        name, rows, symbols, columns = spec
+        return cls(shared_memory.SharedMemory(name=name), rows, symbols, columns)
+
+    @property
+    def spec(self) -> Tuple[str, int, List[str], Tuple[str, ...]]:
+        """Picklable handle for attach()"""
+        return self.shm.name, self.rows, self.symbols, self.columns
+
+    def _arrays(self) -> Dict[str, np.ndarray]:
+        arrays = {}
+        for i, col in enumerate(('time', 'symbol') + self.columns):
+            dtype = 'int64' if col in ('time', 'symbol') else 'float64'
+            arrays[col] = np.ndarray((self.rows,), dtype=dtype, buffer=self.shm.buf, offset=i * self.rows * 8)
+        return arrays
+
+    @staticmethod
+    def normalize(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        The frame to_frame() rebuilds from df, without shared memory: UTC
+        nanosecond times and float64 prices. In-process runs use it so they
+        see exactly what pool workers see.
+        """
+        columns = [col for col in OHLCV_COLUMNS if col in df.columns]
+        times = pd.to_datetime(df['time'], utc=True).dt.tz_localize(None).to_numpy('datetime64[ns]').astype('int64')
+        frame = {
+            'time': pd.to_datetime(times, utc=True),
+            'symbol': df['symbol'].to_numpy(dtype=object),
+        }
+        frame.update({col: df[col].astype(float).to_numpy() for col in columns})
+        return pd.DataFrame(frame)
+
+    def to_frame(self) -> pd.DataFrame:
+        arrays = self._arrays()
+        frame = {
+            'time': pd.to_datetime(arrays['time'], utc=True),
+            'symbol': np.asarray(self.symbols, dtype=object)[arrays['symbol']],
+        }
+        frame.update({col: arrays[col] for col in self.columns})
+        return pd.DataFrame(frame)
+
+    def close(self):
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+# =============================================================================
+# SWEEP EXECUTION
+# =============================================================================
+
+# Per-worker state (set by _init_worker)
+_worker_ohlcv: Optional[pd.DataFrame] = None
+_worker_shared: Optional[SharedOHLCV] = None
+
+
+def _init_worker(spec):
+    global _worker_ohlcv, _worker_shared
+    _worker_shared = SharedOHLCV.attach(spec)
+    _worker_ohlcv = _worker_shared.to_frame()
+
+
+def _run_config(label: str, strategy: StrategyConfig, backtest_config: BacktestConfig) -> BacktestResults:
+    return run_single(label, strategy, backtest_config, _worker_ohlcv)
+
+
+def run_single(label: str, strategy: StrategyConfig, backtest_config: BacktestConfig,
+               ohlcv: pd.DataFrame) -> BacktestResults:
+    """Run one configuration quietly on preloaded OHLCV"""
+    engine = VectorizedBacktestEngine(strategy, backtest_config, db_url=None, ohlcv=ohlcv)
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = engine.run()
+    results.strategy_name = label
+    return results
+
+
+@dataclass
+class ParameterSweep:
+    """
+    Runs StrategyConfig variations over one OHLCV history.
+
+    Usage:
+        sweep = ParameterSweep(backtest_config, ohlcv, workers=4)
+        ranked = sweep.run(grid_configs(CURRENT_PRODUCTION, {'take_profit_pct': [0.025, 0.035]}))
+        BacktestReporter.compare_strategies(ranked, rank_by='total_pnl')
+    """
+
+    backtest_config: BacktestConfig
+    ohlcv: pd.DataFrame
+    workers: int = 1
+    rank_by: str = 'total_pnl'
+
+    def run(self, configs: List[Tuple[str, StrategyConfig]]) -> List[BacktestResults]:
+        """Run every (label, config) and return the results ranked by rank_by"""
+        if self.workers <= 1 or len(configs) <= 1:
+            ohlcv = SharedOHLCV.normalize(self.ohlcv)
+            results = [run_single(label, strategy, self.backtest_config, ohlcv)
+                       for label, strategy in configs]
+            return rank_results(results, self.rank_by)
+
+        shared = SharedOHLCV.create(self.ohlcv)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=min(self.workers, len(configs)),
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(shared.spec,)
+            ) as pool:
+                futures = [
+                    pool.submit(_run_config, label, strategy, self.backtest_config)
+                    for label, strategy in configs
+                ]
+                results = [f.result() for f in futures]
+        finally:
+            shared.close()
+            shared.unlink()
+
+        return rank_results(results, self.rank_by)
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def _parse_grid(items: List[str]) -> Dict[str, List[str]]:
+    grid = {}
+    for item in items or []:
+        name, _, values = item.partition('=')
+        grid[name.strip()] = [v.strip() for v in values.split(',') if v.strip()]
+    return grid
+
+
+def _parse_ranges(items: List[str]) -> Dict[str, Tuple[float, float]]:
+    ranges = {}
+    for item in items or []:
+        name, _, bounds = item.partition('=')
+        low, high = (float(v) for v in bounds.split(':'))
+        ranges[name.strip()] = (low, high)
+    return ranges
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run a backtest parameter sweep')
+    parser.add_argument('--data', help='Local OHLCV file (.csv, .parquet, .pkl)')
+    parser.add_argument('--cache', help='Local OHLCVCache directory (see backtest.ohlcv_cache)')
+    parser.add_argument('--db-url', default=os.getenv('BACKTEST_DB_URL'),
+                        help='Load OHLCV from this database instead of --data')
+    parser.add_argument('--dump', help='Save the loaded OHLCV to this .pkl/.csv file and exit')
+    parser.add_argument('--start', required=True, help='Backtest start date (YYYY-MM-DD)')
+    parser.add_argument('--end', required=True, help='Backtest end date (YYYY-MM-DD)')
+    parser.add_argument('--grid', action='append', metavar='PARAM=V1,V2,...',
+                        help='Grid values for a StrategyConfig field (repeatable)')
+    parser.add_argument('--range', action='append', dest='ranges', metavar='PARAM=LOW:HIGH',
+                        help='Sampling range for a StrategyConfig field (repeatable)')
+    parser.add_argument('--sample', choices=('random', 'lhs'), default='lhs',
+                        help='Sampler for --range parameters (default: lhs)')
+    parser.add_argument('--samples', type=int, default=20, help='Number of sampled configs')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--rank-by', choices=RANK_KEYS, default='total_pnl')
+    parser.add_argument('--top', type=int, default=20, help='Rows shown in the ranking table')
+    args = parser.parse_args(argv)
+
+    backtest_config = BacktestConfig(
+        start_date=datetime.strptime(args.start, '%Y-%m-%d'),
+        end_date=datetime.strptime(args.end, '%Y-%m-%d'),
+        verbose=False
+    )
+
+    if args.data:
+        ohlcv = load_ohlcv_file(args.data)
+    elif args.cache:
+        # BacktestEngine loads every OHLCV column, so --dump writes complete rows
+        backtest_config.ohlcv_cache_dir = args.cache
+        ohlcv = BacktestEngine(CURRENT_PRODUCTION, backtest_config, None)._query_ohlcv()
+    elif args.db_url:
+        ohlcv = BacktestEngine(CURRENT_PRODUCTION, backtest_config, args.db_url)._query_ohlcv()
+    else:
+        parser.error('one of --data, --cache or --db-url is required')
+
+    if args.dump:
+        if args.dump.endswith('.csv'):
+            ohlcv.to_csv(args.dump, index=False)
+        else:
+            ohlcv.to_pickle(args.dump)
+        print(f"✅ Saved {len(ohlcv):,} OHLCV rows to {args.dump}")
+        return 0
+
+    if args.ranges:
+        sampler = latin_hypercube_configs if args.sample == 'lhs' else random_configs
+        configs = sampler(CURRENT_PRODUCTION, _parse_ranges(args.ranges), args.samples, args.seed)
+    elif args.grid:
+        configs = grid_configs(CURRENT_PRODUCTION, _parse_grid(args.grid))
+    else:
+        parser.error('one of --grid or --range is required')
+
+    print(f"🔁 Sweeping {len(configs)} configurations over {len(ohlcv):,} candles "
+          f"with {args.workers} worker(s)...")
+    sweep = ParameterSweep(backtest_config, ohlcv, workers=args.workers, rank_by=args.rank_by)
+    ranked = sweep.run(configs)
+    BacktestReporter.compare_strategies(ranked[:args.top], rank_by=args.rank_by)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,304 @@
+"""
+Vectorized Backtest Engine
+
+Array-based execution core for BacktestEngine. OHLCV rows are pivoted once
+into contiguous per-symbol NumPy arrays; entry signals are evaluated over
+whole arrays and each position's exit is found with array scans over the
+candles after its entry. Decimal is only used at the fill/accounting
+boundary (_open_position / _close_position), so trades and capital are
+computed exactly as in BacktestEngine.
+
+Only the candidate entry timestamps are visited, in chronological order,
+to apply the portfolio rules that depend on state (one position per symbol,
+max concurrent positions, available capital).
+"""
+
+import heapq
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backtest.engine import BacktestEngine
+from backtest.models import ExitReason, TradeType
+
+MAX_POSITIONS = 10  # Same cap as BacktestEngine._check_entry_signals
+
+# Exit checks in BacktestEngine._check_exit_conditions priority order
+_EXIT_PRIORITY = (
+    ExitReason.STOP_LOSS,
+    ExitReason.MAX_HOLD_TIME,
+    ExitReason.ROC_PEAK_DROP,
+    ExitReason.ROC_REVERSAL,
+    ExitReason.TAKE_PROFIT,
+)
+
+_NS_PER_HOUR = 3_600 * 10**9
+
+
+@dataclass
+class SymbolSeries:
+    """Contiguous, time-ordered arrays for one symbol"""
+
+    symbol: str
+    times: np.ndarray        # datetime64[ns] → int64 ns
+    stamps: np.ndarray       # original time values (object), used for Trade timestamps
+    close: np.ndarray        # float64, for signal/exit evaluation
+    close_raw: np.ndarray    # original close values (object), converted to Decimal at fills
+    entry_mask: np.ndarray   # bool, entry signal inside the backtest window
+    start: int               # first row inside the backtest window
+    end: int                 # one past the last row inside the backtest window
+
+
+class VectorizedBacktestEngine(BacktestEngine):
+    """
+    Drop-in replacement for BacktestEngine with an array-based execution core.
+
+    Produces the same trades as BacktestEngine.run() (within float rounding
+    at threshold boundaries) at a fraction of the cost on long backtests.
+    """
+
+    ohlcv_columns = ('close',)
+
+    def run(self):
+        """Execute the backtest"""
+        print("\n🚀 Starting Backtest (vectorized)")
+        print(f"   Period: {self.config.start_date.date()} to {self.config.end_date.date()}")
+        print(f"   Initial Capital: ${self.capital:,.2f}")
+        print()
+
+        print("📊 Loading historical OHLCV data...")
+        data = self._load_data()
+        start_tz, end_tz = self._window_bounds()
+
+        series = self._pivot_by_symbol(data, start_tz, end_tz)
+        in_window = sum(s.end - s.start for s in series)
+        print(f"   Loaded {in_window} candles for backtest period")
+        print(f"   (Plus {len(data) - in_window} historical candles for ROC calculation)")
+        print()
+
+        print("⏳ Simulating trades...")
+        self._simulate(series)
+
+        # Close any remaining positions
+        self._close_remaining_positions()
+
+        # Finalize results
+        self.results.final_capital = self.capital
+        self.results.calculate_metrics()
+
+        print("\n✅ Backtest Complete")
+        print(f"   Total Trades: {self.results.total_trades}")
+        print(f"   Final Capital: ${self.results.final_capital:,.2f}")
+        print()
+
+        return self.results
+
+    def _load_data(self) -> pd.DataFrame:
+        """Load OHLCV and indicators; prices stay in their native type until a fill"""
+        return self._calculate_roc_indicators(self._query_ohlcv())
+
+    # =========================================================================
+    # ARRAY PREPARATION
+    # =========================================================================
+
+    def _pivot_by_symbol(self, data: pd.DataFrame, start_tz, end_tz) -> List[SymbolSeries]:
+        """Split indicator rows into per-symbol arrays and evaluate entry signals"""
+        data = data.sort_values(['symbol', 'time'], kind='mergesort')
+        symbols = data['symbol'].to_numpy()
+        times = data['time'].to_numpy(dtype='datetime64[ns]')
+        stamps = data['time'].to_numpy(dtype=object)
+        close_raw = data['close'].to_numpy(dtype=object)
+        close = data['close'].astype(float).to_numpy()
+        entry = self._entry_signals(data)
+
+        start_ns, end_ns = self._utc_ns(start_tz), self._utc_ns(end_tz)
+        entry &= (times >= start_ns) & (times <= end_ns)
+
+        boundaries = np.flatnonzero(symbols[1:] != symbols[:-1]) + 1
+        series = []
+        for lo, hi in zip(np.r_[0, boundaries], np.r_[boundaries, len(symbols)]):
+            if lo == hi:
+                continue
+            symbol_times = times[lo:hi].astype('int64')
+            series.append(SymbolSeries(
+                symbol=symbols[lo],
+                times=symbol_times,
+                stamps=stamps[lo:hi],
+                close=close[lo:hi],
+                close_raw=close_raw[lo:hi],
+                entry_mask=entry[lo:hi],
+                start=int(np.searchsorted(symbol_times, start_ns.astype('int64'), side='left')),
+                end=int(np.searchsorted(symbol_times, end_ns.astype('int64'), side='right'))
+            ))
+        return series
+
+    def _entry_signals(self, data: pd.DataFrame) -> np.ndarray:
+        """
+        ROC momentum entry conditions (see BacktestEngine._check_entry_signals)
+        evaluated over all rows at once.
+        """
+        strategy = self.strategy
+        roc = data['roc'].to_numpy(dtype=float)
+        mask = roc >= float(strategy.roc_buy_threshold)
+
+        if strategy.roc_accel_enabled:
+            accel_threshold = np.maximum(
+                float(strategy.roc_accel_min),
+                float(strategy.roc_accel_std_mult) * data['roc_diff_std20'].to_numpy(dtype=float)
+            )
+            mask &= np.abs(data['roc_diff'].to_numpy(dtype=float)) >= accel_threshold
+
+        if strategy.rsi_filter_enabled:
+            rsi = data['rsi'].to_numpy(dtype=float)
+            mask &= (rsi >= float(strategy.rsi_neutral_low)) & (rsi <= float(strategy.rsi_neutral_high))
+
+        return mask
+
+    # =========================================================================
+    # SIMULATION
+    # =========================================================================
+
+    def _simulate(self, series: List[SymbolSeries]):
+        """Visit candidate entries chronologically, closing positions at their precomputed exits"""
+        by_symbol = {s.symbol: s for s in series}
+
+        if not series:
+            return
+
+        # Candidate entries ordered like BacktestEngine: by time, then symbol
+        # (series are already in symbol order, so the series index ranks symbols)
+        rows = [np.flatnonzero(s.entry_mask) for s in series]
+        cand_times = np.concatenate([s.times[r] for s, r in zip(series, rows)])
+        cand_series = np.concatenate([np.full(len(r), i) for i, r in enumerate(rows)])
+        cand_rows = np.concatenate(rows)
+        order = np.lexsort((cand_series, cand_times))
+
+        exits: List[Tuple[int, int, str, int, ExitReason, Decimal]] = []
+        sequence = 0
+        current_time = None
+        has_capacity = True
+
+        for k in order:
+            time_ns = int(cand_times[k])
+
+            # Exits at or before this timestamp run first (positions update before entries)
+            while exits and exits[0][0] <= time_ns:
+                self._close_scheduled(heapq.heappop(exits), by_symbol)
+
+            if time_ns != current_time:
+                current_time = time_ns
+                has_capacity = len(self.positions) < MAX_POSITIONS
+            if not has_capacity:
+                continue
+
+            s = series[cand_series[k]]
+            if s.symbol in self.positions:
+                continue
+
+            row = int(cand_rows[k])
+            entry_price = self._to_decimal(s.close_raw[row])
+            self._open_position(
+                symbol=s.symbol,
+                entry_price=entry_price,
+                entry_time=s.stamps[row],
+                trade_type=TradeType.ROC_MOMENTUM,
+                order_size=self.strategy.order_size_roc,
+                initial_roc=None
+            )
+            if s.symbol not in self.positions:
+                continue  # Not enough capital
+
+            exit_row, reason, peak = self._scan_exit(s, row)
+            if exit_row is None:
+                self.positions[s.symbol].peak_price = self._peak_decimal(peak, entry_price)
+                continue
+            heapq.heappush(exits, (
+                int(s.times[exit_row]), sequence, s.symbol, exit_row, reason,
+                self._peak_decimal(peak, entry_price)
+            ))
+            sequence += 1
+
+        while exits:
+            self._close_scheduled(heapq.heappop(exits), by_symbol)
+
+    def _close_scheduled(self, scheduled, by_symbol):
+        _, _, symbol, exit_row, reason, peak_price = scheduled
+        s = by_symbol[symbol]
+        position = self.positions[symbol]
+        position.peak_price = peak_price
+        self._close_position(position, self._to_decimal(s.close_raw[exit_row]), s.stamps[exit_row], reason)
+
+    def _scan_exit(self, s: SymbolSeries, entry_row: int) -> Tuple[Optional[int], Optional[ExitReason], float]:
+        """
+        Find the first candle after entry_row that triggers an exit.
+
+        Scans a growing window of candles after the entry so short holds stay
+        cheap. Returns (row, reason, peak) or (None, None, peak) if the
+        position is still open at the end of the backtest window.
+        """
+        strategy = self.strategy
+        entry = float(s.close[entry_row])
+        lo = entry_row + 1
+        width = 64
+
+        while True:
+            hi = min(lo + width, s.end)
+            prices = s.close[lo:hi]
+            if len(prices) == 0:
+                return None, None, entry
+            pnl = (prices - entry) / entry
+            peak = np.maximum(np.maximum.accumulate(self._smoothed(prices)), entry)
+
+            triggers = [pnl <= -float(strategy.stop_loss_pct)]
+            if strategy.peak_tracking_enabled:
+                held_hours = (s.times[lo:hi] - s.times[entry_row]) / _NS_PER_HOUR
+                peak_active = np.maximum.accumulate(pnl >= float(strategy.peak_min_profit_pct))
+                breakeven_active = np.maximum.accumulate(pnl >= float(strategy.peak_breakeven_pct))
+                triggers += [
+                    held_hours >= strategy.peak_max_hold_hours,
+                    peak_active & ((peak - prices) / peak >= float(strategy.peak_drawdown_pct)),
+                    breakeven_active & (pnl <= 0),
+                ]
+            else:
+                triggers += [np.zeros(len(prices), dtype=bool)] * 3
+            triggers.append(pnl >= float(strategy.take_profit_pct))
+
+            stacked = np.vstack(triggers)
+            fired = stacked.any(axis=0)
+            if fired.any():
+                k = int(np.argmax(fired))
+                reason = _EXIT_PRIORITY[int(np.argmax(stacked[:, k]))]
+                return lo + k, reason, float(peak[k])
+            if hi >= s.end:
+                return None, None, float(peak[-1])
+            width *= 4
+
+    def _smoothed(self, prices: np.ndarray) -> np.ndarray:
+        """Peak-tracking price: SMA over peak_smoothing_periods once enough candles exist"""
+        n = self.strategy.peak_smoothing_periods
+        if n <= 1 or len(prices) < n:
+            return prices
+        # Sum left to right like Position.update_peak_with_smoothing, so peaks match exactly
+        window_sum = np.zeros(len(prices) - n + 1)
+        for offset in range(n):
+            window_sum += prices[offset:len(prices) - n + 1 + offset]
+        smoothed = prices.copy()
+        smoothed[n - 1:] = window_sum / n
+        return smoothed
+
+    @staticmethod
+    def _utc_ns(value) -> np.datetime64:
+        """Timezone-aware datetime → naive UTC datetime64[ns] (the representation of `times`)"""
+        return pd.Timestamp(value).tz_convert('UTC').tz_localize(None).to_datetime64().astype('datetime64[ns]')
+
+    @staticmethod
+    def _peak_decimal(peak: float, entry_price: Decimal) -> Decimal:
+        return Decimal(str(peak)) if peak > float(entry_price) else entry_price
+
+    @staticmethod
+    def _to_decimal(value) -> Decimal:
+        # Exact conversion, like BacktestEngine's df[col].apply(Decimal) on Float columns
+        return value if isinstance(value, Decimal) else Decimal(value)
@@ -0,0 +1,36 @@
+-- Migration: Create fifo_symbol_watermark table for incremental FIFO allocation
+-- Version: 003
+-- Date: 2026-10-16
+-- Description: Per-symbol watermark (last processed fill) used by
+--              FifoAllocationEngine.compute_incremental(). Open lots at the
+--              watermark are kept in the existing fifo_inventory_snapshot table.
+
+\echo 'Creating fifo_symbol_watermark table...'
+
+CREATE TABLE IF NOT EXISTS fifo_symbol_watermark (
+    symbol VARCHAR NOT NULL,
+    allocation_version INT NOT NULL,
+
+    -- Last fill processed, by (order_time, order_id)
+    last_order_time TIMESTAMP WITH TIME ZONE NOT NULL,
+    last_order_id VARCHAR NOT NULL,
+
+    -- Number of buy/sell fills at or before last_order_time when the watermark
+    -- was written. A different count later means a back-dated fill (or a
+    -- deleted one) and forces a rebuild of the symbol.
+    fills_processed INT NOT NULL CHECK (fills_processed >= 0),
+
+    allocation_batch_id UUID,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+
+    PRIMARY KEY (symbol, allocation_version)
+);
+
+CREATE INDEX IF NOT EXISTS idx_fifo_symbol_watermark_version
+    ON fifo_symbol_watermark(allocation_version);
+
+-- Incremental fetches filter trade_records by symbol, side and order_time
+CREATE INDEX IF NOT EXISTS idx_trade_records_symbol_side_time
+    ON trade_records(symbol, side, order_time, order_id);
+
+\echo '✅ fifo_symbol_watermark table created'
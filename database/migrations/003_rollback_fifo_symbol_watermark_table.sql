@@ -0,0 +1,38 @@
+-- Rollback Migration: Remove fifo_symbol_watermark table
+-- Version: 003
+-- Date: 2026-10-16
+-- Description: Rollback script for 003_create_fifo_symbol_watermark_table.sql.
+--              Allocations and fifo_inventory_snapshot rows are kept; without
+--              watermarks, incremental runs rebuild every symbol.
+
+\echo '================================================================================'
+\echo 'FIFO SYMBOL WATERMARK ROLLBACK - Removing Table and Index'
+\echo '================================================================================'
+\echo ''
+
+\prompt 'Type YES to confirm rollback: ' confirmation
+
+\if :'confirmation' = 'YES'
+
+    \echo 'Proceeding with rollback...'
+    \echo ''
+
+    \echo 'Dropping indexes...'
+    DROP INDEX IF EXISTS idx_trade_records_symbol_side_time;
+    \echo '✅ Indexes dropped'
+    \echo ''
+
+    \echo 'Dropping tables...'
+    DROP TABLE IF EXISTS fifo_symbol_watermark CASCADE;
+    \echo '✅ Tables dropped'
+    \echo ''
+
+    \echo '================================================================================'
+    \echo 'ROLLBACK COMPLETE'
+    \echo '================================================================================'
+
+\else
+
+    \echo 'Rollback cancelled.'
+
+\endif
@@ -20,6 +20,9 @@ Usage:
 
     engine = FifoAllocationEngine(db_manager, logger, precision_utils)
     result = await engine.compute_all_symbols(version=1)
+
+    # Nightly: only fills newer than each symbol's watermark
+    result = await engine.compute_incremental(version=1)
 """
 
 from .engine import FifoAllocationEngine
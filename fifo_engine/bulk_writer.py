@@ -0,0 +1,152 @@
+"""
+Bulk persistence for FIFO allocations and the manual review queue.
+
+On Postgres (asyncpg) rows are streamed with COPY on the session's own
+connection, so they stay inside the caller's transaction. Review-queue rows
+need upsert semantics, so they are COPYed into a temp staging table and merged
+with a single INSERT ... SELECT ... ON CONFLICT.
+
+On other backends (e.g. the SQLite benchmark stand-in) the same rows go
+through SQLAlchemy Core inserts in chunks of `batch_rows`, which SQLAlchemy
+sends as multi-row INSERT ... VALUES batches ("insertmanyvalues").
+"""
+
+import uuid
+from typing import Dict, List, Sequence
+
+from sqlalchemy import text, table, column, func, insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+ALLOCATION_COLUMNS = (
+    'sell_order_id', 'buy_order_id', 'symbol', 'allocated_size',
+    'buy_price', 'sell_price', 'buy_fees_per_unit', 'sell_fees_per_unit',
+    'cost_basis_usd', 'proceeds_usd', 'net_proceeds_usd', 'pnl_usd',
+    'buy_time', 'sell_time', 'allocation_version', 'allocation_batch_id', 'notes'
+)
+
+REVIEW_COLUMNS = ('order_id', 'issue_type', 'severity', 'description')
+
+_REVIEW_STAGE_TABLE = 'fifo_review_queue_stage'
+
+_allocations_table = table('fifo_allocations', *[column(c) for c in ALLOCATION_COLUMNS])
+_review_table = table('manual_review_queue', *[column(c) for c in REVIEW_COLUMNS + ('updated_at',)])
+
+_UPSERT_INSERTS = {
+    'postgresql': postgresql_insert,
+    'sqlite': sqlite_insert,
+}
+
+
+class BulkAllocationWriter:
+    """
+    Writes allocation and review-queue rows in bulk.
+
+    Usage:
+        writer = BulkAllocationWriter()
+        await writer.write_allocations(session, allocations)
+        await writer.write_review_items(session, review_items)
+    """
+
+    def __init__(self, batch_rows: int = 1000):
+        """
+        Args:
+            batch_rows: Rows per multi-row INSERT batch on non-asyncpg backends
+        """
+        self.batch_rows = max(1, int(batch_rows))
+
+    async def write_allocations(self, session, allocations: List[Dict]) -> int:
+        """Write allocation dicts to fifo_allocations; returns rows written."""
+        if not allocations:
+            return 0
+
+        connection = await session.connection()
+        if self._is_asyncpg(connection):
+            records = [self._allocation_record(a) for a in allocations]
+            driver = await self._driver_connection(connection)
+            await driver.copy_records_to_table(
+                'fifo_allocations', records=records, columns=list(ALLOCATION_COLUMNS)
+            )
+        else:
+            await self._batched_insert(session, insert(_allocations_table), ALLOCATION_COLUMNS, allocations)
+        return len(allocations)
+
+    async def write_review_items(self, session, items: List[Dict]) -> int:
+        """
+        Upsert review-queue items (dicts with REVIEW_COLUMNS keys); returns rows written.
+
+        Matches the single-row path: an existing (order_id, issue_type) entry
+        keeps its status and gets the new description and updated_at = NOW().
+        """
+        if not items:
+            return 0
+
+        # ON CONFLICT cannot touch the same row twice in one statement: last item wins
+        unique = {(i['order_id'], i['issue_type']): i for i in items}
+        items = list(unique.values())
+        connection = await session.connection()
+        if self._is_asyncpg(connection):
+            await session.execute(text(f"""
+                CREATE TEMP TABLE IF NOT EXISTS {_REVIEW_STAGE_TABLE} (
+                    order_id VARCHAR,
+                    issue_type VARCHAR,
+                    severity VARCHAR,
+                    description TEXT
+                ) ON COMMIT DELETE ROWS
+            """))
+            driver = await self._driver_connection(connection)
+            await driver.copy_records_to_table(
+                _REVIEW_STAGE_TABLE,
+                records=[tuple(i[c] for c in REVIEW_COLUMNS) for i in items],
+                columns=list(REVIEW_COLUMNS)
+            )
+            await session.execute(text(f"""
+                INSERT INTO manual_review_queue ({', '.join(REVIEW_COLUMNS)})
+                SELECT {', '.join(REVIEW_COLUMNS)} FROM {_REVIEW_STAGE_TABLE}
+                ON CONFLICT (order_id, issue_type) DO UPDATE
+                SET updated_at = NOW(), description = EXCLUDED.description
+            """))
+            # Several symbols may share one transaction (serial full computation)
+            await session.execute(text(f"DELETE FROM {_REVIEW_STAGE_TABLE}"))
+        elif connection.dialect.name in _UPSERT_INSERTS:
+            stmt = _UPSERT_INSERTS[connection.dialect.name](_review_table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['order_id', 'issue_type'],
+                set_={'updated_at': func.now(), 'description': stmt.excluded.description}
+            )
+            await self._batched_insert(session, stmt, REVIEW_COLUMNS, items)
+        else:
+            raise NotImplementedError(
+                f"Review-queue upsert not supported on {connection.dialect.name}; use bulk_writes=False"
+            )
+        return len(items)
+
+    # =========================================================================
+    # HELPERS
+    # =========================================================================
+
+    async def _batched_insert(self, session, stmt, columns: Sequence[str], rows: List[Dict]):
+        """Execute an insert for rows in chunks of batch_rows (one multi-row batch per chunk)."""
+        for start in range(0, len(rows), self.batch_rows):
+            chunk = [{c: row[c] for c in columns} for row in rows[start:start + self.batch_rows]]
+            await session.execute(stmt, chunk)
+
+    @staticmethod
+    def _allocation_record(allocation: Dict) -> tuple:
+        """Allocation dict → COPY record (asyncpg needs a real UUID for the batch id)."""
+        record = [allocation[c] for c in ALLOCATION_COLUMNS]
+        batch_index = ALLOCATION_COLUMNS.index('allocation_batch_id')
+        batch_id = record[batch_index]
+        if batch_id is not None and not isinstance(batch_id, uuid.UUID):
+            record[batch_index] = uuid.UUID(str(batch_id))
+        return tuple(record)
+
+    @staticmethod
+    def _is_asyncpg(connection) -> bool:
+        return connection.dialect.name == 'postgresql' and connection.dialect.driver == 'asyncpg'
+
+    @staticmethod
+    async def _driver_connection(connection):
+        """The asyncpg connection underneath the session's (transactional) connection."""
+        raw = await connection.get_raw_connection()
+        return raw.driver_connection
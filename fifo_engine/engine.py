@@ -6,16 +6,20 @@ Operates on an immutable trade ledger to produce versioned allocations.
 """
 
 import uuid
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timezone
 from decimal import Decimal
 from typing import List, Dict, Optional, Tuple
 import asyncio
-from sqlalchemy import text, select
+from sqlalchemy import inspect, text, select
 from sqlalchemy.dialects.postgresql import insert
 
 from database_manager.database_session_manager import DatabaseSessionManager
 from Shared_Utils.logging_manager import LoggerManager
 from Shared_Utils.precision import PrecisionUtils
+from .bulk_writer import BulkAllocationWriter
 
 
 class FifoAllocationEngine:
@@ -37,7 +41,8 @@ class FifoAllocationEngine:
         self,
         database_session_manager: DatabaseSessionManager,
         logger_manager: LoggerManager,
-        precision_utils: PrecisionUtils = None
+        precision_utils: PrecisionUtils = None,
+        bulk_writes: bool = True
     ):
         """
         Initialize FIFO Allocation Engine.
@@ -46,10 +51,14 @@ class FifoAllocationEngine:
             database_session_manager: Database session manager
             logger_manager: Logging manager
             precision_utils: Precision and dust threshold utilities (optional, uses fallbacks if None)
+            bulk_writes: Persist allocations and review items with COPY / multi-row
+                INSERT (default). False uses one statement per row.
         """
         self.db = database_session_manager
         self.logger = logger_manager.get_logger('shared_logger')
         self.precision = precision_utils
+        self.bulk_writer = BulkAllocationWriter() if bulk_writes else None
+        self._watermark_table_exists: Optional[bool] = None
 
         # Use fallback precision if not provided
         if self.precision is None:
@@ -84,6 +93,23 @@ class FifoAllocationEngine:
             return round(Decimal(str(value)), 8)
         return self.precision.round_with_bankers(value, symbol, is_base)
 
+    def _precision_snapshot(self, symbols: List[str]):
+        """Capture dust thresholds and quote rounding for symbols (picklable for pool workers)."""
+        from .parallel import PrecisionSnapshot
+
+        table = {}
+        for symbol in symbols:
+            quantizer = None
+            if not self._use_fallback_precision:
+                try:
+                    _, quote_prec, _, _ = self.precision.fetch_precision(symbol)
+                    quantizer = Decimal('1') / (Decimal('10') ** quote_prec)
+                except Exception:
+                    # Same fallback as PrecisionUtils.round_with_bankers
+                    quantizer = Decimal('1e-8')
+            table[symbol] = (self._get_dust_threshold(symbol), quantizer)
+        return PrecisionSnapshot(table, use_fallback=self._use_fallback_precision)
+
     async def compute_all_symbols(
         self,
         version: int,
@@ -216,6 +242,197 @@ class FifoAllocationEngine:
                 error_message=str(e)
             )
 
+    async def compute_all_symbols_parallel(
+        self,
+        version: int,
+        workers: int = 4,
+        pool: str = 'process',
+        triggered_by: str = 'manual'
+    ) -> 'ComputationResult':
+        """
+        Compute FIFO allocations for all symbols across a bounded worker pool.
+
+        Fetches every fill in one bulk query, runs the streaming core for each
+        symbol on a process (or thread) pool and commits each symbol in its own
+        transaction as soon as it is done. A failing symbol does not abort the
+        others; it is reported in ComputationResult.symbols_failed and the run
+        is logged as 'partial'. Re-running the symbol (compute_symbol or an
+        incremental run) fills the gap.
+
+        Args:
+            version: Allocation version number to create
+            workers: Maximum concurrent allocation tasks and symbol commits
+            pool: 'process' (CPU-parallel) or 'thread' (no pickling, for debugging)
+            triggered_by: What triggered this computation ('manual', 'scheduled', 'api')
+
+        Returns:
+            ComputationResult with statistics and per-symbol failures
+        """
+        if pool not in ('process', 'thread'):
+            raise ValueError(f"Unknown pool type {pool!r} (expected 'process' or 'thread')")
+        workers = max(1, int(workers))
+
+        batch_id = uuid.uuid4()
+        start_time = datetime.now(timezone.utc)
+        log_id = None
+
+        self.logger.info(
+            f"🚀 Starting parallel FIFO computation (Version {version}, Batch {batch_id}, "
+            f"{workers} {pool} workers)"
+        )
+
+        try:
+            async with self.db.async_session() as session:
+                async with session.begin():
+                    log_id = await self._log_computation_start(
+                        session=session,
+                        symbol=None,
+                        version=version,
+                        batch_id=batch_id,
+                        start_time=start_time,
+                        mode='full',
+                        triggered_by=triggered_by
+                    )
+                    await self._clear_allocations(session, version)
+                    fills_by_symbol = await self._fetch_all_fills(session)
+
+            symbols = sorted(fills_by_symbol)
+            self.logger.info(f"📊 Found {len(symbols)} symbols to process")
+
+            from .parallel import init_worker, allocate_symbol
+
+            precision = self._precision_snapshot(symbols)
+            if pool == 'process':
+                # spawn: never fork a process holding an event loop and DB connections
+                executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=init_worker,
+                    initargs=(precision,)
+                )
+            else:
+                executor = ThreadPoolExecutor(
+                    max_workers=workers,
+                    initializer=init_worker,
+                    initargs=(precision,)
+                )
+
+            loop = asyncio.get_running_loop()
+            commit_slots = asyncio.Semaphore(workers)
+
+            async def run_symbol(symbol: str):
+                buys, sells = fills_by_symbol[symbol]
+                try:
+                    outcome = await loop.run_in_executor(
+                        executor, allocate_symbol, symbol, buys, sells, version, batch_id
+                    )
+                    async with commit_slots:
+                        async with self.db.async_session() as session:
+                            async with session.begin():
+                                result = await self._persist_symbol_result(
+                                    session=session,
+                                    symbol=symbol,
+                                    buys=buys,
+                                    sells=sells,
+                                    allocations=outcome.allocations,
+                                    unmatched_sells=outcome.unmatched_sells,
+                                    lots=deque(outcome.open_lots),
+                                    version=version,
+                                    batch_id=batch_id,
+                                    watermark=None
+                                )
+                    self.logger.info(
+                        f"✅ {symbol}: {result['allocations_created']} allocations "
+                        f"({result['buys_processed']} buys → {result['sells_processed']} sells)"
+                    )
+                    return symbol, result, None
+                except Exception as e:
+                    self.logger.error(f"❌ {symbol}: allocation failed: {e}", exc_info=True)
+                    return symbol, None, f"{type(e).__name__}: {e}"
+
+            with executor:
+                outcomes = await asyncio.gather(*(run_symbol(symbol) for symbol in symbols))
+
+            total_allocations = 0
+            total_buys = 0
+            total_sells = 0
+            symbols_processed = []
+            symbols_failed = {}
+            for symbol, result, error in outcomes:
+                if error is not None:
+                    symbols_failed[symbol] = error
+                    continue
+                total_allocations += result['allocations_created']
+                total_buys += result['buys_processed']
+                total_sells += result['sells_processed']
+                symbols_processed.append(symbol)
+
+            end_time = datetime.now(timezone.utc)
+            duration_ms = int((end_time - start_time).total_seconds() * 1000)
+            error_message = (
+                f"{len(symbols_failed)} of {len(symbols)} symbols failed: {', '.join(sorted(symbols_failed))}"
+                if symbols_failed else None
+            )
+
+            async with self.db.async_session() as session:
+                async with session.begin():
+                    total_pnl = await self._compute_total_pnl(session, version)
+                    await self._log_computation_complete(
+                        session=session,
+                        log_id=log_id,
+                        end_time=end_time,
+                        duration_ms=duration_ms,
+                        buys_processed=total_buys,
+                        sells_processed=total_sells,
+                        allocations_created=total_allocations,
+                        symbols_processed=symbols_processed,
+                        total_pnl=total_pnl,
+                        status='partial' if symbols_failed else 'completed',
+                        error_message=error_message
+                    )
+
+            self.logger.info(
+                f"🎉 Parallel FIFO computation complete!\n"
+                f"   Version: {version}\n"
+                f"   Symbols: {len(symbols_processed)} ok, {len(symbols_failed)} failed\n"
+                f"   Allocations: {total_allocations}\n"
+                f"   Total PnL: ${total_pnl:,.2f}\n"
+                f"   Duration: {duration_ms:,}ms"
+            )
+
+            return ComputationResult(
+                success=not symbols_failed,
+                version=version,
+                batch_id=batch_id,
+                symbols_processed=symbols_processed,
+                symbols_failed=symbols_failed,
+                buys_processed=total_buys,
+                sells_processed=total_sells,
+                allocations_created=total_allocations,
+                total_pnl=total_pnl,
+                duration_ms=duration_ms,
+                error_message=error_message
+            )
+
+        except Exception as e:
+            self.logger.error(f"❌ Parallel FIFO computation failed: {e}", exc_info=True)
+
+            if log_id is not None:
+                async with self.db.async_session() as session:
+                    async with session.begin():
+                        await self._log_computation_failure(
+                            session=session,
+                            log_id=log_id,
+                            error_message=str(e)
+                        )
+
+            return ComputationResult(
+                success=False,
+                version=version,
+                batch_id=batch_id,
+                error_message=str(e)
+            )
+
     async def compute_symbol(
         self,
         symbol: str,
@@ -267,6 +484,139 @@ class FifoAllocationEngine:
                 error_message=str(e)
             )
 
+    async def compute_incremental(
+        self,
+        version: int,
+        symbols: Optional[List[str]] = None,
+        triggered_by: str = 'scheduled'
+    ) -> 'ComputationResult':
+        """
+        Compute FIFO allocations incrementally from per-symbol watermarks.
+
+        Each symbol's watermark records the last fill processed and the open
+        lots left after it, so only fills newer than the watermark are
+        allocated. A symbol is rebuilt from its first trade when it has no
+        watermark yet, or when a back-dated fill has landed at or behind it
+        (detected by the fill count up to the watermark changing).
+
+        Amendments to existing trade records are not detected; use a full
+        recomputation (compute_all_symbols) after editing history.
+
+        Args:
+            version: Allocation version to extend
+            symbols: Symbols to process (default: all symbols with trades)
+            triggered_by: What triggered this computation ('manual', 'scheduled', 'api')
+
+        Returns:
+            ComputationResult with statistics and the list of rebuilt symbols
+        """
+        batch_id = uuid.uuid4()
+        start_time = datetime.now(timezone.utc)
+        log_id = None
+
+        self.logger.info(f"🚀 Starting incremental FIFO computation (Version {version}, Batch {batch_id})")
+
+        try:
+            async with self.db.async_session() as session:
+                async with session.begin():
+                    log_id = await self._log_computation_start(
+                        session=session,
+                        symbol=None,
+                        version=version,
+                        batch_id=batch_id,
+                        start_time=start_time,
+                        mode='incremental',
+                        triggered_by=triggered_by
+                    )
+
+                    if symbols is None:
+                        symbols = await self._get_all_symbols(session)
+
+                    total_allocations = 0
+                    total_buys = 0
+                    total_sells = 0
+                    symbols_processed = []
+                    symbols_rebuilt = []
+
+                    for symbol in symbols:
+                        result = await self._compute_symbol_incremental(
+                            session=session,
+                            symbol=symbol,
+                            version=version,
+                            batch_id=batch_id
+                        )
+                        if result['mode'] == 'skipped':
+                            continue
+
+                        total_allocations += result['allocations_created']
+                        total_buys += result['buys_processed']
+                        total_sells += result['sells_processed']
+                        symbols_processed.append(symbol)
+                        if result['mode'] == 'rebuild':
+                            symbols_rebuilt.append(symbol)
+
+                        self.logger.info(
+                            f"✅ {symbol} ({result['mode']}): {result['allocations_created']} allocations "
+                            f"({result['buys_processed']} buys → {result['sells_processed']} sells)"
+                        )
+
+                    end_time = datetime.now(timezone.utc)
+                    duration_ms = int((end_time - start_time).total_seconds() * 1000)
+
+                    total_pnl = await self._compute_total_pnl(session, version)
+
+                    await self._log_computation_complete(
+                        session=session,
+                        log_id=log_id,
+                        end_time=end_time,
+                        duration_ms=duration_ms,
+                        buys_processed=total_buys,
+                        sells_processed=total_sells,
+                        allocations_created=total_allocations,
+                        symbols_processed=symbols_processed,
+                        total_pnl=total_pnl
+                    )
+
+            self.logger.info(
+                f"🎉 Incremental FIFO computation complete!\n"
+                f"   Version: {version}\n"
+                f"   Symbols updated: {len(symbols_processed)} (rebuilt: {len(symbols_rebuilt)})\n"
+                f"   Allocations: {total_allocations}\n"
+                f"   Duration: {duration_ms:,}ms"
+            )
+
+            return ComputationResult(
+                success=True,
+                version=version,
+                batch_id=batch_id,
+                symbols_processed=symbols_processed,
+                symbols_rebuilt=symbols_rebuilt,
+                buys_processed=total_buys,
+                sells_processed=total_sells,
+                allocations_created=total_allocations,
+                total_pnl=total_pnl,
+                duration_ms=duration_ms
+            )
+
+        except Exception as e:
+            self.logger.error(f"❌ Incremental FIFO computation failed: {e}", exc_info=True)
+
+            if log_id is not None:
+                async with self.db.async_session() as session:
+                    async with session.begin():
+                        await self._log_computation_failure(
+                            session=session,
+                            log_id=log_id,
+                            error_message=str(e)
+                        )
+
+            return ComputationResult(
+                success=False,
+                version=version,
+                batch_id=batch_id,
+                error_message=str(e)
+            )
+
     async def _compute_symbol_internal(
         self,
         session,
@@ -285,43 +635,282 @@ class FifoAllocationEngine:
 
         if not sells:
             self.logger.info(f"   No sells to process for {symbol}")
-            return {
-                'buys_processed': len(buys),
-                'sells_processed': 0,
-                'allocations_created': 0
-            }
 
-        # Initialize inventory (order_id → remaining_size)
-        inventory = self._initialize_inventory(buys)
+        return await self._allocate_and_persist(
+            session=session,
+            symbol=symbol,
+            buys=buys,
+            sells=sells,
+            version=version,
+            batch_id=batch_id,
+            lots=deque(),
+            watermark=None
+        )
 
-        # Process each sell using FIFO matching
-        all_allocations = []
-        for sell in sells:
-            allocations = await self._allocate_sell_fifo(
-                session=session,
-                sell=sell,
-                inventory=inventory,
-                buys_dict={b['order_id']: b for b in buys},
-                version=version,
-                batch_id=batch_id
+    async def _compute_symbol_incremental(
+        self,
+        session,
+        symbol: str,
+        version: int,
+        batch_id: uuid.UUID
+    ) -> Dict:
+        """Allocate fills newer than the symbol's watermark (within transaction)."""
+        watermark = await self._load_watermark(session, symbol, version)
+
+        if watermark is None:
+            self.logger.info(f"   {symbol}: no watermark for version {version}, rebuilding")
+            return await self._rebuild_symbol(session, symbol, version, batch_id)
+
+        fills_at_watermark = await self._count_fills_through(session, symbol, watermark['last_order_time'])
+        if fills_at_watermark != watermark['fills_processed']:
+            self.logger.warning(
+                f"⚠️  {symbol}: {fills_at_watermark} fills at or before watermark "
+                f"{watermark['last_order_time']} (expected {watermark['fills_processed']}), "
+                f"back-dated fill detected - rebuilding"
             )
-            all_allocations.extend(allocations)
+            return await self._rebuild_symbol(session, symbol, version, batch_id)
+
+        buys = await self._fetch_buys(session, symbol, after=watermark['last_order_time'])
+        sells = await self._fetch_sells(session, symbol, after=watermark['last_order_time'])
+        if not buys and not sells:
+            return {'mode': 'skipped', 'buys_processed': 0, 'sells_processed': 0, 'allocations_created': 0}
+
+        lots = await self._load_open_lots(session, symbol, version)
+
+        result = await self._allocate_and_persist(
+            session=session,
+            symbol=symbol,
+            buys=buys,
+            sells=sells,
+            version=version,
+            batch_id=batch_id,
+            lots=lots,
+            watermark=watermark
+        )
+        result['mode'] = 'incremental'
+        return result
+
+    async def _rebuild_symbol(
+        self,
+        session,
+        symbol: str,
+        version: int,
+        batch_id: uuid.UUID
+    ) -> Dict:
+        """Clear one symbol's allocations and state, then recompute it from scratch."""
+        await self._clear_symbol_allocations(session, symbol, version)
+        result = await self._compute_symbol_internal(
+            session=session,
+            symbol=symbol,
+            version=version,
+            batch_id=batch_id
+        )
+        result['mode'] = 'rebuild'
+        return result
+
+    async def _allocate_and_persist(
+        self,
+        session,
+        symbol: str,
+        buys: List[Dict],
+        sells: List[Dict],
+        version: int,
+        batch_id: uuid.UUID,
+        lots: deque,
+        watermark: Optional[Dict]
+    ) -> Dict:
+        """Run the streaming core and persist allocations, review items and watermark."""
+        # Stream buys and sells through per-symbol lot queue (single ordered pass)
+        all_allocations, unmatched_sells = self._allocate_symbol_stream(
+            buys=buys,
+            sells=sells,
+            version=version,
+            batch_id=batch_id,
+            lots=lots
+        )
+
+        return await self._persist_symbol_result(
+            session=session,
+            symbol=symbol,
+            buys=buys,
+            sells=sells,
+            allocations=all_allocations,
+            unmatched_sells=unmatched_sells,
+            lots=lots,
+            version=version,
+            batch_id=batch_id,
+            watermark=watermark
+        )
+
+    async def _persist_symbol_result(
+        self,
+        session,
+        symbol: str,
+        buys: List[Dict],
+        sells: List[Dict],
+        allocations: List[Dict],
+        unmatched_sells: List[Tuple[Dict, Decimal]],
+        lots: deque,
+        version: int,
+        batch_id: uuid.UUID,
+        watermark: Optional[Dict]
+    ) -> Dict:
+        """Persist one symbol's allocations, review items and watermark (within transaction)."""
+        # Add unmatched sells to manual review queue
+        review_items = [
+            {
+                'order_id': sell['order_id'],
+                'issue_type': 'unmatched_sell',
+                'severity': 'medium',
+                'description': f"Sell has {remaining_sell_size} {sell['symbol']} with no matching buy"
+            }
+            for sell, remaining_sell_size in unmatched_sells
+        ]
+        if self.bulk_writer is not None:
+            await self.bulk_writer.write_review_items(session, review_items)
+        else:
+            for item in review_items:
+                await self._add_to_review_queue(session=session, **item)
 
         # Save allocations to database
-        if all_allocations:
-            await self._save_allocations(session, all_allocations)
-            self.logger.info(f"   Saved {len(all_allocations)} allocations for {symbol}")
+        if allocations:
+            await self._save_allocations(session, allocations)
+            self.logger.info(f"   Saved {len(allocations)} allocations for {symbol}")
+
+        # Advance the watermark to the newest fill seen and snapshot open lots
+        fills = buys + sells
+        if fills:
+            last_fill = max(fills, key=lambda f: (f['order_time'], f['order_id']))
+            fills_processed = len(fills) + (watermark['fills_processed'] if watermark else 0)
+            await self._save_watermark(
+                session=session,
+                symbol=symbol,
+                version=version,
+                batch_id=batch_id,
+                last_fill=last_fill,
+                fills_processed=fills_processed,
+                lots=lots
+            )
 
         return {
             'buys_processed': len(buys),
             'sells_processed': len(sells),
-            'allocations_created': len(all_allocations)
+            'allocations_created': len(allocations)
         }
 
     # =========================================================================
     # FIFO MATCHING ALGORITHM
     # =========================================================================
 
+    def _allocate_symbol_stream(
+        self,
+        buys: List[Dict],
+        sells: List[Dict],
+        version: int,
+        batch_id: uuid.UUID,
+        lots: Optional[deque] = None
+    ) -> Tuple[List[Dict], List[Tuple[Dict, Decimal]]]:
+        """
+        Allocate every sell of one symbol in a single ordered pass.
+
+        Buys are admitted into a FIFO lot queue as the sell clock passes their
+        order_time, and sells consume lots from the head of the queue. Each buy
+        is enqueued once and dequeued once, so the pass is linear in fills
+        (plus one sort of the buys). Produces the same allocations, in the same
+        order, as running _allocate_sell_fifo for each sell.
+
+        When a lots deque is passed it is used as the starting open-lot state
+        (incremental mode) and is left holding the open lots after the pass,
+        including buys that no sell has reached yet.
+
+        Args:
+            buys: Buy trade records for the symbol
+            sells: Sell trade records for the symbol (chronological order)
+            version: Allocation version
+            batch_id: Batch ID for this computation
+            lots: Optional open-lot queue of [remaining_size, buy] in FIFO order
+
+        Returns:
+            Tuple of (allocations, unmatched) where unmatched is a list of
+            (sell, remaining_size) pairs that need manual review
+        """
+        allocations = []
+        unmatched = []
+        if not sells and lots is None:
+            return allocations, unmatched
+        if not sells and not buys:
+            return allocations, unmatched
+
+        dust_threshold = self._get_dust_threshold((sells or buys)[0]['symbol'])
+
+        # Same FIFO key the per-sell path sorts by
+        ordered_buys = sorted(buys, key=lambda b: (b['order_time'], b['order_id']))
+        next_buy = 0
+
+        # Admitted lots with size above dust: [remaining_size, buy]
+        if lots is None:
+            lots = deque()
+        last_sell_time = None
+
+        for sell in sells:
+            sell_time = sell['order_time']
+            if last_sell_time is not None and sell_time < last_sell_time:
+                raise ValueError(
+                    f"Sells for {sell['symbol']} are not in chronological order "
+                    f"({sell['order_id']} at {sell_time} after {last_sell_time})"
+                )
+            last_sell_time = sell_time
+
+            # Admit buys that happened at or before this sell
+            while next_buy < len(ordered_buys) and ordered_buys[next_buy]['order_time'] <= sell_time:
+                buy = ordered_buys[next_buy]
+                next_buy += 1
+                buy_size = self._safe_decimal(buy['size'])
+                if buy_size > dust_threshold:
+                    lots.append([buy_size, buy])
+
+            remaining_sell_size = self._safe_decimal(sell['size'])
+
+            while lots and remaining_sell_size > dust_threshold:
+                lot = lots[0]
+                allocated_size = min(remaining_sell_size, lot[0])
+
+                allocations.append(self._create_allocation(
+                    sell=sell,
+                    buy=lot[1],
+                    allocated_size=allocated_size,
+                    version=version,
+                    batch_id=batch_id
+                ))
+
+                lot[0] -= allocated_size
+                remaining_sell_size -= allocated_size
+
+                # Exhausted or dust lots are never available again
+                if lot[0] <= dust_threshold:
+                    lots.popleft()
+
+            if remaining_sell_size > dust_threshold:
+                self.logger.warning(
+                    f"⚠️  Unmatched sell: {sell['order_id']} ({sell['symbol']}) - "
+                    f"Remaining: {remaining_sell_size}"
+                )
+                allocations.append(self._create_unmatched_allocation(
+                    sell=sell,
+                    unmatched_size=remaining_sell_size,
+                    version=version,
+                    batch_id=batch_id
+                ))
+                unmatched.append((sell, remaining_sell_size))
+
+        # Buys after the last sell stay open for the next incremental pass
+        for buy in ordered_buys[next_buy:]:
+            buy_size = self._safe_decimal(buy['size'])
+            if buy_size > dust_threshold:
+                lots.append([buy_size, buy])
+
+        return allocations, unmatched
+
     async def _allocate_sell_fifo(
         self,
         session,
@@ -334,6 +923,10 @@ class FifoAllocationEngine:
         """
         Allocate a sell to buy(s) using FIFO logic.
 
+        Reference per-sell implementation: re-filters and re-sorts the whole
+        inventory on every call. The engine uses _allocate_symbol_stream; this
+        path is kept for parity checks against it.
+
         Args:
             session: Database session
             sell: Sell trade record
@@ -523,29 +1116,47 @@ class FifoAllocationEngine:
     # DATABASE HELPERS
     # =========================================================================
 
-    async def _fetch_buys(self, session, symbol: str) -> List[Dict]:
-        """Fetch all buy trades for a symbol in FIFO order (oldest first)."""
-        result = await session.execute(text("""
+    async def _fetch_buys(self, session, symbol: str, after: Optional[datetime] = None) -> List[Dict]:
+        """Fetch buy trades for a symbol in FIFO order (oldest first), optionally only after a time."""
+        return await self._fetch_side(session, symbol, 'buy', after)
+
+    async def _fetch_sells(self, session, symbol: str, after: Optional[datetime] = None) -> List[Dict]:
+        """Fetch sell trades for a symbol in chronological order, optionally only after a time."""
+        return await self._fetch_side(session, symbol, 'sell', after)
+
+    async def _fetch_side(self, session, symbol: str, side: str, after: Optional[datetime]) -> List[Dict]:
+        """Fetch one side of a symbol's trades ordered by (order_time, order_id)."""
+        params = {'symbol': symbol, 'side': side}
+        after_clause = ""
+        if after is not None:
+            after_clause = "AND order_time > :after"
+            params['after'] = after
+
+        result = await session.execute(text(f"""
             SELECT order_id, symbol, side, size, price, total_fees_usd, order_time
             FROM trade_records
-            WHERE symbol = :symbol AND side = 'buy'
+            WHERE symbol = :symbol AND side = :side {after_clause}
             ORDER BY order_time ASC, order_id ASC
-        """), {'symbol': symbol})
+        """), params)
 
         rows = result.fetchall()
         return [dict(row._mapping) for row in rows]
 
-    async def _fetch_sells(self, session, symbol: str) -> List[Dict]:
-        """Fetch all sell trades for a symbol in chronological order."""
+    async def _fetch_all_fills(self, session) -> Dict[str, Tuple[List[Dict], List[Dict]]]:
+        """Fetch every buy/sell fill in one query, grouped as symbol → (buys, sells)."""
         result = await session.execute(text("""
             SELECT order_id, symbol, side, size, price, total_fees_usd, order_time
             FROM trade_records
-            WHERE symbol = :symbol AND side = 'sell'
-            ORDER BY order_time ASC, order_id ASC
-        """), {'symbol': symbol})
+            WHERE side IN ('buy', 'sell')
+            ORDER BY symbol ASC, order_time ASC, order_id ASC
+        """))
 
-        rows = result.fetchall()
-        return [dict(row._mapping) for row in rows]
+        fills_by_symbol = {}
+        for row in result.fetchall():
+            fill = dict(row._mapping)
+            buys, sells = fills_by_symbol.setdefault(fill['symbol'], ([], []))
+            (buys if fill['side'] == 'buy' else sells).append(fill)
+        return fills_by_symbol
 
     async def _get_all_symbols(self, session) -> List[str]:
         """Get all unique symbols that have trades."""
@@ -556,17 +1167,42 @@ class FifoAllocationEngine:
         return [row[0] for row in rows]
 
     async def _clear_allocations(self, session, version: int):
-        """Delete all allocations for a version."""
+        """Delete all allocations and incremental state for a version."""
         await session.execute(text("""
             DELETE FROM fifo_allocations WHERE allocation_version = :version
         """), {'version': version})
+        await session.execute(text("""
+            DELETE FROM fifo_inventory_snapshot WHERE allocation_version = :version
+        """), {'version': version})
+        if await self._has_watermark_table(session):
+            await session.execute(text("""
+                DELETE FROM fifo_symbol_watermark WHERE allocation_version = :version
+            """), {'version': version})
         self.logger.info(f"   Cleared existing allocations for version {version}")
 
+    async def _clear_symbol_allocations(self, session, symbol: str, version: int):
+        """Delete one symbol's allocations and incremental state for a version."""
+        params = {'symbol': symbol, 'version': version}
+        await session.execute(text("""
+            DELETE FROM fifo_allocations WHERE symbol = :symbol AND allocation_version = :version
+        """), params)
+        await session.execute(text("""
+            DELETE FROM fifo_inventory_snapshot WHERE symbol = :symbol AND allocation_version = :version
+        """), params)
+        if await self._has_watermark_table(session):
+            await session.execute(text("""
+                DELETE FROM fifo_symbol_watermark WHERE symbol = :symbol AND allocation_version = :version
+            """), params)
+
     async def _save_allocations(self, session, allocations: List[Dict]):
-        """Save allocations to database in batch."""
+        """Save allocations to database in batch (COPY / multi-row INSERT when bulk writes are on)."""
         if not allocations:
             return
 
+        if self.bulk_writer is not None:
+            await self.bulk_writer.write_allocations(session, allocations)
+            return
+
         # Build values for batch insert
         await session.execute(text("""
             INSERT INTO fifo_allocations (
@@ -614,6 +1250,125 @@ class FifoAllocationEngine:
             inventory[buy['order_id']] = self._safe_decimal(buy['size'])
         return inventory
 
+    # =========================================================================
+    # WATERMARK HELPERS (incremental mode)
+    # =========================================================================
+
+    async def _has_watermark_table(self, session) -> bool:
+        """Whether migration 003 (fifo_symbol_watermark) has been applied."""
+        if self._watermark_table_exists is None:
+            self._watermark_table_exists = await session.run_sync(
+                lambda sync_session: inspect(sync_session.connection()).has_table('fifo_symbol_watermark')
+            )
+            if not self._watermark_table_exists:
+                self.logger.warning(
+                    "⚠️  fifo_symbol_watermark table not found (migration 003 not applied) - "
+                    "watermarks disabled, incremental runs rebuild every symbol"
+                )
+        return self._watermark_table_exists
+
+    async def _load_watermark(self, session, symbol: str, version: int) -> Optional[Dict]:
+        """Load the per-symbol watermark for a version (None if never computed)."""
+        if not await self._has_watermark_table(session):
+            return None
+        result = await session.execute(text("""
+            SELECT last_order_time, last_order_id, fills_processed
+            FROM fifo_symbol_watermark
+            WHERE symbol = :symbol AND allocation_version = :version
+        """), {'symbol': symbol, 'version': version})
+        row = result.fetchone()
+        return dict(row._mapping) if row else None
+
+    async def _count_fills_through(self, session, symbol: str, order_time: datetime) -> int:
+        """Count a symbol's buy/sell fills at or before a time."""
+        result = await session.execute(text("""
+            SELECT COUNT(*)
+            FROM trade_records
+            WHERE symbol = :symbol AND side IN ('buy', 'sell') AND order_time <= :order_time
+        """), {'symbol': symbol, 'order_time': order_time})
+        return int(result.scalar() or 0)
+
+    async def _load_open_lots(self, session, symbol: str, version: int) -> deque:
+        """Load the open-lot queue left by the previous pass, in FIFO order."""
+        result = await session.execute(text("""
+            SELECT t.order_id, t.symbol, t.side, t.size, t.price, t.total_fees_usd, t.order_time,
+                   s.remaining_size
+            FROM fifo_inventory_snapshot s
+            JOIN trade_records t ON t.order_id = s.buy_order_id
+            WHERE s.symbol = :symbol AND s.allocation_version = :version
+        """), {'symbol': symbol, 'version': version})
+
+        lots = []
+        for row in result.fetchall():
+            buy = dict(row._mapping)
+            remaining_size = self._safe_decimal(buy.pop('remaining_size'))
+            lots.append([remaining_size, buy])
+        lots.sort(key=lambda lot: (lot[1]['order_time'], lot[1]['order_id']))
+        return deque(lots)
+
+    async def _save_watermark(
+        self,
+        session,
+        symbol: str,
+        version: int,
+        batch_id: uuid.UUID,
+        last_fill: Dict,
+        fills_processed: int,
+        lots: deque
+    ):
+        """Persist the symbol's open lots and advance its watermark."""
+        snapshot_time = datetime.now(timezone.utc)
+
+        await session.execute(text("""
+            DELETE FROM fifo_inventory_snapshot
+            WHERE symbol = :symbol AND allocation_version = :version
+        """), {'symbol': symbol, 'version': version})
+
+        if lots:
+            await session.execute(text("""
+                INSERT INTO fifo_inventory_snapshot (
+                    symbol, buy_order_id, remaining_size, snapshot_time, allocation_version
+                ) VALUES (
+                    :symbol, :buy_order_id, :remaining_size, :snapshot_time, :version
+                )
+            """), [
+                {
+                    'symbol': symbol,
+                    'buy_order_id': buy['order_id'],
+                    'remaining_size': remaining_size,
+                    'snapshot_time': snapshot_time,
+                    'version': version
+                }
+                for remaining_size, buy in lots
+            ])
+
+        if not await self._has_watermark_table(session):
+            return
+
+        await session.execute(text("""
+            INSERT INTO fifo_symbol_watermark (
+                symbol, allocation_version, last_order_time, last_order_id,
+                fills_processed, allocation_batch_id, updated_at
+            ) VALUES (
+                :symbol, :version, :last_order_time, :last_order_id,
+                :fills_processed, :batch_id, :updated_at
+            )
+            ON CONFLICT (symbol, allocation_version) DO UPDATE
+            SET last_order_time = EXCLUDED.last_order_time,
+                last_order_id = EXCLUDED.last_order_id,
+                fills_processed = EXCLUDED.fills_processed,
+                allocation_batch_id = EXCLUDED.allocation_batch_id,
+                updated_at = EXCLUDED.updated_at
+        """), {
+            'symbol': symbol,
+            'version': version,
+            'last_order_time': last_fill['order_time'],
+            'last_order_id': last_fill['order_id'],
+            'fills_processed': fills_processed,
+            'batch_id': batch_id,
+            'updated_at': snapshot_time
+        })
+
     # =========================================================================
     # COMPUTATION LOGGING
     # =========================================================================
@@ -657,7 +1412,9 @@ class FifoAllocationEngine:
         sells_processed: int,
         allocations_created: int,
         symbols_processed: List[str],
-        total_pnl: Decimal
+        total_pnl: Decimal,
+        status: str = 'completed',
+        error_message: Optional[str] = None
     ):
         """Update computation log with completion details."""
         await session.execute(text("""
@@ -665,7 +1422,8 @@ class FifoAllocationEngine:
             SET
                 computation_end = :end_time,
                 computation_duration_ms = :duration_ms,
-                status = 'completed',
+                status = :status,
+                error_message = :error_message,
                 buys_processed = :buys_processed,
                 sells_processed = :sells_processed,
                 allocations_created = :allocations_created,
@@ -680,7 +1438,9 @@ class FifoAllocationEngine:
             'sells_processed': sells_processed,
             'allocations_created': allocations_created,
             'symbols_processed': symbols_processed,
-            'total_pnl': total_pnl
+            'total_pnl': total_pnl,
+            'status': status,
+            'error_message': error_message
         })
 
     async def _log_computation_failure(self, session, log_id: int, error_message: str):
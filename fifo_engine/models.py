@@ -8,7 +8,7 @@ import uuid
 from dataclasses import dataclass
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional, List
+from typing import Optional, List, Dict
 
 
 @dataclass
@@ -86,6 +86,8 @@ class ComputationResult:
 
     # Statistics
     symbols_processed: List[str] = None
+    symbols_rebuilt: List[str] = None  # Incremental mode: symbols recomputed from scratch
+    symbols_failed: Dict[str, str] = None  # Parallel mode: symbol → error
     buys_processed: int = 0
     sells_processed: int = 0
     allocations_created: int = 0
@@ -104,6 +106,10 @@ class ComputationResult:
         """Initialize default values."""
         if self.symbols_processed is None:
             self.symbols_processed = []
+        if self.symbols_rebuilt is None:
+            self.symbols_rebuilt = []
+        if self.symbols_failed is None:
+            self.symbols_failed = {}
 
     @property
     def has_errors(self) -> bool:
@@ -157,12 +163,18 @@ class ValidationResult:
     error_messages: List[str] = None
     warnings: List[str] = None
 
+    # Scope and timing
+    symbols: Optional[List[str]] = None  # None = all symbols
+    check_timings_ms: Dict[str, float] = None  # check name → elapsed ms
+
     def __post_init__(self):
         """Initialize default values."""
         if self.error_messages is None:
             self.error_messages = []
         if self.warnings is None:
             self.warnings = []
+        if self.check_timings_ms is None:
+            self.check_timings_ms = {}
 
     @property
     def has_errors(self) -> bool:
@@ -0,0 +1,110 @@
+"""
+Parallel per-symbol FIFO allocation.
+
+Symbols are fully independent, so FifoAllocationEngine.compute_all_symbols_parallel()
+fetches every fill in one query and fans the streaming allocation core out across
+a worker pool. This module holds the pieces that cross the process boundary:
+
+- PrecisionSnapshot: picklable per-symbol dust thresholds and rounding quantizers
+  captured from the engine's PrecisionUtils (or its fallbacks)
+- init_worker / allocate_symbol: pool initializer and task function
+- SymbolAllocation: what a worker sends back for persistence
+"""
+
+import logging
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN
+from typing import Dict, List, Optional, Tuple
+
+# Engine instance owned by each worker (set by init_worker)
+_worker_engine = None
+
+
+class PrecisionSnapshot:
+    """
+    Frozen, picklable stand-in for PrecisionUtils inside pool workers.
+
+    Reproduces the engine's precision behaviour for the symbols of one run:
+    the dust threshold and the quote rounding quantizer per symbol. A quantizer
+    of None reproduces the engine's fallback rounding (8 decimal places).
+    """
+
+    def __init__(self, table: Dict[str, Tuple[Decimal, Optional[Decimal]]], use_fallback: bool):
+        self.table = table
+        self.use_fallback = use_fallback
+
+    def safe_decimal(self, value, default="0"):
+        if self.use_fallback:
+            if isinstance(value, Decimal):
+                return value
+            try:
+                return Decimal(str(value))
+            except Exception:
+                return Decimal('0')
+        try:
+            return Decimal(value)
+        except (TypeError, ValueError, InvalidOperation):
+            return Decimal(default)
+
+    def get_dust_threshold(self, symbol: str) -> Decimal:
+        return self.table[symbol][0]
+
+    def round_with_bankers(self, value: Decimal, symbol: str, is_base: bool = True) -> Decimal:
+        quantizer = self.table[symbol][1]
+        if quantizer is None:
+            return round(Decimal(str(value)), 8)
+        try:
+            return value.quantize(quantizer, rounding=ROUND_HALF_EVEN)
+        except InvalidOperation:
+            return value.quantize(Decimal('1e-8'), rounding=ROUND_HALF_EVEN)
+
+
+class _WorkerLoggerManager:
+    """Minimal LoggerManager for pool workers (engine only calls get_logger)."""
+
+    def get_logger(self, name: str):
+        return logging.getLogger(name)
+
+
+@dataclass
+class SymbolAllocation:
+    """Allocation output of one symbol, returned by a worker."""
+
+    symbol: str
+    allocations: List[Dict] = field(default_factory=list)
+    unmatched_sells: List[Tuple[Dict, Decimal]] = field(default_factory=list)
+    open_lots: List[list] = field(default_factory=list)
+
+
+def init_worker(precision: PrecisionSnapshot):
+    """Pool initializer: build one engine per worker around the precision snapshot."""
+    global _worker_engine
+    from .engine import FifoAllocationEngine
+
+    _worker_engine = FifoAllocationEngine(None, _WorkerLoggerManager(), precision)
+
+
+def allocate_symbol(
+    symbol: str,
+    buys: List[Dict],
+    sells: List[Dict],
+    version: int,
+    batch_id: uuid.UUID
+) -> SymbolAllocation:
+    """Pool task: run the streaming FIFO core for one symbol."""
+    lots = deque()
+    allocations, unmatched = _worker_engine._allocate_symbol_stream(
+        buys=buys,
+        sells=sells,
+        version=version,
+        batch_id=batch_id,
+        lots=lots
+    )
+    return SymbolAllocation(
+        symbol=symbol,
+        allocations=allocations,
+        unmatched_sells=unmatched,
+        open_lots=list(lots)
+    )
@@ -2,12 +2,16 @@
 Allocation Validator
 
 Validates FIFO allocation invariants and detects discrepancies.
+
+Every check's counter is computed by one aggregate query; detail rows are
+only fetched for checks that found something.
 """
 
+import time
 from decimal import Decimal
 from typing import List, Dict, Optional
 from datetime import datetime
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
 
 from database_manager.database_session_manager import DatabaseSessionManager
 from Shared_Utils.logging_manager import LoggerManager
@@ -51,31 +55,42 @@ class AllocationValidator:
     async def validate_version(
         self,
         version: int,
-        strict: bool = True
+        strict: bool = True,
+        symbols: Optional[List[str]] = None
     ) -> ValidationResult:
         """
         Validate all allocations for a version.
 
+        All check counters come from a single aggregate query
+        (_collect_counters); a check only goes back to the database for
+        detail rows when its counter is non-zero.
+
         Args:
             version: Allocation version to validate
             strict: If True, treat warnings as errors
+            symbols: Limit validation to these symbols (default: all)
 
         Returns:
-            ValidationResult with validation details
+            ValidationResult with validation details and per-check timings
         """
-        self.logger.info(f"🔍 Validating allocations for Version {version} (strict={strict})")
+        scope = f" for {', '.join(symbols)}" if symbols else ""
+        self.logger.info(f"🔍 Validating allocations for Version {version}{scope} (strict={strict})")
 
         result = ValidationResult(
             is_valid=True,
-            version=version
+            version=version,
+            symbols=list(symbols) if symbols else None
         )
 
         try:
             async with self.db.async_session() as session:
-                # Get basic statistics
-                result.total_allocations = await self._count_allocations(session, version)
-                result.total_sells = await self._count_sells(session)
-                result.total_buys = await self._count_buys(session)
+                t0 = time.perf_counter()
+                counters = await self._collect_counters(session, version, symbols)
+                result.check_timings_ms['aggregate_scan'] = self._elapsed_ms(t0)
+
+                result.total_allocations = counters['total_allocations']
+                result.total_sells = counters['total_sells']
+                result.total_buys = counters['total_buys']
 
                 self.logger.info(
                     f"   Total allocations: {result.total_allocations}\n"
@@ -84,10 +99,19 @@ class AllocationValidator:
                 )
 
                 # Run validation checks
-                await self._check_unmatched_sells(session, version, result)
-                await self._check_allocation_completeness(session, version, result)
-                await self._check_duplicate_allocations(session, version, result)
-                await self._check_temporal_consistency(session, version, result)
+                checks = (
+                    ('unmatched_sells', self._check_unmatched_sells),
+                    ('allocation_completeness', self._check_allocation_completeness),
+                    ('duplicate_allocations', self._check_duplicate_allocations),
+                    ('temporal_consistency', self._check_temporal_consistency),
+                )
+                for name, check in checks:
+                    t0 = time.perf_counter()
+                    await check(session, version, symbols, counters, result)
+                    result.check_timings_ms[name] = self._elapsed_ms(t0)
+
+                timings = ', '.join(f"{k}={v:.1f}ms" for k, v in result.check_timings_ms.items())
+                self.logger.info(f"   Check timings: {timings}")
 
                 # Check if validation passed
                 if result.has_errors:
@@ -107,20 +131,86 @@ class AllocationValidator:
             result.add_error(f"Validation exception: {e}")
             return result
 
+    # =========================================================================
+    # AGGREGATE SCAN
+    # =========================================================================
+
+    async def _collect_counters(self, session, version: int, symbols: Optional[List[str]]) -> Dict[str, int]:
+        """
+        Compute every check's counter in one statement.
+
+        fifo_allocations is read once (grouped by sell/buy pair, then rolled
+        up per sell) and trade_records once (joined to the per-sell totals).
+
+        Returns dict with total_allocations, total_sells, total_buys,
+        unmatched_sells, duplicate_allocations, temporal_violations and
+        completeness_candidates (sells whose allocated total differs from
+        their size by more than 0.00001, before dust filtering).
+        """
+        allocation_scope, trade_scope, params = self._scope_clauses(version, symbols)
+        query_result = await session.execute(text(f"""
+            WITH pairs AS (
+                SELECT
+                    sell_order_id,
+                    buy_order_id,
+                    COUNT(*) AS n,
+                    SUM(allocated_size) AS allocated_total,
+                    SUM(CASE WHEN buy_order_id IS NOT NULL AND buy_time > sell_time
+                             THEN 1 ELSE 0 END) AS temporal
+                FROM fifo_allocations
+                WHERE {allocation_scope}
+                GROUP BY sell_order_id, buy_order_id
+            ),
+            per_sell AS (
+                SELECT
+                    sell_order_id,
+                    SUM(n) AS n,
+                    SUM(CASE WHEN buy_order_id IS NULL THEN n ELSE 0 END) AS unmatched,
+                    SUM(CASE WHEN n > 1 THEN 1 ELSE 0 END) AS duplicate_pairs,
+                    SUM(temporal) AS temporal,
+                    SUM(allocated_total) AS allocated_total
+                FROM pairs
+                GROUP BY sell_order_id
+            )
+            SELECT
+                a.total_allocations,
+                a.unmatched_sells,
+                a.duplicate_allocations,
+                a.temporal_violations,
+                t.total_sells,
+                t.total_buys,
+                t.completeness_candidates
+            FROM (
+                SELECT
+                    COALESCE(SUM(n), 0) AS total_allocations,
+                    COALESCE(SUM(unmatched), 0) AS unmatched_sells,
+                    COALESCE(SUM(duplicate_pairs), 0) AS duplicate_allocations,
+                    COALESCE(SUM(temporal), 0) AS temporal_violations
+                FROM per_sell
+            ) a
+            CROSS JOIN (
+                SELECT
+                    COALESCE(SUM(CASE WHEN tr.side = 'sell' THEN 1 ELSE 0 END), 0) AS total_sells,
+                    COALESCE(SUM(CASE WHEN tr.side = 'buy' THEN 1 ELSE 0 END), 0) AS total_buys,
+                    COALESCE(SUM(CASE WHEN tr.side = 'sell'
+                                       AND ABS(tr.size - COALESCE(ps.allocated_total, 0)) > 0.00001
+                                      THEN 1 ELSE 0 END), 0) AS completeness_candidates
+                FROM trade_records tr
+                LEFT JOIN per_sell ps
+                    ON tr.side = 'sell' AND ps.sell_order_id = tr.order_id
+                WHERE {trade_scope}
+            ) t
+        """).bindparams(*self._scope_bindparams(symbols)), params)
+
+        return {k: int(v) for k, v in query_result.fetchone()._mapping.items()}
+
     # =========================================================================
     # VALIDATION CHECKS
     # =========================================================================
 
-    async def _check_unmatched_sells(self, session, version: int, result: ValidationResult):
+    async def _check_unmatched_sells(self, session, version: int, symbols, counters: Dict, result: ValidationResult):
         """Check for unmatched sells (sells with no matching buy)."""
-        query_result = await session.execute(text("""
-            SELECT COUNT(*) as count
-            FROM fifo_allocations
-            WHERE allocation_version = :version AND buy_order_id IS NULL
-        """), {'version': version})
-
-        row = query_result.fetchone()
-        result.unmatched_sells = row[0]
+        result.unmatched_sells = counters['unmatched_sells']
 
         if result.unmatched_sells > 0:
             result.add_warning(
@@ -128,13 +218,18 @@ class AllocationValidator:
             )
             self.logger.warning(f"⚠️  {result.unmatched_sells} unmatched sells")
 
-    async def _check_allocation_completeness(self, session, version: int, result: ValidationResult):
+    async def _check_allocation_completeness(self, session, version: int, symbols, counters: Dict,
+                                             result: ValidationResult):
         """
         Check that all sells are fully allocated.
 
         For each sell, sum(allocated_size) should equal sell.size (within dust threshold).
         """
-        query_result = await session.execute(text("""
+        if counters['completeness_candidates'] == 0:
+            return
+
+        allocation_scope, trade_scope, params = self._scope_clauses(version, symbols, allocations='a', trades='s')
+        query_result = await session.execute(text(f"""
             SELECT
                 s.order_id,
                 s.symbol,
@@ -144,11 +239,11 @@ class AllocationValidator:
             FROM trade_records s
             LEFT JOIN fifo_allocations a
                 ON a.sell_order_id = s.order_id
-                AND a.allocation_version = :version
-            WHERE s.side = 'sell'
+                AND {allocation_scope}
+            WHERE s.side = 'sell' AND {trade_scope}
             GROUP BY s.order_id, s.symbol, s.size
             HAVING ABS(s.size - COALESCE(SUM(a.allocated_size), 0)) > 0.00001
-        """), {'version': version})
+        """).bindparams(*self._scope_bindparams(symbols)), params)
 
         rows = query_result.fetchall()
 
@@ -163,7 +258,8 @@ class AllocationValidator:
                 if discrepancy <= dust_threshold:
                     # Within dust threshold, ignore
                     continue
-                elif row_dict['allocated_total'] < row_dict['sell_size']:
+                elif (self.precision.safe_decimal(row_dict['allocated_total'])
+                      < self.precision.safe_decimal(row_dict['sell_size'])):
                     result.under_allocated_sells += 1
                     result.add_error(
                         f"Under-allocated sell {row_dict['order_id']}: "
@@ -181,18 +277,23 @@ class AllocationValidator:
             if result.over_allocated_sells > 0:
                 self.logger.error(f"❌ {result.over_allocated_sells} over-allocated sells")
 
-    async def _check_duplicate_allocations(self, session, version: int, result: ValidationResult):
+    async def _check_duplicate_allocations(self, session, version: int, symbols, counters: Dict,
+                                           result: ValidationResult):
         """Check for duplicate allocations (same buy→sell pair multiple times)."""
-        query_result = await session.execute(text("""
+        if counters['duplicate_allocations'] == 0:
+            return
+
+        allocation_scope, _, params = self._scope_clauses(version, symbols)
+        query_result = await session.execute(text(f"""
             SELECT
                 sell_order_id,
                 buy_order_id,
                 COUNT(*) as count
             FROM fifo_allocations
-            WHERE allocation_version = :version
+            WHERE {allocation_scope}
             GROUP BY sell_order_id, buy_order_id
             HAVING COUNT(*) > 1
-        """), {'version': version})
+        """).bindparams(*self._scope_bindparams(symbols)), params)
 
         rows = query_result.fetchall()
 
@@ -206,9 +307,14 @@ class AllocationValidator:
                 )
             self.logger.error(f"❌ {result.duplicate_allocations} duplicate allocations")
 
-    async def _check_temporal_consistency(self, session, version: int, result: ValidationResult):
+    async def _check_temporal_consistency(self, session, version: int, symbols, counters: Dict,
+                                          result: ValidationResult):
         """Check that buy_time <= sell_time for all matched allocations."""
-        query_result = await session.execute(text("""
+        if counters['temporal_violations'] == 0:
+            return
+
+        allocation_scope, _, params = self._scope_clauses(version, symbols, allocations='a')
+        query_result = await session.execute(text(f"""
             SELECT
                 a.id,
                 a.sell_order_id,
@@ -216,10 +322,10 @@ class AllocationValidator:
                 a.buy_time,
                 a.sell_time
             FROM fifo_allocations a
-            WHERE a.allocation_version = :version
+            WHERE {allocation_scope}
               AND a.buy_order_id IS NOT NULL
               AND a.buy_time > a.sell_time
-        """), {'version': version})
+        """).bindparams(*self._scope_bindparams(symbols)), params)
 
         rows = query_result.fetchall()
 
@@ -233,32 +339,35 @@ class AllocationValidator:
             self.logger.error(f"❌ {len(rows)} temporal consistency violations")
 
     # =========================================================================
-    # DATABASE HELPERS
+    # QUERY HELPERS
     # =========================================================================
 
-    async def _count_allocations(self, session, version: int) -> int:
-        """Count total allocations for a version."""
-        result = await session.execute(text("""
-            SELECT COUNT(*) as count FROM fifo_allocations WHERE allocation_version = :version
-        """), {'version': version})
-        row = result.fetchone()
-        return row[0]
-
-    async def _count_sells(self, session) -> int:
-        """Count total sell trades."""
-        result = await session.execute(text("""
-            SELECT COUNT(*) as count FROM trade_records WHERE side = 'sell'
-        """))
-        row = result.fetchone()
-        return row[0]
-
-    async def _count_buys(self, session) -> int:
-        """Count total buy trades."""
-        result = await session.execute(text("""
-            SELECT COUNT(*) as count FROM trade_records WHERE side = 'buy'
-        """))
-        row = result.fetchone()
-        return row[0]
+    @staticmethod
+    def _scope_clauses(version: int, symbols: Optional[List[str]], allocations: str = '', trades: str = 'tr'):
+        """
+        WHERE fragments scoping fifo_allocations (version, symbols) and
+        trade_records (symbols) under the given table aliases.
+
+        Returns (allocation_clause, trade_clause, params).
+        """
+        a = f"{allocations}." if allocations else ""
+        t = f"{trades}." if trades else ""
+        allocation_clause = f"{a}allocation_version = :version"
+        trade_clause = "1 = 1"
+        params = {'version': version}
+        if symbols:
+            allocation_clause += f" AND {a}symbol IN :symbols"
+            trade_clause = f"{t}symbol IN :symbols"
+            params['symbols'] = list(symbols)
+        return allocation_clause, trade_clause, params
+
+    @staticmethod
+    def _scope_bindparams(symbols: Optional[List[str]]):
+        return [bindparam('symbols', expanding=True)] if symbols else []
+
+    @staticmethod
+    def _elapsed_ms(start: float) -> float:
+        return (time.perf_counter() - start) * 1000
 
     # =========================================================================
     # REPORT GENERATION
@@ -6,7 +6,6 @@ import os
 import signal
 import time
 
-import aiohttp
 import faulthandler
 from decimal import Decimal
 from aiohttp import web
@@ -735,6 +734,7 @@ async def app_boot():
 
     # loaded here to avoid circular import
     from Api_manager.coinbase_api import CoinbaseAPI
+    from Api_manager.http_client import HttpClient
     from MarketDataManager.ticker_manager import TickerManager
     from MarketDataManager.webhook_order_book import OrderBookManager
 
@@ -754,7 +754,8 @@ async def app_boot():
     startup_event = asyncio.Event()
 
     try:
-        async with (aiohttp.ClientSession() as session):
+        async with HttpClient.get_instance() as http_client:
+            session = http_client.session  # Pooled keep-alive session shared by the REST helpers
 
             shared_utils_utility = SharedUtility.get_instance(logger_manager)
             coinbase_api = CoinbaseAPI(session, shared_utils_utility, logger_manager, None)
@@ -0,0 +1,6 @@
+"""
+Offline performance benchmarks for BotTrader.
+
+Each benchmark generates or replays local data, needs no database or exchange
+access, and checks that the optimized path matches the reference behaviour.
+"""
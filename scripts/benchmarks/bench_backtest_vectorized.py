@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: BacktestEngine vs. VectorizedBacktestEngine
+
+Generates a synthetic multi-symbol OHLCV history (prices as Decimal, like
+the database returns them) and runs both engines on it with the same
+strategy, then compares their trades. No database access is needed: the
+synthetic frame is passed to the engines as preloaded `ohlcv`.
+
+Usage:
+    python -m scripts.benchmarks.bench_backtest_vectorized --symbols 20 --days 5
+    python -m scripts.benchmarks.bench_backtest_vectorized --symbols 50 --days 90 --skip-reference
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Ensure project root is in path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backtest.config import BacktestConfig, StrategyConfig
+from backtest.engine import BacktestEngine
+from backtest.vectorized import VectorizedBacktestEngine
+
+BENCH_STRATEGY = StrategyConfig(
+    roc_buy_threshold=Decimal("1.5"),  # Synthetic walk is calmer than the live universe
+    take_profit_pct=Decimal("0.025"),
+    stop_loss_pct=Decimal("0.015"),
+    peak_min_profit_pct=Decimal("0.02"),
+    peak_breakeven_pct=Decimal("0.02"),
+    peak_drawdown_pct=Decimal("0.01"),
+    peak_smoothing_periods=3,
+    peak_max_hold_hours=6,
+)
+
+
+def generate_ohlcv(n_symbols: int, start: datetime, end: datetime, seed: int = 3,
+                   interval_minutes: int = 1) -> pd.DataFrame:
+    """Random-walk OHLCV for n_symbols from 48h before start to end (engine lookback)."""
+    rng = np.random.default_rng(seed)
+    times = pd.date_range(start - timedelta(hours=48), end, freq=f"{interval_minutes}min", tz='UTC')
+    frames = []
+    for i in range(n_symbols):
+        # Fat-tailed returns so momentum entries and every exit type occur
+        returns = rng.standard_t(3, len(times)) * 0.004
+        close = 100 * np.exp(np.cumsum(returns))
+        # Drop a few candles so symbols do not share every timestamp
+        keep = rng.random(len(times)) > 0.02
+        quantized = np.round(close[keep], 4)
+        frames.append(pd.DataFrame({
+            'time': times[keep],
+            'symbol': f"SYM{i:03d}-USD",
+            'open': quantized,
+            'high': quantized,
+            'low': quantized,
+            'close': quantized,
+            'volume': 1.0,
+        }))
+    df = pd.concat(frames, ignore_index=True).sort_values(['time', 'symbol'], ignore_index=True)
+    for col in ['open', 'high', 'low', 'close', 'volume']:
+        df[col] = [Decimal(f"{v:.4f}") for v in df[col]]
+    return df
+
+
+def run_engine(engine_cls, strategy, config, data):
+    """Run a backtest engine on an in-memory OHLCV frame; returns (results, seconds)."""
+    engine = engine_cls(strategy, config, db_url=None, ohlcv=data)
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = engine.run()
+    return results, time.perf_counter() - t0
+
+
+def trade_keys(results):
+    """Comparable view of a run's trades."""
+    return [
+        (t.symbol, t.entry_time, t.exit_time, t.exit_reason, t.entry_price, t.exit_price,
+         round(t.net_pnl, 8))
+        for t in results.trades
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark BacktestEngine vs. VectorizedBacktestEngine')
+    parser.add_argument('--symbols', type=int, default=20)
+    parser.add_argument('--days', type=int, default=5)
+    parser.add_argument('--skip-reference', action='store_true',
+                        help='Only run the vectorized engine (reference is O(T·N) per step)')
+    args = parser.parse_args()
+
+    start = datetime(2025, 6, 1, tzinfo=timezone.utc)
+    end = start + timedelta(days=args.days)
+    config = BacktestConfig(start_date=start, end_date=end, verbose=False)
+    data = generate_ohlcv(args.symbols, start, end)
+    print(f"Synthetic OHLCV: {args.symbols} symbols × {args.days} days ({len(data):,} candles)")
+
+    fast, fast_s = run_engine(VectorizedBacktestEngine, BENCH_STRATEGY, config, data)
+    print(f"Vectorized: {fast_s:8.2f}s  {fast.total_trades} trades  final ${fast.final_capital:,.2f}")
+    if args.skip_reference:
+        return 0
+
+    slow, slow_s = run_engine(BacktestEngine, BENCH_STRATEGY, config, data)
+    print(f"Reference:  {slow_s:8.2f}s  {slow.total_trades} trades  final ${slow.final_capital:,.2f}")
+
+    if trade_keys(fast) != trade_keys(slow):
+        print("❌ Trades differ between engines")
+        return 1
+    print(f"✅ Trades identical, speedup {slow_s / fast_s:.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark: shared_data blob encodings (JSON vs. columnar)
+
+Encodes and decodes a market_data / order_management snapshot with the JSON
+encoding (DataFrames as records) and the columnar one
+(SharedDataManager.blob_codec) and reports blob size and encode / decode
+time, the costs save_data() and every blob reader (refresh,
+DBSharedDataView) pay per round trip.
+
+The snapshot is either a shared_data row exported to a file (the `data`
+column, in either encoding) or a synthetic one sized like production.
+
+Usage:
+    python -m scripts.benchmarks.bench_blob_codec
+    python -m scripts.benchmarks.bench_blob_codec --snapshot market_data.json
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root is in path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from scripts.benchmarks.bench_shared_replication import generate_state
+from SharedDataManager.shared_data_manager import SharedDataManager, decode_shared_data, encode_shared_data
+
+
+def timed(fn, repeat: int):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return result, statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark shared_data blob encodings')
+    parser.add_argument('--snapshot', help='File holding an exported shared_data.data value')
+    parser.add_argument('--tickers', type=int, default=500)
+    parser.add_argument('--orders', type=int, default=40)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.snapshot:
+        blobs = {'snapshot': decode_shared_data(Path(args.snapshot).read_text())}
+    else:
+        market_data, order_management = generate_state(args.tickers, args.orders)
+        blobs = {'market_data': market_data,
+                 'order_management': SharedDataManager.dismantle_order_management(order_management)}
+    print(f"Snapshot: {args.snapshot or f'synthetic, {args.tickers} tickers, {args.orders} orders'}; "
+          f"median of {args.repeat}")
+    print(f"{'':28}{'size':>12}{'encode':>12}{'decode':>12}")
+    for name, data in blobs.items():
+        for encoding in ('json', 'columnar'):
+            encoded, encode_s = timed(lambda: encode_shared_data(data, encoding), args.repeat)
+            _, decode_s = timed(lambda: decode_shared_data(encoded), args.repeat)
+            print(f"{name + ' / ' + encoding:28}{len(encoded) / 1024:8.1f} KiB"
+                  f"{encode_s * 1000:9.2f} ms{decode_s * 1000:9.2f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark: FIFO allocation core
+
+Generates a synthetic single-symbol fill history and allocates it with:
+- the streaming lot-queue core (FifoAllocationEngine._allocate_symbol_stream)
+- the per-sell reference path (FifoAllocationEngine._allocate_sell_fifo)
+
+Both results are compared field by field; the benchmark fails if they differ.
+The reference path is quadratic, so it is skipped above --reference-limit fills.
+
+Usage:
+    python -m scripts.benchmarks.bench_fifo_allocation --fills 100000
+    python -m scripts.benchmarks.bench_fifo_allocation --fills 20000 --reference-limit 20000
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+# Ensure project root is in path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from fifo_engine.engine import FifoAllocationEngine
+
+
+def generate_fills(n_fills: int, symbol: str = 'BENCH-USD', seed: int = 7):
+    """Generate a chronological buy/sell history with partial fills and ties."""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    buys, sells = [], []
+    position = Decimal('0')
+    t = start
+
+    for i in range(n_fills):
+        # Occasional identical timestamps exercise the (order_time, order_id) tie-break
+        if rng.random() > 0.1:
+            t += timedelta(seconds=rng.randint(1, 90))
+
+        size = Decimal(rng.randint(1, 5000)) / Decimal('1000')
+        price = Decimal(rng.randint(90000, 110000)) / Decimal('1000')
+        fees = (price * size * Decimal('0.004')).quantize(Decimal('0.00000001'))
+
+        # Mostly sell what we hold, sometimes oversell to create unmatched sells
+        side = 'buy' if position <= 0 or rng.random() < 0.52 else 'sell'
+        record = {
+            'order_id': f"{uuid.UUID(int=rng.getrandbits(128))}",
+            'symbol': symbol,
+            'side': side,
+            'size': size,
+            'price': price,
+            'total_fees_usd': fees,
+            'order_time': t,
+        }
+        if side == 'buy':
+            buys.append(record)
+            position += size
+        else:
+            sells.append(record)
+            position -= size
+
+    sells.sort(key=lambda s: (s['order_time'], s['order_id']))
+    return buys, sells
+
+
+async def run_reference(engine, buys, sells, version, batch_id):
+    """Allocate with the per-sell reference implementation."""
+    session = AsyncMock()
+    inventory = engine._initialize_inventory(buys)
+    buys_dict = {b['order_id']: b for b in buys}
+    allocations = []
+    for sell in sells:
+        allocations.extend(await engine._allocate_sell_fifo(
+            session=session,
+            sell=sell,
+            inventory=inventory,
+            buys_dict=buys_dict,
+            version=version,
+            batch_id=batch_id
+        ))
+    return allocations
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the FIFO allocation core')
+    parser.add_argument('--fills', type=int, default=100_000, help='Total number of synthetic fills')
+    parser.add_argument('--reference-limit', type=int, default=20_000,
+                        help='Run the quadratic reference path only up to this many fills')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    logger_manager = MagicMock()
+    engine = FifoAllocationEngine(None, logger_manager, None)
+    version, batch_id = 1, uuid.UUID(int=0)
+
+    buys, sells = generate_fills(args.fills, seed=args.seed)
+    print(f"Fills: {args.fills:,} ({len(buys):,} buys, {len(sells):,} sells)")
+
+    t0 = time.perf_counter()
+    streamed, unmatched = engine._allocate_symbol_stream(buys, sells, version, batch_id)
+    stream_s = time.perf_counter() - t0
+    print(f"Streaming core:  {stream_s:8.3f}s  {len(streamed):,} allocations ({len(unmatched):,} unmatched)")
+
+    if args.fills > args.reference_limit:
+        print(f"Reference path:  skipped (> {args.reference_limit:,} fills)")
+        return 0
+
+    t0 = time.perf_counter()
+    reference = asyncio.run(run_reference(engine, buys, sells, version, batch_id))
+    ref_s = time.perf_counter() - t0
+    print(f"Reference path:  {ref_s:8.3f}s  {len(reference):,} allocations")
+
+    if streamed != reference:
+        mismatch = next(
+            (i for i, (a, b) in enumerate(zip(streamed, reference)) if a != b),
+            min(len(streamed), len(reference))
+        )
+        print(f"❌ Allocations differ (first mismatch at index {mismatch})")
+        return 1
+
+    print(f"✅ Allocations identical, speedup {ref_s / stream_s:,.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-row vs. bulk persistence of FIFO allocations
+
+Allocates every symbol in memory, then writes the allocations and
+unmatched-sell review items twice inside a rolled-back transaction:
+- per-row: executemany INSERT + one upsert per review item (bulk_writes=False)
+- bulk: COPY on Postgres/asyncpg, batched Core INSERT elsewhere (bulk_writes=True)
+
+Reports rows per second for each path. Nothing is committed.
+
+Usage:
+    python -m scripts.benchmarks.bench_fifo_bulk_write --symbols 20 --fills-per-symbol 10000
+    python -m scripts.benchmarks.bench_fifo_bulk_write --dsn postgresql://bot_user@127.0.0.1:5432/bot_trader_db
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Ensure project root is in path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from fifo_engine.engine import FifoAllocationEngine
+from scripts.benchmarks.bench_fifo_allocation import generate_fills
+from scripts.benchmarks.sqlite_standin import SQLiteSessionManager
+
+
+async def write_all(engine, db, outcomes, version, batch_id) -> float:
+    """Persist every symbol's rows in one transaction, roll back, return seconds spent."""
+    async with db.async_session() as session:
+        transaction = await session.begin()
+        try:
+            t0 = time.perf_counter()
+            for symbol, allocations, review_items in outcomes:
+                await engine._save_allocations(session, allocations)
+                if engine.bulk_writer is not None:
+                    await engine.bulk_writer.write_review_items(session, review_items)
+                else:
+                    for item in review_items:
+                        await engine._add_to_review_queue(session=session, **item)
+            return time.perf_counter() - t0
+        finally:
+            await transaction.rollback()
+
+
+async def run(args):
+    logger_manager = MagicMock()
+
+    if args.dsn:
+        from database_manager.database_session_manager import DatabaseSessionManager
+        db = DatabaseSessionManager(args.dsn)
+        print(f"Database: Postgres ({args.dsn.split('@')[-1]})")
+    else:
+        tmpdir = tempfile.mkdtemp(prefix='fifo_bench_')
+        db = SQLiteSessionManager(os.path.join(tmpdir, 'fifo.sqlite'))
+        await db.create_schema()
+        trades = []
+        for i in range(args.symbols):
+            buys, sells = generate_fills(args.fills_per_symbol, symbol=f"SYM{i:03d}-USD", seed=i)
+            trades.extend(buys + sells)
+        await db.insert_trades(trades)
+        print(f"Database: SQLite stand-in, {args.symbols} symbols × {args.fills_per_symbol:,} fills")
+
+    per_row = FifoAllocationEngine(db, logger_manager, None, bulk_writes=False)
+    bulk = FifoAllocationEngine(db, logger_manager, None, bulk_writes=True)
+    version, batch_id = args.version, uuid.uuid4()
+
+    try:
+        async with db.async_session() as session:
+            fills_by_symbol = await bulk._fetch_all_fills(session)
+
+        outcomes = []
+        total_rows = 0
+        for symbol, (buys, sells) in sorted(fills_by_symbol.items()):
+            allocations, unmatched = bulk._allocate_symbol_stream(buys, sells, version, batch_id)
+            review_items = [
+                {'order_id': sell['order_id'], 'issue_type': 'unmatched_sell', 'severity': 'medium',
+                 'description': f"Sell has {remaining} {symbol} with no matching buy"}
+                for sell, remaining in unmatched
+            ]
+            outcomes.append((symbol, allocations, review_items))
+            total_rows += len(allocations) + len(review_items)
+
+        print(f"Rows to write: {total_rows:,}")
+        for label, engine in (('per-row', per_row), ('bulk', bulk)):
+            seconds = await write_all(engine, db, outcomes, version, batch_id)
+            print(f"{label:>8}: {seconds:8.2f}s  {total_rows / seconds:>12,.0f} rows/s")
+        return 0
+    finally:
+        await db.engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-row vs. bulk FIFO persistence')
+    parser.add_argument('--symbols', type=int, default=20)
+    parser.add_argument('--fills-per-symbol', type=int, default=10_000)
+    parser.add_argument('--version', type=int, default=900, help='Scratch allocation version')
+    parser.add_argument('--dsn', help='Run against an existing Postgres database instead of SQLite')
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
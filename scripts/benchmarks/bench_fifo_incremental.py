@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark: incremental FIFO allocation from a watermark
+
+For growing synthetic histories, compares the allocation cost of:
+- a full recompute over history + new fills
+- an incremental pass over only the new fills, resumed from the open lots
+  left at the watermark (what compute_incremental() does per symbol)
+
+The incremental cost should stay flat as history grows and track the number
+of new fills. Both results are checked against each other.
+
+Usage:
+    python -m scripts.benchmarks.bench_fifo_incremental
+    python -m scripts.benchmarks.bench_fifo_incremental --history 20000 100000 400000 --new-fills 2000
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Ensure project root is in path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from fifo_engine.engine import FifoAllocationEngine
+from scripts.benchmarks.bench_fifo_allocation import generate_fills
+
+
+def split_sides(fills):
+    return [f for f in fills if f['side'] == 'buy'], [f for f in fills if f['side'] == 'sell']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark incremental FIFO allocation')
+    parser.add_argument('--history', type=int, nargs='+', default=[20_000, 100_000, 200_000],
+                        help='History sizes (fills already behind the watermark)')
+    parser.add_argument('--new-fills', type=int, default=1_000, help='Fills appended since the watermark')
+    args = parser.parse_args()
+
+    engine = FifoAllocationEngine(None, MagicMock(), None)
+    version, batch_id = 1, uuid.UUID(int=0)
+
+    print(f"{'history':>10} {'new':>7} {'full (s)':>10} {'incremental (s)':>16} {'speedup':>9}")
+    for history in args.history:
+        buys, sells = generate_fills(history + args.new_fills)
+        fills = sorted(buys + sells, key=lambda f: (f['order_time'], f['order_id']))
+
+        # Place the watermark on a time boundary
+        cut = history
+        while cut < len(fills) and fills[cut]['order_time'] == fills[cut - 1]['order_time']:
+            cut += 1
+        old_buys, old_sells = split_sides(fills[:cut])
+        new_buys, new_sells = split_sides(fills[cut:])
+
+        # State at the watermark (what the previous nightly run persisted)
+        lots = deque()
+        previous, _ = engine._allocate_symbol_stream(old_buys, old_sells, version, batch_id, lots=lots)
+
+        t0 = time.perf_counter()
+        full, _ = engine._allocate_symbol_stream(buys, sells, version, batch_id)
+        full_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        incremental, _ = engine._allocate_symbol_stream(new_buys, new_sells, version, batch_id, lots=lots)
+        incr_s = time.perf_counter() - t0
+
+        if previous + incremental != full:
+            print(f"❌ Incremental allocations differ from full recompute at history={history:,}")
+            return 1
+
+        print(f"{history:>10,} {len(fills) - cut:>7,} {full_s:>10.3f} {incr_s:>16.4f} {full_s / incr_s:>8.0f}x")
+
+    print("✅ Incremental allocations identical to full recompute")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark: serial vs. parallel all-symbols FIFO computation
+
+Seeds a SQLite stand-in with synthetic fills for many symbols, then runs
+FifoAllocationEngine.compute_all_symbols() and compute_all_symbols_parallel()
+against it and checks both produce the same allocations.
+
+With --dsn the benchmark runs against an existing (local) Postgres database
+instead, using its real trade_records and a scratch allocation version that is
+cleared afterwards.
+
+Usage:
+    python -m scripts.benchmarks.bench_fifo_parallel --symbols 40 --fills-per-symbol 5000 --workers 4
+    python -m scripts.benchmarks.bench_fifo_parallel --dsn postgresql://bot_user@127.0.0.1:5432/bot_trader_db
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from sqlalchemy import text
+
+# Ensure project root is in path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from fifo_engine.engine import FifoAllocationEngine
+from scripts.benchmarks.bench_fifo_allocation import generate_fills
+from scripts.benchmarks.sqlite_standin import SQLiteSessionManager
+
+ALLOCATION_COLUMNS = (
+    "sell_order_id, COALESCE(buy_order_id, ''), allocated_size, cost_basis_usd, "
+    "proceeds_usd, net_proceeds_usd, pnl_usd"
+)
+
+
+async def fetch_allocations(db, version: int):
+    async with db.async_session() as session:
+        result = await session.execute(text(f"""
+            SELECT {ALLOCATION_COLUMNS}
+            FROM fifo_allocations
+            WHERE allocation_version = :version
+            ORDER BY sell_order_id, COALESCE(buy_order_id, '')
+        """), {'version': version})
+        return [tuple(str(v) for v in row) for row in result.fetchall()]
+
+
+async def clear_version(db, version: int):
+    async with db.async_session() as session:
+        async with session.begin():
+            for table in ('fifo_allocations', 'fifo_inventory_snapshot', 'fifo_symbol_watermark'):
+                await session.execute(
+                    text(f"DELETE FROM {table} WHERE allocation_version = :version"), {'version': version}
+                )
+
+
+async def run(args):
+    logger_manager = MagicMock()
+
+    if args.dsn:
+        from database_manager.database_session_manager import DatabaseSessionManager
+        db = DatabaseSessionManager(args.dsn)
+        print(f"Database: Postgres ({args.dsn.split('@')[-1]})")
+    else:
+        tmpdir = tempfile.mkdtemp(prefix='fifo_bench_')
+        db = SQLiteSessionManager(os.path.join(tmpdir, 'fifo.sqlite'))
+        await db.create_schema()
+        trades = []
+        for i in range(args.symbols):
+            buys, sells = generate_fills(args.fills_per_symbol, symbol=f"SYM{i:03d}-USD", seed=i)
+            trades.extend(buys + sells)
+        await db.insert_trades(trades)
+        print(f"Database: SQLite stand-in, {args.symbols} symbols × {args.fills_per_symbol:,} fills")
+
+    engine = FifoAllocationEngine(db, logger_manager, None)
+    serial_version, parallel_version = args.version, args.version + 1
+
+    try:
+        t0 = time.perf_counter()
+        serial = await engine.compute_all_symbols(version=serial_version, triggered_by='benchmark')
+        serial_s = time.perf_counter() - t0
+        if not serial.success:
+            print(f"❌ Serial run failed: {serial.error_message}")
+            return 1
+        print(f"Serial:   {serial_s:8.2f}s  {serial.allocations_created:,} allocations")
+
+        t0 = time.perf_counter()
+        parallel = await engine.compute_all_symbols_parallel(
+            version=parallel_version, workers=args.workers, pool=args.pool, triggered_by='benchmark'
+        )
+        parallel_s = time.perf_counter() - t0
+        print(f"Parallel: {parallel_s:8.2f}s  {parallel.allocations_created:,} allocations "
+              f"({args.workers} {args.pool} workers)")
+        for symbol, error in parallel.symbols_failed.items():
+            print(f"   ❌ {symbol}: {error}")
+        if not parallel.success:
+            return 1
+
+        if await fetch_allocations(db, serial_version) != await fetch_allocations(db, parallel_version):
+            print("❌ Parallel allocations differ from serial allocations")
+            return 1
+
+        print(f"✅ Allocations identical, speedup {serial_s / parallel_s:.2f}x")
+        return 0
+    finally:
+        if args.dsn:
+            await clear_version(db, serial_version)
+            await clear_version(db, parallel_version)
+        await db.engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark serial vs. parallel FIFO computation')
+    parser.add_argument('--symbols', type=int, default=40)
+    parser.add_argument('--fills-per-symbol', type=int, default=5_000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 4)
+    parser.add_argument('--pool', choices=('process', 'thread'), default='process')
+    parser.add_argument('--version', type=int, default=900,
+                        help='Scratch allocation version (version and version+1 are used)')
+    parser.add_argument('--dsn', help='Run against an existing Postgres database instead of SQLite')
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark: REST calls with a session per request vs. the pooled HttpClient
+
+Starts a local mock HTTP server (a candles endpoint with a small JSON body
+and optional --latency) and issues --requests calls at --concurrency:
+
+- per-request: a new aiohttp.ClientSession per call (what fetch_ohlcv and
+  fetch_open_orders did): new TCP connection, DNS lookup and, against the
+  real API, TLS handshake every time
+- pooled: HttpClient's shared session with keep-alive connections
+
+Reports throughput, latency percentiles and how many TCP connections the
+server accepted. Pass --url to target another mock server instead (e.g. one
+behind TLS, where the handshake savings are larger).
+
+Usage:
+    python -m scripts.benchmarks.bench_http_client
+    python -m scripts.benchmarks.bench_http_client --requests 2000 --concurrency 50 --latency 0.005
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import aiohttp
+from aiohttp import web
+
+# Ensure project root is in path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from Api_manager.http_client import HttpClient, HttpClientConfig
+
+CANDLES = {"candles": [{"start": str(1700000000 + 60 * i), "low": "1", "high": "2", "open": "1.5",
+                        "close": "1.6", "volume": "10"} for i in range(50)]}
+
+
+async def start_mock_server(latency: float):
+    peers = set()
+
+    async def candles(request):
+        peers.add(request.transport.get_extra_info('peername'))
+        if latency:
+            await asyncio.sleep(latency)
+        return web.json_response(CANDLES)
+
+    app = web.Application()
+    app.router.add_get('/api/v3/brokerage/products/{product_id}/candles', candles)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/api/v3/brokerage/products/BTC-USD/candles", peers
+
+
+async def per_request(url: str):
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url) as resp:
+            await resp.json()
+
+
+def pooled(client: HttpClient):
+    async def call(url: str):
+        async with client.session.get(url) as resp:
+            await resp.json()
+    return call
+
+
+async def drive(call, url: str, requests: int, concurrency: int):
+    latencies, queue = [], asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            t0 = time.perf_counter()
+            await call(url)
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - t0, latencies
+
+
+async def run(args):
+    runner, url, peers = (None, args.url, set()) if args.url else await start_mock_server(args.latency)
+    client = HttpClient(HttpClientConfig(limit_per_host=args.concurrency))
+    print(f"{args.requests} requests, concurrency {args.concurrency}, server latency {args.latency * 1000:.1f} ms")
+    print(f"{'':13}{'req/s':>9}{'p50':>10}{'p99':>10}{'server conns':>14}")
+    try:
+        for name, call in (('per-request', per_request), ('pooled', pooled(client))):
+            peers.clear()
+            elapsed, latencies = await drive(call, url, args.requests, args.concurrency)
+            q = statistics.quantiles(latencies, n=100)
+            conns = len(peers) if not args.url else '-'
+            print(f"{name:13}{args.requests / elapsed:9.0f}{q[49] * 1000:8.2f}ms{q[98] * 1000:8.2f}ms{conns:>14}")
+        print(f"pooled client: {client.stats()}")
+    finally:
+        await client.close()
+        if runner is not None:
+            await runner.cleanup()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-request sessions vs. the pooled HttpClient')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.002, help='Mock server delay per request (seconds)')
+    parser.add_argument('--url', help='Use this mock endpoint instead of starting a local server')
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
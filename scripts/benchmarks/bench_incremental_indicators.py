@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Indicators.calculate_indicators() vs. IncrementalIndicators
+
+Replays OHLCV one candle per cycle the way TradingStrategy sees it: every
+cycle each symbol's most recent `--window` candles are handed to the
+indicator code, whose last row feeds buy_sell_scoring(). The full recompute
+is timed on a sample of symbols (it is slow) and extrapolated; the
+incremental engine is timed on every symbol. Last rows are compared for
+parity on the sampled symbols.
+
+Candles are synthetic by default; `--cache` replays recorded candles from a
+columnar OHLCV cache (see backtest/ohlcv_cache.py) instead.
+
+Usage:
+    python -m scripts.benchmarks.bench_incremental_indicators --symbols 300 --cycles 30
+    python -m scripts.benchmarks.bench_incremental_indicators --cache data/ohlcv_cache --days 2
+"""
+
+import argparse
+import logging
+import math
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+# Ensure project root is in path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import sighook.indicators
+from sighook.incremental_indicators import INDICATOR_COLUMNS, IncrementalIndicators
+from sighook.indicators import Indicators
+
+
+def make_indicators(logger=None, **overrides) -> Indicators:
+    """Indicators with its built-in defaults (no .env / CentralConfig needed)"""
+    settings = dict(
+        bb_window=None, bb_std=None, bb_lower_band=None, bb_upper_band=None,
+        macd_fast=None, macd_slow=None, macd_signal=None,
+        rsi_window=None, rsi_buy=None, rsi_sell=None, roc_window=None,
+        _roc_buy_24h=None, _roc_sell_24h=None,
+        sma_fast=None, sma_slow=None, sma=None, sma_volatility=None,
+        buy_ratio=None, sell_ratio=None, atr_window=None, _swing_window=20,
+    )
+    settings.update(overrides)
+    with mock.patch.object(sighook.indicators, 'CentralConfig', lambda: SimpleNamespace(**settings)):
+        return Indicators(logger or logging.getLogger('bench_incremental_indicators'))
+
+
+def generate_ohlcv(n_symbols: int, n_candles: int, seed: int = 11) -> Dict[str, pd.DataFrame]:
+    """Random-walk 1-minute candles per symbol, with flat stretches like illiquid markets"""
+    rng = np.random.default_rng(seed)
+    times = pd.date_range('2025-06-01', periods=n_candles, freq='1min', tz='UTC')
+    data = {}
+    for i in range(n_symbols):
+        returns = rng.standard_t(3, n_candles) * 0.003
+        returns[rng.random(n_candles) < 0.15] = 0.0
+        close = np.round(100 * np.exp(np.cumsum(returns)), 4)
+        spread = np.abs(rng.normal(0, 0.002, n_candles)) * close
+        data[f"SYM{i:03d}-USD"] = pd.DataFrame({
+            'time': times,
+            'open': np.r_[close[0], close[:-1]],
+            'high': np.round(close + spread, 4),
+            'low': np.round(close - spread, 4),
+            'close': close,
+            'volume': np.round(rng.lognormal(3, 1, n_candles), 2),
+        })
+    return data
+
+
+def load_cached_ohlcv(cache_dir: str, days: int) -> Dict[str, pd.DataFrame]:
+    """Recorded candles per symbol from a columnar OHLCV cache"""
+    from backtest.ohlcv_cache import OHLCVCache
+
+    cache = OHLCVCache(cache_dir)
+    end = cache.last_time()
+    if end is None:
+        raise SystemExit(f"Empty OHLCV cache: {cache_dir}")
+    df = cache.load(end - pd.Timedelta(days=days), end)
+    return {
+        symbol: rows.drop(columns='symbol').reset_index(drop=True)
+        for symbol, rows in df.groupby('symbol', sort=True)
+    }
+
+
+def mismatched_columns(full_row: pd.Series, incremental_row: pd.Series, rel: float = 1e-9) -> List[str]:
+    """Indicator columns whose values differ beyond float rounding (tuple decisions must match)"""
+    def close_enough(a, b):
+        a, b = float(a), float(b)
+        if math.isnan(a) or math.isnan(b):
+            return math.isnan(a) and math.isnan(b)
+        return math.isclose(a, b, rel_tol=rel, abs_tol=1e-9)
+
+    mismatched = []
+    for column in INDICATOR_COLUMNS:
+        a, b = full_row[column], incremental_row[column]
+        if isinstance(a, tuple):
+            same = (isinstance(b, tuple) and a[0] == b[0]
+                    and close_enough(a[1], b[1]) and close_enough(a[2], b[2]))
+        else:
+            same = close_enough(a, b)
+        if not same:
+            mismatched.append(column)
+    return mismatched
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark full vs. incremental indicator calculation')
+    parser.add_argument('--symbols', type=int, default=300)
+    parser.add_argument('--window', type=int, default=720, help='Candles per symbol per cycle (MAX_OHLCV_ROWS)')
+    parser.add_argument('--cycles', type=int, default=30)
+    parser.add_argument('--reference-symbols', type=int, default=5,
+                        help='Symbols timed with the full recompute (extrapolated to --symbols)')
+    parser.add_argument('--quote-deci', type=int, default=4)
+    parser.add_argument('--cache', help='Replay recorded candles from this OHLCV cache directory')
+    parser.add_argument('--days', type=int, default=2, help='Days of recorded candles to replay (with --cache)')
+    args = parser.parse_args()
+
+    if args.cache:
+        data = load_cached_ohlcv(args.cache, args.days)
+        cycles = min(len(df) for df in data.values()) - args.window
+        if cycles < 1:
+            raise SystemExit(f"Need more than {args.window} candles per symbol; increase --days")
+        cycles = min(cycles, args.cycles)
+        print(f"Recorded OHLCV: {len(data)} symbols from {args.cache}")
+    else:
+        data = generate_ohlcv(args.symbols, args.window + args.cycles)
+        cycles = args.cycles
+        print(f"Synthetic OHLCV: {args.symbols} symbols × {args.window + cycles} candles")
+
+    indicators = make_indicators()
+    logging.getLogger('bench_incremental_indicators').setLevel(logging.ERROR)
+    engine = IncrementalIndicators(indicators)
+    symbols = sorted(data)
+    sample = symbols[:args.reference_symbols]
+
+    # Warm-up cycle: seeds the rolling state from the first window (one-off cost)
+    t0 = time.process_time()
+    for symbol in symbols:
+        engine.calculate_indicators(symbol, data[symbol].iloc[:args.window], args.quote_deci)
+    seed_s = time.process_time() - t0
+
+    incremental_s, reference_s, mismatches = 0.0, 0.0, 0
+    for cycle in range(1, cycles + 1):
+        windows = {s: data[s].iloc[cycle:cycle + args.window].reset_index(drop=True) for s in symbols}
+
+        t0 = time.process_time()
+        rows = {s: engine.calculate_indicators(s, windows[s], args.quote_deci) for s in symbols}
+        incremental_s += time.process_time() - t0
+
+        for symbol in sample:
+            window = windows[symbol].copy()
+            t0 = time.process_time()
+            full = indicators.calculate_indicators(window, args.quote_deci)
+            reference_s += time.process_time() - t0
+            mismatches += bool(mismatched_columns(full.iloc[-1], rows[symbol].iloc[-1]))
+
+    per_cycle_inc = incremental_s / cycles
+    per_cycle_ref = reference_s / cycles / max(len(sample), 1) * len(symbols)
+    print(f"Seeding (first cycle):          {seed_s:8.3f}s CPU")
+    print(f"Full recompute per cycle:       {per_cycle_ref:8.3f}s CPU "
+          f"(extrapolated from {len(sample)} symbols)")
+    print(f"Incremental per cycle:          {per_cycle_inc:8.3f}s CPU "
+          f"({per_cycle_inc / len(symbols) * 1e6:.0f} µs/symbol)")
+
+    if mismatches:
+        print(f"❌ {mismatches} last rows differ from the full recompute")
+        return 1
+    print(f"✅ Last rows match on {len(sample)} symbols × {cycles} cycles, "
+          f"speedup {per_cycle_ref / per_cycle_inc:.0f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Coinbase JWT signing per request vs. JwtCache
+
+Replays a burst of REST auth requests (order placement, cancels, OHLCV
+backfill over --symbols products) and times getting a token for each:
+
+- library: coinbase.jwt_generator.build_rest_jwt per request (PEM parse +
+  ECDSA signature every time; the previous generate_rest_jwt)
+- sign: JwtCache with caching disabled (parsed key reused, still one
+  signature per request)
+- cached: JwtCache (one signature per method + path per token lifetime)
+
+Uses a throwaway P-256 key; nothing is sent anywhere.
+
+Usage:
+    python -m scripts.benchmarks.bench_jwt_cache
+    python -m scripts.benchmarks.bench_jwt_cache --requests 20000 --symbols 300
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+from coinbase import jwt_generator
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+# Ensure project root is in path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from Api_manager.jwt_cache import JwtCache
+
+
+def workload(requests: int, symbols: int, rng: random.Random) -> list:
+    paths = [('POST', '/api/v3/brokerage/orders'), ('POST', '/api/v3/brokerage/orders/batch_cancel'),
+             ('GET', '/api/v3/brokerage/orders/historical/batch'), ('GET', '/api/v3/brokerage/best_bid_ask')]
+    candles = [('GET', f'/api/v3/brokerage/products/A{i:03d}-USD/candles') for i in range(symbols)]
+    return [jwt_generator.format_jwt_uri(*(rng.choice(paths) if rng.random() < 0.3 else rng.choice(candles)))
+            for _ in range(requests)]
+
+
+def run(args):
+    key = ec.generate_private_key(ec.SECP256R1())
+    secret = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                               serialization.NoEncryption()).decode()
+    key_name = 'organizations/bench/apiKeys/bench'
+    uris = workload(args.requests, args.symbols, random.Random(3))
+
+    sign_cache, cache = JwtCache(enabled=False), JwtCache()
+    modes = {
+        'library': (lambda uri: jwt_generator.build_rest_jwt(uri, key_name, secret), None),
+        'sign': (lambda uri: sign_cache.token(key_name, secret, uri), sign_cache),
+        'cached': (lambda uri: cache.token(key_name, secret, uri), cache),
+    }
+    print(f"{args.requests} requests over {len(set(uris))} distinct method/paths")
+    print(f"{'':10}{'total':>10}{'per token':>12}{'tokens/s':>12}{'signatures':>12}")
+    for name, (get_token, jwt_cache) in modes.items():
+        t0 = time.perf_counter()
+        for uri in uris:
+            get_token(uri)
+        elapsed = time.perf_counter() - t0
+        signatures = jwt_cache.stats()['signed'] if jwt_cache is not None else len(uris)
+        print(f"{name:10}{elapsed * 1000:8.0f}ms{elapsed / len(uris) * 1e6:10.1f}µs"
+              f"{len(uris) / elapsed:12.0f}{signatures:12}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark JWT signing per request vs. JwtCache')
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--symbols', type=int, default=200, help='Products in the OHLCV backfill')
+    return run(parser.parse_args())
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark: level2 order book replay and queries
+
+Replays a level2 capture through L2BookManager (decode, sequence check, apply)
+and times the queries the order path uses (best bid/ask, spread, top-N depth,
+VWAP to a size).
+
+The capture is a JSONL file with one raw market websocket message per line;
+without one, Coinbase-shaped l2_data messages are generated (a deep snapshot
+per product, then updates concentrated near the top of the book).
+
+Usage:
+    python -m scripts.benchmarks.bench_l2_book
+    python -m scripts.benchmarks.bench_l2_book --capture level2.jsonl
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+from typing import List
+
+# Ensure project root is in path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from MarketDataManager.l2_order_book import L2_CHANNEL, L2BookManager
+from webhook.ws_decoder import get_decoder
+
+
+def generate_capture(products: int = 5, levels: int = 1000, messages: int = 50000,
+                     updates_per_message: int = 5, seed: int = 1) -> List[str]:
+    """Raw l2_data messages: one snapshot per product, then level updates"""
+    rng = random.Random(seed)
+    tick = Decimal('0.01')
+    mids = {f"SYM{i}-USD": Decimal(rng.randint(1000, 100000)) for i in range(products)}
+    frames, seq = [], 0
+
+    def level(side, price, qty):
+        return {'side': side, 'event_time': '2025-06-01T00:00:00.123456Z',
+                'price_level': str(price), 'new_quantity': qty}
+
+    for product, mid in mids.items():
+        updates = [level('bid', mid - tick * (i + 1), f"{rng.uniform(0.01, 5):.8f}") for i in range(levels)]
+        updates += [level('offer', mid + tick * (i + 1), f"{rng.uniform(0.01, 5):.8f}") for i in range(levels)]
+        frames.append(json.dumps({'channel': L2_CHANNEL, 'client_id': '', 'timestamp': '2025-06-01T00:00:00Z',
+                                  'sequence_num': seq, 'events': [{'type': 'snapshot', 'product_id': product,
+                                                                   'updates': updates}]}))
+        seq += 1
+
+    products_list = list(mids)
+    for _ in range(messages):
+        product = rng.choice(products_list)
+        mid = mids[product]
+        updates = []
+        for _ in range(updates_per_message):
+            side = rng.choice(('bid', 'offer'))
+            distance = tick * (1 + int(rng.expovariate(0.05)))  # Mostly near the top
+            price = mid - distance if side == 'bid' else mid + distance
+            qty = '0' if rng.random() < 0.3 else f"{rng.uniform(0.01, 5):.8f}"
+            updates.append(level(side, price, qty))
+        frames.append(json.dumps({'channel': L2_CHANNEL, 'client_id': '', 'timestamp': '2025-06-01T00:00:00Z',
+                                  'sequence_num': seq, 'events': [{'type': 'update', 'product_id': product,
+                                                                   'updates': updates}]}))
+        seq += 1
+    return frames
+
+
+def load_capture(path: str) -> List[str]:
+    with open(path) as f:
+        return [line.rstrip('\n') for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark level2 order book replay')
+    parser.add_argument('--capture', help='JSONL file with one raw market websocket message per line')
+    parser.add_argument('--products', type=int, default=5)
+    parser.add_argument('--levels', type=int, default=1000, help='Snapshot levels per side')
+    parser.add_argument('--messages', type=int, default=50000)
+    parser.add_argument('--queries', type=int, default=10000)
+    args = parser.parse_args()
+
+    frames = (load_capture(args.capture) if args.capture
+              else generate_capture(args.products, args.levels, args.messages))
+    decode = get_decoder()
+    print(f"Capture: {len(frames)} messages ({args.capture or 'synthetic'})")
+
+    books = L2BookManager()
+    t0 = time.perf_counter()
+    for frame in frames:
+        data = decode(frame)
+        books.observe(data)
+        if data.get('channel') == L2_CHANNEL:
+            books.on_message(data)
+    elapsed = time.perf_counter() - t0
+    stats = books.stats()
+    levels = sum(b.updates for b in books.books.values())  # Snapshot + update levels
+    print(f"Replay   {elapsed:8.3f}s  {len(frames) / elapsed:10.0f} msg/s  {levels / elapsed:10.0f} levels/s")
+    print(f"         {stats}")
+
+    in_sync = [b for b in books.books.values() if b.valid]
+    if not in_sync:
+        return 0
+    book = in_sync[0]
+    size = sum(q for _, q in book.depth(20)['asks']) / 2
+    for name, query in (('best bid/ask', lambda: (book.best_bid(), book.best_ask())),
+                        ('spread', book.spread),
+                        ('depth(10)', lambda: book.depth(10)),
+                        (f'vwap({size:.2f})', lambda: book.vwap('buy', size))):
+        t0 = time.perf_counter()
+        for _ in range(args.queries):
+            query()
+        print(f"Query    {name:<14} {(time.perf_counter() - t0) / args.queries * 1e6:8.2f} µs")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark: shared OHLCV ring-buffer store vs. per-symbol DataFrame caches
+
+Fills `--symbols` × `--bars` one-minute candles and compares, for the store and
+for a dict of DataFrames (the shape the old per-consumer caches held):
+
+- memory held
+- lookup latency of the newest `--window` bars (zero-copy view, DataFrame copy)
+- appending one new bar per symbol (one cycle of websocket candles)
+
+Usage:
+    python -m scripts.benchmarks.bench_ohlcv_store --symbols 500 --bars 1440
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Ensure project root is in path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from MarketDataManager.ohlcv_store import FIELDS, OHLCVRing, OHLCVStore
+
+T0 = 1_750_000_020
+
+
+def generate_bars(n_bars: int, rng) -> np.ndarray:
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n_bars)))
+    spread = np.abs(rng.normal(0, 0.001, n_bars)) * close
+    return np.vstack([np.r_[close[0], close[:-1]], close + spread, close - spread, close,
+                      rng.lognormal(3, 1, n_bars)])
+
+
+def per_call_us(fn, symbols, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for symbol in symbols:
+            fn(symbol)
+    return (time.perf_counter() - start) / (repeat * len(symbols)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the shared OHLCV store')
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--bars', type=int, default=1440)
+    parser.add_argument('--window', type=int, default=720, help='Bars per lookup (MAX_OHLCV_ROWS)')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(3)
+    symbols = [f"SYM{i:03d}/USD" for i in range(args.symbols)]
+    times = T0 + 60 * np.arange(args.bars, dtype=np.int64)
+    data = {symbol: generate_bars(args.bars + 1, rng) for symbol in symbols}
+
+    store = OHLCVStore(capacities={'ONE_MINUTE': args.bars})
+    frames = {}
+    t0 = time.perf_counter()
+    for symbol in symbols:
+        store.update(symbol, 'ONE_MINUTE', times, data[symbol][:, :-1])
+    store_fill_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for symbol in symbols:
+        frame = pd.DataFrame(data[symbol][:, :-1].T, columns=list(FIELDS))
+        frame.insert(0, 'time', pd.to_datetime(times, unit='s', utc=True))
+        frames[symbol] = frame
+    frames_fill_s = time.perf_counter() - t0
+
+    frames_bytes = sum(int(f.memory_usage(deep=True).sum()) for f in frames.values())
+    print(f"{args.symbols} symbols × {args.bars} bars")
+    print(f"Memory   store {store.nbytes / 2**20:8.1f} MiB (preallocated, incl. slack) · "
+          f"DataFrames {frames_bytes / 2**20:8.1f} MiB")
+    print(f"Fill     store {store_fill_s:8.3f}s · DataFrames {frames_fill_s:8.3f}s")
+
+    w = args.window
+    timings = {
+        'store.view (zero-copy)': per_call_us(lambda s: store.view(s, n=w), symbols, args.repeat),
+        'store.frame (copy)': per_call_us(lambda s: store.frame(s, n=w), symbols, args.repeat),
+        'DataFrame.tail': per_call_us(lambda s: frames[s].tail(w), symbols, args.repeat),
+        'DataFrame.tail().copy()': per_call_us(lambda s: frames[s].tail(w).copy(), symbols, args.repeat),
+    }
+    for label, us in timings.items():
+        print(f"Lookup   {label:<26} {us:8.1f} µs/symbol")
+
+    new_time = int(times[-1]) + 60
+    t0 = time.perf_counter()
+    for symbol in symbols:
+        store.update_bar(symbol, 'ONE_MINUTE', new_time, *data[symbol][:, -1])
+    store_append_us = (time.perf_counter() - t0) / len(symbols) * 1e6
+    t0 = time.perf_counter()
+    for symbol in symbols:
+        row = pd.DataFrame([data[symbol][:, -1]], columns=list(FIELDS))
+        row.insert(0, 'time', pd.to_datetime([new_time], unit='s', utc=True))
+        frames[symbol] = pd.concat([frames[symbol].iloc[1:], row], ignore_index=True)
+    frames_append_us = (time.perf_counter() - t0) / len(symbols) * 1e6
+    print(f"Append   store {store_append_us:8.1f} µs/bar · DataFrames {frames_append_us:8.1f} µs/bar")
+
+    # Memory cap: a quarter of the symbols fit; the rest are evicted LRU-first
+    ring_bytes = OHLCVRing(args.bars).nbytes
+    capped = OHLCVStore(max_bytes=ring_bytes * (args.symbols // 4), capacities={'ONE_MINUTE': args.bars})
+    for symbol in symbols:
+        capped.update(symbol, 'ONE_MINUTE', times, data[symbol][:, :-1])
+    print(f"Capped   {len(capped)} series held, {capped.stats['evictions']} evicted, "
+          f"{capped.nbytes / 2**20:.1f} MiB")
+
+    view = store.view(symbols[-1], n=w)
+    assert len(view) == w and int(view.time[-1]) == new_time
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: monitoring tick over the order tracker, linear scans vs. indexes
+
+One tick is what the asset monitor sweep does with resting orders: an
+"open sell for this product?" check per held position
+(PositionMonitor._has_open_sell_order) and an OrderData per tracked order
+(AssetMonitor.monitor_orders_and_assets), while user-channel updates replace
+--churn of the orders between ticks.
+
+- scan: linear scan per position + OrderData.from_dict per order per tick
+- indexed: IndexedOrderTracker.has() + cached OrderData (rebuilt only for
+  orders that changed)
+
+Usage:
+    python -m scripts.benchmarks.bench_order_tracker
+    python -m scripts.benchmarks.bench_order_tracker --orders 800 --positions 200
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Ensure project root is in path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from SharedDataManager.order_tracker import OPEN_STATUSES, IndexedOrderTracker
+from webhook.webhook_validate_orders import OrderData
+
+
+def make_order(order_id: str, symbol: str, rng: random.Random) -> dict:
+    created = (datetime.now(timezone.utc) - timedelta(minutes=rng.uniform(0, 600))).isoformat()
+    price = f"{rng.uniform(0.1, 1000):.4f}"
+    return {
+        'order_id': order_id, 'symbol': symbol, 'side': rng.choice(['buy', 'sell']), 'type': 'limit',
+        'status': rng.choice(['OPEN', 'OPEN', 'OPEN', 'PENDING']), 'price': price, 'amount': '1.5',
+        'datetime': created, 'filled_size': 0.0,
+        'info': {'product_id': symbol, 'created_time': created,
+                 'order_configuration': {'limit_limit_gtc': {'base_size': '1.5', 'limit_price': price}}},
+    }
+
+
+def scan_has_open_sell(tracker: dict, product_id: str) -> bool:
+    for order_info in tracker.values():
+        if order_info.get('symbol') == product_id or order_info.get('product_id') == product_id:
+            if order_info.get('side', '').lower() == 'sell':
+                if order_info.get('status') in OPEN_STATUSES:
+                    return True
+    return False
+
+
+def run(args):
+    rng = random.Random(17)
+    symbols = [f"A{i:03d}-USD" for i in range(args.products)]
+    positions = symbols[:args.positions]
+    orders = {f"o-{i}": make_order(f"o-{i}", rng.choice(symbols), rng) for i in range(args.orders)}
+    trackers = {'scan': dict(orders), 'indexed': IndexedOrderTracker(orders)}
+
+    def scan_tick(tracker):
+        found = sum(scan_has_open_sell(tracker, p) for p in positions)
+        typed = [OrderData.from_dict(raw) for raw in tracker.values()]
+        return found, len(typed)
+
+    def indexed_tick(tracker):
+        found = sum(tracker.has(product=p, side='sell', status=OPEN_STATUSES) for p in positions)
+        typed = [tracker.cached(oid, OrderData.from_dict) for oid in tracker]
+        return found, len(typed)
+
+    ticks = {'scan': scan_tick, 'indexed': indexed_tick}
+    timings = {name: [] for name in ticks}
+    churn = max(1, int(args.orders * args.churn))
+    for _ in range(args.ticks):
+        replaced = [(oid, make_order(oid, rng.choice(symbols), rng)) for oid in rng.sample(list(orders), churn)]
+        results = {}
+        for name, tick in ticks.items():
+            tracker = trackers[name]
+            for oid, order in replaced:  # User-channel updates between ticks
+                tracker[oid] = order
+            t0 = time.perf_counter()
+            results[name] = tick(tracker)
+            timings[name].append(time.perf_counter() - t0)
+        assert results['scan'] == results['indexed']
+
+    print(f"{args.orders} orders over {args.products} products, {args.positions} positions, "
+          f"{churn} orders replaced per tick, {args.ticks} ticks")
+    print(f"{'':10}{'p50 tick':>12}{'max tick':>12}")
+    for name, values in timings.items():
+        print(f"{name:10}{statistics.median(values) * 1000:10.2f}ms{max(values) * 1000:10.2f}ms")
+    print(f"indexed: {trackers['indexed'].stats()['typed_builds']} OrderData builds, "
+          f"{trackers['indexed'].stats()['typed_hits']} cache hits")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark order tracker scans vs. indexes')
+    parser.add_argument('--orders', type=int, default=400)
+    parser.add_argument('--products', type=int, default=300)
+    parser.add_argument('--positions', type=int, default=100, help='Held positions checked per tick')
+    parser.add_argument('--churn', type=float, default=0.02, help='Fraction of orders replaced between ticks')
+    parser.add_argument('--ticks', type=int, default=50)
+    return run(parser.parse_args())
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: fetch_precision, per-call set_index().to_dict() vs. ProductRegistry
+
+Each cycle the ticker refresh replaces usd_pairs_cache, then order sizing,
+position monitoring and webhook validation look up precision for --lookups
+symbols. The previous fetch_precision converted the whole usd_pairs
+DataFrame to a dict on every call; the registry is built once per DataFrame
+and lookups are a dict get.
+
+Usage:
+    python -m scripts.benchmarks.bench_precision_registry
+    python -m scripts.benchmarks.bench_precision_registry --products 800 --lookups 2000
+"""
+
+import argparse
+import logging
+import math
+import random
+import statistics
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+from types import SimpleNamespace
+
+import pandas as pd
+
+# Ensure project root is in path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from Shared_Utils.precision import PrecisionUtils
+
+
+def generate_usd_pairs(products: int, rng: random.Random) -> pd.DataFrame:
+    rows = []
+    for i in range(products):
+        base_places = rng.choice([0, 2, 4, 6, 8])
+        rows.append({
+            'asset': f"A{i:04d}",
+            'quote': 'USD',
+            'symbol': f"A{i:04d}-USD",
+            'precision': {'base_increment': f"{Decimal(1).scaleb(-base_places)}", 'quote_increment': '0.01',
+                          'price_increment': '0.01', 'base_min_size': '1', 'quote_min_size': '1'},
+            'info': {'price': rng.uniform(0.01, 1000), 'volume_24h': rng.uniform(1e3, 1e7)},
+        })
+    return pd.DataFrame(rows)
+
+
+def legacy_fetch_precision(usd_pairs_df: pd.DataFrame, symbol: str) -> tuple:
+    """The previous fetch_precision body (happy path)"""
+    asset = symbol.replace('-', '/').split('/')[0]
+    market = usd_pairs_df.set_index('asset').to_dict(orient='index')
+    if market.get(asset):
+        base_precision = Decimal(market.get(asset, {}).get('precision', {}).get('base_increment', 1e-08))
+        quote_precision = Decimal(market.get(asset, {}).get('precision', {}).get('quote_increment', 1e-08))
+        return -int(math.log10(base_precision)), -int(math.log10(quote_precision)), base_precision, quote_precision
+    return 0, 2, 1e-08, 1e-08
+
+
+def run(args):
+    rng = random.Random(7)
+    market_data = {}
+    logger_manager = SimpleNamespace(loggers={'shared_logger': logging.getLogger('bench_precision_registry')})
+    utils = PrecisionUtils.get_instance(logger_manager, SimpleNamespace(market_data=market_data))
+
+    timings = {'legacy': [], 'registry': []}
+    for _ in range(args.cycles):
+        market_data['usd_pairs_cache'] = generate_usd_pairs(args.products, rng)  # Ticker refresh
+        symbols = [f"A{rng.randrange(args.products):04d}-USD" for _ in range(args.lookups)]
+
+        t0 = time.perf_counter()
+        legacy = [legacy_fetch_precision(market_data['usd_pairs_cache'], s) for s in symbols]
+        timings['legacy'].append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        current = [utils.fetch_precision(s) for s in symbols]  # Includes the registry rebuild
+        timings['registry'].append(time.perf_counter() - t0)
+        assert current == legacy
+
+    print(f"{args.products} products, {args.lookups} lookups per cycle, {args.cycles} cycles")
+    print(f"{'':10}{'per cycle':>12}{'per lookup':>14}")
+    for name, values in timings.items():
+        cycle = statistics.median(values)
+        print(f"{name:10}{cycle * 1000:10.2f}ms{cycle / args.lookups * 1e6:12.2f}µs")
+    print(f"registry: {utils.product_registry_stats()}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark fetch_precision (per-call to_dict vs. ProductRegistry)')
+    parser.add_argument('--products', type=int, default=500)
+    parser.add_argument('--lookups', type=int, default=1000, help='fetch_precision calls per refresh cycle')
+    parser.add_argument('--cycles', type=int, default=5)
+    return run(parser.parse_args())
+
+
+if __name__ == '__main__':
+    sys.exit(main())
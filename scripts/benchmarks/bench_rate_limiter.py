@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Benchmark: layered semaphores + fixed sleeps vs. the unified RateLimiter
+
+Starts a local mock exchange that meters requests with a lazy-fill token
+bucket of --capacity requests per second (HTTP 429 with Retry-After when it
+is empty, like Coinbase's private endpoints) and replays an OHLCV REST
+backfill (--symbols products x --chunks candle requests each) while orders
+are placed every --order-interval seconds:
+
+- layered: the previous pacing. Candles go through a 5-slot semaphore
+  (CoinbaseAPI._ohlcv_semaphore), symbols in barrier batches with 0.2 s
+  between chunks and 0.5 s between batches (MarketManager), 429s retried with
+  1-2-4 s backoff. Orders bypass all of it and fail on a 429.
+- unified: every request through RateLimiter.acquire() with the 'ohlcv' or
+  'orders' endpoint (orders take the next token first), 429 and Retry-After
+  fed back through observe(), no fixed sleeps.
+
+Reports backfill time, 429s drawn, failed orders and order latency.
+
+Usage:
+    python -m scripts.benchmarks.bench_rate_limiter
+    python -m scripts.benchmarks.bench_rate_limiter --symbols 60 --chunks 5 --capacity 30
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import aiohttp
+from aiohttp import web
+
+# Ensure project root is in path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from Api_manager.rate_limiter import RateLimiter
+
+
+async def start_mock_exchange(capacity: int, latency: float):
+    state = {'tokens': float(capacity), 'updated': time.monotonic(), 'rejected': 0}
+
+    async def handle(request):
+        now = time.monotonic()
+        state['tokens'] = min(capacity, state['tokens'] + (now - state['updated']) * capacity)
+        state['updated'] = now
+        if state['tokens'] < 1:
+            state['rejected'] += 1
+            return web.json_response({'error': 'rate_limited'}, status=429,
+                                     headers={'Retry-After': f"{(1 - state['tokens']) / capacity:.3f}"})
+        state['tokens'] -= 1
+        await asyncio.sleep(latency)
+        return web.json_response({'ok': True})
+
+    app = web.Application()
+    app.router.add_get('/candles', handle)
+    app.router.add_post('/orders', handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}", state
+
+
+def batch_size_for(total_symbols: int) -> int:
+    """MarketManager.fetch_and_store_ohlcv_data's batch sizing"""
+    return 5 if total_symbols <= 20 else 7 if total_symbols <= 50 else 10
+
+
+class Layered:
+    def __init__(self, session, base):
+        self.session, self.base = session, base
+        self.ohlcv_semaphore = asyncio.Semaphore(5)
+
+    async def candles(self):
+        delay = 1
+        for _ in range(6):
+            async with self.ohlcv_semaphore:
+                async with self.session.get(f"{self.base}/candles") as resp:
+                    if resp.status == 200:
+                        return
+            await asyncio.sleep(delay + random.uniform(0, 0.5))
+            delay = min(delay * 2, 30)
+
+    async def order(self) -> bool:
+        async with self.session.post(f"{self.base}/orders") as resp:
+            return resp.status == 200
+
+    async def backfill(self, symbols: int, chunks: int):
+        async def symbol_chunks():
+            for chunk in range(chunks):
+                await self.candles()
+                if chunk < chunks - 1:
+                    await asyncio.sleep(0.2)
+
+        batch = batch_size_for(symbols)
+        for i in range(0, symbols, batch):
+            await asyncio.gather(*(symbol_chunks() for _ in range(min(batch, symbols - i))))
+            await asyncio.sleep(0.5)
+
+
+class Unified:
+    def __init__(self, session, base, limiter: RateLimiter):
+        self.session, self.base, self.limiter = session, base, limiter
+
+    async def _call(self, method, path, endpoint) -> int:
+        async with self.limiter.acquire(endpoint):
+            async with self.session.request(method, f"{self.base}{path}") as resp:
+                self.limiter.observe(endpoint, resp.status, resp.headers.get('Retry-After'))
+                return resp.status
+
+    async def candles(self):
+        while await self._call('GET', '/candles', 'ohlcv') != 200:
+            pass
+
+    async def order(self) -> bool:
+        return await self._call('POST', '/orders', 'orders') == 200
+
+    async def backfill(self, symbols: int, chunks: int):
+        semaphore = asyncio.Semaphore(batch_size_for(symbols))
+
+        async def symbol_chunks():
+            async with semaphore:
+                for _ in range(chunks):
+                    await self.candles()
+
+        await asyncio.gather(*(symbol_chunks() for _ in range(symbols)))
+
+
+async def replay(client, args):
+    latencies, failed, done = [], 0, asyncio.Event()
+
+    async def place(t0):
+        nonlocal failed
+        if not await client.order():
+            failed += 1
+        latencies.append(time.perf_counter() - t0)
+
+    async def orders():
+        placed = []
+        while not done.is_set():
+            placed.append(asyncio.create_task(place(time.perf_counter())))
+            await asyncio.sleep(args.order_interval)
+        await asyncio.gather(*placed)
+
+    order_task = asyncio.create_task(orders())
+    t0 = time.perf_counter()
+    await client.backfill(args.symbols, args.chunks)
+    elapsed = time.perf_counter() - t0
+    done.set()
+    await order_task
+    return elapsed, latencies, failed
+
+
+async def run(args):
+    print(f"backfill {args.symbols} symbols x {args.chunks} chunks, an order every {args.order_interval * 1000:.0f} ms, "
+          f"exchange capacity {args.capacity} req/s")
+    print(f"{'':10}{'backfill':>10}{'429s':>7}{'orders':>8}{'failed':>8}{'order p50':>11}{'order p99':>11}")
+    for name in ('layered', 'unified'):
+        runner, base, state = await start_mock_exchange(args.capacity, args.latency)
+        try:
+            async with aiohttp.ClientSession() as session:
+                limiter = RateLimiter({'private': args.capacity, 'public': 10})
+                client = Layered(session, base) if name == 'layered' else Unified(session, base, limiter)
+                elapsed, latencies, failed = await replay(client, args)
+        finally:
+            await runner.cleanup()
+        q = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+        print(f"{name:10}{elapsed:9.2f}s{state['rejected']:7}{len(latencies):8}{failed:8}"
+              f"{q[49] * 1000:9.1f}ms{q[98] * 1000:9.1f}ms")
+        if name == 'unified':
+            print(f"limiter: {limiter.stats()['pools']['private']}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark layered throttling vs. the unified RateLimiter')
+    parser.add_argument('--symbols', type=int, default=40)
+    parser.add_argument('--chunks', type=int, default=4, help='Candle requests per symbol')
+    parser.add_argument('--capacity', type=int, default=30, help='Mock exchange requests per second')
+    parser.add_argument('--latency', type=float, default=0.05, help='Mock exchange delay per request (seconds)')
+    parser.add_argument('--order-interval', type=float, default=0.1)
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
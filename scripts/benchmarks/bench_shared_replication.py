@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Benchmark: shared state blob save/refresh vs. delta replication
+
+Per cycle, a writer changes a fraction of the tickers (prices, bid/ask) and
+one order, then shares its state; a reader picks it up.
+
+- blob: what save_data() / refresh_shared_data() did every cycle. Both
+  snapshot rows are rewritten, the market_data blob is re-read and merged,
+  both blobs are upserted, and the reader re-reads and decodes both blobs.
+- delta: SharedStateReplicator.publish() writes the changed entries and the
+  reader, woken by the file notifier, applies only those.
+
+Reports bytes written and read per cycle plus writer time, reader time and
+publish-to-applied latency. Runs on a SQLite stand-in; on Postgres the reader
+is woken by LISTEN/NOTIFY instead of the file notifier.
+
+Usage:
+    python -m scripts.benchmarks.bench_shared_replication
+    python -m scripts.benchmarks.bench_shared_replication --tickers 800 --changed 0.02 --cycles 50
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from decimal import Decimal
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+# Ensure project root is in path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from SharedDataManager.replication import FileNotifier, SharedStateReplicator
+from SharedDataManager.shared_data_manager import (CustomJSONDecoder, DecimalEncoderIn, SharedDataManager,
+                                                   preprocess_market_data)
+from TableModels.shared_data import SharedData
+from TableModels.shared_data_entry import SharedDataEntry
+
+
+class _SessionManager:
+    def __init__(self, engine):
+        self.engine = engine
+        self._sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def async_session(self):
+        async with self._sessionmaker() as session:
+            yield session
+
+
+def generate_state(n_tickers: int, n_orders: int, seed: int = 1):
+    rng = random.Random(seed)
+    symbols = [f"SYM{i:03d}/USD" for i in range(n_tickers)]
+    prices = [rng.uniform(0.01, 5000) for _ in symbols]
+    ticker_cache = pd.DataFrame({
+        'symbol': symbols, 'asset': [s.split('/')[0] for s in symbols], 'quote': 'USD',
+        'price': prices, 'bid': [p * 0.999 for p in prices], 'ask': [p * 1.001 for p in prices],
+        '24h_quote_volume': [rng.uniform(1e5, 1e9) for _ in symbols],
+        'price_percentage_change_24h': [rng.gauss(0, 3) for _ in symbols],
+        'base_increment': 1e-8, 'quote_increment': 0.01, 'base_min_size': 1e-6,
+        'status': 'online', 'trading_disabled': False,
+    })
+    market_data = {
+        'ticker_cache': ticker_cache,
+        'usd_pairs_cache': ticker_cache.copy(),
+        'filtered_vol': ticker_cache.to_dict(orient='records'),
+        'bid_ask_spread': {s: {'bid': p * 0.999, 'ask': p * 1.001, 'spread': p * 0.002} for s, p in zip(symbols, prices)},
+        'atr_pct_cache': {s: rng.uniform(0.001, 0.05) for s in symbols},
+        'atr_price_cache': {s: p * 0.02 for s, p in zip(symbols, prices)},
+        'avg_quote_volume': Decimal('750000'),
+    }
+    order_management = {
+        'order_tracker': {f"order-{i}": {'order_id': f"order-{i}", 'symbol': rng.choice(symbols), 'side': 'buy',
+                                         'status': 'open', 'price': Decimal('1.2345'), 'amount': Decimal('10')}
+                          for i in range(n_orders)},
+        'non_zero_balances': {s.split('/')[0]: {'asset': s.split('/')[0], 'account_uuid': 'uuid',
+                                                'total_balance_fiat': 100.0, 'total_balance_crypto': 1.0}
+                              for s in symbols[:30]},
+    }
+    return market_data, order_management
+
+
+def mutate(market_data, order_management, changed: float, rng: random.Random):
+    """A cycle's worth of changes: prices of a fraction of the tickers, their bid/ask, one order"""
+    frame = market_data['ticker_cache']
+    rows = rng.sample(range(len(frame)), max(1, int(len(frame) * changed)))
+    factor = pd.Series([1 + rng.gauss(0, 0.002) for _ in rows], index=rows)
+    frame.loc[rows, 'price'] = frame.loc[rows, 'price'] * factor
+    for row in rows:
+        symbol, price = frame.at[row, 'symbol'], frame.at[row, 'price']
+        market_data['bid_ask_spread'][symbol] = {'bid': price * 0.999, 'ask': price * 1.001, 'spread': price * 0.002}
+    order = rng.choice(list(order_management['order_tracker'].values()))
+    order['status'] = rng.choice(('open', 'partially_filled'))
+
+
+async def _upsert_blob(db, data_type: str, encoded: str):
+    async with db.async_session() as session:
+        async with session.begin():
+            stmt = sqlite_insert(SharedData).values(data_type=data_type, data=encoded)
+            await session.execute(stmt.on_conflict_do_update(index_elements=['data_type'],
+                                                             set_={'data': stmt.excluded.data}))
+
+
+async def _read_blob(db, data_type: str) -> str:
+    async with db.async_session() as session:
+        return (await session.execute(select(SharedData.data).where(SharedData.data_type == data_type))).scalar_one()
+
+
+async def blob_cycle(db, market_data, order_management):
+    """One save_data() + refresh_shared_data() round trip (bytes written, bytes read, writer s, reader s)"""
+    t0 = time.perf_counter()
+    processed = preprocess_market_data(market_data)
+    md = json.dumps(processed, cls=DecimalEncoderIn)
+    om = json.dumps(SharedDataManager.dismantle_order_management(order_management), cls=DecimalEncoderIn)
+    await _upsert_blob(db, 'market_data_snapshot', md)
+    await _upsert_blob(db, 'order_management_snapshot', om)
+    stored = await _read_blob(db, 'market_data')  # Merge with the other container's keys
+    merged = {**preprocess_market_data(json.loads(stored, cls=CustomJSONDecoder)), **processed}
+    merged_md = json.dumps(merged, cls=DecimalEncoderIn)
+    await _upsert_blob(db, 'market_data', merged_md)
+    await _upsert_blob(db, 'order_management', om)
+    written = len(md) + len(om) + len(merged_md) + len(om)
+    t1 = time.perf_counter()
+
+    md_raw, om_raw = await _read_blob(db, 'market_data'), await _read_blob(db, 'order_management')
+    json.loads(md_raw, cls=CustomJSONDecoder)
+    json.loads(om_raw, cls=CustomJSONDecoder)
+    t2 = time.perf_counter()
+    return written, len(stored) + len(md_raw) + len(om_raw), t1 - t0, t2 - t1
+
+
+async def run(args):
+    tmp = Path(tempfile.mkdtemp())
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp / 'shared.sqlite'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(SharedData.__table__.create)
+        await conn.run_sync(SharedDataEntry.__table__.create)
+    db = _SessionManager(engine)
+    rng = random.Random(7)
+
+    # ---- blob ----
+    market_data, order_management = generate_state(args.tickers, args.orders)
+    await _upsert_blob(db, 'market_data', json.dumps(preprocess_market_data(market_data), cls=DecimalEncoderIn))
+    blob = []
+    for _ in range(args.cycles):
+        mutate(market_data, order_management, args.changed, rng)
+        blob.append(await blob_cycle(db, market_data, order_management))
+
+    # ---- delta ----
+    market_data, order_management = generate_state(args.tickers, args.orders)
+    notify_path = str(tmp / 'shared_data.version')
+    writer = SharedStateReplicator(db, notifier=FileNotifier(notify_path, poll_interval=0.001))
+    reader = SharedStateReplicator(db, notifier=FileNotifier(notify_path, poll_interval=0.001))
+    await writer.publish({'market_data': market_data,
+                          'order_management': SharedDataManager.dismantle_order_management(order_management)})
+    await reader.sync()
+    await reader.start()
+    delta = []
+    for _ in range(args.cycles):
+        mutate(market_data, order_management, args.changed, rng)
+        published, received = writer.stats()['bytes_published'], reader.stats()['bytes_received']
+        t0 = time.perf_counter()
+        await writer.publish({'market_data': market_data,
+                              'order_management': SharedDataManager.dismantle_order_management(order_management)})
+        t1 = time.perf_counter()
+        while reader.version != writer.version:
+            await asyncio.sleep(0.0005)
+        t2 = time.perf_counter()
+        stats = reader.stats()
+        delta.append((writer.stats()['bytes_published'] - published, stats['bytes_received'] - received,
+                      t1 - t0, stats['last_sync_ms'] / 1000, t2 - t0))
+    await reader.stop()
+    await engine.dispose()
+
+    def ms(values):
+        return f"{statistics.median(values) * 1000:8.2f} ms"
+
+    def kb(values):
+        return f"{statistics.median(values) / 1024:9.1f} KiB"
+
+    print(f"State: {args.tickers} tickers, {args.orders} orders; {args.changed:.0%} of tickers change per cycle; "
+          f"{args.cycles} cycles (medians)")
+    print(f"{'':8}{'written':>14}{'read':>14}{'writer':>12}{'reader':>12}{'publish→applied':>18}")
+    print(f"{'blob':8}{kb([b[0] for b in blob])}{kb([b[1] for b in blob])}{ms([b[2] for b in blob])}"
+          f"{ms([b[3] for b in blob])}{'(next refresh)':>18}")
+    print(f"{'delta':8}{kb([d[0] for d in delta])}{kb([d[1] for d in delta])}{ms([d[2] for d in delta])}"
+          f"{ms([d[3] for d in delta])}{ms([d[4] for d in delta]):>18}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark shared state blob vs. delta replication')
+    parser.add_argument('--tickers', type=int, default=500)
+    parser.add_argument('--orders', type=int, default=40)
+    parser.add_argument('--changed', type=float, default=0.05, help='Fraction of tickers changed per cycle')
+    parser.add_argument('--cycles', type=int, default=30)
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: webhook snapshot reads, deepcopy vs. copy-on-write
+
+A burst of concurrent webhooks each takes a market_data / order_management
+snapshot (what WebhookListener.process_webhook does) and reads prices and a
+balance from it, while a writer replaces bid_ask_spread / ticker_cache and
+touches the order tracker every --write-interval seconds, like the ticker
+refresh and user-channel fills do.
+
+- deepcopy: the previous get_snapshots() (lock + copy.deepcopy of both)
+- cow: SharedDataManager.get_snapshots() on SnapshotStore
+
+Reports per-webhook latency, burst wall time and allocations per webhook.
+
+Usage:
+    python -m scripts.benchmarks.bench_snapshots
+    python -m scripts.benchmarks.bench_snapshots --webhooks 500 --tickers 800
+"""
+
+import argparse
+import asyncio
+import copy
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Ensure project root is in path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+os.environ.setdefault('SHARED_DATA_REPLICATION', 'false')  # No database here
+
+from scripts.benchmarks.bench_shared_replication import generate_state, mutate
+from SharedDataManager.shared_data_manager import SharedDataManager
+
+
+async def deepcopy_snapshots(manager):
+    async with manager.lock:
+        return copy.deepcopy(manager.market_data), copy.deepcopy(manager.order_management)
+
+
+async def webhook(get_snapshots, manager, symbol: str, latencies: list):
+    t0 = time.perf_counter()
+    market_data, order_management = await get_snapshots(manager)
+    spread = market_data.get('bid_ask_spread', {}).get(symbol, {})
+    price = spread.get('ask') or spread.get('bid') or 0
+    balance = order_management.get('non_zero_balances', {}).get(symbol.split('/')[0])
+    usd_pairs = market_data.get('usd_pairs_cache')
+    assert price and usd_pairs is not None and (balance is None or isinstance(balance, dict))
+    latencies.append(time.perf_counter() - t0)
+    await asyncio.sleep(0)  # The real handler awaits precision / order placement next
+
+
+async def writer(manager, interval: float, stop: asyncio.Event):
+    rng = random.Random(11)
+    while not stop.is_set():
+        mutate(manager.market_data, manager.order_management, 0.05, rng)
+        await manager.update_shared_data(
+            {'bid_ask_spread': dict(manager.market_data['bid_ask_spread']),
+             'ticker_cache': manager.market_data['ticker_cache'].copy()}, None)
+        await manager.get_order_tracker()  # Fill handling edits the tracker in place...
+        manager.mark_changed('order_management', ['order_tracker'])  # ...then marks it changed
+        await asyncio.sleep(interval)
+
+
+async def burst(get_snapshots, manager, args, latencies):
+    symbols = list(manager.market_data['bid_ask_spread'])
+    rng = random.Random(5)
+    stop = asyncio.Event()
+    writer_task = asyncio.create_task(writer(manager, args.write_interval, stop))
+    t0 = time.perf_counter()
+    for _ in range(args.bursts):
+        await asyncio.gather(*(webhook(get_snapshots, manager, rng.choice(symbols), latencies)
+                               for _ in range(args.webhooks)))
+        await asyncio.sleep(args.write_interval / 2)
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    await writer_task
+    return elapsed
+
+
+async def allocated_per_webhook(get_snapshots, manager, n: int = 50) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = [await get_snapshots(manager) for _ in range(n)]  # Burst: all handlers alive at once
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return (after - before) / n
+
+
+async def run(args):
+    manager = SharedDataManager(None, None, None, None)
+    manager._initialized_event.set()
+    modes = (('deepcopy', deepcopy_snapshots), ('cow', lambda m: m.get_snapshots()))
+    print(f"State: {args.tickers} tickers, {args.orders} orders; {args.bursts} bursts × {args.webhooks} webhooks; "
+          f"writes every {args.write_interval * 1000:.0f} ms")
+    print(f"{'':10}{'p50':>10}{'p99':>10}{'max':>10}{'burst wall':>12}{'alloc/webhook':>16}")
+    for name, get_snapshots in modes:
+        manager.market_data, manager.order_management = generate_state(args.tickers, args.orders)
+        latencies = []
+        elapsed = await burst(get_snapshots, manager, args, latencies)
+        alloc = await allocated_per_webhook(get_snapshots, manager)
+        q = statistics.quantiles(latencies, n=100)
+        print(f"{name:10}{q[49] * 1000:8.3f}ms{q[98] * 1000:8.3f}ms{max(latencies) * 1000:8.2f}ms"
+              f"{elapsed / args.bursts * 1000:10.1f}ms{alloc / 1024:12.1f} KiB")
+    print(f"cow store: {manager.snapshots.stats()}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark webhook snapshot reads (deepcopy vs. copy-on-write)')
+    parser.add_argument('--tickers', type=int, default=500)
+    parser.add_argument('--orders', type=int, default=40)
+    parser.add_argument('--webhooks', type=int, default=200, help='Concurrent webhooks per burst')
+    parser.add_argument('--bursts', type=int, default=10)
+    parser.add_argument('--write-interval', type=float, default=0.05)
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
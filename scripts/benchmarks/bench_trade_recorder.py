@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-trade vs. batched TradeRecorder during a fill storm
+
+Enqueues --trades fills across --symbols products at once (a bracket cascade)
+and times the recorder worker draining trade_queue, with batch_size 1 (one
+transaction per trade, as before) and --batch-size.
+
+The database is simulated: each statement costs --statement-ms and each
+commit --commit-ms (round trip to Postgres plus WAL flush), so the numbers
+show the effect of fewer round trips and commits rather than of a particular
+server. Reports drain time, statements, commits and queue lag.
+
+Usage:
+    python -m scripts.benchmarks.bench_trade_recorder
+    python -m scripts.benchmarks.bench_trade_recorder --trades 2000 --symbols 80 --statement-ms 0.5 --commit-ms 2
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from contextlib import asynccontextmanager
+from decimal import Decimal
+from pathlib import Path
+from types import SimpleNamespace
+
+# Ensure project root is in path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from SharedDataManager.trade_recorder import TradeRecorder
+
+
+class SimulatedDb:
+    """async_session() whose statements and commits only cost time"""
+
+    def __init__(self, statement_s: float, commit_s: float):
+        self.statement_s, self.commit_s = statement_s, commit_s
+        self.statements = self.commits = 0
+
+    @asynccontextmanager
+    async def async_session(self):
+        yield self
+
+    @asynccontextmanager
+    async def begin(self):
+        yield
+        self.commits += 1
+        await asyncio.sleep(self.commit_s)
+
+    async def execute(self, stmt):
+        self.statements += 1
+        await asyncio.sleep(self.statement_s)
+        return []
+
+
+def fill_storm(trades: int, symbols: int, rng: random.Random) -> list:
+    return [{'order_id': f'O{i:06d}', 'symbol': f'A{rng.randrange(symbols):03d}-USD',
+             'side': rng.choice(('buy', 'sell')), 'amount': '1.5', 'price': '12.34', 'source': 'websocket',
+             'order_time': '2026-01-01T00:00:00Z', 'total_fees': '0.01'} for i in range(trades)]
+
+
+async def drain(batch_size: int, trades: list, args) -> tuple:
+    db = SimulatedDb(args.statement_ms / 1000, args.commit_ms / 1000)
+    precision = SimpleNamespace(fetch_precision=lambda symbol: (8, 2, 0, 0),
+                                safe_convert=lambda value, places: Decimal(value))
+    recorder = TradeRecorder(db, None, precision, None, shared_data_manager=SimpleNamespace(market_data={}))
+    recorder.batch_size = batch_size
+    recorder.logger.disabled = True
+
+    t0 = time.perf_counter()
+    for trade in trades:
+        await recorder.enqueue_trade(trade)
+    await recorder.start_worker()
+    await recorder.trade_queue.join()
+    elapsed = time.perf_counter() - t0
+    recorder.worker_task.cancel()
+    return elapsed, db, recorder.stats()
+
+
+async def run(args):
+    trades = fill_storm(args.trades, args.symbols, random.Random(5))
+    print(f"{args.trades} queued fills over {args.symbols} symbols, "
+          f"{args.statement_ms} ms/statement, {args.commit_ms} ms/commit")
+    print(f"{'':12}{'drain':>9}{'trades/s':>10}{'statements':>12}{'commits':>9}{'max lag':>9}{'avg batch':>11}")
+    for name, batch_size in (('per-trade', 1), (f'batch {args.batch_size}', args.batch_size)):
+        elapsed, db, stats = await drain(batch_size, trades, args)
+        print(f"{name:12}{elapsed:8.2f}s{len(trades) / elapsed:10.0f}{db.statements:12}{db.commits:9}"
+              f"{stats['max_lag_s']:8.2f}s{stats['avg_batch']:11}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-trade vs. batched trade recording')
+    parser.add_argument('--trades', type=int, default=1000)
+    parser.add_argument('--symbols', type=int, default=40)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--statement-ms', type=float, default=0.5, help='Simulated cost per statement')
+    parser.add_argument('--commit-ms', type=float, default=2.0, help='Simulated cost per commit')
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
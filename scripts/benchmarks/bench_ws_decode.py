@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark: websocket frame decoding (stdlib json vs. orjson) and Decimal parsing
+
+Decodes a corpus of raw websocket frames with every available decoder, then
+compares eager Decimal conversion of every numeric ticker field with lazy
+conversion (ws_decoder.decimal_field) of only the symbols a consumer touches.
+
+The corpus is a JSONL file with one raw frame per line, e.g. a recording made
+with WS_CANDLE_RECORD_PATH; without one, Coinbase-shaped frames are generated
+(ticker_batch frames plus user-channel and heartbeat frames).
+
+Usage:
+    python -m scripts.benchmarks.bench_ws_decode
+    python -m scripts.benchmarks.bench_ws_decode --corpus recorded_frames.jsonl --touched 0.1
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+from typing import List
+
+# Ensure project root is in path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from webhook.ws_decoder import available_decoders, decimal_field, get_decoder
+
+TICKER_NUMERIC_FIELDS = ('price', 'volume_24_h', 'low_24_h', 'high_24_h', 'low_52_w', 'high_52_w',
+                         'price_percent_chg_24_h', 'best_bid', 'best_bid_quantity', 'best_ask', 'best_ask_quantity')
+
+
+def generate_frames(n_frames: int = 2000, tickers_per_batch: int = 300, seed: int = 1) -> List[str]:
+    """Raw frames shaped like the Coinbase Advanced Trade market and user channels"""
+    rng = random.Random(seed)
+    products = [f"SYM{i:03d}-USD" for i in range(tickers_per_batch)]
+    prices = {p: rng.uniform(0.01, 5000) for p in products}
+    frames = []
+    for seq in range(n_frames):
+        kind = rng.random()
+        if kind < 0.85:
+            tickers = []
+            for product in products:
+                prices[product] *= 1 + rng.gauss(0, 0.001)
+                price = prices[product]
+                tickers.append({
+                    'type': 'ticker', 'product_id': product, 'price': f"{price:.4f}",
+                    'volume_24_h': f"{rng.uniform(1e3, 1e7):.8f}",
+                    'low_24_h': f"{price * 0.97:.4f}", 'high_24_h': f"{price * 1.03:.4f}",
+                    'low_52_w': f"{price * 0.4:.4f}", 'high_52_w': f"{price * 2.1:.4f}",
+                    'price_percent_chg_24_h': f"{rng.gauss(0, 3):.8f}",
+                    'best_bid': f"{price * 0.9995:.4f}", 'best_bid_quantity': f"{rng.uniform(0, 50):.8f}",
+                    'best_ask': f"{price * 1.0005:.4f}", 'best_ask_quantity': f"{rng.uniform(0, 50):.8f}",
+                })
+            frame = {'channel': 'ticker_batch', 'client_id': '', 'timestamp': '2025-06-01T00:00:00.123456789Z',
+                     'sequence_num': seq, 'events': [{'type': 'update', 'tickers': tickers}]}
+        elif kind < 0.95:
+            frame = {'channel': 'heartbeats', 'client_id': '', 'timestamp': '2025-06-01T00:00:00.123Z',
+                     'sequence_num': seq, 'events': [{'current_time': '2025-06-01 00:00:00.1 +0000 UTC',
+                                                      'heartbeat_counter': seq}]}
+        else:
+            product = rng.choice(products)
+            frame = {'channel': 'user', 'client_id': '', 'timestamp': '2025-06-01T00:00:00.123Z',
+                     'sequence_num': seq, 'events': [{'type': 'update', 'orders': [{
+                         'order_id': f"{seq:08d}-0000-0000-0000-000000000000", 'product_id': product,
+                         'order_side': 'BUY', 'order_type': 'Limit', 'status': 'FILLED',
+                         'limit_price': f"{prices[product]:.4f}", 'avg_price': f"{prices[product]:.4f}",
+                         'filled_size': '1.25', 'cumulative_quantity': '1.25', 'leaves_quantity': '0',
+                         'total_fees': '0.0123', 'creation_time': '2025-06-01T00:00:00.123Z',
+                     }]}]}
+        frames.append(json.dumps(frame))
+    return frames
+
+
+def load_corpus(path: str) -> List[str]:
+    with open(path) as f:
+        return [line.rstrip('\n') for line in f if line.strip()]
+
+
+def tickers_of(messages):
+    for data in messages:
+        for event in data.get('events') or []:
+            yield from event.get('tickers') or []
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark websocket frame decoding')
+    parser.add_argument('--corpus', help='JSONL file with one raw websocket frame per line')
+    parser.add_argument('--frames', type=int, default=2000, help='Synthetic frames (without --corpus)')
+    parser.add_argument('--tickers', type=int, default=300, help='Tickers per synthetic ticker_batch frame')
+    parser.add_argument('--touched', type=float, default=0.1,
+                        help='Fraction of tickers a consumer processes (lazy Decimal parsing)')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    frames = load_corpus(args.corpus) if args.corpus else generate_frames(args.frames, args.tickers)
+    total_mb = sum(len(f) for f in frames) / 2**20
+    print(f"Corpus: {len(frames)} frames, {total_mb:.1f} MiB ({args.corpus or 'synthetic'})")
+
+    reference = [json.loads(f) for f in frames]
+    timings = {}
+    for name in available_decoders():
+        decode = get_decoder(name)
+        assert [decode(f) for f in frames[:200]] == reference[:200], name
+        best = float('inf')
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            for f in frames:
+                decode(f)
+            best = min(best, time.perf_counter() - t0)
+        timings[name] = best
+        print(f"Decode   {name:<8} {best:8.3f}s  {len(frames) / best:10.0f} frames/s  {total_mb / best:8.1f} MiB/s")
+    if 'orjson' in timings:
+        print(f"         orjson speedup {timings['json'] / timings['orjson']:.1f}x")
+    else:
+        print("         orjson not installed: stdlib json only")
+
+    tickers = list(tickers_of(reference))
+    if not tickers:
+        return 0
+    t0 = time.perf_counter()
+    for ticker in tickers:
+        for field in TICKER_NUMERIC_FIELDS:
+            value = ticker.get(field)
+            if value:
+                Decimal(value)
+    eager_s = time.perf_counter() - t0
+
+    step = max(1, round(1 / args.touched)) if args.touched > 0 else len(tickers) + 1
+    t0 = time.perf_counter()
+    for ticker in tickers[::step]:
+        decimal_field(ticker, 'price')
+        decimal_field(ticker, 'volume_24_h')
+    lazy_s = time.perf_counter() - t0
+    print(f"Decimal  eager (all fields, {len(tickers)} tickers) {eager_s:8.3f}s · "
+          f"lazy (price + volume, 1 in {step} tickers) {lazy_s:8.3f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+SQLite stand-in for the FIFO tables, for offline benchmarks.
+
+Provides a session manager with the same async_session() interface as
+DatabaseSessionManager, backed by a local SQLite file, plus the subset of the
+Postgres schema the FIFO engine touches (trade_records, fifo_allocations,
+fifo_computation_log, fifo_inventory_snapshot, fifo_symbol_watermark,
+manual_review_queue).
+
+Numeric and timestamp columns are stored as TEXT so Decimal values round-trip
+exactly; datetimes are written in a fixed-width ISO format so string ordering
+matches time ordering. NOW() is registered as a SQL function.
+"""
+
+import json
+import sqlite3
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, List
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS trade_records (
+        order_id TEXT PRIMARY KEY,
+        symbol TEXT NOT NULL,
+        side TEXT NOT NULL,
+        size TEXT NOT NULL,
+        price TEXT NOT NULL,
+        total_fees_usd TEXT,
+        order_time TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_trade_records_symbol_side_time ON trade_records(symbol, side, order_time, order_id)",
+    """
+    CREATE TABLE IF NOT EXISTS fifo_allocations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        sell_order_id TEXT NOT NULL,
+        buy_order_id TEXT,
+        symbol TEXT NOT NULL,
+        allocated_size TEXT NOT NULL,
+        buy_price TEXT,
+        sell_price TEXT NOT NULL,
+        buy_fees_per_unit TEXT,
+        sell_fees_per_unit TEXT NOT NULL,
+        cost_basis_usd TEXT,
+        proceeds_usd TEXT NOT NULL,
+        net_proceeds_usd TEXT NOT NULL,
+        pnl_usd TEXT,
+        buy_time TEXT,
+        sell_time TEXT NOT NULL,
+        allocation_time TEXT DEFAULT CURRENT_TIMESTAMP,
+        allocation_version INTEGER NOT NULL,
+        allocation_batch_id TEXT,
+        notes TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_fifo_allocations_symbol ON fifo_allocations(symbol, allocation_version)",
+    "CREATE INDEX IF NOT EXISTS idx_fifo_allocations_sell ON fifo_allocations(sell_order_id)",
+    """
+    CREATE TABLE IF NOT EXISTS fifo_computation_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        symbol TEXT,
+        allocation_version INTEGER NOT NULL,
+        allocation_batch_id TEXT NOT NULL,
+        computation_start TEXT NOT NULL,
+        computation_end TEXT,
+        computation_duration_ms INTEGER,
+        status TEXT NOT NULL,
+        buys_processed INTEGER DEFAULT 0,
+        sells_processed INTEGER DEFAULT 0,
+        allocations_created INTEGER DEFAULT 0,
+        error_message TEXT,
+        error_traceback TEXT,
+        symbols_processed TEXT,
+        total_pnl_computed TEXT,
+        computation_mode TEXT,
+        triggered_by TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS fifo_inventory_snapshot (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        symbol TEXT NOT NULL,
+        buy_order_id TEXT NOT NULL,
+        remaining_size TEXT NOT NULL,
+        snapshot_time TEXT NOT NULL,
+        allocation_version INTEGER NOT NULL,
+        UNIQUE(symbol, buy_order_id, allocation_version)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS fifo_symbol_watermark (
+        symbol TEXT NOT NULL,
+        allocation_version INTEGER NOT NULL,
+        last_order_time TEXT NOT NULL,
+        last_order_id TEXT NOT NULL,
+        fills_processed INTEGER NOT NULL,
+        allocation_batch_id TEXT,
+        updated_at TEXT NOT NULL,
+        PRIMARY KEY (symbol, allocation_version)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS manual_review_queue (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        order_id TEXT NOT NULL,
+        issue_type TEXT NOT NULL,
+        severity TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        description TEXT,
+        resolution TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        resolved_at TEXT,
+        resolved_by TEXT,
+        UNIQUE(order_id, issue_type)
+    )
+    """,
+]
+
+
+def _format_datetime(value: datetime) -> str:
+    return value.isoformat(sep=' ', timespec='microseconds')
+
+
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(uuid.UUID, str)
+sqlite3.register_adapter(datetime, _format_datetime)
+sqlite3.register_adapter(list, json.dumps)
+
+
+class SQLiteSessionManager:
+    """async_session() compatible stand-in for DatabaseSessionManager over SQLite."""
+
+    def __init__(self, path: str):
+        self.engine = create_async_engine(
+            f"sqlite+aiosqlite:///{path}",
+            connect_args={'timeout': 60}
+        )
+        event.listen(self.engine.sync_engine, 'connect', self._on_connect)
+        self._session_factory = async_sessionmaker(self.engine, expire_on_commit=False, class_=AsyncSession)
+
+    @staticmethod
+    def _on_connect(dbapi_connection, connection_record):
+        dbapi_connection.create_function(
+            'NOW', 0, lambda: _format_datetime(datetime.now(timezone.utc))
+        )
+
+    @asynccontextmanager
+    async def async_session(self):
+        async with self._session_factory() as session:
+            yield session
+
+    async def create_schema(self):
+        async with self.engine.begin() as conn:
+            await conn.execute(text("PRAGMA journal_mode=WAL"))
+            for statement in SCHEMA:
+                await conn.execute(text(statement))
+
+    async def insert_trades(self, trades: List[Dict]):
+        async with self.async_session() as session:
+            async with session.begin():
+                await session.execute(text("""
+                    INSERT INTO trade_records (order_id, symbol, side, size, price, total_fees_usd, order_time)
+                    VALUES (:order_id, :symbol, :side, :size, :price, :total_fees_usd, :order_time)
+                """), trades)
+
+    async def dispose(self):
+        await self.engine.dispose()
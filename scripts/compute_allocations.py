@@ -14,6 +14,9 @@ Usage:
     # Recompute (clears existing allocations for version)
     python -m scripts.compute_allocations --version 1 --all-symbols --force
 
+    # Incremental (only fills newer than each symbol's watermark)
+    python -m scripts.compute_allocations --version 1 --all-symbols --incremental
+
 Examples:
     python -m scripts.compute_allocations --version 1 --all-symbols
     python -m scripts.compute_allocations --version 2 --symbol ETH-USD
@@ -153,7 +156,7 @@ async def compute_allocations(args):
         existing_count = result.fetchone()[0]
 
     # Allow incremental mode to proceed even if allocations exist
-    if existing_count > 0 and not args.force and not since_time:
+    if existing_count > 0 and not args.force and not since_time and not args.incremental:
         print(f"\n⚠️  Version {args.version} already has {existing_count:,} allocations!")
         print("    Use --force to recompute (will delete existing allocations)")
         print("    Or use --since to compute only new trades incrementally")
@@ -163,7 +166,18 @@ async def compute_allocations(args):
         print(f"\n🗑️  Clearing {existing_count:,} existing allocations for Version {args.version}...")
 
     # Determine what to compute
-    if args.all_symbols:
+    if args.incremental:
+        scope = f"{args.symbol}" if args.symbol else "ALL symbols"
+        print(f"\n🚀 Incremental computation for {scope} (from per-symbol watermarks)...")
+        result = await engine.compute_incremental(
+            version=args.version,
+            symbols=[args.symbol] if args.symbol else None,
+            triggered_by='manual'
+        )
+        if result.success and result.symbols_rebuilt:
+            print(f"🔁 Rebuilt from scratch (no watermark or back-dated fills): "
+                  f"{', '.join(result.symbols_rebuilt)}")
+    elif args.all_symbols:
         # If incremental mode, find symbols with new trades
         if since_time and not args.force:
             print(f"\n🔍 Finding symbols with new trades since {since_time.strftime('%Y-%m-%d %H:%M:%S')}...")
@@ -226,6 +240,14 @@ async def compute_allocations(args):
                 symbols_processed=symbols_with_new_trades,
                 allocations_created=all_allocations
             )
+        elif args.workers > 1:
+            print(f"\n🚀 Computing allocations for ALL symbols ({args.workers} {args.pool} workers)...")
+            result = await engine.compute_all_symbols_parallel(
+                version=args.version,
+                workers=args.workers,
+                pool=args.pool,
+                triggered_by='manual'
+            )
         else:
             print(f"\n🚀 Computing allocations for ALL symbols...")
             result = await engine.compute_all_symbols(
@@ -277,6 +299,12 @@ async def compute_allocations(args):
         print(f"\nError:")
         print(f"  {result.error_message}")
 
+    if result.symbols_failed:
+        print(f"\n❌ Failed symbols ({len(result.symbols_failed)}):")
+        for symbol, error in sorted(result.symbols_failed.items()):
+            print(f"  - {symbol}: {error}")
+        print("  Re-run them with --symbol <SYMBOL> or --incremental")
+
     print(f"\nFinished: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
 
@@ -296,6 +324,12 @@ Examples:
   # Recompute (force)
   python -m scripts.compute_allocations --version 1 --all-symbols --force
 
+  # Recompute on 4 worker processes (per-symbol commits)
+  python -m scripts.compute_allocations --version 1 --all-symbols --force --workers 4
+
+  # Nightly incremental update
+  python -m scripts.compute_allocations --version 1 --all-symbols --incremental
+
 Version Guidelines:
   - Version 1: Initial bootstrap (full computation)
   - Version 2+: After algorithm changes, bug fixes, or data amendments
@@ -335,8 +369,33 @@ Version Guidelines:
         help='Only process trades since this time (e.g., "10 minutes ago", "2025-12-04 10:00"). Enables incremental mode.'
     )
 
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='All-symbols full computation: allocate symbols in parallel on this many workers '
+             '(bulk fetch, per-symbol commits)'
+    )
+
+    parser.add_argument(
+        '--pool',
+        choices=('process', 'thread'),
+        default='process',
+        help='Worker pool type for --workers (default: process)'
+    )
+
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only allocate fills newer than each symbol\'s stored watermark; '
+             'symbols with back-dated fills are rebuilt automatically'
+    )
+
     args = parser.parse_args()
 
+    if args.incremental and (args.force or args.since):
+        parser.error('--incremental cannot be combined with --force or --since')
+
     # Run async computation
     asyncio.run(compute_allocations(args))
 
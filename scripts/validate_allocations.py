@@ -11,6 +11,9 @@ Usage:
     # Strict validation (warnings = errors)
     python -m scripts.validate_allocations --version 1 --strict
 
+    # Validate selected symbols only
+    python -m scripts.validate_allocations --version 1 --symbols BTC-USD ETH-USD
+
     # Generate detailed report
     python -m scripts.validate_allocations --version 1 --report
 """
@@ -88,6 +91,8 @@ async def validate_allocations(args):
     print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"Version: {args.version}")
     print(f"Strict mode: {'ON' if args.strict else 'OFF'}")
+    if args.symbols:
+        print(f"Symbols: {', '.join(args.symbols)}")
 
     # Initialize dependencies
     print("\n🔧 Initializing dependencies...")
@@ -118,7 +123,8 @@ async def validate_allocations(args):
     print(f"\n🔍 Validating allocations...")
     result = await validator.validate_version(
         version=args.version,
-        strict=args.strict
+        strict=args.strict,
+        symbols=args.symbols
     )
 
     # Display results
@@ -141,6 +147,10 @@ async def validate_allocations(args):
     print(f"  - Over-allocated sells: {result.over_allocated_sells:,}")
     print(f"  - Duplicate allocations: {result.duplicate_allocations:,}")
 
+    print("\nCheck timings:")
+    for check, elapsed_ms in result.check_timings_ms.items():
+        print(f"  - {check}: {elapsed_ms:,.1f} ms")
+
     if result.total_pnl_computed is not None:
         print(f"\nPnL:")
         print(f"  - Total PnL: ${result.total_pnl_computed:,.2f}")
@@ -242,6 +252,12 @@ Validation Checks:
         help='Strict mode: treat warnings as errors'
     )
 
+    parser.add_argument(
+        '--symbols',
+        nargs='+',
+        help='Validate only these symbols (default: all)'
+    )
+
     parser.add_argument(
         '--report',
         action='store_true',
@@ -0,0 +1,390 @@
+"""
+Incremental Indicators
+
+Streaming counterpart of Indicators.calculate_indicators(). Each symbol keeps
+rolling state (MACD EMAs, Bollinger / RSI / volatility window statistics,
+rolling highs and lows for swing and ATR), so a new candle costs O(1)
+instead of a recompute over the symbol's whole OHLCV history.
+
+The newest candle of a symbol is provisional: it is evaluated against the
+committed state without changing it, because the in-progress candle is
+upserted into ohlcv_data and may be revised on every cycle. It is committed
+once a newer candle arrives.
+
+Only the last row is produced. It carries the same columns and
+(decision, value, threshold) tuples as the last row of
+Indicators.calculate_indicators(), which is all buy_sell_scoring() and
+update_indicator_matrix() read. W-Bottom / M-Top need the candle after the
+pattern, so the full recompute never marks the last row either; both are
+always (0, 0.0, 0.0) here.
+"""
+
+import math
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from sighook.indicators import Indicators
+
+NAN = float('nan')
+
+# Column order of Indicators.calculate_indicators()
+INDICATOR_COLUMNS = (
+    'basis', 'std', 'upper', 'lower', 'band_ratio',
+    'Buy Touch', 'Sell Touch', 'Buy Ratio', 'Sell Ratio',
+    'EMA_fast', 'EMA_slow', 'MACD', 'Signal_Line', 'MACD_Histogram', 'Buy MACD', 'Sell MACD',
+    'RSI', 'Buy RSI', 'Sell RSI',
+    'ROC', 'ROC_Diff', 'ROC_Diff_STD20', 'Buy ROC', 'Sell ROC',
+    'atr', 'W-Bottom', 'M-Top',
+    'volatility', 'rolling_high', 'rolling_low', 'Buy Swing', 'Sell Swing',
+)
+
+ROC_DIFF_STD_WINDOW = 20
+ROC_DIFF_STD_MIN_PERIODS = 5
+ROC_DIFF_STD_DEFAULT = 0.3
+
+
+def _div(numerator: float, denominator: float) -> float:
+    """Float division with NumPy semantics (x/0 → ±inf, 0/0 → NaN) instead of raising"""
+    if denominator == 0:
+        if numerator == 0 or numerator != numerator:
+            return NAN
+        return math.copysign(math.inf, numerator) * math.copysign(1.0, denominator)
+    return numerator / denominator
+
+
+class RollingStats:
+    """
+    Rolling mean and sample std (ddof=1) over the last `size` values.
+
+    Welford updates with removal keep each step O(1); the sums are rebuilt
+    from the window every RESYNC_EVERY pushes so rounding cannot drift. Like
+    pandas, a window of identical values has exactly that mean and std 0.
+    """
+
+    RESYNC_EVERY = 1024
+
+    __slots__ = ('size', 'min_periods', 'values', 'mean', 'm2', 'same_run', 'pushes')
+
+    def __init__(self, size: int, min_periods: Optional[int] = None):
+        self.size = size
+        self.min_periods = size if min_periods is None else min_periods
+        self.values = deque(maxlen=size)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.same_run = 0
+        self.pushes = 0
+
+    def peek(self, x: float) -> Tuple[float, float]:
+        """(mean, std) of the window if x were pushed; NaN below min_periods"""
+        return self._result(x, *self._next(x))
+
+    def push(self, x: float):
+        count, mean, m2, same_run = self._next(x)
+        self.values.append(x)
+        self.mean, self.m2, self.same_run = mean, m2, same_run
+        self.pushes += 1
+        if self.pushes % self.RESYNC_EVERY == 0:
+            self.mean = math.fsum(self.values) / len(self.values)
+            self.m2 = math.fsum((v - self.mean) ** 2 for v in self.values)
+
+    def _next(self, x: float):
+        n = len(self.values)
+        if n < self.size:
+            count = n + 1
+            delta = x - self.mean
+            mean = self.mean + delta / count
+            m2 = self.m2 + delta * (x - mean)
+        else:
+            count = n
+            old = self.values[0]
+            mean = self.mean + (x - old) / count
+            m2 = self.m2 + (x - old) * (x - mean + old - self.mean)
+        same_run = self.same_run + 1 if n and x == self.values[-1] else 1
+        return count, mean, m2, same_run
+
+    def _result(self, x, count, mean, m2, same_run) -> Tuple[float, float]:
+        if count < self.min_periods:
+            return NAN, NAN
+        if same_run >= count:
+            return x, 0.0
+        std = math.sqrt(max(m2, 0.0) / (count - 1)) if count > 1 else NAN
+        return mean, std
+
+
+class RollingExtremum:
+    """Rolling max (or min) over the last `size` values with a monotonic deque"""
+
+    __slots__ = ('size', 'sign', 'candidates', 'count')
+
+    def __init__(self, size: int, largest: bool = True):
+        self.size = size
+        self.sign = 1.0 if largest else -1.0
+        self.candidates = deque()  # (index, signed value), signed values decreasing
+        self.count = 0
+
+    def peek(self, x: float) -> float:
+        """Max/min of the window if x were pushed; NaN until the window is full"""
+        if self.count + 1 < self.size:
+            return NAN
+        best = self.sign * x
+        candidates = self.candidates
+        if candidates:
+            # At most the front can fall out of the window when x enters it
+            front = candidates[0] if candidates[0][0] > self.count - self.size else (
+                candidates[1] if len(candidates) > 1 else None)
+            if front is not None and front[1] > best:
+                best = front[1]
+        return self.sign * best
+
+    def push(self, x: float):
+        value = self.sign * x
+        candidates = self.candidates
+        while candidates and candidates[-1][1] <= value:
+            candidates.pop()
+        candidates.append((self.count, value))
+        self.count += 1
+        if candidates[0][0] < self.count - self.size:
+            candidates.popleft()
+
+
+class EMA:
+    """Exponential moving average, same recurrence as Series.ewm(span, adjust=False).mean()"""
+
+    __slots__ = ('alpha', 'value')
+
+    def __init__(self, span: int):
+        self.alpha = 1.0 / (1.0 + (span - 1) / 2.0)
+        self.value = NAN
+
+    def peek(self, x: float) -> float:
+        if self.value != self.value or self.value == x:
+            return x
+        old_wt = 1.0 - self.alpha
+        return (old_wt * self.value + self.alpha * x) / (old_wt + self.alpha)
+
+
+class SymbolIndicatorState:
+    """Committed rolling indicator state for one symbol"""
+
+    def __init__(self, params: Indicators):
+        self.params = params
+        self.bollinger = RollingStats(params.bb_window)
+        self.volatility = RollingStats(params.sma_volatility)
+        self.gains = RollingStats(params.rsi_window)
+        self.losses = RollingStats(params.rsi_window)
+        self.roc_diffs = RollingStats(ROC_DIFF_STD_WINDOW, min_periods=ROC_DIFF_STD_MIN_PERIODS)
+        self.roc_closes = deque(maxlen=params.roc_window)
+        self.swing_high = RollingExtremum(params.swing_window, largest=True)
+        self.swing_low = RollingExtremum(params.swing_window, largest=False)
+        self.atr_high = RollingExtremum(params.atr_window, largest=True)
+        self.atr_low = RollingExtremum(params.atr_window, largest=False)
+        self.ema_fast = EMA(params.macd_fast)
+        self.ema_slow = EMA(params.macd_slow)
+        self.ema_signal = EMA(params.macd_signal)
+        self.prev_close = NAN
+        self.prev_macd = NAN
+        self.prev_signal = NAN
+        self.prev_roc = NAN
+        self.count = 0          # committed candles
+        self.last_time = None   # time of the last committed candle
+        self.last_candle = None  # (close, high, low) of the last committed candle
+
+    def evaluate(self, close: float, high: float, low: float) -> Dict[str, float]:
+        """Raw indicator values for the candle after the committed ones (state is unchanged)"""
+        p = self.params
+        bb_std = float(p.bb_std)
+
+        basis, std = self.bollinger.peek(close)
+        upper = basis + bb_std * std
+        lower = basis - bb_std * std
+        band_ratio = _div(upper, lower)
+
+        ema_fast = self.ema_fast.peek(close)
+        ema_slow = self.ema_slow.peek(close)
+        macd = ema_fast - ema_slow
+        signal = self.ema_signal.peek(macd)
+
+        delta = close - self.prev_close
+        gain = delta if delta > 0 else 0.0
+        loss = -(delta if delta < 0 else 0.0)
+        avg_gain = self.gains.peek(gain)[0]
+        avg_loss = self.losses.peek(loss)[0]
+        rsi = 100 - _div(100, 1 + _div(avg_gain, NAN if avg_loss == 0 else avg_loss))
+        rsi = 50.0 if rsi != rsi else min(max(rsi, 0.0), 100.0)
+
+        if len(self.roc_closes) == p.roc_window:
+            roc = (_div(close, self.roc_closes[0]) - 1) * 100
+        else:
+            roc = NAN
+        roc_diff = roc - self.prev_roc
+        if roc_diff != roc_diff:
+            roc_diff = 0.0
+        roc_diff_std = self.roc_diffs.peek(roc_diff)[1]
+        if roc_diff_std != roc_diff_std:
+            roc_diff_std = ROC_DIFF_STD_DEFAULT
+
+        atr = self.atr_high.peek(high) - self.atr_low.peek(low)
+        volatility = self.volatility.peek(close)[1]
+
+        return {
+            'basis': basis, 'std': std, 'upper': upper, 'lower': lower,
+            'band_ratio': 1.0 if band_ratio != band_ratio else band_ratio,
+            'EMA_fast': ema_fast, 'EMA_slow': ema_slow,
+            'MACD': macd, 'Signal_Line': signal, 'MACD_Histogram': macd - signal,
+            'RSI': rsi, 'gain': gain, 'loss': loss,
+            'ROC': roc, 'ROC_Diff': roc_diff, 'ROC_Diff_STD20': roc_diff_std,
+            'atr': 0.0 if atr != atr else atr,
+            'volatility': 0.0 if volatility != volatility else volatility,
+            'rolling_high': self.swing_high.peek(close),
+            'rolling_low': self.swing_low.peek(close),
+        }
+
+    def commit(self, time, close: float, high: float, low: float, values: Dict[str, float]):
+        """Fold a candle (and its evaluate() values) into the state"""
+        self.bollinger.push(close)
+        self.volatility.push(close)
+        self.gains.push(values['gain'])
+        self.losses.push(values['loss'])
+        self.roc_diffs.push(values['ROC_Diff'])
+        self.roc_closes.append(close)
+        self.swing_high.push(close)
+        self.swing_low.push(close)
+        self.atr_high.push(high)
+        self.atr_low.push(low)
+        self.ema_fast.value = values['EMA_fast']
+        self.ema_slow.value = values['EMA_slow']
+        self.ema_signal.value = values['Signal_Line']
+        self.prev_close = close
+        self.prev_macd = values['MACD']
+        self.prev_signal = values['Signal_Line']
+        self.prev_roc = values['ROC']
+        self.count += 1
+        self.last_time = time
+        self.last_candle = (close, high, low)
+
+    def signals(self, values: Dict[str, float], close: float, quote_deci: int) -> Dict[str, tuple]:
+        """(decision, value, threshold) tuples for an evaluate() row"""
+        p = self.params
+        normalize = p.normalize_tuple
+        buy_ratio, sell_ratio = float(p.buy_ratio), float(p.sell_ratio)
+        rsi_buy, rsi_sell = float(p.rsi_buy), float(p.rsi_sell)
+        roc_buy, roc_sell = float(p.roc_buy_threshold), float(p.roc_sell_threshold)
+        macd, signal, rsi, roc = values['MACD'], values['Signal_Line'], values['RSI'], values['ROC']
+        band_ratio = values['band_ratio']
+
+        if self.count:
+            buy_macd = self.prev_macd < self.prev_signal and macd > signal and macd > 0
+            sell_macd = self.prev_macd > self.prev_signal and macd < signal and macd < 0
+            macd_tuples = (normalize(buy_macd, values['MACD_Histogram'], 0.0),
+                           normalize(sell_macd, values['MACD_Histogram'], 0.0))
+        else:
+            macd_tuples = ((0, 0.0, 0.0), (0, 0.0, 0.0))
+
+        return {
+            'Buy Touch': normalize(close <= values['lower'], round(close, quote_deci), values['lower']),
+            'Sell Touch': normalize(close >= values['upper'], round(close, quote_deci), values['upper']),
+            'Buy Ratio': normalize(band_ratio > buy_ratio, round(band_ratio, quote_deci), buy_ratio),
+            'Sell Ratio': normalize(band_ratio < sell_ratio, round(band_ratio, quote_deci), sell_ratio),
+            'Buy MACD': macd_tuples[0],
+            'Sell MACD': macd_tuples[1],
+            'Buy RSI': normalize(rsi < rsi_buy, round(rsi, 2), rsi_buy),
+            'Sell RSI': normalize(rsi > rsi_sell, round(rsi, 2), rsi_sell),
+            'Buy ROC': normalize(roc > roc_buy, round(roc, 2), roc_buy),
+            'Sell ROC': normalize(roc < roc_sell, round(roc, 2), roc_sell),
+            'W-Bottom': (0, 0.0, 0.0),
+            'M-Top': (0, 0.0, 0.0),
+            'Buy Swing': normalize(close > values['rolling_high'] and macd > signal, close, None),
+            'Sell Swing': normalize(close < values['rolling_low'] and macd < signal, close, None),
+        }
+
+
+class IncrementalIndicators:
+    """
+    Per-symbol incremental indicator engine.
+
+    Usage:
+        engine = IncrementalIndicators(indicators)
+        last_row = engine.calculate_indicators(symbol, ohlcv_df, quote_deci)
+
+    `ohlcv_df` is the symbol's recent OHLCV window (time ascending), as
+    fetched every cycle. Only candles newer than the last committed one are
+    folded into the state; if the window no longer contains that candle or
+    it was revised after being committed, the state is rebuilt from the window.
+    """
+
+    def __init__(self, indicators: Indicators):
+        self.indicators = indicators
+        self.logger = indicators.logger
+        self.min_rows = max(indicators.bb_window, indicators.macd_slow, indicators.rsi_window)
+        self._states: Dict[str, SymbolIndicatorState] = {}
+
+    def calculate_indicators(self, symbol: str, df: pd.DataFrame, quote_deci: int) -> pd.DataFrame:
+        """
+        Last row of `df` with the indicator columns of Indicators.calculate_indicators().
+
+        Returns a one-row DataFrame (index of the last row kept), or `df`
+        unchanged when there are fewer rows than the indicators need.
+        """
+        try:
+            if df.empty:
+                return df
+
+            state, start = self._sync(symbol, df)
+            closes = df['close'].to_numpy(dtype=float)[start:].tolist()
+            highs = df['high'].to_numpy(dtype=float)[start:].tolist()
+            lows = df['low'].to_numpy(dtype=float)[start:].tolist()
+            times = df['time'].iloc[start:].tolist()
+
+            for time, close, high, low in zip(times[:-1], closes[:-1], highs[:-1], lows[:-1]):
+                state.commit(time, close, high, low, state.evaluate(close, high, low))
+
+            if state.count + 1 < self.min_rows:
+                self.logger.warning(f"⚠️ Insufficient OHLCV data. Rows: {state.count + 1}")
+                return df
+
+            close = closes[-1]
+            values = state.evaluate(close, highs[-1], lows[-1])
+            signals = state.signals(values, close, quote_deci)
+
+            # Single object block: much cheaper to build than one block per dtype
+            columns = list(df.columns) + [c for c in INDICATOR_COLUMNS if c not in df.columns]
+            row = {c: df[c].iat[-1] for c in df.columns}
+            for column in INDICATOR_COLUMNS:
+                row[column] = signals[column] if column in signals else values[column]
+            cells = np.empty((1, len(columns)), dtype=object)
+            for i, column in enumerate(columns):
+                cells[0, i] = row[column]
+            return pd.DataFrame(cells, columns=columns, index=df.index[-1:], dtype=object)
+
+        except Exception as e:
+            self.logger.error(f"❌ Error in incremental calculate_indicators() for {symbol}: {e}", exc_info=True)
+            self._states.pop(symbol, None)
+            return self.indicators.calculate_indicators(df, quote_deci)
+
+    def reset(self, symbol: Optional[str] = None):
+        """Drop the rolling state of one symbol (or all symbols)"""
+        if symbol is None:
+            self._states.clear()
+        else:
+            self._states.pop(symbol, None)
+
+    def _sync(self, symbol: str, df: pd.DataFrame) -> Tuple[SymbolIndicatorState, int]:
+        """State for `symbol` and the first row of `df` it has not committed yet"""
+        state = self._states.get(symbol)
+        if state is not None and state.last_time is not None:
+            times = df['time']
+            position = int(times.searchsorted(state.last_time, side='left'))
+            if (position < len(df) - 1 and times.iloc[position] == state.last_time
+                    and self._candle(df, position) == state.last_candle):
+                return state, position + 1
+
+        state = SymbolIndicatorState(self.indicators)
+        self._states[symbol] = state
+        return state, 0
+
+    @staticmethod
+    def _candle(df: pd.DataFrame, position: int) -> tuple:
+        return tuple(float(df[column].iat[position]) for column in ('close', 'high', 'low'))
@@ -1,5 +1,6 @@
 
 import asyncio
+import os
 import uuid
 from typing import Dict, Any, List, Tuple
 import pandas as pd
@@ -8,6 +9,8 @@ from sqlalchemy import select
 from Config.config_manager import CentralConfig
 from sighook.signal_manager import SignalManager
 from sighook.indicators import Indicators
+from sighook.incremental_indicators import IncrementalIndicators
+from MarketDataManager.ohlcv_store import OHLCVStore
 from TableModels.ohlcv_data import OHLCVData
 from Shared_Utils.dynamic_symbol_filter import DynamicSymbolFilter
 
@@ -39,12 +42,19 @@ class TradingStrategy:
 
         # ✅ Indicators & Signal Manager (with TP/SL support)
         self.indicators = Indicators(logger_manager)
+        # Rolling per-symbol indicator state: O(1) per new candle instead of a full recompute
+        self.incremental_indicators = (
+            IncrementalIndicators(self.indicators)
+            if os.getenv('INCREMENTAL_INDICATORS', 'true').lower() in ('true', '1', 'yes')
+            else None
+        )
         self.signal_manager = SignalManager(logger_manager,shared_data_manager,
                                             shared_utils_precision,
                                             trade_recorder)
 
         # ✅ Cached config thresholds
         self._max_ohlcv_rows = self.config.max_ohlcv_rows or 720
+        self.ohlcv_store = OHLCVStore.get_instance()
         self._hodl = self.config._hodl
         self.start_time = None
 
@@ -137,12 +147,17 @@ class TradingStrategy:
 
                 # ✅ Calculate Indicators
                 _, quote_deci, _, _ = self.shared_utils_precision.fetch_precision(symbol)
-                ohlcv_df = self.indicators.calculate_indicators(ohlcv_df, quote_deci)
+                candles = ohlcv_df
+                if self.incremental_indicators is not None:
+                    # Last row only (all that scoring and the matrix read)
+                    ohlcv_df = self.incremental_indicators.calculate_indicators(symbol, candles, quote_deci)
+                else:
+                    ohlcv_df = self.indicators.calculate_indicators(candles, quote_deci)
                 if ohlcv_df is None or ohlcv_df.empty:
                     continue
 
                 # ✅ Cache ATR for this symbol (enables ATR-based TP/SL for new buys)
-                self._cache_atr_for_symbol(symbol.replace("/", "-"), ohlcv_df)
+                self._cache_atr_for_symbol(symbol.replace("/", "-"), candles)
 
                 # ✅ Decide Action (Buy/Sell/TP/SL)
                 trade_decision = await self.decide_action(ohlcv_df, symbol)
@@ -237,6 +252,9 @@ class TradingStrategy:
             if 'atr_price_cache' not in self.shared_data_manager.market_data:
                 self.shared_data_manager.market_data['atr_price_cache'] = {}
 
+            # Only the last `period` True Ranges are used
+            ohlcv_df = ohlcv_df.tail(period + 1)
+
             # Calculate True Range ATR (same formula as webhook_order_manager)
             trs = []
             prev_close = float(ohlcv_df.iloc[0]['close'])
@@ -264,6 +282,7 @@ class TradingStrategy:
                 # Cache for webhook to use
                 self.shared_data_manager.market_data['atr_pct_cache'][product_id] = atr_pct
                 self.shared_data_manager.market_data['atr_price_cache'][product_id] = atr_price
+                self.shared_data_manager.mark_changed('market_data', ['atr_pct_cache', 'atr_price_cache'])
 
                 self.logger.debug(f"[ATR_CACHE] {product_id}: ATR={atr_price:.6f}, ATR%={atr_pct*100:.2f}%")
 
@@ -275,26 +294,32 @@ class TradingStrategy:
     # =========================================================
     async def fetch_valid_ohlcv_batches(self, filtered_ticker_cache: pd.DataFrame) -> Dict[str, pd.DataFrame]:
         """
-        Fetch OHLCV for all symbols with controlled concurrency.
-        """
-        semaphore = asyncio.Semaphore(10)  # Limit to 10 concurrent queries (tune as needed)
-
-        async def safe_fetch(symbol):
-            async with semaphore:
-                return await self.fetch_ohlcv_data_from_db(symbol)
+        OHLCV for all symbols from the shared OHLCV store.
 
-        tasks = {
-            row['symbol']: asyncio.create_task(safe_fetch(row['symbol']))
-            for _, row in filtered_ticker_cache.iterrows()
-        }
-
-        raw_data = await asyncio.gather(*tasks.values(), return_exceptions=False)
-
-        return {
-            symbol: df
-            for symbol, df in zip(tasks.keys(), raw_data)
-            if isinstance(df, pd.DataFrame) and not df.empty
-        }
+        The store is synced with ohlcv_data first: symbols seen before only
+        read the rows written since the last cycle (one query for all symbols).
+        """
+        symbols = filtered_ticker_cache['symbol'].tolist()
+        try:
+            await self.ohlcv_store.refresh_from_db(
+                self.shared_data_manager.database_session_manager, symbols, self.max_ohlcv_rows
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Serve what the store already holds; the next cycle retries the sync
+            self.logger.error(f"❌ Error syncing OHLCV store: {e}", exc_info=True)
+
+        ohlcv_data = {}
+        for symbol in symbols:
+            ohlcv_df = self.ohlcv_store.frame(symbol, n=self.max_ohlcv_rows)
+            if ohlcv_df.empty:
+                continue
+            if ohlcv_df.isnull().values.any():
+                self.logger.warning(f"⚠️ NaN detected in OHLCV for {symbol}")
+                continue
+            ohlcv_data[symbol] = ohlcv_df
+        return ohlcv_data
 
     async def fetch_ohlcv_data_from_db(self, symbol: str) -> pd.DataFrame:
         """
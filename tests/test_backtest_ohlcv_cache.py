@@ -0,0 +1,71 @@
+"""
+Test columnar OHLCV cache
+
+Round trip through OHLCVCache (time-range, symbol and column pruning),
+incremental merges, and a backtest read from the cache without a database.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+
+from backtest.config import BacktestConfig
+from backtest.ohlcv_cache import OHLCVCache
+from backtest.vectorized import VectorizedBacktestEngine
+from scripts.benchmarks.bench_backtest_vectorized import BENCH_STRATEGY, generate_ohlcv, run_engine, trade_keys
+
+START = datetime(2025, 6, 1, tzinfo=timezone.utc)
+END = START + timedelta(hours=30)
+
+
+@pytest.fixture(scope='module')
+def ohlcv():
+    df = generate_ohlcv(3, START, END, seed=9)
+    for column in ('open', 'high', 'low', 'close', 'volume'):
+        df[column] = df[column].astype(float)  # ohlcv_data columns are Float
+    return df
+
+
+@pytest.fixture
+def cache(tmp_path, ohlcv):
+    cache = OHLCVCache(str(tmp_path / 'cache'))
+    cache.write(ohlcv)
+    return cache
+
+
+def test_load_prunes_time_symbol_and_columns(cache, ohlcv):
+    lo, hi = START + timedelta(hours=5), START + timedelta(hours=26)
+    loaded = cache.load(lo, hi, symbols=['SYM001-USD'], columns=['close'])
+
+    expected = ohlcv[(ohlcv['symbol'] == 'SYM001-USD') & (ohlcv['time'] >= lo) & (ohlcv['time'] <= hi)]
+    assert list(loaded.columns) == ['time', 'symbol', 'close']
+    assert list(loaded['time']) == list(expected['time'])
+    assert list(loaded['close']) == list(expected['close'])
+    assert cache.last_time() == ohlcv['time'].max()
+
+
+def test_incremental_write_merges_and_replaces(cache, ohlcv):
+    last = ohlcv['time'].max()
+    extra = pd.DataFrame({
+        'time': [last, last + timedelta(minutes=1)],
+        'symbol': ['SYM000-USD', 'SYM000-USD'],
+        'open': [1.0, 2.0], 'high': [1.0, 2.0], 'low': [1.0, 2.0], 'close': [1.0, 2.0], 'volume': [1.0, 1.0],
+    })
+    cache.write(extra)
+
+    tail = cache.load(last, last + timedelta(minutes=1), symbols=['SYM000-USD'])
+    assert list(tail['close']) == [1.0, 2.0]
+    assert cache.last_time() == last + timedelta(minutes=1)
+    assert len(cache.load(START - timedelta(days=3), END + timedelta(hours=1))) == len(ohlcv) + 1
+
+
+def test_backtest_reads_cache_offline(cache, ohlcv):
+    cached_config = BacktestConfig(start_date=START, end_date=END, verbose=False, ohlcv_cache_dir=str(cache.root))
+    config = BacktestConfig(start_date=START, end_date=END, verbose=False)
+
+    from_cache, _ = run_engine(VectorizedBacktestEngine, BENCH_STRATEGY, cached_config, None)
+    preloaded, _ = run_engine(VectorizedBacktestEngine, BENCH_STRATEGY, config, ohlcv)
+
+    assert from_cache.total_trades > 0
+    assert trade_keys(from_cache) == trade_keys(preloaded)
@@ -0,0 +1,125 @@
+"""
+Test backtest parameter sweep
+
+Config generation (grid, Latin hypercube), shared-memory OHLCV round trip,
+a process-pool sweep matching sequential runs, and the CLI over an
+OHLCVCache directory.
+"""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from backtest.config import BacktestConfig
+from backtest.ohlcv_cache import OHLCVCache
+from backtest.reporter import rank_results
+from backtest.sweep import (
+    ParameterSweep, SharedOHLCV, grid_configs, latin_hypercube_configs, load_ohlcv_file, main
+)
+from scripts.benchmarks.bench_backtest_vectorized import BENCH_STRATEGY, generate_ohlcv
+
+START = datetime(2025, 6, 1, tzinfo=timezone.utc)
+END = START + timedelta(hours=12)
+
+
+@pytest.fixture(scope='module')
+def ohlcv():
+    df = generate_ohlcv(3, START, END, seed=5)
+    for column in ('open', 'high', 'low', 'close', 'volume'):
+        df[column] = df[column].astype(float)  # ohlcv_data columns are Float, as in shared memory
+    return df
+
+
+def test_grid_configs_coerce_field_types():
+    configs = grid_configs(BENCH_STRATEGY, {'take_profit_pct': ['0.02', 0.03], 'peak_max_hold_hours': [4.0]})
+
+    assert [label for label, _ in configs] == [
+        'take_profit_pct=0.02 peak_max_hold_hours=4',
+        'take_profit_pct=0.03 peak_max_hold_hours=4',
+    ]
+    assert configs[1][1].take_profit_pct == Decimal('0.03')
+    assert configs[0][1].peak_max_hold_hours == 4
+    assert configs[0][1].stop_loss_pct == BENCH_STRATEGY.stop_loss_pct
+
+    with pytest.raises(ValueError):
+        grid_configs(BENCH_STRATEGY, {'no_such_param': [1]})
+
+
+def test_latin_hypercube_uses_every_stratum_once():
+    n = 8
+    configs = latin_hypercube_configs(BENCH_STRATEGY, {'stop_loss_pct': (0.0, 0.08)}, n, seed=1)
+
+    strata = sorted(int(float(c.stop_loss_pct) / 0.01) for _, c in configs)
+    assert strata == list(range(n))
+
+
+def test_shared_ohlcv_round_trip(ohlcv, tmp_path):
+    path = tmp_path / 'ohlcv.csv'
+    ohlcv.to_csv(path, index=False)
+    loaded = load_ohlcv_file(str(path))
+
+    shared = SharedOHLCV.create(loaded)
+    try:
+        attached = SharedOHLCV.attach(shared.spec)
+        frame = attached.to_frame()
+        attached.close()
+    finally:
+        shared.close()
+        shared.unlink()
+
+    assert list(frame['time']) == list(loaded['time'])
+    assert list(frame['symbol']) == list(loaded['symbol'])
+    assert list(frame['close']) == list(loaded['close'])
+
+
+def test_shared_ohlcv_copies_present_columns_only(ohlcv):
+    shared = SharedOHLCV.create(ohlcv[['time', 'symbol', 'close']])
+    try:
+        frame = SharedOHLCV.attach(shared.spec).to_frame()
+    finally:
+        shared.close()
+        shared.unlink()
+
+    assert list(frame.columns) == ['time', 'symbol', 'close']
+    assert list(frame['close']) == list(ohlcv['close'])
+
+
+def test_pool_sweep_matches_sequential(ohlcv):
+    config = BacktestConfig(start_date=START, end_date=END, verbose=False)
+    configs = grid_configs(BENCH_STRATEGY, {'take_profit_pct': [0.02, 0.03], 'stop_loss_pct': [0.01, 0.02]})
+
+    sequential = ParameterSweep(config, ohlcv, workers=1).run(configs)
+    pooled = ParameterSweep(config, ohlcv, workers=2).run(configs)
+
+    assert [r.strategy_name for r in pooled] == [r.strategy_name for r in sequential]
+    assert [r.total_pnl for r in pooled] == [r.total_pnl for r in sequential]
+    assert sequential == rank_results(sequential, 'total_pnl')
+
+
+def test_cli_sweeps_and_dumps_from_cache(ohlcv, tmp_path, capsys):
+    OHLCVCache(str(tmp_path / 'cache')).write(ohlcv)
+    args = ['--cache', str(tmp_path / 'cache'), '--start', START.strftime('%Y-%m-%d'),
+            '--end', END.strftime('%Y-%m-%d')]
+
+    assert main(args + ['--grid', 'take_profit_pct=0.02,0.03', '--workers', '2']) == 0
+    assert 'take_profit_pct=0.03' in capsys.readouterr().out
+
+    dump = tmp_path / 'ohlcv.pkl'
+    assert main(args + ['--dump', str(dump)]) == 0
+    assert set(pd.read_pickle(dump).columns) == {'time', 'symbol', 'open', 'high', 'low', 'close', 'volume'}
+
+
+def test_worker_count_does_not_change_results():
+    # Decimal prices, as handed over by callers that did not go through the database
+    decimal_ohlcv = generate_ohlcv(3, START, END, seed=5)
+    config = BacktestConfig(start_date=START, end_date=END, verbose=False)
+    configs = grid_configs(BENCH_STRATEGY, {'take_profit_pct': [0.02, 0.03], 'stop_loss_pct': [0.01, 0.02]})
+
+    single = ParameterSweep(config, decimal_ohlcv, workers=1).run(configs)
+    pooled = ParameterSweep(config, decimal_ohlcv, workers=2).run(configs)
+
+    assert [r.strategy_name for r in pooled] == [r.strategy_name for r in single]
+    assert [(r.total_trades, r.total_pnl, r.final_capital) for r in pooled] == \
+        [(r.total_trades, r.total_pnl, r.final_capital) for r in single]
@@ -0,0 +1,43 @@
+"""
+Test vectorized backtest execution core
+
+VectorizedBacktestEngine must produce the same trades and final capital as
+BacktestEngine on a fixed synthetic OHLCV fixture.
+"""
+
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backtest.config import BacktestConfig
+from backtest.engine import BacktestEngine
+from backtest.vectorized import VectorizedBacktestEngine
+from scripts.benchmarks.bench_backtest_vectorized import (
+    BENCH_STRATEGY, generate_ohlcv, run_engine, trade_keys
+)
+
+START = datetime(2025, 6, 1, tzinfo=timezone.utc)
+END = START + timedelta(hours=18)
+
+
+@pytest.fixture(scope='module')
+def data():
+    return generate_ohlcv(4, START, END, seed=11)
+
+
+@pytest.mark.parametrize('strategy', [
+    BENCH_STRATEGY,
+    replace(BENCH_STRATEGY, peak_tracking_enabled=False, rsi_filter_enabled=False),
+    replace(BENCH_STRATEGY, peak_smoothing_periods=1, roc_accel_enabled=False),
+], ids=['peak-smoothed', 'no-peak-no-rsi', 'unsmoothed-no-accel'])
+def test_vectorized_matches_reference(data, strategy):
+    config = BacktestConfig(start_date=START, end_date=END, verbose=False)
+
+    reference, _ = run_engine(BacktestEngine, strategy, config, data)
+    vectorized, _ = run_engine(VectorizedBacktestEngine, strategy, config, data)
+
+    assert reference.total_trades > 0
+    assert trade_keys(vectorized) == trade_keys(reference)
+    assert [t.peak_price for t in vectorized.trades] == [t.peak_price for t in reference.trades]
+    assert vectorized.final_capital == reference.final_capital
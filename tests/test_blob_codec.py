@@ -0,0 +1,71 @@
+"""
+Test the columnar shared_data blob encoding
+
+DataFrames and uniform records keep their column types, Decimals stay exact,
+JSON rows written before the switch still decode, and unknown format
+versions are rejected.
+"""
+
+import json
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from SharedDataManager.blob_codec import decode_columnar, encode_columnar, is_columnar
+from SharedDataManager.shared_data_manager import decode_shared_data, encode_shared_data
+
+
+def market_data():
+    return {
+        'ticker_cache': pd.DataFrame({
+            'symbol': ['BTC/USD', 'ETH/USD', None],
+            'price': [100000.5, 3500.25, np.nan],
+            'volume': np.array([10, 20, 30], dtype=np.int64),
+            'trading_disabled': [False, True, False],
+            'base_increment': [Decimal('0.00000001'), Decimal('0.0001'), Decimal('0.01')],
+            'updated': pd.to_datetime(['2025-06-01T00:00:00Z', '2025-06-01T00:00:01Z', None], utc=True),
+        }, index=[5, 6, 7]),
+        'bid_ask_spread': {'BTC/USD': {'bid': Decimal('99999.12345678'), 'ask': 100001.0},
+                           'ETH/USD': {'bid': 3499.5, 'ask': 3500.5}},
+        'filtered_vol': [{'symbol': 'BTC/USD', 'rank': 1, 'volume': 1e9, 'new': False},
+                         {'symbol': 'ETH/USD', 'rank': 2, 'volume': float('nan'), 'new': True}],
+        'avg_quote_volume': Decimal('750000'),
+        'empty': pd.DataFrame(),
+    }
+
+
+def test_columnar_round_trip_keeps_types_and_decimals():
+    encoded = encode_columnar(market_data())
+    assert is_columnar(encoded) and encoded.startswith('SDC1:')
+    decoded = decode_columnar(encoded)
+
+    expected = market_data()['ticker_cache'].reset_index(drop=True)
+    pd.testing.assert_frame_equal(decoded['ticker_cache'], expected)
+    assert decoded['bid_ask_spread'] == market_data()['bid_ask_spread']
+    assert decoded['bid_ask_spread']['BTC/USD']['bid'] == Decimal('99999.12345678')
+    rows = decoded['filtered_vol']
+    assert rows[0] == {'symbol': 'BTC/USD', 'rank': 1, 'volume': 1e9, 'new': False}
+    assert type(rows[1]['rank']) is int and rows[1]['volume'] != rows[1]['volume'] and rows[1]['new'] is True
+    assert decoded['avg_quote_volume'] == Decimal('750000')
+    assert decoded['empty'].empty
+
+
+def test_json_rows_still_decode_and_json_stays_the_default():
+    legacy = json.dumps({'ticker_cache': {'__type__': 'DataFrame', 'data': [{'symbol': 'BTC/USD', 'price': 1.5}]},
+                         'avg_quote_volume': {'__type__': 'Decimal', 'value': '750000'}})
+    decoded = decode_shared_data(legacy)
+    assert decoded['ticker_cache']['symbol'].tolist() == ['BTC/USD']
+    assert decoded['avg_quote_volume'] == Decimal('750000')
+
+    encoded = encode_shared_data(market_data())
+    assert encoded.startswith('{')
+    assert decode_shared_data(encoded)['bid_ask_spread']['BTC/USD']['bid'] == 99999.12345678  # JSON: float
+    assert decode_shared_data(encode_shared_data(market_data(), 'columnar'))['avg_quote_volume'] == Decimal('750000')
+
+
+def test_unknown_version_is_rejected():
+    encoded = encode_columnar({'a': 1})
+    with pytest.raises(ValueError, match='SDC9'):
+        decode_shared_data('SDC9' + encoded[4:])
@@ -0,0 +1,180 @@
+"""
+Test websocket candle builder
+
+Replays recorded-style market messages through CandleBuilder (exact OHLCV from
+trades, opt-in close-price bars from tickers, dropped partial first bar, flat
+fills, late updates) and checks CandleService upserts trade bars into
+ohlcv_data on SQLite and never ticker-sampled ones.
+"""
+
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from MarketDataManager.candle_builder import (
+    CandleBuilder, CandleService, read_messages, replay
+)
+from TableModels.ohlcv_data import OHLCVData
+
+T0 = 1_750_000_020  # Minute boundary
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f') + '123Z'
+
+
+def trades(*rows, event_type='update'):
+    """market_trades message; rows are (product_id, price, size, ts)"""
+    return {
+        'channel': 'market_trades', 'timestamp': _iso(rows[-1][3]),
+        'events': [{'type': event_type, 'trades': [
+            {'product_id': p, 'price': str(price), 'size': str(size), 'side': 'BUY', 'time': _iso(ts)}
+            for p, price, size, ts in rows
+        ]}],
+    }
+
+
+def ticker(product_id, price, ts, channel='ticker_batch'):
+    return {
+        'channel': channel, 'timestamp': _iso(ts),
+        'events': [{'type': 'update', 'tickers': [{'product_id': product_id, 'price': str(price)}]}],
+    }
+
+
+def bars(candles, symbol='BTC/USD'):
+    return [(c.start - T0, c.open, c.high, c.low, c.close, c.volume) for c in candles if c.symbol == symbol]
+
+
+def test_trades_build_exact_ohlcv():
+    messages = [
+        trades(('BTC-USD', 100, 1, T0 + 30)),                              # Partial first minute: dropped
+        trades(('BTC-USD', 101, 0.5, T0 + 60), ('BTC-USD', 104, 0.25, T0 + 75)),
+        trades(('BTC-USD', 99, 1, T0 + 100), ('BTC-USD', 102, 2, T0 + 119)),
+        trades(('BTC-USD', 103, 1, T0 + 130)),
+    ]
+    candles = replay(messages)
+    assert bars(candles) == [
+        (60, 101, 104, 99, 102, 3.75),
+        (120, 103, 103, 103, 103, 1.0),
+    ]
+
+
+def test_snapshot_trades_ignored():
+    builder = CandleBuilder()
+    builder.on_message(trades(('BTC-USD', 100, 1, T0 - 600), event_type='snapshot'))
+    assert builder.stats['updates'] == 0
+
+
+def test_ticker_prices_and_flat_fill():
+    messages = [
+        ticker('ETH-USD', 10, T0 + 50),
+        ticker('ETH-USD', 11, T0 + 61),
+        ticker('ETH-USD', 12, T0 + 70, channel='ticker'),
+        ticker('ETH-USD', 9, T0 + 90),
+        ticker('ETH-USD', 13, T0 + 245),  # Two quiet minutes in between
+    ]
+    assert replay(messages) == []
+
+    candles = replay(messages, CandleBuilder(ticker_prices=True))
+    assert bars(candles, 'ETH/USD') == [
+        (60, 11, 12, 9, 9, 0.0),
+        (120, 9, 9, 9, 9, 0.0),
+        (180, 9, 9, 9, 9, 0.0),
+        (240, 13, 13, 13, 13, 0.0),
+    ]
+
+
+def test_late_updates_and_due_closing():
+    builder = CandleBuilder(grace_seconds=5, max_fill_bars=2)
+    builder.add_trade('SOL-USD', 20, 1, T0 + 10)
+    builder.add_trade('SOL-USD', 21, 1, T0 + 60)
+    # Minute 60 is still within its grace period
+    assert builder.close_due(T0 + 124) == []
+    assert bars(builder.close_due(T0 + 125), 'SOL/USD') == [(60, 21, 21, 21, 21, 1.0)]
+
+    builder.add_trade('SOL-USD', 25, 1, T0 + 119)  # Bar already written
+    assert builder.stats['late_updates'] == 1
+
+    # Quiet symbol: flat bars stop after max_fill_bars
+    filled = builder.close_due(T0 + 1000)
+    assert [c.start - T0 for c in filled] == [120, 180]
+
+
+def test_reset_drops_partial_bar_after_reconnect():
+    builder = CandleBuilder()
+    builder.add_trade('BTC-USD', 100, 1, T0 + 10)
+    builder.add_trade('BTC-USD', 101, 1, T0 + 70)
+    builder.reset()
+    candles = builder.add_trade('BTC-USD', 102, 1, T0 + 250) + builder.add_trade('BTC-USD', 103, 1, T0 + 300)
+    # No bars for the missed minutes and none for the partial minute after the reconnect
+    assert candles == []
+    assert bars(builder.close_due(T0 + 400)) == [(300, 103, 103, 103, 103, 1.0)]
+
+
+def test_read_messages_roundtrip(tmp_path):
+    path = tmp_path / 'messages.jsonl'
+    messages = [trades(('BTC-USD', 100 + i, 1, T0 + 20 * i)) for i in range(10)]
+    path.write_text('\n'.join(json.dumps(m) for m in messages) + '\n\n')
+    assert bars(replay(read_messages(str(path)))) == bars(replay(messages))
+
+
+class _SessionManager:
+    def __init__(self, engine):
+        self.engine = engine
+        self._sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def async_session(self):
+        async with self._sessionmaker() as session:
+            yield session
+
+
+@pytest.fixture
+async def db(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'ohlcv.sqlite'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(OHLCVData.__table__.create)
+    yield _SessionManager(engine)
+    await engine.dispose()
+
+
+async def _rows(db):
+    async with db.async_session() as session:
+        result = await session.execute(
+            select(OHLCVData.symbol, OHLCVData.time, OHLCVData.close, OHLCVData.volume)
+            .order_by(OHLCVData.symbol, OHLCVData.time)
+        )
+        return [(s, t.replace(tzinfo=timezone.utc).timestamp() - T0, c, v) for s, t, c, v in result]
+
+
+async def test_service_upserts_closed_bars(db, tmp_path):
+    record = tmp_path / 'recorded.jsonl'
+    service = CandleService(db, batch_rows=2, record_path=str(record))
+    for i in range(12):
+        service.on_message(trades(('BTC-USD', 100 + i, 1, T0 + 20 * i), ('ETH-USD', 10 + i, 2, T0 + 20 * i)))
+    service.on_message({'channel': 'heartbeats'})
+    service.on_message(ticker('BTC-USD', 500, T0 + 30))
+
+    assert await service.flush(now=T0 + 300) == 6
+    assert await _rows(db) == [
+        ('BTC/USD', 60, 105.0, 3.0), ('BTC/USD', 120, 108.0, 3.0), ('BTC/USD', 180, 111.0, 3.0),
+        ('ETH/USD', 60, 15.0, 6.0), ('ETH/USD', 120, 18.0, 6.0), ('ETH/USD', 180, 21.0, 6.0),
+    ]
+    assert len(record.read_text().splitlines()) == 12
+
+    # Rewriting a stored minute updates it in place
+    revised = replay([trades(('BTC-USD', 90, 4, T0 + 170), ('BTC-USD', 91, 4, T0 + 185), ('BTC-USD', 92, 1, T0 + 240))])
+    service._pending = revised
+    assert await service.flush(now=T0 + 300) == 2
+    rows = await _rows(db)
+    assert len(rows) == 7 and rows[2] == ('BTC/USD', 180, 91.0, 4.0)
+    assert await service.flush(now=T0 + 300) == 0
+
+
+def test_service_refuses_ticker_sampled_bars(db):
+    with pytest.raises(ValueError):
+        CandleService(db, builder=CandleBuilder(ticker_prices=True))
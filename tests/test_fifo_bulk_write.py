@@ -0,0 +1,67 @@
+"""
+Test bulk FIFO persistence
+
+Checks BulkAllocationWriter (bulk_writes=True) against the per-row path on the
+SQLite stand-in: same allocations, and review-queue items upsert on
+(order_id, issue_type) without resetting status.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import text
+
+from fifo_engine.bulk_writer import BulkAllocationWriter
+from fifo_engine.engine import FifoAllocationEngine
+from scripts.benchmarks.bench_fifo_allocation import generate_fills
+from scripts.benchmarks.bench_fifo_parallel import fetch_allocations
+from scripts.benchmarks.sqlite_standin import SQLiteSessionManager
+
+
+@pytest.fixture
+async def db(tmp_path):
+    db = SQLiteSessionManager(str(tmp_path / 'fifo.sqlite'))
+    await db.create_schema()
+    buys, sells = generate_fills(600, symbol='AAA-USD', seed=7)
+    await db.insert_trades(buys + sells)
+    yield db
+    await db.dispose()
+
+
+async def test_bulk_matches_per_row(db):
+    per_row = FifoAllocationEngine(db, MagicMock(), None, bulk_writes=False)
+    bulk = FifoAllocationEngine(db, MagicMock(), None, bulk_writes=True)
+
+    first = await per_row.compute_all_symbols(version=1)
+    second = await bulk.compute_all_symbols(version=2)
+
+    assert first.success and second.success
+    assert second.allocations_created == first.allocations_created
+    assert await fetch_allocations(db, 1) == await fetch_allocations(db, 2)
+
+
+async def test_review_items_upsert(db):
+    writer = BulkAllocationWriter(batch_rows=2)
+    items = [
+        {'order_id': f'S{i}', 'issue_type': 'unmatched_sell', 'severity': 'medium', 'description': 'old'}
+        for i in range(5)
+    ]
+
+    async with db.async_session() as session:
+        async with session.begin():
+            await writer.write_review_items(session, items)
+            await session.execute(text(
+                "UPDATE manual_review_queue SET status = 'in_progress' WHERE order_id = 'S0'"
+            ))
+            updated = [dict(items[0], description='new'), dict(items[0], description='newest')]
+            assert await writer.write_review_items(session, updated) == 1
+
+    async with db.async_session() as session:
+        rows = await session.execute(text(
+            "SELECT order_id, status, description FROM manual_review_queue ORDER BY order_id"
+        ))
+        rows = rows.fetchall()
+
+    assert len(rows) == 5
+    assert tuple(rows[0]) == ('S0', 'in_progress', 'newest')
+    assert all(r[2] == 'old' for r in rows[1:])
@@ -0,0 +1,77 @@
+"""
+Test parallel all-symbols FIFO computation
+
+Runs FifoAllocationEngine.compute_all_symbols_parallel() against the SQLite
+stand-in and checks it matches the serial computation and reports per-symbol
+failures without aborting the other symbols.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import text
+
+from fifo_engine.engine import FifoAllocationEngine
+from scripts.benchmarks.bench_fifo_allocation import generate_fills
+from scripts.benchmarks.bench_fifo_parallel import fetch_allocations
+from scripts.benchmarks.sqlite_standin import SQLiteSessionManager
+
+SYMBOLS = ['AAA-USD', 'BBB-USD', 'CCC-USD']
+
+
+@pytest.fixture
+async def db(tmp_path):
+    db = SQLiteSessionManager(str(tmp_path / 'fifo.sqlite'))
+    await db.create_schema()
+    trades = []
+    for i, symbol in enumerate(SYMBOLS):
+        buys, sells = generate_fills(400, symbol=symbol, seed=i)
+        trades.extend(buys + sells)
+    await db.insert_trades(trades)
+    yield db
+    await db.dispose()
+
+
+async def test_parallel_matches_serial(db):
+    engine = FifoAllocationEngine(db, MagicMock(), None)
+
+    serial = await engine.compute_all_symbols(version=1)
+    parallel = await engine.compute_all_symbols_parallel(version=2, workers=2, pool='thread')
+
+    assert serial.success and parallel.success
+    assert parallel.symbols_failed == {}
+    assert sorted(parallel.symbols_processed) == SYMBOLS
+    assert parallel.allocations_created == serial.allocations_created
+    assert await fetch_allocations(db, 1) == await fetch_allocations(db, 2)
+
+
+async def test_failed_symbol_is_reported_and_others_commit(db):
+    engine = FifoAllocationEngine(db, MagicMock(), None)
+    persist = engine._persist_symbol_result
+
+    async def failing_persist(*args, **kwargs):
+        if kwargs['symbol'] == 'BBB-USD':
+            raise RuntimeError('disk full')
+        return await persist(*args, **kwargs)
+
+    engine._persist_symbol_result = failing_persist
+
+    result = await engine.compute_all_symbols_parallel(version=1, workers=2, pool='thread')
+
+    assert not result.success
+    assert result.symbols_failed == {'BBB-USD': 'RuntimeError: disk full'}
+    assert sorted(result.symbols_processed) == ['AAA-USD', 'CCC-USD']
+
+    async with db.async_session() as session:
+        rows = await session.execute(text("""
+            SELECT DISTINCT symbol FROM fifo_allocations WHERE allocation_version = 1 ORDER BY symbol
+        """))
+        assert [r[0] for r in rows.fetchall()] == ['AAA-USD', 'CCC-USD']
+        status = await session.execute(text("SELECT status FROM fifo_computation_log"))
+        assert status.scalar() == 'partial'
+
+
+async def test_unknown_pool_rejected(db):
+    engine = FifoAllocationEngine(db, MagicMock(), None)
+    with pytest.raises(ValueError):
+        await engine.compute_all_symbols_parallel(version=1, pool='gpu')
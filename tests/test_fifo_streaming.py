@@ -0,0 +1,240 @@
+"""
+Test streaming FIFO allocation core
+
+Verifies that FifoAllocationEngine._allocate_symbol_stream produces exactly the
+same allocations (and unmatched sells) as the per-sell reference path.
+"""
+
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import text
+
+from fifo_engine.engine import FifoAllocationEngine
+from scripts.benchmarks.bench_fifo_allocation import generate_fills, run_reference
+from scripts.benchmarks.bench_fifo_parallel import fetch_allocations
+from scripts.benchmarks.sqlite_standin import SQLiteSessionManager
+
+T0 = datetime(2026, 1, 1, 12, 0, 0)
+VERSION = 1
+BATCH_ID = uuid.UUID(int=0)
+
+
+def _trade(order_id, side, size, price, minutes, fees='0'):
+    return {
+        'order_id': order_id,
+        'symbol': 'BTC-USD',
+        'side': side,
+        'size': Decimal(size),
+        'price': Decimal(price),
+        'total_fees_usd': Decimal(fees),
+        'order_time': T0 + timedelta(minutes=minutes),
+    }
+
+
+@pytest.fixture
+def engine():
+    return FifoAllocationEngine(None, MagicMock(), None)
+
+
+async def _assert_parity(engine, buys, sells):
+    streamed, unmatched = engine._allocate_symbol_stream(buys, sells, VERSION, BATCH_ID)
+    reference = await run_reference(engine, buys, sells, VERSION, BATCH_ID)
+    assert streamed == reference
+    return streamed, unmatched
+
+
+class TestStreamingParity:
+    """Streaming core must match the per-sell reference path."""
+
+    async def test_partial_fills_across_lots(self, engine):
+        buys = [
+            _trade('b1', 'buy', '0.5', '40000', 0, '0.20'),
+            _trade('b2', 'buy', '0.5', '41000', 1, '0.21'),
+        ]
+        sells = [
+            _trade('s1', 'sell', '0.6', '42000', 2, '0.25'),
+            _trade('s2', 'sell', '0.4', '43000', 3, '0.17'),
+        ]
+        streamed, unmatched = await _assert_parity(engine, buys, sells)
+
+        assert [(a['sell_order_id'], a['buy_order_id'], a['allocated_size']) for a in streamed] == [
+            ('s1', 'b1', Decimal('0.5')),
+            ('s1', 'b2', Decimal('0.1')),
+            ('s2', 'b2', Decimal('0.4')),
+        ]
+        assert unmatched == []
+
+    async def test_buy_after_sell_is_not_used(self, engine):
+        buys = [_trade('b1', 'buy', '1.0', '100', 10)]
+        sells = [
+            _trade('s1', 'sell', '0.5', '110', 5),
+            _trade('s2', 'sell', '0.5', '120', 15),
+        ]
+        streamed, unmatched = await _assert_parity(engine, buys, sells)
+
+        assert streamed[0]['buy_order_id'] is None
+        assert [s['order_id'] for s, _ in unmatched] == ['s1']
+        assert unmatched[0][1] == Decimal('0.5')
+        assert streamed[1]['buy_order_id'] == 'b1'
+
+    async def test_same_timestamp_tie_break_on_order_id(self, engine):
+        # Buys arrive out of key order; FIFO key is (order_time, order_id)
+        buys = [
+            _trade('b-z', 'buy', '1.0', '100', 0),
+            _trade('b-a', 'buy', '1.0', '90', 0),
+        ]
+        sells = [_trade('s1', 'sell', '1.5', '110', 0)]
+        streamed, _ = await _assert_parity(engine, buys, sells)
+
+        assert [a['buy_order_id'] for a in streamed] == ['b-a', 'b-z']
+
+    async def test_dust_remainders_are_skipped(self, engine):
+        precision = MagicMock()
+        precision.safe_decimal.side_effect = lambda v: Decimal(str(v))
+        precision.get_dust_threshold.return_value = Decimal('0.01')
+        precision.round_with_bankers.side_effect = lambda v, s, is_base=False: round(v, 2)
+        engine = FifoAllocationEngine(None, MagicMock(), precision)
+
+        buys = [
+            _trade('b1', 'buy', '0.005', '100', 0),   # dust on arrival
+            _trade('b2', 'buy', '1.0', '100', 1),
+            _trade('b3', 'buy', '1.0', '101', 2),
+        ]
+        sells = [
+            _trade('s1', 'sell', '0.995', '105', 3),  # leaves 0.005 dust on b2
+            _trade('s2', 'sell', '0.5', '106', 4),
+            _trade('s3', 'sell', '0.505', '107', 5),  # leaves 0.005 dust unallocated
+        ]
+        streamed, unmatched = await _assert_parity(engine, buys, sells)
+
+        assert [a['buy_order_id'] for a in streamed] == ['b2', 'b3', 'b3']
+        assert unmatched == []
+
+    async def test_synthetic_history(self, engine):
+        buys, sells = generate_fills(3000, symbol='BTC-USD', seed=11)
+        streamed, _ = await _assert_parity(engine, buys, sells)
+        assert len(streamed) >= len(sells)
+
+    def test_out_of_order_sells_rejected(self, engine):
+        buys = [_trade('b1', 'buy', '1.0', '100', 0)]
+        sells = [
+            _trade('s1', 'sell', '0.5', '110', 5),
+            _trade('s2', 'sell', '0.5', '120', 1),
+        ]
+        with pytest.raises(ValueError):
+            engine._allocate_symbol_stream(buys, sells, VERSION, BATCH_ID)
+
+
+class TestIncrementalWatermark:
+    """Resuming from carried open lots must match a full recompute."""
+
+    @pytest.mark.parametrize('split', [0.25, 0.5, 0.9])
+    async def test_resume_from_open_lots_matches_full_pass(self, engine, split):
+        buys, sells = generate_fills(4000, symbol='BTC-USD', seed=5)
+        fills = sorted(buys + sells, key=lambda f: (f['order_time'], f['order_id']))
+
+        # Watermark must sit on a time boundary: fills sharing its order_time are all "old"
+        cut = int(len(fills) * split)
+        while cut < len(fills) and fills[cut]['order_time'] == fills[cut - 1]['order_time']:
+            cut += 1
+        old, new = fills[:cut], fills[cut:]
+
+        full, _ = engine._allocate_symbol_stream(buys, sells, VERSION, BATCH_ID)
+
+        lots = deque()
+        first, _ = engine._allocate_symbol_stream(
+            [f for f in old if f['side'] == 'buy'], [f for f in old if f['side'] == 'sell'],
+            VERSION, BATCH_ID, lots=lots
+        )
+        second, _ = engine._allocate_symbol_stream(
+            [f for f in new if f['side'] == 'buy'], [f for f in new if f['side'] == 'sell'],
+            VERSION, BATCH_ID, lots=lots
+        )
+
+        assert first + second == full
+
+    async def test_missing_watermark_rebuilds(self, engine):
+        engine._load_watermark = AsyncMock(return_value=None)
+        engine._rebuild_symbol = AsyncMock(return_value={'mode': 'rebuild'})
+
+        result = await engine._compute_symbol_incremental(AsyncMock(), 'BTC-USD', VERSION, BATCH_ID)
+
+        assert result['mode'] == 'rebuild'
+        engine._rebuild_symbol.assert_awaited_once()
+
+    async def test_back_dated_fill_rebuilds(self, engine):
+        engine._load_watermark = AsyncMock(return_value={
+            'last_order_time': T0, 'last_order_id': 's9', 'fills_processed': 10
+        })
+        engine._count_fills_through = AsyncMock(return_value=11)
+        engine._rebuild_symbol = AsyncMock(return_value={'mode': 'rebuild'})
+        engine._fetch_side = AsyncMock()
+
+        result = await engine._compute_symbol_incremental(AsyncMock(), 'BTC-USD', VERSION, BATCH_ID)
+
+        assert result['mode'] == 'rebuild'
+        engine._fetch_side.assert_not_awaited()
+
+    async def test_no_new_fills_skips(self, engine):
+        engine._load_watermark = AsyncMock(return_value={
+            'last_order_time': T0, 'last_order_id': 's9', 'fills_processed': 10
+        })
+        engine._count_fills_through = AsyncMock(return_value=10)
+        engine._fetch_side = AsyncMock(return_value=[])
+        engine._save_watermark = AsyncMock()
+
+        result = await engine._compute_symbol_incremental(AsyncMock(), 'BTC-USD', VERSION, BATCH_ID)
+
+        assert result['mode'] == 'skipped'
+        engine._save_watermark.assert_not_awaited()
+
+    async def test_new_fills_advance_watermark(self, engine):
+        engine._load_watermark = AsyncMock(return_value={
+            'last_order_time': T0, 'last_order_id': 'b0', 'fills_processed': 1
+        })
+        engine._count_fills_through = AsyncMock(return_value=1)
+        engine._load_open_lots = AsyncMock(return_value=deque([
+            [Decimal('1.0'), _trade('b0', 'buy', '1.0', '100', 0)]
+        ]))
+        new_sell = _trade('s1', 'sell', '0.4', '110', 5)
+        engine._fetch_side = AsyncMock(side_effect=lambda session, symbol, side, after: (
+            [new_sell] if side == 'sell' else []
+        ))
+        engine._save_allocations = AsyncMock()
+        engine._save_watermark = AsyncMock()
+
+        result = await engine._compute_symbol_incremental(AsyncMock(), 'BTC-USD', VERSION, BATCH_ID)
+
+        assert result == {
+            'mode': 'incremental', 'buys_processed': 0, 'sells_processed': 1, 'allocations_created': 1
+        }
+        saved = engine._save_watermark.await_args.kwargs
+        assert saved['last_fill'] is new_sell
+        assert saved['fills_processed'] == 2
+        assert [(lot[0], lot[1]['order_id']) for lot in saved['lots']] == [(Decimal('0.6'), 'b0')]
+
+    async def test_runs_without_watermark_table(self, tmp_path):
+        db = SQLiteSessionManager(str(tmp_path / 'fifo.sqlite'))
+        await db.create_schema()
+        async with db.async_session() as session:
+            async with session.begin():
+                await session.execute(text("DROP TABLE fifo_symbol_watermark"))
+        buys, sells = generate_fills(300, symbol='BTC-USD', seed=3)
+        await db.insert_trades(buys + sells)
+
+        try:
+            engine = FifoAllocationEngine(db, MagicMock(), None)
+            full = await engine.compute_all_symbols(version=1)
+            again = await engine.compute_all_symbols(version=1)
+            incremental = await engine.compute_incremental(version=1)
+
+            assert full.success and again.success and incremental.success
+            assert incremental.allocations_created == full.allocations_created
+            assert len(await fetch_allocations(db, 1)) == full.allocations_created
+        finally:
+            await db.dispose()
@@ -0,0 +1,92 @@
+"""
+Test single-pass AllocationValidator
+
+Runs AllocationValidator against the SQLite stand-in: a clean computation
+validates, injected defects are reported by the matching check, symbol
+scoping limits what is checked, and every check reports its timing.
+"""
+
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import text
+
+from fifo_engine.engine import FifoAllocationEngine
+from fifo_engine.validator import AllocationValidator
+from scripts.benchmarks.bench_fifo_allocation import generate_fills
+from scripts.benchmarks.sqlite_standin import SQLiteSessionManager
+
+SYMBOLS = ['AAA-USD', 'BBB-USD']
+CHECKS = ['aggregate_scan', 'unmatched_sells', 'allocation_completeness',
+          'duplicate_allocations', 'temporal_consistency']
+
+
+@pytest.fixture
+async def db(tmp_path):
+    db = SQLiteSessionManager(str(tmp_path / 'fifo.sqlite'))
+    await db.create_schema()
+    trades = []
+    for i, symbol in enumerate(SYMBOLS):
+        buys, sells = generate_fills(300, symbol=symbol, seed=i)
+        trades.extend(buys + sells)
+    await db.insert_trades(trades)
+    await FifoAllocationEngine(db, MagicMock(), None).compute_all_symbols(version=1)
+    yield db
+    await db.dispose()
+
+
+@pytest.fixture
+def validator(db):
+    precision = MagicMock()
+    precision.safe_decimal.side_effect = lambda v: Decimal(str(v))
+    precision.get_dust_threshold.return_value = Decimal('0.00000001')
+    return AllocationValidator(db, MagicMock(), precision)
+
+
+async def _execute(db, sql):
+    async with db.async_session() as session:
+        async with session.begin():
+            await session.execute(text(sql))
+
+
+async def test_clean_version_is_valid(db, validator):
+    result = await validator.validate_version(version=1, strict=False)
+
+    assert result.is_valid, result.error_messages
+    assert result.total_allocations > 0
+    assert result.total_sells + result.total_buys == 600
+    assert list(result.check_timings_ms) == CHECKS
+
+
+async def test_injected_defects_are_reported(db, validator):
+    # Duplicate one matched allocation of AAA-USD and back-date a BBB-USD buy
+    await _execute(db, """
+        INSERT INTO fifo_allocations (sell_order_id, buy_order_id, symbol, allocated_size, buy_price,
+            sell_price, buy_fees_per_unit, sell_fees_per_unit, cost_basis_usd, proceeds_usd,
+            net_proceeds_usd, pnl_usd, buy_time, sell_time, allocation_version, allocation_batch_id)
+        SELECT sell_order_id, buy_order_id, symbol, allocated_size, buy_price,
+            sell_price, buy_fees_per_unit, sell_fees_per_unit, cost_basis_usd, proceeds_usd,
+            net_proceeds_usd, pnl_usd, buy_time, sell_time, allocation_version, allocation_batch_id
+        FROM fifo_allocations
+        WHERE symbol = 'AAA-USD' AND buy_order_id IS NOT NULL
+        ORDER BY id LIMIT 1
+    """)
+    await _execute(db, """
+        UPDATE fifo_allocations SET buy_time = '2999-01-01 00:00:00.000000'
+        WHERE id = (SELECT MIN(id) FROM fifo_allocations
+                    WHERE symbol = 'BBB-USD' AND buy_order_id IS NOT NULL)
+    """)
+
+    result = await validator.validate_version(version=1, strict=False)
+
+    assert not result.is_valid
+    assert result.duplicate_allocations == 1
+    assert result.over_allocated_sells == 1
+    assert any(m.startswith('Temporal violation') for m in result.error_messages)
+
+    scoped = await validator.validate_version(version=1, strict=False, symbols=['BBB-USD'])
+    assert scoped.duplicate_allocations == 0
+    assert scoped.over_allocated_sells == 0
+    assert [m.split(':')[0] for m in scoped.error_messages] == ['Temporal violation']
+    assert scoped.total_sells + scoped.total_buys == 300
@@ -0,0 +1,84 @@
+"""
+Test the pooled HTTP client
+
+Requests on the process-wide session reuse keep-alive connections (and the
+counters say so), the per-host limit bounds open connections under a burst,
+and close() shuts the pool down while later use gets a fresh session.
+"""
+
+import asyncio
+
+from aiohttp import web
+
+from Api_manager.http_client import HttpClient, HttpClientConfig
+
+
+async def _server(delay: float = 0.0):
+    state = {'active': 0, 'peak': 0}
+
+    async def handler(request):
+        state['active'] += 1
+        state['peak'] = max(state['peak'], state['active'])
+        await asyncio.sleep(delay)
+        state['active'] -= 1
+        return web.json_response({'ok': True})
+
+    app = web.Application()
+    app.router.add_get('/candles', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/candles", state
+
+
+async def test_sequential_requests_reuse_one_connection():
+    runner, url, _ = await _server()
+    client = HttpClient(HttpClientConfig())
+    try:
+        for _ in range(10):
+            async with client.session.get(url) as resp:
+                assert (await resp.json()) == {'ok': True}
+        stats = client.stats()
+        assert stats['requests'] == 10
+        assert stats['connections_created'] == 1 and stats['connections_reused'] == 9
+        assert stats['sessions_created'] == 1
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+
+async def test_burst_is_bounded_by_the_per_host_limit():
+    runner, url, state = await _server(delay=0.02)
+    client = HttpClient(HttpClientConfig(limit_per_host=4))
+
+    async def call():
+        async with client.session.get(url) as resp:
+            return resp.status
+
+    try:
+        assert await asyncio.gather(*(call() for _ in range(20))) == [200] * 20
+        assert state['peak'] <= 4
+        assert client.stats()['connections_created'] <= 4
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+
+async def test_close_shuts_the_pool_and_later_use_reopens():
+    runner, url, _ = await _server()
+    client = HttpClient(HttpClientConfig())
+    try:
+        async with client as entered:
+            first = entered.session
+            async with first.get(url):
+                pass
+        assert first.closed
+
+        async with client.session.get(url) as resp:
+            assert resp.status == 200
+        assert client.session is not first and client.stats()['sessions_created'] == 2
+    finally:
+        await client.close()
+        await runner.cleanup()
@@ -0,0 +1,85 @@
+"""
+Test incremental indicator engine
+
+The last row produced by IncrementalIndicators must match the last row of
+Indicators.calculate_indicators() on the same candles, cycle after cycle,
+including revisions of the in-progress candle and gaps in the history.
+"""
+
+import pytest
+
+from scripts.benchmarks.bench_incremental_indicators import (
+    generate_ohlcv, make_indicators, mismatched_columns
+)
+from sighook.incremental_indicators import IncrementalIndicators
+
+QUOTE_DECI = 4
+
+
+@pytest.fixture(scope='module')
+def indicators():
+    return make_indicators()
+
+
+@pytest.fixture(scope='module')
+def candles():
+    return generate_ohlcv(2, 360, seed=5)
+
+
+def _full_last_row(indicators, window):
+    return indicators.calculate_indicators(window.copy(), QUOTE_DECI).iloc[-1]
+
+
+def test_streaming_matches_full_recompute(indicators, candles):
+    engine = IncrementalIndicators(indicators)
+    for symbol, df in candles.items():
+        for end in range(30, len(df) + 1, 11):
+            window = df.iloc[:end]
+            row = engine.calculate_indicators(symbol, window, QUOTE_DECI)
+            assert len(row) == 1 and row.index[0] == window.index[-1]
+            assert mismatched_columns(_full_last_row(indicators, window), row.iloc[-1]) == [], end
+
+
+def test_revised_last_candle(indicators, candles):
+    engine = IncrementalIndicators(indicators)
+    symbol, df = next(iter(candles.items()))
+    for end in range(30, 130, 3):
+        window = df.iloc[:end]
+        provisional = window.copy()
+        provisional.loc[provisional.index[-1], ['close', 'high']] *= 1.02
+        engine.calculate_indicators(symbol, provisional, QUOTE_DECI)
+
+        row = engine.calculate_indicators(symbol, window, QUOTE_DECI)
+        assert mismatched_columns(_full_last_row(indicators, window), row.iloc[-1]) == [], end
+
+
+def test_sliding_window_and_gaps(indicators, candles):
+    """Production shape: a fixed-size window of the latest candles, sometimes skipping cycles"""
+    engine = IncrementalIndicators(indicators)
+    symbol, df = next(iter(candles.items()))
+    size = 300  # Long enough for the EMA seed of the window to have decayed
+    for start in [0, 1, 2, 5, 6, 40, 41, 59]:
+        window = df.iloc[start:start + size].reset_index(drop=True)
+        row = engine.calculate_indicators(symbol, window, QUOTE_DECI)
+        assert mismatched_columns(_full_last_row(indicators, window), row.iloc[-1]) == [], start
+
+
+def test_flat_prices(indicators):
+    """Constant windows: zero std puts close exactly on the bands, like pandas"""
+    engine = IncrementalIndicators(indicators)
+    df = generate_ohlcv(1, 90, seed=2)['SYM000-USD']
+    df.loc[50:, ['open', 'high', 'low', 'close']] = 42.0
+
+    for end in range(40, len(df) + 1, 2):
+        window = df.iloc[:end]
+        row = engine.calculate_indicators('FLAT-USD', window, QUOTE_DECI).iloc[-1]
+        assert mismatched_columns(_full_last_row(indicators, window), row) == [], end
+    assert row['std'] == 0.0
+    assert row['Buy Touch'][0] == 1 and row['Sell Touch'][0] == 1
+
+
+def test_insufficient_rows_returns_input(indicators, candles):
+    engine = IncrementalIndicators(indicators)
+    symbol, df = next(iter(candles.items()))
+    window = df.iloc[:10]
+    assert engine.calculate_indicators(symbol, window, QUOTE_DECI) is window
@@ -0,0 +1,89 @@
+"""
+Test the Coinbase JWT cache
+
+Tokens are reused per (key, method + host + path) until the refresh margin,
+carry the same claims as coinbase.jwt_generator, and concurrent callers get
+one signature instead of one each.
+"""
+
+import threading
+
+import jwt
+import pytest
+from coinbase import jwt_generator
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from Api_manager.jwt_cache import JwtCache
+
+
+@pytest.fixture(scope='module')
+def credentials():
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    pem = private_key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                    serialization.NoEncryption()).decode()
+    return 'organizations/test/apiKeys/key-1', pem, private_key.public_key()
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_800_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_tokens_are_reused_per_uri_until_the_refresh_margin(credentials):
+    key_name, secret, public_key = credentials
+    clock = _Clock()
+    cache = JwtCache(refresh_margin=30, clock=clock)
+    orders = jwt_generator.format_jwt_uri('GET', '/api/v3/brokerage/orders')
+    candles = jwt_generator.format_jwt_uri('GET', '/api/v3/brokerage/products/BTC-USD/candles')
+
+    first = cache.token(key_name, secret, orders)
+    assert cache.token(key_name, secret, orders) == first
+    assert cache.token(key_name, secret, candles) != first
+    assert cache.token(key_name, secret, jwt_generator.format_jwt_uri('POST', '/api/v3/brokerage/orders')) != first
+
+    clock.now += 89  # Still 31 s left
+    assert cache.token(key_name, secret, orders) == first
+    clock.now += 1
+    refreshed = cache.token(key_name, secret, orders)
+    assert refreshed != first
+
+    claims = jwt.decode(refreshed, public_key, algorithms=['ES256'], options={'verify_exp': False,
+                                                                           'verify_nbf': False})
+    assert claims == {'sub': key_name, 'iss': 'cdp', 'nbf': int(clock.now), 'exp': int(clock.now) + 120,
+                      'uri': orders}
+    header = jwt.get_unverified_header(refreshed)
+    assert header['kid'] == key_name and header['nonce']
+    assert cache.stats() == {'enabled': True, 'tokens': 3, 'hits': 2, 'signed': 4, 'expired': 1,
+                             'hit_rate': 0.333}
+
+
+def test_disabled_cache_signs_every_request_and_clear_drops_tokens(credentials):
+    key_name, secret, _ = credentials
+    uri = jwt_generator.format_jwt_uri('GET', '/api/v3/brokerage/accounts')
+    disabled = JwtCache(enabled=False)
+    assert disabled.token(key_name, secret, uri) != disabled.token(key_name, secret, uri)
+    assert disabled.stats()['signed'] == 2
+
+    cache = JwtCache()
+    token = cache.token(key_name, secret, uri)
+    cache.clear()
+    assert cache.token(key_name, secret, uri) != token
+    with pytest.raises(ValueError):
+        cache.token(key_name, '', uri)
+
+
+def test_concurrent_callers_share_one_signature(credentials):
+    key_name, secret, _ = credentials
+    cache = JwtCache()
+    uri = jwt_generator.format_jwt_uri('GET', '/api/v3/brokerage/best_bid_ask')
+    tokens = []
+    threads = [threading.Thread(target=lambda: tokens.append(cache.token(key_name, secret, uri))) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(tokens)) == 1 and cache.stats()['signed'] == 1
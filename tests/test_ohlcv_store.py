@@ -0,0 +1,163 @@
+"""
+Test shared OHLCV store
+
+Ring buffers keep the newest bars in order through wraps, revisions and
+out-of-order writes; views are zero-copy and read-only; the memory cap evicts
+least recently used series; refresh_from_db() loads cold symbols and then
+only reads changed ohlcv_data rows (SQLite stand-in).
+"""
+
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from MarketDataManager.ohlcv_store import OHLCVRing, OHLCVStore
+from TableModels.ohlcv_data import OHLCVData
+
+T0 = 1_750_000_020
+
+
+def bars(times):
+    times = np.asarray(times, dtype=np.int64)
+    close = times.astype(float) / 60
+    return times, np.vstack([close, close + 1, close - 1, close, np.ones(len(times))])
+
+
+def test_ring_keeps_newest_bars_through_wraps():
+    ring = OHLCVRing(100)
+    for i in range(1000):
+        ring.append(T0 + 60 * i, (i, i + 1, i - 1, i, 1.0))
+    ring.extend(*bars(T0 + 60 * np.arange(1000, 1037)))
+
+    view = ring.view()
+    assert len(view) == 100
+    assert np.array_equal(view.time, T0 + 60 * np.arange(937, 1037))
+    assert view.open[0] == 937 and view.close[-1] == (T0 + 60 * 1036) / 60
+
+    big = OHLCVRing(100)
+    big.extend(*bars(T0 + 60 * np.arange(250)))
+    assert np.array_equal(big.view().time, T0 + 60 * np.arange(150, 250))
+
+
+def test_views_are_zero_copy_and_read_only():
+    ring = OHLCVRing(50)
+    ring.extend(*bars(T0 + 60 * np.arange(20)))
+    view = ring.view(n=5)
+    assert len(view) == 5 and np.shares_memory(view.close, ring._values)
+    with pytest.raises(ValueError):
+        view.close[0] = 1.0
+
+
+def test_revisions_and_out_of_order_bars():
+    ring = OHLCVRing(10)
+    ring.extend(*bars([T0, T0 + 60, T0 + 180, T0 + 240]))
+    ring.append(T0 + 240, (1, 2, 0, 1.5, 7))            # Revised in-progress bar
+    ring.append(T0 + 120, (5, 5, 5, 5, 5))              # Backfilled hole
+    ring.extend(*bars([T0 + 60, T0 + 300]))             # Overlap + new bar
+
+    view = ring.view()
+    assert list(view.time - T0) == [0, 60, 120, 180, 240, 300]
+    assert view.close[2] == 5 and view.close[4] == 1.5 and view.volume[4] == 7
+
+
+def test_store_lru_eviction_and_lookup():
+    ring_bytes = OHLCVRing(100).nbytes
+    store = OHLCVStore(max_bytes=3 * ring_bytes, capacities={'ONE_MINUTE': 100})
+    for symbol in ['AAA-USD', 'BBB-USD', 'CCC-USD']:
+        store.update(symbol, 'ONE_MINUTE', *bars(T0 + 60 * np.arange(10)))
+    assert store.view('AAA/USD') is not None                # Touch: BBB is now the coldest
+    store.update_bar('DDD/USD', 'ONE_MINUTE', T0, 1, 1, 1, 1, 1)
+
+    assert ('BBB/USD', 'ONE_MINUTE') not in store
+    assert len(store) == 3 and store.nbytes == 3 * ring_bytes
+    assert store.stats['evictions'] == 1
+    assert store.view('BBB-USD') is None
+
+    since = datetime.fromtimestamp(T0 + 60 * 7, tz=timezone.utc)
+    df = store.frame('AAA-USD', since=since)
+    assert list(df.columns) == ['time', 'open', 'high', 'low', 'close', 'volume']
+    assert list(df['time']) == [datetime.fromtimestamp(T0 + 60 * i, tz=timezone.utc) for i in (7, 8, 9)]
+    df.loc[0, 'close'] = -1.0                               # frame() is a copy
+    assert store.view('AAA-USD').close[7] != -1.0
+
+
+class _SessionManager:
+    def __init__(self, engine):
+        self._sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def async_session(self):
+        async with self._sessionmaker() as session:
+            yield session
+
+
+@pytest.fixture
+async def db(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'ohlcv.sqlite'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(OHLCVData.__table__.create)
+    yield _SessionManager(engine)
+    await engine.dispose()
+
+
+def _row(symbol, minute, close, written):
+    return {'symbol': symbol, 'time': datetime.fromtimestamp(T0 + 60 * minute, tz=timezone.utc),
+            'open': close, 'high': close, 'low': close, 'close': close, 'volume': 1.0,
+            'last_updated': written}
+
+
+async def _execute(db, stmt, rows=None):
+    async with db.async_session() as session:
+        async with session.begin():
+            if rows is None:
+                await session.execute(stmt)
+            else:
+                await session.execute(stmt, rows)
+
+
+async def test_refresh_from_db_loads_then_reads_changes(db):
+    t1 = datetime(2026, 1, 1, 12, 0)
+    rows = [_row(s, m, 100.0 + m, t1 - timedelta(minutes=30 - m))
+            for s in ('BTC/USD', 'ETH/USD') for m in range(30) if m != 20]
+    await _execute(db, insert(OHLCVData), rows)
+
+    store = OHLCVStore(db_overlap=timedelta(0))
+    assert await store.refresh_from_db(db, ['BTC-USD', 'ETH/USD'], limit=25) == 50
+    assert len(store.view('BTC/USD')) == 25
+
+    # New bar, backfilled hole, revised bar
+    t2 = t1 + timedelta(minutes=1)
+    await _execute(db, insert(OHLCVData), [_row('BTC/USD', 20, 7.0, t2), _row('BTC/USD', 30, 8.0, t2)])
+    await _execute(db, update(OHLCVData).where(OHLCVData.symbol == 'ETH/USD', OHLCVData.time == rows[-1]['time'])
+                   .values(close=9.0, last_updated=t2))
+
+    # Changed rows plus those written at the previous watermark
+    assert await store.refresh_from_db(db, ['BTC/USD', 'ETH/USD'], limit=25) == 4
+    btc = store.frame('BTC/USD')
+    assert list(btc['close'].tail(12)) == [119.0, 7.0] + [100.0 + m for m in range(21, 30)] + [8.0]
+    assert store.view('ETH/USD').close[-1] == 9.0
+
+    await _execute(db, update(OHLCVData).values(last_updated=t1))
+    assert await store.refresh_from_db(db, ['BTC/USD', 'ETH/USD'], limit=25) == 0
+
+
+async def test_refresh_watermarks_are_per_symbol(db):
+    t1 = datetime(2026, 1, 1, 12, 0)
+    await _execute(db, insert(OHLCVData), [_row(s, m, 100.0 + m, t1) for s in ('BTC/USD', 'ETH/USD') for m in range(5)])
+
+    store = OHLCVStore(db_overlap=timedelta(0))
+    assert await store.refresh_from_db(db, ['BTC/USD', 'ETH/USD'], limit=25) == 10
+
+    # ETH gets a bar, then another caller refreshes BTC alone after a later BTC write
+    await _execute(db, insert(OHLCVData), [_row('ETH/USD', 5, 1.0, t1 + timedelta(minutes=1))])
+    await _execute(db, insert(OHLCVData), [_row('BTC/USD', 5, 2.0, t1 + timedelta(minutes=2))])
+    assert await store.refresh_from_db(db, ['BTC/USD'], limit=25) == 6
+
+    # The ETH-only caller still sees its bar written before the BTC refresh
+    await store.refresh_from_db(db, ['ETH/USD'], limit=25)
+    assert store.view('ETH/USD').close[-1] == 1.0
+    assert len(store.view('ETH/USD')) == 6
@@ -0,0 +1,97 @@
+"""
+Test the indexed order tracker
+
+Index lookups agree with a linear scan after every kind of dict mutation,
+typed views are cached until their order changes, and the tracker still
+behaves as (and serializes like) the plain order_tracker dict.
+"""
+
+import copy
+import json
+import random
+from datetime import datetime, timedelta, timezone
+
+from SharedDataManager.order_tracker import OPEN_STATUSES, IndexedOrderTracker
+
+NOW = datetime(2026, 1, 5, 12, 0, tzinfo=timezone.utc)
+
+
+def _order(order_id, symbol, side, status='OPEN', minutes_old=1, order_type='limit'):
+    return {
+        'order_id': order_id, 'symbol': symbol, 'side': side, 'type': order_type, 'status': status,
+        'datetime': (NOW - timedelta(minutes=minutes_old)).isoformat(),
+        'info': {'product_id': symbol, 'created_time': (NOW - timedelta(minutes=minutes_old)).isoformat()},
+    }
+
+
+def _scan(tracker, product, side, statuses):
+    """The linear scan PositionMonitor._has_open_sell_order used to do"""
+    return {
+        oid for oid, o in tracker.items()
+        if (o.get('symbol') == product or o.get('product_id') == product)
+        and o.get('side', '').lower() == side and o.get('status') in statuses
+    }
+
+
+def test_indexes_match_a_linear_scan_through_mutations():
+    rng = random.Random(3)
+    symbols = ['BTC-USD', 'ETH-USD', 'SOL-USD', 'DOGE-USD']
+    tracker = IndexedOrderTracker({f'o-{i}': _order(f'o-{i}', rng.choice(symbols), rng.choice(['buy', 'SELL']))
+                                   for i in range(20)})
+    for step in range(300):
+        oid = f'o-{rng.randrange(40)}'
+        action = rng.random()
+        if action < 0.5:
+            tracker[oid] = _order(oid, rng.choice(symbols), rng.choice(['buy', 'sell']),
+                                  rng.choice(['OPEN', 'new', 'FILLED']))
+        elif action < 0.8:
+            tracker.pop(oid, None)
+        elif action < 0.9 and oid in tracker:
+            del tracker[oid]
+        else:
+            tracker.update({oid: _order(oid, 'BTC-USD', 'sell')})
+
+        for symbol in symbols:
+            assert tracker.select(product=symbol, side='sell', status=OPEN_STATUSES) == \
+                _scan(tracker, symbol, 'sell', OPEN_STATUSES)
+    assert tracker.select() == set(tracker)
+
+    tracker.clear()
+    assert not tracker.has(product='BTC-USD') and tracker.stats()['products'] == 0
+
+
+def test_older_than_and_in_place_edits():
+    tracker = IndexedOrderTracker({
+        'fresh': _order('fresh', 'BTC-USD', 'buy', minutes_old=2),
+        'stale': _order('stale', 'BTC-USD', 'buy', minutes_old=90),
+        'edge': _order('edge', 'ETH-USD', 'sell', minutes_old=61),
+    })
+    assert sorted(tracker.older_than(3600, now=NOW.timestamp())) == ['edge', 'stale']
+
+    tracker['fresh']['status'] = 'FILLED'  # In-place edit: indexes only follow after touch()
+    assert tracker.has(product='BTC-USD', status='OPEN', side='buy')
+    tracker.touch('fresh')
+    assert tracker.select(product='BTC-USD', status='OPEN') == {'stale'}
+
+
+def test_typed_views_are_cached_until_the_order_changes():
+    tracker = IndexedOrderTracker({'o-1': _order('o-1', 'BTC-USD', 'buy')})
+    builds = []
+
+    def build(order):
+        builds.append(order['order_id'])
+        return (order['symbol'], order['status'])
+
+    assert tracker.cached('o-1', build) == ('BTC-USD', 'OPEN')
+    assert tracker.cached('o-1', build) == ('BTC-USD', 'OPEN') and builds == ['o-1']
+
+    tracker['o-1'] = _order('o-1', 'BTC-USD', 'buy', status='new')
+    assert tracker.cached('o-1', build) == ('BTC-USD', 'new') and len(builds) == 2
+    assert tracker.stats()['typed_hits'] == 1
+
+    # Still the order_tracker dict for everything else
+    assert json.loads(json.dumps(tracker)) == {'o-1': tracker['o-1']}
+    clone = copy.deepcopy(tracker)
+    assert isinstance(clone, IndexedOrderTracker) and clone.has(product='BTC-USD', status='new')
+    clone.pop('o-1')
+    assert 'o-1' in tracker
@@ -0,0 +1,86 @@
+"""
+Test the product metadata registry behind PrecisionUtils
+
+fetch_precision answers from a registry indexed once per usd_pairs DataFrame
+with the same values as the per-call set_index().to_dict() it replaces;
+a replaced DataFrame swaps in a new registry, and malformed rows fail the
+way they always did.
+"""
+
+import logging
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from Shared_Utils.precision import PrecisionUtils
+from Shared_Utils.product_registry import ProductRegistry
+
+
+def _usd_pairs(**overrides):
+    rows = [
+        {'asset': 'BTC', 'symbol': 'BTC-USD',
+         'precision': {'base_increment': '0.00000001', 'quote_increment': '0.01', 'price_increment': '0.01',
+                       'base_min_size': '0.00001', 'quote_min_size': '1'}},
+        {'asset': 'ETH', 'symbol': 'ETH-USD',
+         'precision': {'base_increment': '0.0001', 'quote_increment': '0.01', 'price_increment': '0.01'}},
+        {'asset': 'PEPE', 'symbol': 'PEPE-USD',
+         'precision': {'base_increment': '1', 'quote_increment': '0.00000001', 'base_min_size': '100000'}},
+    ]
+    for row in rows:
+        row['precision'].update(overrides.get(row['asset'], {}))
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def precision_utils():
+    market_data = {'usd_pairs_cache': _usd_pairs()}
+    logger_manager = SimpleNamespace(loggers={'shared_logger': logging.getLogger('test_product_registry')})
+    PrecisionUtils._instance = None
+    utils = PrecisionUtils.get_instance(logger_manager, SimpleNamespace(market_data=market_data))
+    yield utils
+    PrecisionUtils._instance = None
+
+
+def test_fetch_precision_matches_the_usd_pairs_rows(precision_utils):
+    assert precision_utils.fetch_precision('BTC-USD') == (8, 2, Decimal('0.00000001'), Decimal('0.01'))
+    assert precision_utils.fetch_precision('ETH/USD') == (4, 2, Decimal('0.0001'), Decimal('0.01'))
+    assert precision_utils.fetch_precision('PEPE') == (0, 8, Decimal('1'), Decimal('0.00000001'))
+    assert precision_utils.fetch_precision('USD') == (2, 2, 1e-08, 1e-08)
+    assert precision_utils.fetch_precision('DOGE-USD') == (0, 2, 1e-08, 1e-08)  # Unknown product
+
+    assert precision_utils.get_min_trade_size('BTC-USD') == Decimal('0.0001')  # Explicit table wins
+    assert precision_utils.get_min_trade_size('PEPE-USD') == Decimal('100000')  # Exchange base_min_size
+    assert precision_utils.get_min_trade_size('DOGE-USD') == Decimal('10.0')
+    assert precision_utils.get_product('BTC/USD').quote_min_size == Decimal('1')
+
+    stats = precision_utils.product_registry_stats()
+    assert stats['products'] == 3 and stats['builds'] == 1
+    assert stats['misses'] == 1 and stats['hits'] >= 3
+
+
+def test_replaced_usd_pairs_swap_in_a_new_registry(precision_utils):
+    precision_utils.fetch_precision('ETH-USD')
+    old = precision_utils.product_registry()
+
+    precision_utils.shared_data_manager.market_data['usd_pairs_cache'] = _usd_pairs(ETH={'base_increment': '0.001'})
+    assert precision_utils.fetch_precision('ETH-USD')[0] == 3
+    assert precision_utils.product_registry() is not old
+    assert precision_utils.product_registry_stats()['builds'] == 2
+
+    # A caller still holding the previous frame (an older snapshot) reuses its registry
+    assert precision_utils.fetch_precision('ETH-USD', usd_pairs_override=old.source)[0] == 4
+    assert precision_utils.product_registry_stats()['builds'] == 2
+
+
+def test_malformed_rows_fail_like_before(precision_utils):
+    precision_utils.shared_data_manager.market_data['usd_pairs_cache'] = _usd_pairs(ETH={'base_increment': '0'})
+    assert precision_utils.fetch_precision('ETH-USD') == (None, None, None, None)
+    assert precision_utils.fetch_precision('BTC-USD')[0] == 8  # Other rows are unaffected
+
+    registry = ProductRegistry(pd.DataFrame([{'asset': 'BAD', 'precision': None}]))
+    assert 'BAD' in registry.errors and not registry.products
+    with pytest.raises(AttributeError):
+        registry.get('BAD')
+    assert ProductRegistry(None).empty
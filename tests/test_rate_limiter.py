@@ -0,0 +1,116 @@
+"""
+Test the unified exchange rate limiter
+
+Waiters for an exhausted pool are served by priority class, requests through
+CoinbaseAPI._request against a simulated rate-limited server back off on 429
+(AIMD) instead of hammering it, and the per-endpoint concurrency cap and
+pool rate hold under a burst.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from aiohttp import ClientSession, web
+
+from Api_manager.coinbase_api import CoinbaseAPI
+from Api_manager.rate_limiter import RateLimiter
+
+
+async def _rate_limited_server(capacity: int, window: float):
+    """Accepts `capacity` requests per `window` seconds, 429 + Retry-After beyond that"""
+    state = {'ok': 0, 'rejected': 0, 'window_start': time.monotonic(), 'in_window': 0}
+
+    async def handler(request):
+        now = time.monotonic()
+        if now - state['window_start'] >= window:
+            state['window_start'], state['in_window'] = now, 0
+        if state['in_window'] >= capacity:
+            state['rejected'] += 1
+            retry_after = window - (now - state['window_start'])
+            return web.json_response({'error': 'rate_limited'}, status=429,
+                                     headers={'Retry-After': f"{retry_after:.3f}"})
+        state['in_window'] += 1
+        state['ok'] += 1
+        return web.json_response({'candles': []})
+
+    app = web.Application()
+    app.router.add_get('/candles', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/candles", state
+
+
+async def test_waiters_are_served_by_priority():
+    limiter = RateLimiter({'private': 20, 'public': 10})
+    for _ in range(20):  # Drain the burst
+        async with limiter.acquire('orders'):
+            pass
+
+    granted = []
+
+    async def call(endpoint):
+        async with limiter.acquire(endpoint):
+            granted.append(endpoint)
+
+    tasks = []
+    for endpoint in ('reports', 'ohlcv', 'account', 'orders'):
+        tasks.append(asyncio.create_task(call(endpoint)))
+        await asyncio.sleep(0)  # Queue in this order
+    await asyncio.gather(*tasks)
+
+    assert granted == ['orders', 'account', 'ohlcv', 'reports']
+    stats = limiter.stats()
+    assert stats['pools']['private']['queued'] == 0
+    assert stats['endpoints']['reports']['granted'] == 1 and stats['endpoints']['reports']['max_wait_ms'] > 100
+
+
+async def test_429s_from_a_rate_limited_server_slow_the_pool_down():
+    runner, url, server = await _rate_limited_server(capacity=10, window=0.25)  # 40 req/s
+    limiter = RateLimiter({'private': 100, 'public': 10})
+    async with ClientSession() as session:
+        api = SimpleNamespace(rate_limiter=limiter, _ensure_session=lambda: session)
+
+        async def fetch():
+            while True:
+                async with CoinbaseAPI._request(api, 'GET', url, endpoint='ohlcv') as resp:
+                    if resp.status == 200:
+                        return
+
+        try:
+            await asyncio.gather(*(fetch() for _ in range(100)))
+        finally:
+            await runner.cleanup()
+
+    stats = limiter.stats()
+    assert server['ok'] == 100
+    # Without the feedback this run draws ~240 rejections; AIMD + Retry-After keep it to a few per window
+    assert server['rejected'] == stats['endpoints']['ohlcv']['throttled'] < 80
+    assert stats['pools']['private']['rate'] < 100
+    assert stats['pools']['private']['throttled'] == server['rejected']
+
+
+async def test_concurrency_cap_and_pool_rate_hold_under_a_burst():
+    limiter = RateLimiter({'private': 50, 'public': 10})
+    state = {'active': 0, 'peak': 0}
+
+    async def call(endpoint, hold=0.01):
+        async with limiter.acquire(endpoint):
+            state['active'] += 1
+            state['peak'] = max(state['peak'], state['active'])
+            await asyncio.sleep(hold)
+            state['active'] -= 1
+
+    t0 = time.monotonic()
+    await asyncio.gather(*(call('ohlcv') for _ in range(75)))
+    elapsed = time.monotonic() - t0
+    assert state['peak'] == 5  # 'ohlcv' max_concurrent
+    assert elapsed >= 0.45  # 50 burst tokens, then 25 more at 50/s
+
+    state['peak'] = 0
+    await asyncio.gather(*(call('no-such-endpoint', hold=0.1) for _ in range(6)))
+    assert state['peak'] == 2  # Falls back to the 'default' budget
+    assert limiter.stats()['endpoints']['ohlcv']['granted'] == 75
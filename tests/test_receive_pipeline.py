@@ -0,0 +1,93 @@
+"""
+Test websocket receive pipeline
+
+put() never waits on handlers, channels are dispatched independently and in
+order, ticker frames are shed (oldest / stale first, newest always delivered)
+while user frames are never dropped, and decode errors and high-water
+crossings are counted.
+"""
+
+import asyncio
+import json
+
+from webhook.receive_pipeline import ReceivePipeline
+
+
+class Handler:
+    def __init__(self, delays=None):
+        self.delays = delays or {}
+        self.seen = []
+
+    async def __call__(self, data):
+        await asyncio.sleep(self.delays.get(data['channel'], 0))
+        self.seen.append((data['channel'], data['n']))
+
+
+def frame(channel, n):
+    return json.dumps({'channel': channel, 'n': n})
+
+
+async def test_channels_dispatch_independently_and_in_order():
+    handler = Handler(delays={'user': 0.2})
+    pipeline = ReceivePipeline('TEST', handler, metrics_interval=0)
+    pipeline.start()
+    for n in range(3):
+        pipeline.put(frame('user', n))
+        pipeline.put(frame('heartbeats', n))
+
+    await asyncio.sleep(0.05)
+    # The slow user handler does not hold up heartbeats
+    assert [n for c, n in handler.seen if c == 'heartbeats'] == [0, 1, 2]
+    await pipeline.join(timeout=2)
+    assert [n for c, n in handler.seen if c == 'user'] == [0, 1, 2]
+    await pipeline.stop()
+
+
+async def test_ticker_frames_shed_user_frames_kept():
+    handler = Handler(delays={'ticker_batch': 0.01, 'user': 0.001})
+    pipeline = ReceivePipeline('TEST', handler, high_water=50, shed_high_water=5, metrics_interval=0)
+    pipeline.start()
+    for n in range(200):
+        pipeline.put(frame('ticker_batch', n))
+        pipeline.put(frame('user', n))
+    await pipeline.join(timeout=5)
+
+    tickers = [n for c, n in handler.seen if c == 'ticker_batch']
+    assert tickers[-1] == 199 and len(tickers) < 20
+    assert [n for c, n in handler.seen if c == 'user'] == list(range(200))
+
+    stats = pipeline.stats()
+    ticker_stats, user_stats = stats['channels']['ticker_batch'], stats['channels']['user']
+    assert ticker_stats['shed_overflow'] == 200 - len(tickers) and ticker_stats['peak_depth'] <= 5
+    assert user_stats['shed_overflow'] == user_stats['shed_stale'] == 0
+    assert stats['intake']['high_water_hits'] == 1 and stats['intake']['peak_depth'] == 400
+    assert user_stats['lag']['max_ms'] >= user_stats['lag']['p50_ms'] > 0
+    await pipeline.stop()
+
+
+async def test_stale_ticker_frames_dropped_when_newer_queued():
+    handler = Handler(delays={'ticker': 0.05})
+    pipeline = ReceivePipeline('TEST', handler, shed_high_water=100, stale_after=0.02, metrics_interval=0)
+    pipeline.start()
+    for n in range(5):
+        pipeline.put(frame('ticker', n))
+    await pipeline.join(timeout=2)
+
+    # Frame 0 went straight to the handler; 1-3 aged while it ran, 4 is the newest
+    assert handler.seen == [('ticker', 0), ('ticker', 4)]
+    assert pipeline.stats()['channels']['ticker']['shed_stale'] == 3
+    await pipeline.stop()
+
+
+async def test_decode_errors_counted():
+    handler = Handler()
+    pipeline = ReceivePipeline('TEST', handler, metrics_interval=0)
+    pipeline.start()
+    pipeline.put('{not json')
+    pipeline.put(frame('heartbeats', 1))
+    await pipeline.join(timeout=2)
+
+    assert handler.seen == [('heartbeats', 1)]
+    assert pipeline.stats()['decode_errors'] == 1
+    await pipeline.stop()
+    assert not pipeline.running and pipeline.depth() == 0
@@ -0,0 +1,143 @@
+"""
+Test shared state delta replication
+
+Publishing writes only changed entries (rows, items, tombstones) under one
+version; readers apply only entries newer than their last version, rebuild
+the same shapes as the shared_data blob, republish read state without writes,
+and are woken by the notifier (SQLite + file stand-in).
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from SharedDataManager.replication import FileNotifier, SharedStateReplicator
+from TableModels.shared_data_entry import SharedDataEntry
+
+
+class _SessionManager:
+    def __init__(self, engine):
+        self.engine = engine
+        self._sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def async_session(self):
+        async with self._sessionmaker() as session:
+            yield session
+
+
+@pytest.fixture
+async def db(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'shared.sqlite'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(SharedDataEntry.__table__.create)
+    yield _SessionManager(engine)
+    await engine.dispose()
+
+
+def market_data():
+    return {
+        'ticker_cache': pd.DataFrame({'symbol': ['BTC/USD', 'ETH/USD', 'SOL/USD'],
+                                      'price': [100000.0, 3500.0, 150.0], 'rank': [1, 2, 3]}),
+        'bid_ask_spread': {'BTC/USD': {'bid': 99999.0, 'ask': 100001.0}, 'ETH/USD': {'bid': 3499.5, 'ask': 3500.5}},
+        'avg_quote_volume': Decimal('750000'),
+    }
+
+
+def order_management():
+    return {'order_tracker': {'o-1': {'symbol': 'BTC/USD', 'status': 'open', 'amount': Decimal('0.5')}},
+            'non_zero_balances': {}}
+
+
+async def test_publish_writes_changed_entries_and_reader_applies_them(db):
+    writer, reader = SharedStateReplicator(db), SharedStateReplicator(db)
+    md, om = market_data(), order_management()
+    assert await writer.publish({'market_data': md, 'order_management': om}) == 11
+    assert await writer.publish({'market_data': md, 'order_management': om}) == 0
+
+    await reader.sync()
+    state = reader.state['market_data']
+    pd.testing.assert_frame_equal(state['ticker_cache'], md['ticker_cache'])
+    assert state['bid_ask_spread'] == md['bid_ask_spread'] and state['avg_quote_volume'] == Decimal('750000')
+    assert reader.state['order_management']['order_tracker']['o-1']['amount'] == 0.5  # Nested Decimal → float
+
+    md['ticker_cache'].loc[1, 'price'] = 3510.0
+    del md['bid_ask_spread']['ETH/USD']
+    om['order_tracker']['o-1']['status'] = 'filled'
+    assert await writer.publish({'market_data': md, 'order_management': om}) == 3
+
+    received = reader.stats()['entries_received']
+    assert await reader.sync() == {('market_data', 'ticker_cache'), ('market_data', 'bid_ask_spread'),
+                                   ('order_management', 'order_tracker')}
+    assert reader.stats()['entries_received'] - received == 3
+    assert reader.state['market_data']['ticker_cache']['price'].tolist() == [100000.0, 3510.0, 150.0]
+    assert list(reader.state['market_data']['bid_ask_spread']) == ['BTC/USD']
+    assert reader.state['order_management']['order_tracker']['o-1']['status'] == 'filled'
+
+
+async def test_reader_republishes_only_its_own_changes(db):
+    webhook, sighook = SharedStateReplicator(db), SharedStateReplicator(db)
+    md = market_data()
+    await webhook.publish({'market_data': md})
+    await sighook.sync()
+
+    # sighook's copy goes stale while the webhook moves prices
+    md['ticker_cache'].loc[0, 'price'] = 101000.0
+    await webhook.publish({'market_data': md})
+
+    local = dict(sighook.state['market_data'])
+    local['buy_sell_matrix'] = pd.DataFrame({'asset': ['BTC'], 'signal': ['buy']})
+    assert await sighook.publish({'market_data': local}) == 2  # Header + row of the new path only
+
+    await webhook.sync()
+    assert webhook.state['market_data']['ticker_cache']['price'][0] == 101000.0
+    assert webhook.state['market_data']['buy_sell_matrix']['signal'].tolist() == ['buy']
+
+
+async def test_notifier_wakes_reader(db, tmp_path):
+    path = str(tmp_path / 'shared_data.version')
+    writer = SharedStateReplicator(db, notifier=FileNotifier(path, poll_interval=0.01))
+    reader = SharedStateReplicator(db, notifier=FileNotifier(path, poll_interval=0.01))
+    await reader.sync()
+    await reader.start()
+
+    md = market_data()
+    await writer.publish({'market_data': md})
+    for _ in range(100):
+        if 'ticker_cache' in reader.state.get('market_data', {}):
+            break
+        await asyncio.sleep(0.01)
+    assert reader.state['market_data']['bid_ask_spread'] == md['bid_ask_spread']
+    assert reader.stats()['notifications'] == 1 and reader.stats()['last_notify_to_apply_ms'] > 0
+    await reader.stop()
+
+
+async def test_tombstones_purged_and_stale_reader_reloads(db):
+    writer = SharedStateReplicator(db, tombstone_retention=60, purge_interval=0)
+    reader = SharedStateReplicator(db, tombstone_retention=60)
+    md = market_data()
+    await writer.publish({'market_data': md})
+    await reader.sync()
+
+    del md['bid_ask_spread']['BTC/USD']
+    await writer.publish({'market_data': md})
+    async with db.async_session() as session:
+        async with session.begin():
+            await session.execute(update(SharedDataEntry).where(SharedDataEntry.value.is_(None))
+                                  .values(last_updated=datetime.now(timezone.utc) - timedelta(hours=1)))
+    md['ticker_cache'].loc[2, 'price'] = 155.0
+    await writer.publish({'market_data': md})  # Purges the tombstone
+    async with db.async_session() as session:
+        assert (await session.execute(select(func.count()).where(SharedDataEntry.value.is_(None)))).scalar() == 0
+
+    reader._synced_at -= 3600  # Missed the tombstone: reload everything
+    await reader.sync()
+    assert reader.stats()['full_syncs'] == 2
+    assert list(reader.state['market_data']['bid_ask_spread']) == ['ETH/USD']
+    assert reader.state['market_data']['ticker_cache']['price'][2] == 155.0
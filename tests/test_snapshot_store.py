@@ -0,0 +1,78 @@
+"""
+Test copy-on-write shared state snapshots
+
+Reads return the same frozen snapshot until the live state changes; a rebuild
+re-freezes only replaced or marked values and shares the rest; snapshots are
+read-only, copies of them are mutable, and max_age bounds unmarked edits.
+"""
+
+import copy
+import json
+
+import pandas as pd
+import pytest
+
+from SharedDataManager.snapshot_store import FrozenDict, SnapshotStore
+
+
+class _Live:
+    def __init__(self):
+        self.market_data = {
+            'ticker_cache': pd.DataFrame({'symbol': ['BTC/USD', 'ETH/USD'], 'price': [100000.0, 3500.0]}),
+            'bid_ask_spread': {'BTC/USD': {'bid': 99999.0, 'ask': 100001.0}},
+            'filtered_vol': [{'symbol': 'BTC/USD'}],
+        }
+        self.order_management = {'order_tracker': {'o-1': {'status': 'open'}}, 'non_zero_balances': {}}
+        self.store = SnapshotStore(lambda: (self.market_data, self.order_management), max_age=60)
+
+
+def test_reads_share_one_snapshot_until_a_value_is_replaced():
+    live = _Live()
+    first = live.store.current()
+    assert live.store.current() is first and live.store.stats()['builds'] == 1
+
+    live.market_data['bid_ask_spread'] = {'BTC/USD': {'bid': 101000.0, 'ask': 101002.0}}
+    second = live.store.current()
+    assert second.version == first.version + 1
+    assert second.market_data['bid_ask_spread']['BTC/USD']['bid'] == 101000.0
+    assert first.market_data['bid_ask_spread']['BTC/USD']['bid'] == 99999.0  # Old version untouched
+    assert second.market_data['ticker_cache'] is first.market_data['ticker_cache']  # Structural sharing
+    assert second.order_management is first.order_management
+
+    live.market_data['ticker_cache'].loc[0, 'price'] = 0.0  # Writers' DataFrames are copied, not shared
+    assert second.market_data['ticker_cache']['price'][0] == 100000.0
+
+
+def test_in_place_changes_need_mark_changed():
+    live = _Live()
+    first = live.store.current()
+    live.order_management['order_tracker']['o-1']['status'] = 'filled'
+    assert live.store.current() is first
+
+    live.store.mark_changed('order_management', ['order_tracker'])
+    second = live.store.current()
+    assert second.order_management['order_tracker']['o-1']['status'] == 'filled'
+    assert second.order_management['non_zero_balances'] is first.order_management['non_zero_balances']
+
+
+def test_snapshots_are_read_only_and_copies_are_mutable():
+    live = _Live()
+    snapshot = live.store.current()
+    with pytest.raises(TypeError):
+        snapshot.market_data['bid_ask_spread']['ETH/USD'] = {}
+    with pytest.raises(TypeError):
+        snapshot.market_data['filtered_vol'].append({})
+
+    thawed = copy.deepcopy(snapshot.market_data)
+    thawed['bid_ask_spread']['ETH/USD'] = {}
+    assert type(thawed) is dict and 'ETH/USD' not in snapshot.market_data['bid_ask_spread']
+    assert isinstance(snapshot.order_management, FrozenDict)
+    assert json.loads(json.dumps(snapshot.order_management)) == live.order_management
+
+
+def test_max_age_refreezes_unmarked_changes():
+    live = _Live()
+    live.store.max_age = 0
+    live.store.current()
+    live.order_management['order_tracker']['o-2'] = {'status': 'open'}
+    assert 'o-2' in live.store.current().order_management['order_tracker']
@@ -0,0 +1,100 @@
+"""
+Test ticker dispatcher
+
+Per-symbol queues keep only the latest updates, one slow symbol does not hold
+up the others, a symbol is never processed concurrently, the worker limit is
+respected, and handler errors are counted without stopping the workers.
+"""
+
+import asyncio
+
+from webhook.ticker_dispatcher import TickerDispatcher
+
+
+class Recorder:
+    def __init__(self, delays=None):
+        self.delays = delays or {}
+        self.seen = []
+        self.active = {}
+        self.max_active = 0
+        self.max_per_symbol = 0
+
+    async def __call__(self, update):
+        symbol, value = update
+        self.active[symbol] = self.active.get(symbol, 0) + 1
+        self.max_per_symbol = max(self.max_per_symbol, self.active[symbol])
+        self.max_active = max(self.max_active, sum(self.active.values()))
+        try:
+            if value == 'boom':
+                raise ValueError('bad ticker')
+            await asyncio.sleep(self.delays.get(symbol, 0.001))
+            self.seen.append(update)
+        finally:
+            self.active[symbol] -= 1
+
+
+async def _drain(dispatcher, timeout=2.0):
+    async def idle():
+        while dispatcher.stats()['queue_depth'] or dispatcher._scheduled:
+            await asyncio.sleep(0.001)
+    await asyncio.wait_for(idle(), timeout)
+
+
+async def test_latest_update_wins():
+    handler = Recorder(delays={'BTC-USD': 0.05})
+    dispatcher = TickerDispatcher(handler, max_workers=2, metrics_interval=0)
+    for i in range(10):
+        dispatcher.submit('BTC-USD', ('BTC-USD', i))
+        await asyncio.sleep(0)
+    await _drain(dispatcher)
+
+    # The first update was picked up immediately; the rest collapsed into the latest
+    assert handler.seen == [('BTC-USD', 0), ('BTC-USD', 9)]
+    stats = dispatcher.stats()
+    assert stats['dropped'] == 8 and stats['processed'] == 2
+    assert stats['top_dropped'] == [('BTC-USD', 8)]
+    await dispatcher.stop()
+
+
+async def test_slow_symbol_does_not_block_others():
+    handler = Recorder(delays={'SLOW-USD': 0.5})
+    dispatcher = TickerDispatcher(handler, max_workers=4, metrics_interval=0)
+    dispatcher.submit('SLOW-USD', ('SLOW-USD', 0))
+    for symbol in ['AAA-USD', 'BBB-USD', 'CCC-USD']:
+        dispatcher.submit(symbol, (symbol, 0))
+
+    await asyncio.sleep(0.1)
+    assert sorted(s for s, _ in handler.seen) == ['AAA-USD', 'BBB-USD', 'CCC-USD']
+    await dispatcher.stop()
+
+
+async def test_worker_limit_and_per_symbol_serial():
+    handler = Recorder()
+    dispatcher = TickerDispatcher(handler, max_workers=3, queue_size=4, metrics_interval=0)
+    for round_ in range(4):
+        for i in range(10):
+            dispatcher.submit(f"S{i}-USD", (f"S{i}-USD", round_))
+    await _drain(dispatcher)
+
+    assert handler.max_active <= 3 and handler.max_per_symbol == 1
+    assert len(handler.seen) == 40 and dispatcher.stats()['dropped'] == 0
+    # Per-symbol arrival order is kept
+    for i in range(10):
+        assert [v for s, v in handler.seen if s == f"S{i}-USD"] == [0, 1, 2, 3]
+    await dispatcher.stop()
+
+
+async def test_errors_are_counted_and_workers_survive():
+    handler = Recorder()
+    dispatcher = TickerDispatcher(handler, max_workers=1, queue_size=2, metrics_interval=0)
+    dispatcher.submit('BAD-USD', ('BAD-USD', 'boom'))
+    dispatcher.submit('BAD-USD', ('BAD-USD', 1))
+    await _drain(dispatcher)
+
+    stats = dispatcher.stats()
+    assert stats['errors'] == 1 and stats['processed'] == 1
+    assert handler.seen == [('BAD-USD', 1)]
+    assert stats['processing']['max_ms'] >= stats['processing']['p50_ms'] >= 0
+
+    await dispatcher.stop()
+    assert not dispatcher.running and dispatcher.stats()['queue_depth'] == 0
@@ -0,0 +1,50 @@
+"""
+Test ATR for active positions from the shared OHLCV store
+
+_calculate_atr_for_products refreshes the stored 1h series from the exchange
+and computes ATR from it, skipping symbols whose newest stored candle is
+stale (for example after a failed fetch).
+"""
+
+import logging
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from MarketDataManager.ohlcv_store import OHLCVStore
+from MarketDataManager.ticker_manager import ATR_MAX_CANDLE_AGE, TickerManager
+
+
+def _hourly(end: int, count: int) -> pd.DataFrame:
+    times = end - 3600 * np.arange(count)[::-1]
+    close = 100.0 + np.arange(count)
+    return pd.DataFrame({'time': pd.to_datetime(times, unit='s', utc=True), 'open': close,
+                         'high': close + 2, 'low': close - 2, 'close': close, 'volume': 1.0})
+
+
+def _manager(store, response):
+    async def fetch_ohlcv(product_id, params):
+        return response
+
+    manager = TickerManager.__new__(TickerManager)
+    manager.logger = logging.getLogger('test_ticker_manager_atr')
+    manager.ohlcv_store = store
+    manager.coinbase_api = SimpleNamespace(fetch_ohlcv=fetch_ohlcv)
+    return manager
+
+
+async def test_atr_uses_fresh_candles_and_skips_stale_ones():
+    now = int(datetime.now(timezone.utc).timestamp())
+    store = OHLCVStore()
+    store.update_frame('BTC-USD', 'ONE_HOUR', _hourly(now - ATR_MAX_CANDLE_AGE - 3600, 30))
+    positions = {'BTC': {}}
+
+    # The fetch failed, so only the stale stored series is left
+    assert await _manager(store, {})._calculate_atr_for_products([], positions) == ({}, {})
+
+    pct, price = await _manager(store, {'data': _hourly(now, 30)})._calculate_atr_for_products([], positions)
+    assert price['BTC-USD'] == 4.0
+    assert pct['BTC-USD'] == pytest.approx(4.0 / 129.0)
@@ -0,0 +1,123 @@
+"""
+Test batched trade recording
+
+Queued trades are coalesced into one transaction per batch with per-symbol
+order preserved, `source` rules (immutable once known, SELLs inherit their
+parent BUY's) hold across rows of the same batch, a failing batch falls back
+to one trade at a time, and the worker reports batch size and queue lag.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from decimal import Decimal
+from types import SimpleNamespace
+
+from SharedDataManager.trade_recorder import TradeRecorder
+
+
+class _Session:
+    """Applies TradeRecorder's statements to a dict of trade_records rows"""
+
+    def __init__(self, db):
+        self.db = db
+
+    @asynccontextmanager
+    async def begin(self):
+        snapshot = {k: dict(v) for k, v in self.db.rows.items()}
+        try:
+            yield
+            self.db.commits += 1
+        except BaseException:
+            self.db.rows = snapshot
+            raise
+
+    async def execute(self, stmt):
+        if stmt.is_select:
+            ids = stmt.whereclause.right.value
+            return [(i, self.db.rows[i]['source']) for i in ids if i in self.db.rows]
+        rows = [{col.key: value for col, value in row.items()} for row in stmt._multi_values[0]]
+        updates = [key for key, _ in stmt._post_values_clause.update_values_to_set]
+        self.db.statements.append([row['order_id'] for row in rows])
+        for row in rows:
+            if row['order_id'] in self.db.poison:
+                raise RuntimeError(f"constraint violation on {row['order_id']}")
+            if row['order_id'] in self.db.rows:
+                self.db.rows[row['order_id']].update({k: row[k] for k in updates})
+            else:
+                self.db.rows[row['order_id']] = row
+
+
+class _Db:
+    def __init__(self, rows=None, poison=()):
+        self.rows = rows or {}
+        self.poison = set(poison)
+        self.statements = []
+        self.commits = 0
+
+    @asynccontextmanager
+    async def async_session(self):
+        yield _Session(self)
+
+
+def _recorder(db, batch_size=50):
+    precision = SimpleNamespace(fetch_precision=lambda symbol: (8, 2, 0, 0),
+                                safe_convert=lambda value, places: Decimal(str(value)))
+    recorder = TradeRecorder(db, None, precision, None, shared_data_manager=SimpleNamespace(market_data={}))
+    recorder.batch_size = batch_size
+    return recorder
+
+
+def _trade(order_id, symbol, side, source='', parent_id=None, amount='1'):
+    return {'order_id': order_id, 'symbol': symbol, 'side': side, 'amount': amount, 'price': '10',
+            'source': source, 'parent_id': parent_id, 'order_time': '2026-01-01T00:00:00Z'}
+
+
+async def test_batch_is_one_transaction_with_source_rules_and_symbol_order():
+    db = _Db(rows={'OLD-BUY': {'order_id': 'OLD-BUY', 'symbol': 'ETH-USD', 'side': 'buy', 'source': 'passivemm',
+                               'remaining_size': 0.5}})
+    recorder = _recorder(db)
+    batch = [
+        _trade('B1', 'BTC-USD', 'buy', source='webhook'),
+        _trade('E1', 'ETH-USD', 'sell', parent_id='OLD-BUY'),
+        _trade('B2', 'BTC-USD', 'sell', source='unknown', parent_id='B1'),
+        _trade('OLD-BUY', 'ETH-USD', 'buy', source='websocket', amount='2'),
+        _trade('B1', 'BTC-USD', 'buy', source='manual', amount='3'),
+    ]
+    assert await recorder.record_trades(batch) == 5
+
+    assert db.commits == 1
+    # Rows share a statement per upsert shape; B1's second row goes in one after its first
+    assert db.statements == [['B1'], ['B2', 'E1'], ['B1', 'OLD-BUY']]
+    assert db.rows['B2']['source'] == 'webhook'  # Inherited from a parent written earlier in the batch
+    assert db.rows['E1']['source'] == 'passivemm'
+    assert db.rows['B1']['source'] == 'webhook' and db.rows['B1']['size'] == 3.0  # Source immutable, size updated
+    assert db.rows['OLD-BUY']['remaining_size'] == 0.5 and db.rows['OLD-BUY']['source'] == 'passivemm'
+
+
+async def test_rows_share_one_statement_and_a_bad_row_falls_back():
+    db = _Db(poison={'S3'})
+    recorder = _recorder(db)
+    batch = [_trade(f'S{i}', 'SOL-USD', 'buy', source='websocket') for i in range(6)]
+    assert await recorder.record_trades(batch) == 5
+
+    assert db.statements[0] == [f'S{i}' for i in range(6)]  # The batch statement, rolled back
+    assert db.statements[1:] == [[f'S{i}'] for i in range(6)]
+    assert sorted(db.rows) == ['S0', 'S1', 'S2', 'S4', 'S5']
+    assert db.commits == 5 and recorder.metrics['failed'] == 1
+
+
+async def test_worker_coalesces_queued_trades_and_reports_lag():
+    db = _Db()
+    recorder = _recorder(db, batch_size=10)
+    for i in range(25):
+        await recorder.enqueue_trade(_trade(f'T{i:02d}', f'SYM{i % 3}-USD', 'buy', source='websocket'))
+    await asyncio.sleep(0.01)
+
+    await recorder.start_worker()
+    await asyncio.wait_for(recorder.trade_queue.join(), timeout=5)
+    recorder.worker_task.cancel()
+
+    stats = recorder.stats()
+    assert (stats['trades'], stats['batches'], stats['max_batch'], stats['last_batch']) == (25, 3, 10, 5)
+    assert stats['max_lag_s'] >= 0.01 and stats['queued'] == 0
+    assert db.commits == 3 and len(db.rows) == 25
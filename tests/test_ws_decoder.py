@@ -0,0 +1,45 @@
+"""
+Test websocket frame decoder
+
+Every available decoder returns the same messages as stdlib json on a
+Coinbase-shaped corpus and raises ValueError on malformed frames; numeric
+fields convert to Decimal on access.
+"""
+
+from decimal import Decimal
+
+import pytest
+
+from scripts.benchmarks.bench_ws_decode import generate_frames
+from webhook import ws_decoder
+from webhook.ws_decoder import available_decoders, decimal_field, get_decoder, to_decimal
+
+
+@pytest.mark.parametrize('name', available_decoders())
+def test_decoders_match_stdlib(name):
+    frames = generate_frames(60, tickers_per_batch=20, seed=4)
+    stdlib = get_decoder('json')
+    decode = get_decoder(name)
+    assert [decode(f) for f in frames] == [stdlib(f) for f in frames]
+    assert decode(frames[0].encode()) == stdlib(frames[0])
+    with pytest.raises(ValueError):
+        decode('{"channel": "ticker_batch", ')
+
+
+def test_decoder_selection(monkeypatch):
+    monkeypatch.setenv('WS_JSON_DECODER', 'json')
+    assert get_decoder() is get_decoder('json')
+    expected = 'orjson' if ws_decoder.orjson is not None else 'json'
+    assert get_decoder('auto') is get_decoder(expected)
+    with pytest.raises(ValueError):
+        get_decoder('simdjson')
+
+
+def test_decimal_field():
+    ticker = {'price': '101.2500', 'volume_24_h': '', 'low_24_h': 'n/a', 'size': 3, 'ratio': 0.1}
+    assert decimal_field(ticker, 'price') == Decimal('101.2500')
+    assert str(decimal_field(ticker, 'price')) == '101.2500'
+    assert decimal_field(ticker, 'volume_24_h', Decimal('0')) == Decimal('0')
+    assert decimal_field(ticker, 'low_24_h') is None
+    assert decimal_field(ticker, 'missing', Decimal('0')) == Decimal('0')
+    assert to_decimal(ticker['size']) == Decimal(3) and to_decimal(ticker['ratio']) == Decimal('0.1')
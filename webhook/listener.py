@@ -1,5 +1,6 @@
 
 
+import os
 import json
 import time
 import uuid
@@ -34,6 +35,7 @@ from Shared_Utils.alert_system import AlertSystem
 from webhook.webhook_manager import WebHookManager
 from TestDebugMaintenance.debugger import Debugging
 from webhook.websocket_helper import WebSocketHelper
+from webhook.receive_pipeline import ReceivePipeline, SHED_CHANNELS
 from webhook.webhook_validate_orders import OrderData
 from Shared_Utils.dates_and_times import DatesAndTimes
 from webhook.webhook_order_types import OrderTypeManager
@@ -88,6 +90,10 @@ class WebSocketManager:
         self._market_reconnect_lock = asyncio.Lock()
         self._user_reconnect_lock = asyncio.Lock()
 
+        # Receive pipelines: socket reads only enqueue frames, consumers outlive reconnects
+        self.use_receive_pipeline = os.getenv('WS_RECEIVE_PIPELINE', 'true').lower() in ('true', '1', 'yes')
+        self.receive_pipelines = {}
+
     # ===============================================================
     # PUBLIC METHODS
     # ===============================================================
@@ -105,6 +111,9 @@ class WebSocketManager:
             asyncio.create_task(self.websocket_helper.monitor_user_channel_activity())
             asyncio.create_task(self.websocket_helper.monitor_market_channel_activity())
 
+            if self.websocket_helper.candle_service is not None:
+                asyncio.create_task(self.websocket_helper.candle_service.run(self.shutdown_event))
+
         except Exception as e:
             self.logger.error(f"Error starting WebSockets: {e}", exc_info=True)
 
@@ -119,6 +128,23 @@ class WebSocketManager:
                     await task
                 except asyncio.CancelledError:
                     self.logger.info("✅ WebSocket task cancelled cleanly.")
+        for pipeline in self.receive_pipelines.values():
+            self.logger.info(f"🛑 Stopping {pipeline.name} receive pipeline: {pipeline.stats()}")
+            await pipeline.stop()
+
+    def _receive_pipeline(self, stream: str, is_user_ws: bool) -> ReceivePipeline:
+        """Started receive pipeline of a stream (user frames are never shed)"""
+        pipeline = self.receive_pipelines.get(stream)
+        if pipeline is None:
+            if is_user_ws:
+                pipeline = ReceivePipeline(stream, self.websocket_helper.handle_user_data, shed_channels=())
+            else:
+                pipeline = ReceivePipeline(stream, self.websocket_helper.handle_market_data,
+                                           observe=self.websocket_helper.observe_market_message,
+                                           shed_channels=SHED_CHANNELS)
+            self.receive_pipelines[stream] = pipeline
+        pipeline.start()
+        return pipeline
 
     # ===============================================================
     # CONNECTION MANAGEMENT
@@ -163,6 +189,7 @@ class WebSocketManager:
         last_message_time = time.time()
         MAX_ALERT_ATTEMPTS = 10
         BACKOFF_CAP = 60  # seconds
+        pipeline = self._receive_pipeline(stream, is_user_ws) if self.use_receive_pipeline else None
 
         while not self.shutdown_event.is_set():
             ws = None
@@ -196,6 +223,10 @@ class WebSocketManager:
                     else:
                         self.websocket_helper.market_ws = ws
                         self.reconnect_attempts_market = 0
+                        if self.websocket_helper.candle_service is not None:
+                            self.websocket_helper.candle_service.reset()  # Updates were missed while down
+                        if self.websocket_helper.order_books is not None:
+                            self.websocket_helper.order_books.reset()  # New sequence, new snapshots
 
                     # ---- (re)subscribe cleanly ----
                     if hasattr(self.websocket_helper, "subscribed_channels"):
@@ -222,13 +253,16 @@ class WebSocketManager:
                         continue  # exit context and retry
 
                     last_message_time = time.time()
-                    try:
-                        if is_user_ws:
-                            await self.websocket_helper._on_user_message_wrapper(first)
-                        else:
-                            await self.websocket_helper._on_market_message_wrapper(first)
-                    except Exception as msg_err:
-                        self.logger.error(f"❌ {stream}: error processing initial message: {msg_err}", exc_info=True)
+                    if pipeline is not None:
+                        pipeline.put(first)
+                    else:
+                        try:
+                            if is_user_ws:
+                                await self.websocket_helper._on_user_message_wrapper(first)
+                            else:
+                                await self.websocket_helper._on_market_message_wrapper(first)
+                        except Exception as msg_err:
+                            self.logger.error(f"❌ {stream}: error processing initial message: {msg_err}", exc_info=True)
 
                     self.logger.info(f"🎧 Listening on {stream} WebSocket…")
 
@@ -241,6 +275,9 @@ class WebSocketManager:
                             break
 
                         last_message_time = time.time()
+                        if pipeline is not None:
+                            pipeline.put(message)  # Decoded and dispatched by the pipeline's consumers
+                            continue
                         try:
                             if is_user_ws:
                                 await self.websocket_helper._on_user_message_wrapper(message)
@@ -715,6 +752,7 @@ class WebhookListener:
                 # Remove the buy order from order_tracker (it's now a position)
                 if order_data.order_id in self.order_management.get('order_tracker', {}):
                     del self.order_management['order_tracker'][order_data.order_id]
+                    self.shared_data_manager.mark_changed('order_management', ['order_tracker'])
                     self.structured_logger.info(
                         "Removed filled buy order from order_tracker",
                         extra={'order_id': order_data.order_id}
@@ -733,6 +771,7 @@ class WebhookListener:
                 # Remove from order_tracker
                 if order_data.order_id in self.order_management.get('order_tracker', {}):
                     del self.order_management['order_tracker'][order_data.order_id]
+                    self.shared_data_manager.mark_changed('order_management', ['order_tracker'])
                     self.structured_logger.info(
                         "Removed filled sell order from order_tracker",
                         extra={'order_id': order_data.order_id}
@@ -740,6 +779,7 @@ class WebhookListener:
                 # Remove from positions if tracked there
                 if symbol in self.order_management.get('positions', {}):
                     del self.order_management['positions'][symbol]
+                    self.shared_data_manager.mark_changed('order_management', ['positions'])
                     self.structured_logger.info(
                         "Removed closed position from positions",
                         extra={'symbol': symbol}
@@ -772,6 +812,7 @@ class WebhookListener:
 
                     # Clean up bracket tracking
                     del bracket_orders[symbol]
+                    self.shared_data_manager.mark_changed('order_management', ['bracket_orders'])
                     self.logger.debug(f"[BRACKET] Removed bracket tracking for {symbol} (exit via {exit_source})")
                 else:
                     self.logger.debug(f"[BRACKET] No bracket found for {symbol} SELL fill (likely position monitor exit)")
@@ -1114,11 +1155,7 @@ class WebhookListener:
         try:
             while True:
                 try:
-                    market_data_snapshot, order_management_snapshot = await self.shared_data_manager.get_snapshots()
-                    await self.shared_data_manager.update_shared_data(
-                        new_market_data=market_data_snapshot,
-                        new_order_management=order_management_snapshot
-                    )
+                    # Saves the live state (snapshots are read-only and must not be merged back into it)
                     await self.shared_data_manager.save_data()
                     self.logger.debug("✅ Periodic save completed.")
                 except Exception as e:
@@ -1182,6 +1219,7 @@ class WebhookListener:
                 'side': side,
                 'timestamp': trade_data.get("time", int(time.time() * 1000))
             }
+            self.shared_data_manager.mark_changed('market_data', ['strategy_metadata_cache'])
 
             self.logger.debug(
                 f"[STRATEGY_CACHE] Cached metadata for {product_id}: "
@@ -1237,6 +1275,7 @@ class WebhookListener:
                 oid = normalized.get("order_id")
                 if oid and oid not in tracker:
                     tracker[oid] = normalized
+                    shared_data_manager.mark_changed('order_management', ['order_tracker'])
                     logger.debug(f"📌 Added missing open order: {oid}")
 
             # ✅ Fetch recent FILLED orders
@@ -0,0 +1,262 @@
+"""
+Websocket Receive Pipeline
+
+Decouples socket reads from message handling. The receive loop only calls
+put() with the raw frame; a decoder task parses it and routes it to a queue
+per channel, and one consumer task per channel dispatches the decoded
+messages in arrival order. A slow handler therefore only delays its own
+channel and never the socket reads (which keep the server-side connection
+alive during bursts).
+
+Backpressure policy:
+- Every queue has a high-water mark; crossing it is logged (once per excursion)
+  and counted.
+- Shed channels (ticker frames) are bounded by their high-water mark: the
+  oldest frame is dropped for each new one, and frames older than
+  `stale_after` seconds are dropped at dispatch while a newer frame is
+  queued behind them. The newest ticker frame is always delivered.
+- All other channels (user/order updates, heartbeats, subscriptions, level2,
+  trades) are never dropped.
+
+Metrics per channel (see stats()): queue depth and peak, receive-to-dispatch
+lag, handler time, and processed / shed / high-water counts.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, Optional, Tuple
+
+from Shared_Utils.logger import get_logger
+from webhook.ticker_dispatcher import latency_percentiles
+from webhook.ws_decoder import get_decoder
+
+SHED_CHANNELS = ('ticker_batch', 'ticker')
+
+_INTAKE = '_intake'
+
+
+class _ChannelQueue:
+    """Frames of one channel plus their metrics"""
+
+    __slots__ = ('name', 'frames', 'ready', 'high_water', 'shed', 'above_high_water',
+                 'peak', 'busy', 'lag_s', 'handle_s', 'counters', 'task')
+
+    def __init__(self, name: str, high_water: int, shed: bool, samples: int):
+        self.name = name
+        self.frames: Deque[Tuple[float, Any]] = deque()
+        self.ready = asyncio.Event()
+        self.high_water = high_water
+        self.shed = shed
+        self.above_high_water = False
+        self.peak = 0
+        self.busy = False  # A frame taken from the queue is being handled
+        self.lag_s: Deque[float] = deque(maxlen=samples)
+        self.handle_s: Deque[float] = deque(maxlen=samples)
+        self.counters = {'received': 0, 'processed': 0, 'shed_overflow': 0, 'shed_stale': 0,
+                         'high_water_hits': 0, 'errors': 0}
+        self.task: Optional[asyncio.Task] = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            'depth': len(self.frames),
+            'peak_depth': self.peak,
+            'high_water': self.high_water,
+            'lag': latency_percentiles(self.lag_s),
+            'handler': latency_percentiles(self.handle_s),
+        }
+
+
+class ReceivePipeline:
+    """
+    Usage:
+        pipeline = ReceivePipeline('MARKET', dispatch=helper.handle_market_data)
+        pipeline.start()
+        async for frame in ws:
+            pipeline.put(frame)
+        ...
+        await pipeline.stop()
+    """
+
+    def __init__(self, name: str, dispatch: Callable[[Dict], Awaitable[None]],
+                 decode: Optional[Callable[[Any], Dict]] = None, observe: Optional[Callable[[Dict], Any]] = None,
+                 shed_channels: Iterable[str] = SHED_CHANNELS,
+                 high_water: int = 1000, shed_high_water: int = 20, stale_after: float = 5.0,
+                 metrics_interval: float = 60.0, latency_samples: int = 1024, logger=None):
+        """
+        Args:
+            name: Stream name for logs (MARKET / USER)
+            dispatch: Coroutine function called with each decoded message
+            decode: Raw frame → message dict (default: ws_decoder.get_decoder())
+            observe: Called with every decoded message in arrival order, before
+                routing and shedding (e.g. sequence-gap checks)
+            shed_channels: Channels whose stale frames may be dropped
+            high_water: High-water mark of the intake queue and never-dropped channels
+            shed_high_water: Frames kept per shed channel
+            stale_after: Age (seconds since receipt) after which a shed-channel
+                frame is dropped if a newer one is queued
+            metrics_interval: Seconds between metrics log lines (0 = never)
+            latency_samples: Recent frames the latency percentiles are computed over
+        """
+        self.name = name
+        self.dispatch = dispatch
+        self.decode = decode or get_decoder()
+        self.observe = observe
+        self.shed_channels = set(shed_channels)
+        self.high_water = high_water
+        self.shed_high_water = max(1, shed_high_water)
+        self.stale_after = stale_after
+        self.metrics_interval = metrics_interval
+        self.latency_samples = latency_samples
+        self.logger = logger or get_logger('webhook', context={'component': 'receive_pipeline'})
+
+        self._intake = _ChannelQueue(_INTAKE, high_water, shed=False, samples=latency_samples)
+        self._channels: Dict[str, _ChannelQueue] = {}
+        self._decode_errors = 0
+        self._last_metrics = time.monotonic()
+
+    # =========================================================================
+    # LIFECYCLE
+    # =========================================================================
+
+    @property
+    def running(self) -> bool:
+        return self._intake.task is not None and not self._intake.task.done()
+
+    def start(self):
+        if not self.running:
+            self._intake.task = asyncio.create_task(self._decoder())
+            for channel in self._channels.values():
+                if channel.task is None or channel.task.done():
+                    channel.task = asyncio.create_task(self._consumer(channel))
+
+    async def stop(self):
+        """Cancel the decoder and consumers; queued frames are discarded"""
+        tasks = [q.task for q in (self._intake, *self._channels.values()) if q.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for queue in (self._intake, *self._channels.values()):
+            queue.task = None
+            queue.frames.clear()
+
+    async def join(self, timeout: Optional[float] = None):
+        """Wait until every queued frame has been dispatched"""
+        async def idle():
+            while self.depth():
+                await asyncio.sleep(0.001)
+        await asyncio.wait_for(idle(), timeout)
+
+    # =========================================================================
+    # RECEIVE SIDE
+    # =========================================================================
+
+    def put(self, raw: Any):
+        """Queue one raw frame (called by the receive loop; never blocks)"""
+        self._enqueue(self._intake, (time.monotonic(), raw))
+
+    def _enqueue(self, queue: _ChannelQueue, item: Tuple[float, Any]):
+        queue.counters['received'] += 1
+        if queue.shed and len(queue.frames) >= queue.high_water:
+            queue.frames.popleft()
+            queue.counters['shed_overflow'] += 1
+        queue.frames.append(item)
+        depth = len(queue.frames)
+        queue.peak = max(queue.peak, depth)
+        if depth >= queue.high_water and not queue.above_high_water and not queue.shed:
+            queue.above_high_water = True
+            queue.counters['high_water_hits'] += 1
+            self.logger.warning(f"⚠️ {self.name} {queue.name} queue above high-water mark",
+                                extra={'depth': depth, 'high_water': queue.high_water})
+        elif queue.above_high_water and depth < queue.high_water // 2:
+            queue.above_high_water = False
+        queue.ready.set()
+
+    # =========================================================================
+    # DECODE + DISPATCH
+    # =========================================================================
+
+    def _channel(self, name: str) -> _ChannelQueue:
+        queue = self._channels.get(name)
+        if queue is None:
+            shed = name in self.shed_channels
+            queue = _ChannelQueue(name, self.shed_high_water if shed else self.high_water,
+                                  shed=shed, samples=self.latency_samples)
+            queue.task = asyncio.create_task(self._consumer(queue))
+            self._channels[name] = queue
+        return queue
+
+    async def _next(self, queue: _ChannelQueue) -> Tuple[float, Any]:
+        queue.busy = False
+        while not queue.frames:
+            queue.ready.clear()
+            await queue.ready.wait()
+        queue.busy = True
+        return queue.frames.popleft()
+
+    async def _decoder(self):
+        intake = self._intake
+        while True:
+            received, raw = await self._next(intake)
+            intake.lag_s.append(time.monotonic() - received)
+            try:
+                data = self.decode(raw)
+            except Exception as e:
+                self._decode_errors += 1
+                self.logger.error(f"❌ Failed to decode {self.name} WebSocket message: {e}", exc_info=True)
+                continue
+            intake.counters['processed'] += 1
+            if self.observe is not None:
+                try:
+                    self.observe(data)
+                except Exception as e:
+                    self.logger.error(f"❌ {self.name}: error observing message: {e}", exc_info=True)
+            channel = data.get('channel') or data.get('type') or 'unknown'
+            self._enqueue(self._channel(channel), (received, data))
+            self._maybe_log_metrics()
+            if not intake.frames:
+                await asyncio.sleep(0)  # Let consumers run between bursts
+
+    async def _consumer(self, queue: _ChannelQueue):
+        while True:
+            received, data = await self._next(queue)
+            started = time.monotonic()
+            if queue.shed and queue.frames and started - received > self.stale_after:
+                queue.counters['shed_stale'] += 1
+                continue
+            queue.lag_s.append(started - received)
+            try:
+                await self.dispatch(data)
+                queue.counters['processed'] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                queue.counters['errors'] += 1
+                self.logger.error(f"❌ {self.name}: error processing {queue.name} message: {e}", exc_info=True)
+            finally:
+                queue.handle_s.append(time.monotonic() - started)
+
+    # =========================================================================
+    # METRICS
+    # =========================================================================
+
+    def depth(self) -> int:
+        """Frames waiting in (or being handled from) the intake and channel queues"""
+        return sum(len(q.frames) + q.busy for q in (self._intake, *self._channels.values()))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'stream': self.name,
+            'decode_errors': self._decode_errors,
+            'intake': self._intake.stats(),
+            'channels': {name: q.stats() for name, q in self._channels.items()},
+        }
+
+    def _maybe_log_metrics(self):
+        if not self.metrics_interval:
+            return
+        now = time.monotonic()
+        if now - self._last_metrics >= self.metrics_interval:
+            self._last_metrics = now
+            self.logger.info(f"{self.name} receive pipeline metrics", extra=self.stats())
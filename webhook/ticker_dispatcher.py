@@ -0,0 +1,169 @@
+"""
+Ticker Dispatcher
+
+Fans ticker updates out to concurrent workers so one slow symbol (REST OHLCV
+fetch, order placement) no longer holds up the rest of a ticker_batch or the
+websocket receive loop.
+
+- Each symbol has a bounded queue; when it is full the oldest update is
+  dropped (a newer price supersedes it), so the latest value always wins.
+- A symbol is handled by at most one worker at a time, in arrival order.
+- Up to `max_workers` symbols are processed concurrently.
+
+Metrics (see stats()): queue depth, drops, and queue-wait / processing
+latency percentiles over the most recent updates.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set, Tuple
+
+from Shared_Utils.logger import get_logger
+
+
+def latency_percentiles(samples) -> Dict[str, float]:
+    """p50 / p95 / max in milliseconds of latency samples in seconds"""
+    if not samples:
+        return {'p50_ms': 0.0, 'p95_ms': 0.0, 'max_ms': 0.0}
+    ordered = sorted(samples)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+    return {'p50_ms': pick(0.50), 'p95_ms': pick(0.95), 'max_ms': round(ordered[-1] * 1000, 3)}
+
+
+class TickerDispatcher:
+    """
+    Usage:
+        dispatcher = TickerDispatcher(handler, max_workers=8)
+        dispatcher.submit(product_id, ticker)    # non-blocking, from the message handler
+        ...
+        await dispatcher.stop()
+    """
+
+    def __init__(self, handler: Callable[[Any], Awaitable[None]], max_workers: int = 8,
+                 queue_size: int = 1, metrics_interval: float = 60.0, latency_samples: int = 2048):
+        """
+        Args:
+            handler: Coroutine function called with each update
+            max_workers: Symbols processed concurrently
+            queue_size: Pending updates kept per symbol (1 = only the latest)
+            metrics_interval: Seconds between metrics log lines (0 = never)
+            latency_samples: Recent updates the latency percentiles are computed over
+        """
+        self.handler = handler
+        self.max_workers = max(1, int(max_workers))
+        self.queue_size = max(1, int(queue_size))
+        self.metrics_interval = metrics_interval
+        self.logger = get_logger('webhook', context={'component': 'ticker_dispatcher'})
+
+        self._pending: Dict[str, Deque[Tuple[float, Any]]] = {}
+        self._scheduled: Set[str] = set()   # Symbols in the ready queue or being processed
+        self._ready: Optional[asyncio.Queue] = None
+        self._workers = []
+        self._wait_s: Deque[float] = deque(maxlen=latency_samples)
+        self._process_s: Deque[float] = deque(maxlen=latency_samples)
+        self._last_metrics = time.monotonic()
+        self.counters = {'submitted': 0, 'dropped': 0, 'processed': 0, 'errors': 0}
+        self.dropped_by_symbol: Dict[str, int] = {}
+
+    # =========================================================================
+    # LIFECYCLE
+    # =========================================================================
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self):
+        """Start the workers (called by submit() on first use)"""
+        if self.running:
+            return
+        self._ready = asyncio.Queue()
+        for symbol in self._scheduled:
+            self._ready.put_nowait(symbol)
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.max_workers)]
+
+    async def stop(self):
+        """Cancel the workers; pending updates are discarded"""
+        workers, self._workers = self._workers, []
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._pending.clear()
+        self._scheduled.clear()
+
+    # =========================================================================
+    # DISPATCH
+    # =========================================================================
+
+    def submit(self, symbol: str, update: Any):
+        """Queue an update for `symbol` (never blocks)"""
+        if not self.running:
+            self.start()
+        self.counters['submitted'] += 1
+        queue = self._pending.get(symbol)
+        if queue is None:
+            queue = self._pending[symbol] = deque(maxlen=self.queue_size)
+        if len(queue) == self.queue_size:
+            self.counters['dropped'] += 1
+            self.dropped_by_symbol[symbol] = self.dropped_by_symbol.get(symbol, 0) + 1
+        queue.append((time.monotonic(), update))
+        if symbol not in self._scheduled:
+            self._scheduled.add(symbol)
+            self._ready.put_nowait(symbol)
+
+    async def _worker(self, worker_id: int):
+        while True:
+            symbol = await self._ready.get()
+            queue = self._pending.get(symbol)
+            if not queue:
+                self._scheduled.discard(symbol)
+                continue
+            queued_at, update = queue.popleft()
+            started = time.monotonic()
+            self._wait_s.append(started - queued_at)
+            try:
+                await self.handler(update)
+                self.counters['processed'] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.counters['errors'] += 1
+                self.logger.error(f"❌ Error processing update for {symbol}: {e}", exc_info=True)
+            finally:
+                self._process_s.append(time.monotonic() - started)
+                if queue:
+                    self._ready.put_nowait(symbol)  # Back of the line: other symbols go first
+                else:
+                    self._scheduled.discard(symbol)
+                    self._pending.pop(symbol, None)
+            self._maybe_log_metrics()
+
+    # =========================================================================
+    # METRICS
+    # =========================================================================
+
+    def stats(self) -> Dict[str, Any]:
+        depths = [len(q) for q in self._pending.values()]
+        return {
+            **self.counters,
+            'workers': len(self._workers),
+            'queued_symbols': sum(1 for d in depths if d),
+            'queue_depth': sum(depths),
+            'max_queue_depth': max(depths, default=0),
+            'ready': self._ready.qsize() if self._ready is not None else 0,
+            'wait': latency_percentiles(self._wait_s),
+            'processing': latency_percentiles(self._process_s),
+            'top_dropped': sorted(self.dropped_by_symbol.items(), key=lambda kv: -kv[1])[:5],
+        }
+
+    def _maybe_log_metrics(self):
+        if not self.metrics_interval:
+            return
+        now = time.monotonic()
+        if now - self._last_metrics >= self.metrics_interval:
+            self._last_metrics = now
+            self.logger.info("Ticker dispatcher metrics", extra=self.stats())
@@ -11,6 +11,7 @@ from datetime import datetime, timedelta, timezone
 from webhook.webhook_validate_orders import OrderData
 from Config.config_manager import CentralConfig as Config
 from Shared_Utils.logger import get_logger
+from MarketDataManager.l2_order_book import L2BookManager
 
 
 # Define the OrderTypeManager class
@@ -138,11 +139,27 @@ class OrderTypeManager:
             "bid_size_1": Decimal|None, "ask_size_1": Decimal|None,
             "mid": Decimal
           }
-        Uses self.bid_ask_spread (fast path). If sizes are missing and
-        fetch_missing_sizes=True, fetches /product_book(limit=1) and merges.
+        Uses the websocket L2 book when it is in sync, else self.bid_ask_spread
+        (fast path). If sizes are missing and fetch_missing_sizes=True, fetches
+        /product_book(limit=1) and merges.
         """
         qquant = Decimal("1").scaleb(-int(quote_deci))
 
+        # --- 0) Live L2 book: prices and level-1 sizes without REST
+        l2 = L2BookManager.get_instance().book(product_id)
+        if l2 is not None and l2.bids and l2.asks:
+            (bid, bid_sz), (ask, ask_sz) = l2.best_bid(), l2.best_ask()
+            bid = self.shared_utils_precision.safe_quantize(bid, qquant)
+            ask = self.shared_utils_precision.safe_quantize(ask, qquant)
+            return {
+                "bid": bid,
+                "ask": ask,
+                "spread": ask - bid,
+                "mid": (bid + ask) / Decimal("2"),
+                "bid_size_1": bid_sz,
+                "ask_size_1": ask_sz,
+            }
+
         # --- 1) Fast path: read what we already have
         book = (self.bid_ask_spread or {}).get(product_id) or {}
         bid_raw = book.get("bid")
@@ -621,6 +638,7 @@ class OrderTypeManager:
                     'status': 'active',
                     'source': order_data.source
                 }
+                self.shared_data_manager.mark_changed('order_management', ['bracket_orders'])
 
                 self.logger.debug(
                     f"[BRACKET_TRACK] {trading_pair} bracket stored: "
@@ -1,14 +1,19 @@
 import asyncio
 import json
+import os
 import time
 import random
 import pandas as pd
 
 from decimal import Decimal
-from coinbase import jwt_generator
-from datetime import datetime, timedelta, timezone
+from Api_manager.jwt_cache import JwtCache
+from datetime import datetime, timezone
 from websockets.exceptions import ConnectionClosed, ConnectionClosedError, ConnectionClosedOK
 from Shared_Utils.logger import get_logger
+from MarketDataManager.candle_builder import TRADE_CHANNELS, CandleService
+from MarketDataManager.l2_order_book import L2_CHANNEL, L2BookManager
+from MarketDataManager.ohlcv_store import OHLCVStore
+from webhook.ws_decoder import decode
 
 BATCH_SIZE = 10
 TASK_TIMEOUT = 10  # per asset
@@ -114,6 +119,23 @@ class WebSocketHelper:
         self.market_channel_activity = {}  # key = channel, value = last_received_timestamp
         self.user_channel_activity = {}
 
+        # 1-minute candles built from market_trades messages (replaces the REST refetch)
+        self.candle_service = (
+            CandleService(database_session_manager, record_path=os.getenv('WS_CANDLE_RECORD_PATH') or None,
+                          store=OHLCVStore.get_instance())
+            if os.getenv('WS_CANDLES_ENABLED', 'false').lower() in ('true', '1', 'yes')
+            else None
+        )
+        if self.candle_service is not None:
+            self.market_channels += [c for c in TRADE_CHANNELS if c not in self.market_channels]
+
+        # Level2 order books (when 'level2' is one of the configured market channels)
+        self.level2_product_ids = [p.strip().replace('/', '-')
+                                   for p in os.getenv('WS_LEVEL2_PRODUCTS', '').split(',') if p.strip()]
+        self.order_books = L2BookManager.get_instance() if 'level2' in self.market_channels else None
+        if self.order_books is not None:
+            self.order_books.resync = self.resync_level2
+
     @property
     def currency_pairs_ignored(self):
         return self._currency_pairs_ignored
@@ -192,32 +214,36 @@ class WebSocketHelper:
     def generate_ws_jwt(self):
         """Generate JWT for WebSocket authentication."""
         try:
-            jwt_token = jwt_generator.build_rest_jwt(self.market_ws_url, self.websocket_api_key,
-                                                     self.websocket_api_secret)
+            issued = JwtCache.get_instance().issue(self.websocket_api_key, self.websocket_api_secret,
+                                                   self.market_ws_url)
 
-            if not jwt_token:
+            if not issued.token:
                 raise ValueError("JWT token is empty!")
 
-            self.jwt_token = jwt_token
-            self.jwt_expiry = datetime.now(timezone.utc) + timedelta(minutes=5)
+            self.jwt_token = issued.token
+            self.jwt_expiry = datetime.fromtimestamp(issued.expires, timezone.utc)
 
-            return jwt_token
+            return issued.token
         except Exception as e:
             self.logger.error(f"WebSocket JWT Generation Failed: {e}", exc_info=True)
             return None
 
     async def generate_jwt(self):
-        """Generate and refresh JWT if expired."""
-        if not self.jwt_token or datetime.now(timezone.utc) >= self.jwt_expiry - timedelta(seconds=60):
-            return self.generate_ws_jwt()  # ✅ Use WebSocketHelper's method
-
-        return self.jwt_token
+        """JWT for websocket auth (JwtCache re-signs it shortly before it expires)."""
+        return self.generate_ws_jwt()
 
     async def _on_user_message_wrapper(self, message):
         """Handle incoming user WebSocket messages and delegate to processor."""
         try:
-            data = json.loads(message)
+            data = decode(message)
+        except ValueError:
+            self.logger.error("❌ Failed to decode user WebSocket message.", exc_info=True)
+            return
+        await self.handle_user_data(data)
 
+    async def handle_user_data(self, data):
+        """Handle a decoded user WebSocket message (receive pipeline entry point)."""
+        try:
             # 📥 Log raw message for diagnostics
             #print(f"💚💚 Raw user WS message: {json.dumps(data, indent=2)} 💚💚 DEBUG")  # debug
 
@@ -232,8 +258,6 @@ class WebSocketHelper:
 
             await self.on_user_message(data)
 
-        except json.JSONDecodeError:
-            self.logger.error("❌ Failed to decode user WebSocket message.", exc_info=True)
         except Exception as e:
             self.logger.error(f"❌ Error in _on_user_message_wrapper: {e}", exc_info=True)
 
@@ -335,8 +359,21 @@ class WebSocketHelper:
     async def _on_market_message_wrapper(self, message):
         """Handle raw market WebSocket message and dispatch to appropriate processor."""
         try:
-            data = json.loads(message)
+            data = decode(message)
+        except ValueError:
+            self.logger.error("❌ Failed to decode market WebSocket message.", exc_info=True)
+            return
+        self.observe_market_message(data)
+        await self.handle_market_data(data)
 
+    def observe_market_message(self, data):
+        """Every decoded market message, in arrival order (sequence-gap check for the L2 books)."""
+        if self.order_books is not None:
+            self.order_books.observe(data)
+
+    async def handle_market_data(self, data):
+        """Handle a decoded market WebSocket message (receive pipeline entry point)."""
+        try:
             if data.get("type") == "error":
                 self.logger.error(f"❌ ❌ Market WebSocket Error: {data.get('message')} | Full message: {data} ❌❌")
                 await self.websocket_manager.force_reconnect()
@@ -351,8 +388,6 @@ class WebSocketHelper:
 
             await self.on_market_message(data)
 
-        except json.JSONDecodeError:
-            self.logger.error("❌ Failed to decode market WebSocket message.", exc_info=True)
         except Exception as e:
             self.logger.error(f"❌ Error in _on_market_message_wrapper: {e}", exc_info=True)
 
@@ -378,15 +413,22 @@ class WebSocketHelper:
                 )
                 self.market_channel_counters[channel] = 0
 
+            if self.candle_service is not None and channel in TRADE_CHANNELS:
+                self.candle_service.on_message(data)
+
             # --- Process specific channels ---
             if channel == "ticker_batch":
                 await self.market_ws_manager.process_ticker_batch_update(data)
 
-            elif channel == "level2":
-                # Debug level2 occasionally if needed
+            elif channel in ("market_trades", "ticker"):
+                pass  # Only feeds the candle builder
+
+            elif channel == L2_CHANNEL:
+                if self.order_books is not None:
+                    self.order_books.on_message(data)
                 if self.market_channel_counters[channel] == 0:
-                    self.structured_logger.debug("MARKET level2 active")
-                # process level2 here if implemented
+                    self.structured_logger.debug("MARKET level2 active", extra=self.order_books.stats()
+                                                 if self.order_books is not None else None)
 
             elif channel == "heartbeats":
                 self.last_heartbeat = time.time()
@@ -487,7 +529,10 @@ class WebSocketHelper:
                 successes, failures = set(), set()
 
                 for channel in self.market_channels:
-                    msg = {"type": "subscribe", "product_ids": self.product_ids, "channel": channel}
+                    product_ids = self.product_ids
+                    if channel == "level2" and self.level2_product_ids:
+                        product_ids = self.level2_product_ids
+                    msg = {"type": "subscribe", "product_ids": product_ids, "channel": channel}
 
                     # JWT only if your provider requires it for specific channels
                     if channel in {"level2_batch", "level2"}:
@@ -507,7 +552,7 @@ class WebSocketHelper:
 
                     try:
                         await ws.send(json.dumps(msg))
-                        self.logger.debug(f"✅ Sent subscription for {channel} ({len(self.product_ids)} products).")
+                        self.logger.debug(f"✅ Sent subscription for {channel} ({len(product_ids)} products).")
                         successes.add(channel)
                     except asyncio.CancelledError:
                         self.logger.warning(f"⚠️ Subscription to {channel} cancelled (reconnect/shutdown).")
@@ -533,6 +578,18 @@ class WebSocketHelper:
             self.logger.error(f"❌ Market subscription error: {e}", exc_info=True)
             return False
 
+    async def resync_level2(self, product_ids):
+        """Resubscribe level2 for `product_ids`; the server answers with fresh snapshots."""
+        ws = getattr(self, "market_ws", None)
+        if ws is None or getattr(ws, "closed", True):
+            self.logger.warning("⚠️ Market WebSocket is closed; level2 resync deferred to reconnect.")
+            return
+        jwt_token = await self.generate_jwt()
+        for msg_type in ("unsubscribe", "subscribe"):
+            await ws.send(json.dumps({"type": msg_type, "product_ids": list(product_ids),
+                                      "channel": "level2", "jwt": jwt_token}))
+        self.logger.info(f"🔄 Level2 resync requested for {len(product_ids)} products")
+
     async def subscribe_user(self):
         """Subscribe to User WebSocket channels with proper JWT authentication."""
         try:
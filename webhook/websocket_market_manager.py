@@ -1,6 +1,7 @@
 import asyncio
 import json
 import math
+import os
 import time
 from datetime import datetime, timezone
 from typing import Optional
@@ -9,6 +10,8 @@ from TableModels.trade_record import TradeRecord
 from Config.config_manager import CentralConfig as Config
 from webhook.webhook_validate_orders import OrderData
 from Shared_Utils.logger import get_logger
+from webhook.ticker_dispatcher import TickerDispatcher
+from webhook.ws_decoder import decimal_field
 
 getcontext().prec = 10
 
@@ -105,6 +108,14 @@ class WebSocketMarketManager:
         self.passive_order_semaphore = asyncio.Semaphore(5)
         self._background_tasks = set()
 
+        # ticker_batch fan-out: latest update per symbol, processed concurrently (0 workers = inline)
+        ticker_workers = int(os.getenv('TICKER_WORKERS', '8'))
+        self.ticker_dispatcher = (
+            TickerDispatcher(self._process_single_ticker, max_workers=ticker_workers,
+                             queue_size=int(os.getenv('TICKER_QUEUE_SIZE', '1')))
+            if ticker_workers > 0 else None
+        )
+
     @property
     def hodl(self):
         return self._hodl
@@ -171,6 +182,7 @@ class WebSocketMarketManager:
                         except Exception:
                             self.logger.error("❌ delete_trade failed", exc_info=True)
                         order_tracker.pop(order_id, None)
+                        self.shared_data_manager.mark_changed('order_management', ['order_tracker'])
                         continue
 
                     # -------------------------------
@@ -193,6 +205,7 @@ class WebSocketMarketManager:
                             order_tracker[order_id] = normalized
                         elif status == "FILLED":
                             order_tracker.pop(order_id, None)
+                        self.shared_data_manager.mark_changed('order_management', ['order_tracker'])
 
                     # -------------------------------
                     # ✅ PRIMARY FILLED ORDER HANDLING
@@ -449,7 +462,10 @@ class WebSocketMarketManager:
         try:
             for event in data.get("events", []):
                 for ticker in event.get("tickers", []):
-                    await self._process_single_ticker(ticker)
+                    if self.ticker_dispatcher is not None:
+                        self.ticker_dispatcher.submit(ticker.get("product_id"), ticker)
+                    else:
+                        await self._process_single_ticker(ticker)
         except Exception as e:
             self.logger.error(f"Error processing ticker_batch data: {e}", exc_info=True)
 
@@ -462,8 +478,8 @@ class WebSocketMarketManager:
                 return
             last = self.passive_order_manager.passive_order_tracker.get(product_id, {}).get("timestamp", 0)
             symbol = product_id.split("-")[0]
-            current_price = self.shared_utils_precision.safe_decimal(ticker.get("price", 0)) or Decimal("0")
-            base_volume = self.shared_utils_precision.safe_decimal((ticker.get("volume_24_h", 0)) or  Decimal("0"))
+            current_price = decimal_field(ticker, "price", Decimal("0"))
+            base_volume = decimal_field(ticker, "volume_24_h", Decimal("0"))
             usd_volume = base_volume * current_price
 
             # call manager at most once every 5 s per symbol
@@ -587,7 +603,10 @@ class WebSocketMarketManager:
         self.logger.debug(f"Stop order activated: {order_id} at stop price {stop_price}")
 
     async def shutdown(self):
-        """Cleanly cancel and await background passive order tasks."""
+        """Cleanly cancel and await ticker workers and background passive order tasks."""
+        if self.ticker_dispatcher is not None:
+            self.logger.info(f"🛑 Stopping ticker workers: {self.ticker_dispatcher.stats()}")
+            await self.ticker_dispatcher.stop()
         if hasattr(self, "_background_tasks"):
             self.logger.info("🛑 Cancelling passive order tasks...")
             for task in self._background_tasks:
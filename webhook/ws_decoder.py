@@ -0,0 +1,74 @@
+"""
+Websocket Frame Decoder
+
+Pluggable JSON decoding for market and user websocket frames:
+
+- orjson when it is installed (several times faster on ticker_batch frames),
+  stdlib json otherwise; WS_JSON_DECODER=json|orjson|auto picks explicitly.
+- Numeric fields are left as the strings Coinbase sends. decimal_field()
+  converts one field of one message on access, so only the symbols a
+  consumer actually processes pay for Decimal parsing. Conversions are
+  memoized by string, since consecutive frames repeat most prices and sizes.
+"""
+
+import json
+import os
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import orjson
+except ImportError:  # Optional: stdlib json is the fallback
+    orjson = None
+
+Decoder = Callable[[Any], Any]
+
+_DECODERS: Dict[str, Decoder] = {'json': json.loads}
+if orjson is not None:
+    _DECODERS['orjson'] = orjson.loads
+
+
+def available_decoders():
+    """Names of the decoders usable in this environment (fastest first)"""
+    return sorted(_DECODERS, key=lambda name: name != 'orjson')
+
+
+def get_decoder(name: Optional[str] = None) -> Decoder:
+    """
+    Decoder by name ('auto' = fastest available). Defaults to WS_JSON_DECODER.
+
+    Every decoder raises ValueError on malformed input (json.JSONDecodeError
+    and orjson.JSONDecodeError both subclass it).
+    """
+    name = (name or os.getenv('WS_JSON_DECODER', 'auto')).lower()
+    if name == 'auto':
+        return _DECODERS['orjson' if orjson is not None else 'json']
+    if name not in _DECODERS:
+        raise ValueError(f"JSON decoder '{name}' not available (have: {', '.join(available_decoders())})")
+    return _DECODERS[name]
+
+
+decode = get_decoder()
+
+
+@lru_cache(maxsize=65536)
+def _to_decimal(text: str) -> Decimal:
+    return Decimal(text)
+
+
+def to_decimal(value, default: Optional[Decimal] = None) -> Optional[Decimal]:
+    """Numeric string / int / float from a frame → Decimal (memoized for strings)"""
+    if value is None or value == '':
+        return default
+    try:
+        if isinstance(value, str):
+            return _to_decimal(value)
+        return Decimal(str(value)) if isinstance(value, float) else Decimal(value)
+    except (InvalidOperation, TypeError, ValueError):
+        return default
+
+
+def decimal_field(message: Dict, key: str, default: Optional[Decimal] = None) -> Optional[Decimal]:
+    """One numeric field of a decoded message as Decimal, parsed on access"""
+    return to_decimal(message.get(key), default)